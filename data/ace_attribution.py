@@ -1,6 +1,8 @@
 """ACE attribution math: residual / equal-split observations and event simulation.
 
 Production and eval both use ``simulate_event`` so research and live scores match.
+States, priors and snapshots are keyed by team slot (team_keys.TEAM_KEYS), not
+by TBA key string; callers convert at their DB / checkpoint boundaries.
 """
 
 from __future__ import annotations
@@ -10,7 +12,8 @@ import math
 from dataclasses import dataclass, field, replace
 from typing import Dict, List, Literal, Optional, Tuple
 
-from phase_totals import phase_totals
+from phase_totals import alliance_phase_totals
+from team_keys import TEAM_KEYS
 
 Method = Literal["residual", "equal_split", "residual_shrink", "baseline_current"]
 
@@ -47,10 +50,82 @@ def _parse_breakdown(match: dict) -> Optional[dict]:
     return breakdown
 
 
+# Pre-parsed score_breakdown stored on each match-store dict (see match_phases).
+PHASES_KEY = "_ace_phases"
+
+# Per alliance: (auto_S, teleop_S, endgame_S, per-robot endgame or None).
+AlliancePhases = Tuple[float, float, float, Optional[Tuple[float, ...]]]
+
+
+def extract_match_phases(match: dict, year: int) -> Dict[str, AlliancePhases]:
+    """Alliance phase totals for both colors, from one parse of ``score_breakdown``.
+
+    Seasons without a usable breakdown (pre-2015, or a missing one) credit the
+    whole alliance score to a shared endgame, as ACE always has.
+    """
+    breakdown_root = _parse_breakdown(match)
+    out: Dict[str, AlliancePhases] = {}
+    for color in ("red", "blue"):
+        n = len(match["alliances"][color].get("team_keys") or [])
+        alliance_bd: dict = {}
+        if breakdown_root:
+            raw_bd = breakdown_root.get(color) or {}
+            if isinstance(raw_bd, dict):
+                alliance_bd = raw_bd
+        if (not alliance_bd and year >= 2015) or year <= 2014:
+            out[color] = (0.0, 0.0, float(match["alliances"][color]["score"] or 0), None)
+        else:
+            auto_s, teleop_s, end_s, ends = alliance_phase_totals(year, alliance_bd, n)
+            out[color] = (auto_s, teleop_s, end_s, tuple(ends) if ends is not None else None)
+    return out
+
+
+def _phases_signature(match: dict, year: int) -> Tuple:
+    a = match["alliances"]
+    return (
+        year,
+        a["red"]["score"],
+        a["blue"]["score"],
+        len(a["red"].get("team_keys") or ()),
+        len(a["blue"].get("team_keys") or ()),
+    )
+
+
+def match_phases(match: dict, year: int) -> Dict[str, AlliancePhases]:
+    """``extract_match_phases``, computed once per match dict and kept on it.
+
+    The simulation re-walks the same match-store dicts for the precompute,
+    walk-forward predictions and every tuner evaluation; only the first walk
+    parses. The stored entry is keyed by year, scores and alliance sizes, so a
+    corrected result in place is re-extracted.
+    """
+    signature = _phases_signature(match, year)
+    cached = match.get(PHASES_KEY)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    phases = extract_match_phases(match, year)
+    match[PHASES_KEY] = (signature, phases)
+    return phases
+
+
+def extract_season_phases(matches_by_event: Dict[str, List[dict]], year: int) -> int:
+    """One-time extraction stage over a season's match store; returns matches parsed."""
+    parsed = 0
+    for matches in matches_by_event.values():
+        for match in matches or []:
+            if match.get(PHASES_KEY) is None or match[PHASES_KEY][0] != _phases_signature(match, year):
+                match_phases(match, year)
+                parsed += 1
+    return parsed
+
+
 def _played(match: dict) -> bool:
     red = match["alliances"]["red"]["score"]
     blue = match["alliances"]["blue"]["score"]
     winning = match.get("winning_alliance")
+    # TBA (and synthetic_season.py) report unplayed matches as -1 / -1.
+    if (red is not None and red < 0) or (blue is not None and blue < 0):
+        return False
     if red == 0 and blue == 0 and winning not in ("red", "blue"):
         return False
     return True
@@ -151,19 +226,19 @@ def ema_update(
 
 
 def seed_states_from_priors(
-    states: Dict[str, TeamPhaseState],
-    prior_means: Optional[Dict[str, Tuple[float, ...]]],
+    states: Dict[int, TeamPhaseState],
+    prior_means: Optional[Dict[int, Tuple[float, ...]]],
 ) -> None:
     """Seed RAW from cross-event priors so the event does not cold-start at 0."""
     if not prior_means:
         return
-    for key, phases in prior_means.items():
+    for slot, phases in prior_means.items():
         if not phases or len(phases) < 3:
             continue
         auto, teleop, endgame = float(phases[0]), float(phases[1]), float(phases[2])
         if auto == 0 and teleop == 0 and endgame == 0:
             continue
-        st = states.get(key) or TeamPhaseState()
+        st = states.get(slot) or TeamPhaseState()
         if st.initialized:
             continue
         st.auto = max(0.0, auto)
@@ -172,7 +247,7 @@ def seed_states_from_priors(
         if len(phases) > 3 and phases[3] is not None:
             st.carried_confidence = max(0.0, min(1.0, float(phases[3])))
         st.initialized = True
-        states[key] = st
+        states[slot] = st
 
 
 def merge_carry_prior(
@@ -203,13 +278,13 @@ def merge_carry_prior(
 
 
 def apply_match_updates(
-    states: Dict[str, TeamPhaseState],
+    states: Dict[int, TeamPhaseState],
     match: dict,
     year: int,
     method: Method,
     k_base: float = 0.4,
     shrink: float = 0.05,
-    prior_means: Optional[Dict[str, Tuple[float, ...]]] = None,
+    prior_means: Optional[Dict[int, Tuple[float, ...]]] = None,
     spike_damp: float = 0.5,
     k_up: float = 1.0,
     k_down: float = 1.0,
@@ -217,26 +292,24 @@ def apply_match_updates(
 ) -> None:
     """Update states in-place for one played match (all six robots)."""
     prior_means = prior_means or {}
-    breakdown_root = _parse_breakdown(match)
+    phases = match_phases(match, year)
     red_score = match["alliances"]["red"]["score"]
     blue_score = match["alliances"]["blue"]["score"]
     comp = match.get("comp_level", "qm")
+    red_slots, blue_slots = TEAM_KEYS.match_slots(match)
 
-    def ensure(key: str) -> TeamPhaseState:
-        if key not in states:
-            states[key] = TeamPhaseState()
-        return states[key]
+    def ensure(slot: int) -> TeamPhaseState:
+        if slot not in states:
+            states[slot] = TeamPhaseState()
+        return states[slot]
 
     for color in ("red", "blue"):
-        team_keys = list(match["alliances"][color].get("team_keys") or [])
-        if not team_keys:
+        team_slots = red_slots if color == "red" else blue_slots
+        if not team_slots:
             continue
-        n = len(team_keys)
-        alliance_bd: dict = {}
-        if breakdown_root:
-            raw_bd = breakdown_root.get(color) or {}
-            if isinstance(raw_bd, dict):
-                alliance_bd = raw_bd
+        n = len(team_slots)
+        auto_s, teleop_s, alliance_end, robot_ends = phases[color]
+        end_per_robot = robot_ends is not None
 
         snapshots = {
             k: (
@@ -245,36 +318,29 @@ def apply_match_updates(
                 ensure(k).endgame,
                 ensure(k).initialized,
             )
-            for k in team_keys
+            for k in team_slots
         }
         opp = "blue" if color == "red" else "red"
         opp_score = match["alliances"][opp]["score"]
 
-        for idx, key in enumerate(team_keys):
+        for idx, slot in enumerate(team_slots):
             robot_index = idx + 1
-            st = ensure(key)
+            st = ensure(slot)
             st.match_count += 1
             _record_wl(st, color, red_score, blue_score, year)
 
-            if (not alliance_bd and year >= 2015) or year <= 2014:
-                auto_s = teleop_s = 0.0
-                end_s = float(match["alliances"][color]["score"] or 0)
-                end_per_robot = False
-            else:
-                auto_s, teleop_s, end_s, end_per_robot = phase_totals(
-                    year, alliance_bd, n, robot_index
-                )
+            end_s = robot_ends[min(robot_index, len(robot_ends)) - 1] if end_per_robot else alliance_end
 
-            prior = prior_means.get(key, (0.0, 0.0, 0.0))
+            prior = prior_means.get(slot, (0.0, 0.0, 0.0))
             partner_auto = [
                 snapshots[k][0] if snapshots[k][3] else auto_s / n
-                for k in team_keys
-                if k != key
+                for k in team_slots
+                if k != slot
             ]
             partner_teleop = [
                 snapshots[k][1] if snapshots[k][3] else teleop_s / n
-                for k in team_keys
-                if k != key
+                for k in team_slots
+                if k != slot
             ]
 
             if method == "baseline_current":
@@ -286,7 +352,7 @@ def apply_match_updates(
                 obs_auto = observation_for_phase(
                     method,
                     auto_s,
-                    snapshots[key][0],
+                    snapshots[slot][0],
                     partner_auto,
                     n,
                     prior[0],
@@ -296,7 +362,7 @@ def apply_match_updates(
                 obs_teleop = observation_for_phase(
                     method,
                     teleop_s,
-                    snapshots[key][1],
+                    snapshots[slot][1],
                     partner_teleop,
                     n,
                     prior[1],
@@ -308,13 +374,13 @@ def apply_match_updates(
                 else:
                     partner_end = [
                         snapshots[k][2] if snapshots[k][3] else end_s / n
-                        for k in team_keys
-                        if k != key
+                        for k in team_slots
+                        if k != slot
                     ]
                     obs_end = observation_for_phase(
                         method,
                         end_s,
-                        snapshots[key][2],
+                        snapshots[slot][2],
                         partner_end,
                         n,
                         prior[2],
@@ -402,15 +468,15 @@ def simulate_event(
     method: Method = "residual_shrink",
     k_base: float = 0.4,
     shrink: float = 0.05,
-    prior_means: Optional[Dict[str, Tuple[float, ...]]] = None,
+    prior_means: Optional[Dict[int, Tuple[float, ...]]] = None,
     spike_damp: float = 0.5,
     seed_priors: bool = True,
     k_up: float = 1.0,
     k_down: float = 1.0,
     partner_cap: float = 0.0,
-) -> Dict[str, TeamPhaseState]:
+) -> Dict[int, TeamPhaseState]:
     """Match-centric walk: update all alliance members from each played match."""
-    states: Dict[str, TeamPhaseState] = {}
+    states: Dict[int, TeamPhaseState] = {}
     if seed_priors:
         seed_states_from_priors(states, prior_means)
     ordered = sorted(matches, key=_match_sort_key)
@@ -439,20 +505,20 @@ def simulate_event_pre_match_snapshots(
     method: Method = "residual_shrink",
     k_base: float = 0.4,
     shrink: float = 0.05,
-    prior_means: Optional[Dict[str, Tuple[float, ...]]] = None,
+    prior_means: Optional[Dict[int, Tuple[float, ...]]] = None,
     spike_damp: float = 0.5,
     seed_priors: bool = True,
     k_up: float = 1.0,
     k_down: float = 1.0,
     partner_cap: float = 0.0,
-) -> Tuple[Dict[str, TeamPhaseState], Dict[str, Dict[str, TeamPhaseState]]]:
+) -> Tuple[Dict[int, TeamPhaseState], Dict[str, Dict[int, TeamPhaseState]]]:
     """Walk an event and capture each team's state before every match.
 
-    Returns final states and ``match_key -> team_key -> pre-match TeamPhaseState``.
+    Returns final states and ``match_key -> team slot -> pre-match TeamPhaseState``.
     Unplayed matches receive snapshots reflecting all prior played matches only.
     """
-    states: Dict[str, TeamPhaseState] = {}
-    snapshots: Dict[str, Dict[str, TeamPhaseState]] = {}
+    states: Dict[int, TeamPhaseState] = {}
+    snapshots: Dict[str, Dict[int, TeamPhaseState]] = {}
     if seed_priors:
         seed_states_from_priors(states, prior_means)
 
@@ -462,11 +528,11 @@ def simulate_event_pre_match_snapshots(
         if not match_key:
             continue
 
-        team_snapshots: Dict[str, TeamPhaseState] = {}
-        for color in ("red", "blue"):
-            for key in match["alliances"][color].get("team_keys") or []:
-                st = states.get(key) or TeamPhaseState()
-                team_snapshots[key] = _copy_team_phase_state(st)
+        team_snapshots: Dict[int, TeamPhaseState] = {}
+        for team_slots in TEAM_KEYS.match_slots(match):
+            for slot in team_slots:
+                st = states.get(slot) or TeamPhaseState()
+                team_snapshots[slot] = _copy_team_phase_state(st)
         snapshots[match_key] = team_snapshots
 
         if _played(match):
@@ -26,7 +26,7 @@ def _as_date(value):
 def get_all_event_keys(conn, year):
     """Every event key for a season."""
     cur = conn.cursor()
-    cur.execute("SELECT event_key FROM events WHERE event_key LIKE %s", (f"{year}%",))
+    cur.execute("SELECT event_key FROM events WHERE year = %s", (int(year),))
     keys = [row[0] for row in cur.fetchall()]
     cur.close()
     return keys
@@ -39,8 +39,8 @@ def get_active_event_keys(conn, year, buffer_days=2):
     """
     cur = conn.cursor()
     cur.execute(
-        "SELECT event_key, start_date, end_date FROM events WHERE event_key LIKE %s",
-        (f"{year}%",),
+        "SELECT event_key, start_date, end_date FROM events WHERE year = %s",
+        (int(year),),
     )
     rows = cur.fetchall()
     cur.close()
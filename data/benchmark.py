@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""Offline speed benchmarks for the ACE and prediction engines.
+
+Times the hot kernels against frozen fixture seasons (TBA match payloads plus
+``team_epas`` priors, no Postgres or TBA needed) and compares them with a
+stored baseline so a slower ACE kernel shows up before a season backfill does.
+
+Benchmarks:
+  extract_season_phases               score_breakdown -> phase totals, matches/sec
+  simulate_event                      every fixture event, matches/sec
+  simulate_event_pre_match_snapshots  every fixture event, matches/sec
+  precompute_season_event_epas        whole season through run.py, matches/sec
+  aggregate_overall_epa               every team's event list, teams/sec
+  compute_walk_forward_strengths      whole season, matches/sec
+  compute_and_store_team_epa_ranks    whole season (fake DB), teams/sec
+
+Fixtures are gzip JSON files in data/bench/fixtures/ (see ``capture_fixture``
+for the layout). Capture one from the live DB + TBA once, then commit it:
+
+  python data/benchmark.py --capture 2025 --name 2025-sample --events 40
+  python data/benchmark.py                                   # all fixtures
+  python data/benchmark.py --fixture 2025-sample --repeat 5
+  python data/benchmark.py --save-baseline                   # record this machine
+  python data/benchmark.py --tolerance 0.15                  # exit 1 on >15% slowdown
+
+Baselines are machine-specific; compare on the same box that recorded them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import fake_db
+import run as run_module
+from ace_attribution import (
+    PHASES_KEY,
+    extract_season_phases,
+    simulate_event,
+    simulate_event_pre_match_snapshots,
+)
+from prediction import (
+    AceParams,
+    DbPredictionData,
+    MatchRow,
+    PredictionConfig,
+    TeamSeasonData,
+    compute_walk_forward_strengths,
+)
+from team_keys import TEAM_KEYS, intern_season
+
+BENCH_DIR = Path(os.path.dirname(os.path.abspath(__file__))) / "bench"
+FIXTURE_DIR = BENCH_DIR / "fixtures"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+FIXTURE_FORMAT = 1
+
+
+@dataclass
+class BenchResult:
+    fixture: str
+    name: str
+    unit: str
+    items: int
+    runs: List[float]
+    peak_kib: Optional[float] = None
+    extra: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def median_s(self) -> float:
+        return statistics.median(self.runs)
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.median_s if self.median_s > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        out = asdict(self)
+        out["median_s"] = round(self.median_s, 6)
+        out["min_s"] = round(min(self.runs), 6)
+        out["throughput"] = round(self.throughput, 2)
+        out["runs"] = [round(r, 6) for r in self.runs]
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+def load_fixture(name_or_path: str) -> dict:
+    path = Path(name_or_path)
+    if not path.exists():
+        path = FIXTURE_DIR / f"{name_or_path}.json.gz"
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        fixture = json.load(f)
+    if fixture.get("format") != FIXTURE_FORMAT:
+        raise ValueError(f"{path}: unsupported fixture format {fixture.get('format')!r}")
+    fixture.setdefault("name", path.name.replace(".json.gz", ""))
+    return fixture
+
+
+def write_fixture(fixture: dict, name: str) -> Path:
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    path = FIXTURE_DIR / f"{name}.json.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(fixture, f, separators=(",", ":"), default=str)
+    return path
+
+
+def capture_fixture(year: int, *, events: Optional[int]) -> dict:
+    """Freeze a season (or its first ``events`` events) from the live DB + TBA.
+
+    Layout: ``events`` (key, dates, week, type), ``matches_by_event`` (raw TBA
+    payloads with score_breakdown), ``team_epas`` for ``year`` and ``year - 1``,
+    ``teams`` (location + district for ranks) and ``experience`` (seasons played).
+    """
+    conn = run_module.get_pg_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT event_key, start_date::text, end_date::text, week, event_type
+            FROM events
+            WHERE year = %s
+            ORDER BY start_date NULLS LAST, event_key
+            """,
+            (year,),
+        )
+        event_rows = cur.fetchall()
+        if events:
+            event_rows = event_rows[:events]
+        event_keys = [r[0] for r in event_rows]
+        matches_by_event = run_module.fetch_tba_matches_by_event(event_keys)
+        team_numbers = sorted(
+            {
+                tn
+                for matches in matches_by_event.values()
+                for m in matches
+                for color in ("red", "blue")
+                for tn in (
+                    run_module.parse_tba_team_number(k)
+                    for k in m["alliances"][color].get("team_keys") or []
+                )
+                if tn is not None
+            }
+        )
+        team_epas: Dict[str, List[dict]] = {}
+        for y in (year, year - 1):
+            cur.execute(
+                """
+                SELECT team_number, ace, confidence, raw, auto_raw, teleop_raw, endgame_raw,
+                       wins, losses, ties
+                FROM team_epas
+                WHERE year = %s AND team_number = ANY(%s)
+                """,
+                (y, team_numbers),
+            )
+            cols = [d[0] for d in cur.description]
+            team_epas[str(y)] = [dict(zip(cols, row)) for row in cur.fetchall()]
+        cur.execute(
+            """
+            SELECT t.team_number, t.country, t.state_prov, t.district_key,
+                   COALESCE(d.display_name, d.name) AS district
+            FROM teams t
+            LEFT JOIN districts d ON (
+                CASE WHEN t.district_key ~ '^[0-9]{4}[a-zA-Z]+$'
+                     THEN UPPER(SUBSTRING(t.district_key FROM 5))
+                     ELSE UPPER(TRIM(t.district_key))
+                END
+            ) = d.district_key
+            WHERE t.team_number = ANY(%s)
+            """,
+            (team_numbers,),
+        )
+        cols = [d[0] for d in cur.description]
+        teams = [dict(zip(cols, row)) for row in cur.fetchall()]
+        cur.execute(
+            """
+            SELECT team_number, COUNT(DISTINCT year)
+            FROM team_epas
+            WHERE year <= %s AND team_number = ANY(%s)
+            GROUP BY team_number
+            """,
+            (year, team_numbers),
+        )
+        experience = {str(tn): int(n) for tn, n in cur.fetchall()}
+        cur.close()
+    finally:
+        conn.close()
+
+    return {
+        "format": FIXTURE_FORMAT,
+        "year": year,
+        "events": [
+            {"event_key": ek, "start_date": sd, "end_date": ed, "week": wk, "event_type": et}
+            for ek, sd, ed, wk, et in event_rows
+        ],
+        "matches_by_event": matches_by_event,
+        "team_epas": team_epas,
+        "teams": teams,
+        "experience": experience,
+    }
+
+
+def prediction_data_from_fixture(fixture: dict) -> DbPredictionData:
+    """Build the DbPredictionData load_prediction_data_from_db would return."""
+    year = int(fixture["year"])
+
+    def _season(y: int) -> Dict[int, TeamSeasonData]:
+        return {
+            int(r["team_number"]): TeamSeasonData(
+                ace=float(r.get("ace") or 0.0),
+                raw=float(r.get("raw") or 0.0),
+                confidence=float(r.get("confidence") or 0.0),
+                auto_raw=float(r.get("auto_raw") or 0.0),
+                teleop_raw=float(r.get("teleop_raw") or 0.0),
+                endgame_raw=float(r.get("endgame_raw") or 0.0),
+            )
+            for r in fixture["team_epas"].get(str(y), [])
+        }
+
+    event_order = {e["event_key"]: (e.get("start_date") or "", e["event_key"]) for e in fixture["events"]}
+    matches: List[MatchRow] = []
+    for ek in sorted(fixture["matches_by_event"], key=lambda k: event_order.get(k, ("", k))):
+        for m in fixture["matches_by_event"][ek]:
+            red = m["alliances"]["red"]
+            blue = m["alliances"]["blue"]
+            matches.append(
+                MatchRow(
+                    match_key=m["key"],
+                    event_key=ek,
+                    red_teams=[t for t in map(run_module.parse_tba_team_number, red["team_keys"]) if t],
+                    blue_teams=[t for t in map(run_module.parse_tba_team_number, blue["team_keys"]) if t],
+                    red_score=int(red.get("score") or 0),
+                    blue_score=int(blue.get("score") or 0),
+                    winning_alliance=m.get("winning_alliance") or "",
+                    predicted_time=m.get("predicted_time"),
+                    comp_level=m.get("comp_level") or "qm",
+                )
+            )
+    return DbPredictionData(
+        year=year,
+        event_order=event_order,
+        season=_season(year),
+        prior_season=_season(year - 1),
+        matches=matches,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+
+def _reset_run_caches() -> None:
+    """Same per-run cache reset as run._fetch_and_store_team_data_impl."""
+    run_module.match_cache.clear()
+    TEAM_KEYS.clear()
+    run_module._pre_match_ratings_by_match.clear()
+    run_module._carry_priors_snapshot.clear()
+    run_module._event_epa_cache.clear()
+    run_module._team_experience_cache.clear()
+    run_module._team_played_events_cache.clear()
+    run_module._event_start_date_cache.clear()
+    run_module._event_week_cache.clear()
+    run_module._season_bounds_cache.clear()
+
+
+def _load_season_into_run(fixture: dict) -> None:
+    _reset_run_caches()
+    run_module.match_cache.update(fixture["matches_by_event"])
+    run_module.preload_event_metadata(int(fixture["year"]))
+
+
+def _team_event_lists(year: int) -> Dict[int, List[dict]]:
+    """Per-team event EPA lists from a warm _event_epa_cache (fetch_team_components' input)."""
+    by_team: Dict[int, List[dict]] = {}
+    for cache_key, epa_map in run_module._event_epa_cache.items():
+        event_key = cache_key.split("::", 1)[0]
+        for slot, epa in epa_map.items():
+            tn = run_module.parse_tba_team_number(TEAM_KEYS.keys[slot])
+            if tn is None or epa.get("match_count", 0) <= 0:
+                continue
+            by_team.setdefault(tn, []).append(dict(epa, event_key=event_key))
+    return by_team
+
+
+def _time(fn: Callable[[], object], setup: Callable[[], object], repeat: int, memory: bool):
+    runs = []
+    for _ in range(repeat):
+        setup()
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    peak_kib = None
+    if memory:
+        # Separate pass: tracemalloc slows allocation-heavy code, so it never
+        # overlaps the timed runs.
+        setup()
+        tracemalloc.start()
+        fn()
+        peak_kib = tracemalloc.get_traced_memory()[1] / 1024.0
+        tracemalloc.stop()
+    return runs, peak_kib
+
+
+def run_fixture(fixture: dict, *, repeat: int, memory: bool, only: Optional[set]) -> List[BenchResult]:
+    name = fixture["name"]
+    year = int(fixture["year"])
+    matches_by_event = fixture["matches_by_event"]
+    n_matches = sum(len(v) for v in matches_by_event.values())
+    ace = AceParams.from_env()
+    sim_kwargs = dict(
+        method=ace.method,
+        k_base=ace.k_base,
+        shrink=ace.shrink,
+        spike_damp=ace.spike_damp,
+        k_up=ace.k_up,
+        k_down=ace.k_down,
+        partner_cap=ace.partner_cap,
+        prior_means=None,
+        seed_priors=False,
+    )
+    db = fake_db.FakeDb(fixture)
+    restore = fake_db.install(run_module, db)
+    results: List[BenchResult] = []
+
+    def bench(label, unit, items, fn, setup=lambda: None):
+        if only and label not in only:
+            return
+        runs, peak = _time(fn, setup, repeat, memory)
+        result = BenchResult(fixture=name, name=label, unit=unit, items=items, runs=runs, peak_kib=peak)
+        results.append(result)
+        print(
+            f"  {label:<36} {result.median_s * 1000:>10.1f} ms  "
+            f"{result.throughput:>11.1f} {unit}/s"
+            + (f"  peak {peak / 1024:.1f} MiB" if peak is not None else ""),
+            flush=True,
+        )
+
+    def strip_phases():
+        for ms in matches_by_event.values():
+            for m in ms:
+                m.pop(PHASES_KEY, None)
+
+    try:
+        # Leaves the phases extracted, as run.py / the tuner do before simulating.
+        bench(
+            "extract_season_phases", "matches", n_matches,
+            lambda: extract_season_phases(matches_by_event, year),
+            setup=strip_phases,
+        )
+        # Team slots are interned at ingest in run.py, so the walks below start warm.
+        intern_season(matches_by_event)
+        bench(
+            "simulate_event", "matches", n_matches,
+            lambda: [simulate_event(ms, year, **sim_kwargs) for ms in matches_by_event.values()],
+        )
+        bench(
+            "simulate_event_pre_match_snapshots", "matches", n_matches,
+            lambda: [
+                simulate_event_pre_match_snapshots(ms, year, **sim_kwargs)
+                for ms in matches_by_event.values()
+            ],
+        )
+        bench(
+            "precompute_season_event_epas", "matches", n_matches,
+            lambda: run_module.precompute_season_event_epas(year),
+            setup=lambda: _load_season_into_run(fixture),
+        )
+
+        _load_season_into_run(fixture)
+        run_module.precompute_season_event_epas(year)
+        team_lists = _team_event_lists(year)
+        bench(
+            "aggregate_overall_epa", "teams", len(team_lists),
+            lambda: [run_module.aggregate_overall_epa(evs, year, tn) for tn, evs in team_lists.items()],
+        )
+
+        data = prediction_data_from_fixture(fixture)
+        pred_config = PredictionConfig.from_env()
+        bench(
+            "compute_walk_forward_strengths", "matches", len(data.matches),
+            lambda: compute_walk_forward_strengths(
+                data, matches_by_event, pred_config, ace, run_module.finalize_pre_match_team
+            ),
+        )
+
+        conn = db.connect()
+        bench(
+            "compute_and_store_team_epa_ranks", "teams", len(fixture["team_epas"].get(str(year), [])),
+            lambda: run_module.compute_and_store_team_epa_ranks(year, quiet=True, conn=conn),
+            setup=db.reset_ranks,
+        )
+    finally:
+        restore()
+        _reset_run_caches()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------------
+
+
+def _machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def save_baseline(path: Path, results: List[BenchResult]) -> None:
+    payload = {
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": _machine(),
+        "results": {f"{r.fixture}/{r.name}": r.to_dict() for r in results},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"\nWrote baseline to {path}", flush=True)
+
+
+def compare_baseline(path: Path, results: List[BenchResult], tolerance: float) -> List[str]:
+    """Print current vs baseline; return the benchmarks slower than ``tolerance``."""
+    with path.open("r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("machine") != _machine():
+        print(f"\nNote: baseline recorded on {baseline.get('machine')}; numbers may not be comparable.")
+    print(f"\nVs baseline {path} (tolerance {tolerance:.0%}):")
+    regressions = []
+    for r in results:
+        key = f"{r.fixture}/{r.name}"
+        base = baseline.get("results", {}).get(key)
+        if not base:
+            print(f"  {key:<56} (no baseline)")
+            continue
+        ratio = r.median_s / base["median_s"] if base["median_s"] else 1.0
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            flag = "  SLOWER"
+            regressions.append(key)
+        elif ratio < 1.0 - tolerance:
+            flag = "  faster"
+        mem = ""
+        if r.peak_kib is not None and base.get("peak_kib"):
+            mem = f"  mem x{r.peak_kib / base['peak_kib']:.2f}"
+        print(f"  {key:<56} x{ratio:.2f}{mem}{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline ACE / prediction speed benchmarks.")
+    parser.add_argument("--fixture", action="append", help="Fixture name or path (repeatable; default: all)")
+    parser.add_argument("--bench", action="append", help="Only run these benchmarks (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown vs baseline (default: 0.15)")
+    parser.add_argument("--json", type=Path, help="Also write results to this JSON file")
+    parser.add_argument("--capture", type=int, metavar="YEAR", help="Capture a fixture from the live DB + TBA")
+    parser.add_argument("--name", help="Fixture name for --capture (default: the year)")
+    parser.add_argument("--events", type=int, help="With --capture, keep only the first N events")
+    args = parser.parse_args()
+
+    if args.capture:
+        fixture = capture_fixture(args.capture, events=args.events)
+        path = write_fixture(fixture, args.name or str(args.capture))
+        n_matches = sum(len(v) for v in fixture["matches_by_event"].values())
+        print(f"Captured {len(fixture['events'])} event(s), {n_matches} match(es) to {path}")
+        return 0
+
+    names = args.fixture or sorted(p.name.replace(".json.gz", "") for p in FIXTURE_DIR.glob("*.json.gz"))
+    if not names:
+        print(f"No fixtures in {FIXTURE_DIR}; capture one with --capture YEAR --events N.")
+        return 1
+
+    results: List[BenchResult] = []
+    for name in names:
+        fixture = load_fixture(name)
+        n_matches = sum(len(v) for v in fixture["matches_by_event"].values())
+        print(
+            f"\n{fixture['name']}: {len(fixture['matches_by_event'])} event(s), {n_matches} match(es), "
+            f"repeat={args.repeat}",
+            flush=True,
+        )
+        results.extend(
+            run_fixture(
+                fixture,
+                repeat=max(1, args.repeat),
+                memory=not args.no_memory,
+                only=set(args.bench) if args.bench else None,
+            )
+        )
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with args.json.open("w", encoding="utf-8") as f:
+            json.dump([r.to_dict() for r in results], f, indent=2)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        return 0
+    if args.baseline.exists():
+        regressions = compare_baseline(args.baseline, results, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than baseline.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Phase checkpoints so an interrupted run.py recompute can pick up where it died.
+
+A full recompute of a season is: fetch every event from TBA into
+``match_cache`` (create_event_db), one chronological ACE precompute pass,
+thousands of per-team writes, then ranks / h2h / predictions / predictor pool
+/ rating series / playoff odds. Multi-year backfills do not always fit in one
+runner or dyno lifetime, and a Neon flake or a restart used to send the next
+run back to the TBA fetch with an empty cache.
+
+Each full run now records its progress in ``pipeline_checkpoints``
+(peekorobo-api/migrations/0011_pipeline_checkpoints.sql), a Postgres staging
+table rather than local disk because runner and dyno disks do not survive
+the restart we are guarding against:
+
+  - ``events``: the fetched TBA match payloads (``match_cache``);
+  - ``precompute``: the per-event ACE cache, carry priors and pre-match
+    snapshots;
+  - ``teams``: team numbers already written (flushed every
+    ``PIPELINE_CHECKPOINT_TEAM_EVERY`` completions and on shutdown);
+  - ``ranks``, ``h2h_index``, ``predictions``, ... : bare completion markers;
+  - ``done``: the season finished, so a resumed multi-year run skips it.
+
+A plain run clears its season's checkpoints and writes new ones as it goes;
+``run.py 2024,2025 --resume`` loads them and skips completed phases and teams.
+Checkpoints are ignored when the ACE / prediction settings changed
+(``config_key``) or when older than ``PIPELINE_CHECKPOINT_MAX_AGE_HOURS``.
+Payloads are zlib-compressed JSON, not pickles: the table lives in the same
+database the internet-facing API connects to, and unpickling whatever is
+there would hand code execution to anyone who can write it. Callers keep
+payloads JSON-shaped (string keys, lists for tuples) and convert on restore.
+
+Checkpointing is best effort: a failed read or write is logged and the run
+carries on as if no checkpoint existed. ``PIPELINE_CHECKPOINT=0`` disables it.
+"""
+import hashlib
+import json
+import os
+import zlib
+from typing import Callable, Set
+
+import psycopg2
+
+ENABLED = os.environ.get("PIPELINE_CHECKPOINT", "1").strip().lower() not in ("0", "false", "no")
+MAX_AGE_HOURS = float(os.environ.get("PIPELINE_CHECKPOINT_MAX_AGE_HOURS", "36"))
+TEAM_FLUSH_EVERY = int(os.environ.get("PIPELINE_CHECKPOINT_TEAM_EVERY", "100"))
+
+
+def config_key(*parts) -> str:
+    """Fingerprint of the settings a checkpoint's contents depend on."""
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class RunCheckpoint:
+    def __init__(
+        self,
+        run_key: str,
+        config: str,
+        connect: Callable,
+        resume: bool = False,
+        enabled: bool = True,
+    ):
+        self.run_key = run_key
+        self.config = config
+        self._connect = connect
+        self.resume = resume
+        self.enabled = enabled and ENABLED
+        self._stages: Set[str] = set()
+        self._teams: Set[int] = set()
+        self._teams_unflushed = 0
+
+    def _log(self, msg: str) -> None:
+        print(f"[checkpoint] {self.run_key}: {msg}", flush=True)
+
+    def _execute(self, sql: str, params=(), fetch: bool = False):
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            rows = cur.fetchall() if fetch else None
+            cur.close()
+            conn.commit()
+            return rows
+        finally:
+            conn.close()
+
+    def open(self) -> None:
+        """Start fresh, or (``resume``) find the stages a previous run completed."""
+        if not self.enabled:
+            return
+        try:
+            if not self.resume:
+                self._execute("DELETE FROM pipeline_checkpoints WHERE run_key = %s", (self.run_key,))
+                return
+            # Drop anything written under other settings or too long ago.
+            self._execute(
+                """
+                DELETE FROM pipeline_checkpoints
+                WHERE run_key = %s
+                  AND (config_key <> %s OR updated_at < NOW() - %s * INTERVAL '1 hour')
+                """,
+                (self.run_key, self.config, MAX_AGE_HOURS),
+            )
+            rows = self._execute(
+                "SELECT stage FROM pipeline_checkpoints WHERE run_key = %s",
+                (self.run_key,),
+                fetch=True,
+            )
+            self._stages = {r[0] for r in rows}
+        except Exception as e:
+            self._log(f"unavailable, running without checkpoints ({e})")
+            self.enabled = False
+            self._stages = set()
+            return
+        if self._stages:
+            self._log(f"resuming; completed stages: {', '.join(sorted(self._stages))}")
+        else:
+            self._log("nothing to resume; starting from the beginning")
+
+    def done(self, stage: str) -> bool:
+        return stage in self._stages
+
+    def load(self, stage: str):
+        """Payload saved for ``stage``, or None (missing / unreadable)."""
+        if not self.enabled or stage not in self._stages:
+            return None
+        try:
+            rows = self._execute(
+                "SELECT payload FROM pipeline_checkpoints WHERE run_key = %s AND stage = %s",
+                (self.run_key, stage),
+                fetch=True,
+            )
+            if not rows or rows[0][0] is None:
+                return None
+            return json.loads(zlib.decompress(bytes(rows[0][0])).decode("utf-8"))
+        except Exception as e:
+            self._log(f"could not load {stage} ({e}); recomputing it")
+            self._stages.discard(stage)
+            return None
+
+    def save(self, stage: str, payload=None) -> None:
+        """Mark ``stage`` complete, storing ``payload`` when given."""
+        if not self.enabled:
+            return
+        blob = None
+        try:
+            if payload is not None:
+                raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+                blob = psycopg2.Binary(zlib.compress(raw, 6))
+            self._execute(
+                """
+                INSERT INTO pipeline_checkpoints (run_key, stage, config_key, payload, updated_at)
+                VALUES (%s, %s, %s, %s, NOW())
+                ON CONFLICT (run_key, stage) DO UPDATE
+                SET config_key = EXCLUDED.config_key,
+                    payload = EXCLUDED.payload,
+                    updated_at = EXCLUDED.updated_at
+                """,
+                (self.run_key, stage, self.config, blob),
+            )
+        except Exception as e:
+            self._log(f"could not save {stage} ({e})")
+            return
+        self._stages.add(stage)
+
+    def completed_teams(self) -> Set[int]:
+        """Teams a previous run already wrote (resume only)."""
+        self._teams = set(self.load("teams") or ())
+        return set(self._teams)
+
+    def team_done(self, team_number: int) -> None:
+        """Record one written team; flushed in batches."""
+        if not self.enabled or team_number is None:
+            return
+        self._teams.add(int(team_number))
+        self._teams_unflushed += 1
+        if self._teams_unflushed >= TEAM_FLUSH_EVERY:
+            self.flush_teams()
+
+    def flush_teams(self) -> None:
+        if not self.enabled or not self._teams_unflushed:
+            return
+        self.save("teams", sorted(self._teams))
+        self._teams_unflushed = 0
+
+    def finish(self) -> None:
+        """Season complete: drop the payloads, keep a ``done`` marker."""
+        if not self.enabled:
+            return
+        try:
+            self._execute(
+                "DELETE FROM pipeline_checkpoints WHERE run_key = %s AND stage <> 'done'",
+                (self.run_key,),
+            )
+        except Exception as e:
+            self._log(f"could not clear payloads ({e})")
+        self.save("done")
+        self._log("season complete")
+
@@ -0,0 +1,168 @@
+"""
+Shared per-event refresh engine for run_rankings.py and run_awards.py.
+
+For a season's target events it:
+  1. loads every existing row for those events in one query,
+  2. fetches TBA concurrently (fetching never touches the DB),
+  3. diffs each event in memory at row level, and
+  4. writes only what changed with batched upserts + batched deletes,
+     committed once at the end.
+
+Safety rules carried over from the serial loops, per event:
+  - fetch failed (``fetch`` returned None): skip, never wipe;
+  - fetch returned nothing but the event has rows: treat as a failure that
+    slipped through and skip;
+  - identical rows: skip without writing.
+Stale rows are only deleted for events that also have fresh, non-empty data,
+so an event is never emptied by a refresh.
+
+Each table is described by a :class:`RefreshSpec`: rows are tuples starting
+with ``event_key``; the first ``key_len`` columns are the row's identity and
+the rest are compared to decide whether it needs rewriting. ``year`` is
+appended on write via ``season_of``. Events that changed are announced to
+the API's live feed (event_updates.py) in the same transaction.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from psycopg2.extras import execute_values
+
+import instrumentation
+from event_updates import notify_event_updates
+from season_year import season_of
+
+# TBA fetch threads hold no DB connection, so this is bounded by TBA politeness
+# rather than the pool size.
+FETCH_WORKERS = max(1, int(os.environ.get("TBA_FETCH_WORKERS", "8")))
+
+
+@dataclass(frozen=True)
+class RefreshSpec:
+    name: str
+    table: str
+    columns: Tuple[str, ...]  # stored columns, event_key first, without year
+    key_len: int
+    fetch: Callable[[str], Optional[List[tuple]]]
+    # Appended to "INSERT ... VALUES %s"; DO NOTHING for key-only tables.
+    on_conflict: str
+
+    @property
+    def key_columns(self) -> Tuple[str, ...]:
+        return self.columns[: self.key_len]
+
+
+@dataclass
+class RefreshResult:
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    upserted_rows: int = 0
+    deleted_rows: int = 0
+
+
+def load_existing(cur, spec: RefreshSpec, event_keys: Sequence[str]) -> Dict[str, Dict[tuple, tuple]]:
+    """event_key -> {key tuple: value tuple} for every target event, in one query."""
+    cur.execute(
+        f"SELECT {', '.join(spec.columns)} FROM {spec.table} WHERE event_key = ANY(%s)",
+        (list(event_keys),),
+    )
+    out: Dict[str, Dict[tuple, tuple]] = {k: {} for k in event_keys}
+    for row in cur.fetchall():
+        out.setdefault(row[0], {})[tuple(row[: spec.key_len])] = tuple(row[spec.key_len:])
+    return out
+
+
+def fetch_all(spec: RefreshSpec, event_keys: Sequence[str]) -> Dict[str, Optional[List[tuple]]]:
+    """Fetch every event concurrently; an exception counts as a failed fetch (None)."""
+
+    def one(event_key):
+        try:
+            return spec.fetch(event_key)
+        except Exception as e:
+            print(f"  WARNING: {spec.name} fetch raised for {event_key}: {e}", flush=True)
+            return None
+
+    with instrumentation.span(f"{spec.name}.fetch", events=len(event_keys)):
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, max(1, len(event_keys)))) as pool:
+            return dict(zip(event_keys, pool.map(one, event_keys)))
+
+
+def diff_event(spec: RefreshSpec, existing: Dict[tuple, tuple], rows: List[tuple]):
+    """(upserts, deleted keys) turning ``existing`` into ``rows`` (deduped by key, last wins)."""
+    fresh: Dict[tuple, tuple] = {}
+    for row in rows:
+        fresh[tuple(row[: spec.key_len])] = tuple(row[spec.key_len: len(spec.columns)])
+    upserts = [k + v for k, v in fresh.items() if existing.get(k) != v]
+    deletes = [k for k in existing if k not in fresh]
+    return upserts, deletes
+
+
+def refresh_events(conn, spec: RefreshSpec, event_keys: Sequence[str]) -> RefreshResult:
+    """Refresh ``event_keys`` for ``spec`` and commit; see the module docstring for the rules."""
+    result = RefreshResult()
+    if not event_keys:
+        return result
+    started = time.time()
+    cur = conn.cursor()
+    existing = load_existing(cur, spec, event_keys)
+    fetched = fetch_all(spec, event_keys)
+
+    upserts: List[tuple] = []
+    deletes: List[tuple] = []
+    changed: List[str] = []
+    for event_key in event_keys:
+        rows = fetched.get(event_key)
+        have = existing.get(event_key) or {}
+        if rows is None:
+            print(f"  WARNING: {spec.name} fetch failed for {event_key}; skipping to avoid wiping existing data")
+            result.failed += 1
+            continue
+        if not rows and have:
+            print(
+                f"  WARNING: {spec.name} fetch returned empty for {event_key} which has existing rows; "
+                "skipping to avoid wiping"
+            )
+            result.failed += 1
+            continue
+        ups, dels = diff_event(spec, have, rows)
+        if not ups and not dels:
+            result.unchanged += 1
+            continue
+        upserts.extend(ups)
+        deletes.extend(dels)
+        changed.append(event_key)
+        result.updated += 1
+
+    if upserts:
+        execute_values(
+            cur,
+            f"INSERT INTO {spec.table} ({', '.join(spec.columns)}, year) VALUES %s {spec.on_conflict}",
+            [row + (season_of(row[0]),) for row in upserts],
+            page_size=1000,
+        )
+    if deletes:
+        keys = spec.key_columns
+        execute_values(
+            cur,
+            f"DELETE FROM {spec.table} t USING (VALUES %s) AS v({', '.join(keys)}) "
+            f"WHERE {' AND '.join(f't.{c} = v.{c}' for c in keys)}",
+            deletes,
+            page_size=1000,
+        )
+    notify_event_updates(cur, spec.name, changed)
+    conn.commit()
+    cur.close()
+
+    result.upserted_rows = len(upserts)
+    result.deleted_rows = len(deletes)
+    instrumentation.incr(f"rows.{spec.name}_upserted", len(upserts))
+    instrumentation.incr(f"rows.{spec.name}_deleted", len(deletes))
+    print(
+        f"  {spec.name}: {len(event_keys)} event(s) in {time.time() - started:.1f}s "
+        f"({len(upserts)} row(s) upserted, {len(deletes)} deleted)",
+        flush=True,
+    )
+    return result
@@ -0,0 +1,21 @@
+"""
+NOTIFY the API's live event feed (peekorobo-api/live.py) about committed changes.
+
+Writers call ``notify_event_updates`` on the cursor that made the change,
+before committing: Postgres delivers NOTIFY only on commit (and drops it on
+rollback), so subscribers never hear about data they cannot read yet. The
+payload only names the event and the kind; each API dyno reloads and diffs
+the rows itself. Kinds the feed does not serve (e.g. awards) are ignored there.
+"""
+import json
+
+CHANNEL = "event_updates"
+
+
+def notify_event_updates(cur, kind, event_keys):
+    """Queue one ``event_updates`` notification per event for ``kind``."""
+    for event_key in sorted(set(event_keys)):
+        cur.execute(
+            "SELECT pg_notify(%s, %s)",
+            (CHANNEL, json.dumps({"event_key": event_key, "kind": kind})),
+        )
@@ -0,0 +1,257 @@
+"""
+In-memory stand-in for the Postgres queries the ACE / prediction kernels issue.
+
+Used by benchmark.py so the pipeline functions can be timed against a frozen
+fixture season without a database. Only the statements those code paths run
+are understood; anything else raises NotImplementedError so a new query in
+the hot path shows up as a benchmark failure instead of being silently timed
+as a no-op.
+
+``install(run_module)`` swaps ``run.get_pg_connection`` / ``run._pooled_connection``
+for the fake and returns a callable that restores the originals.
+"""
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+
+_RANK_COLS = (
+    "rank_global", "rank_country", "rank_state", "rank_district",
+    "count_global", "count_country", "count_state", "count_district",
+)
+
+
+def _norm_sql(sql):
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8")
+    return re.sub(r"\s+", " ", sql).strip().lower()
+
+
+def _team_number(team_key):
+    digits = "".join(ch for ch in str(team_key) if ch.isdigit())
+    return int(digits) if digits else None
+
+
+class FakeDb:
+    """Tables built from a fixture dict (see benchmark.py for the format)."""
+
+    def __init__(self, fixture):
+        self.events = {e["event_key"]: e for e in fixture.get("events", [])}
+        self.teams = {int(t["team_number"]): t for t in fixture.get("teams", [])}
+        self.team_epas = {}
+        for year, rows in (fixture.get("team_epas") or {}).items():
+            for row in rows:
+                self.team_epas[(int(row["team_number"]), int(year))] = dict(row)
+        self.experience = {int(k): int(v) for k, v in (fixture.get("experience") or {}).items()}
+        self.event_teams = defaultdict(set)
+        self.played = defaultdict(set)  # (team_number, year) -> played event keys
+        for ek, matches in (fixture.get("matches_by_event") or {}).items():
+            year = int(ek[:4])
+            for m in matches or []:
+                alliances = m.get("alliances") or {}
+                red = (alliances.get("red") or {}).get("score")
+                blue = (alliances.get("blue") or {}).get("score")
+                was_played = (red and red > 0) or (blue and blue > 0) or m.get("winning_alliance") in ("red", "blue")
+                for color in ("red", "blue"):
+                    for key in (alliances.get(color) or {}).get("team_keys") or []:
+                        tn = _team_number(key)
+                        if tn is None:
+                            continue
+                        self.event_teams[ek].add(tn)
+                        if was_played:
+                            self.played[(tn, year)].add(ek)
+        self.round_trips = 0
+        self.rows_written = 0
+
+    def reset_ranks(self):
+        for row in self.team_epas.values():
+            for col in _RANK_COLS:
+                row.pop(col, None)
+
+    def connect(self):
+        return FakeConnection(self)
+
+    @contextmanager
+    def pooled_connection(self):
+        yield FakeConnection(self)
+
+    # -- query handlers: (params, pending execute_values rows) -> result rows --
+
+    def _events_for_year(self, params, _values):
+        year = int(params[0])
+        return [
+            (ek, e.get("start_date"), e.get("end_date"), e.get("week"))
+            for ek, e in self.events.items()
+            if int(ek[:4]) == year
+        ]
+
+    def _season_bounds(self, params, _values):
+        year = int(params[0])
+        weeks = [e for ek, e in self.events.items() if int(ek[:4]) == year and e.get("week") is not None]
+        if not weeks:
+            return [(None, None, None)]
+        return [(
+            min(str(e.get("start_date") or "9999") for e in weeks),
+            max(str(e.get("end_date") or "") for e in weeks),
+            max(int(e["week"]) for e in weeks),
+        )]
+
+    def _event_start_date(self, params, _values):
+        event = self.events.get(params[0])
+        return [(event.get("start_date"),)] if event else []
+
+    def _years_of(self, team_number, up_to_year):
+        if team_number in self.experience:
+            return self.experience[team_number]
+        return len({y for (tn, y) in self.team_epas if tn == team_number and y <= up_to_year})
+
+    def _experience_many(self, params, _values):
+        up_to, team_numbers = int(params[0]), params[1]
+        rows = []
+        for tn in team_numbers:
+            years = self._years_of(int(tn), up_to)
+            if years:
+                rows.append((int(tn), years))
+        return rows
+
+    def _experience_one(self, params, _values):
+        return [(self._years_of(int(params[0]), int(params[1])),)]
+
+    def _carry_priors(self, params, _values):
+        year = int(params[0])
+        return [
+            (tn, r.get("auto_raw"), r.get("teleop_raw"), r.get("endgame_raw"), r.get("confidence"))
+            for (tn, y), r in self.team_epas.items()
+            if y == year
+        ]
+
+    def _rank_inputs(self, params, _values):
+        year = int(params[0])
+        rows = []
+        for (tn, y), r in self.team_epas.items():
+            if y != year:
+                continue
+            t = self.teams.get(tn, {})
+            rows.append((
+                tn, r.get("ace"), r.get("wins"), r.get("losses"), r.get("ties"),
+                t.get("country"), t.get("state_prov"), t.get("district_key"), t.get("district"),
+            ))
+        return rows
+
+    def _existing_ranks(self, params, _values):
+        year = int(params[0])
+        return [
+            (tn,) + tuple(r.get(col) for col in _RANK_COLS)
+            for (tn, y), r in self.team_epas.items()
+            if y == year
+        ]
+
+    def _update_ranks(self, _params, values):
+        for tn, y, *ranks in values:
+            row = self.team_epas.get((int(tn), int(y)))
+            if row is not None:
+                row.update(zip(_RANK_COLS, ranks))
+                self.rows_written += 1
+        return []
+
+    def _played_events(self, params, _values):
+        year, team = int(params[0]), int(params[1])
+        return [(ek, 1, 0, "red", None) for ek in self.played.get((team, year), ())]
+
+    def _team_events(self, params, _values):
+        team, year = int(params[0]), int(params[1])
+        return [(ek,) for ek, tns in self.event_teams.items() if team in tns and int(ek[:4]) == year]
+
+    HANDLERS = (
+        ("select event_key, start_date, end_date, week from events where year = %s", "_events_for_year"),
+        ("select min(start_date), max(end_date), max(week) from events where year = %s", "_season_bounds"),
+        ("select start_date from events where event_key = %s", "_event_start_date"),
+        ("select team_number, count(distinct year) from team_epas where year <= %s and team_number = any(%s)", "_experience_many"),
+        ("select count(distinct year) from team_epas where team_number = %s and year <= %s", "_experience_one"),
+        ("select team_number, auto_raw, teleop_raw, endgame_raw, confidence from team_epas where year = %s", "_carry_priors"),
+        ("select te.team_number, te.ace, te.wins, te.losses, te.ties,", "_rank_inputs"),
+        ("select team_number, rank_global, rank_country, rank_state, rank_district,", "_existing_ranks"),
+        ("update team_epas as te set rank_global", "_update_ranks"),
+        ("select event_key, red_score, blue_score, winning_alliance, predicted_time from event_matches", "_played_events"),
+        ("select event_key from event_teams where team_number = %s and year = %s", "_team_events"),
+    )
+
+    def run(self, sql, params, values):
+        self.round_trips += 1
+        text = _norm_sql(sql)
+        for prefix, handler in self.HANDLERS:
+            if text.startswith(prefix):
+                return getattr(self, handler)(params or (), values)
+        raise NotImplementedError(f"fake DB has no handler for: {text[:120]}")
+
+
+class FakeCursor:
+    def __init__(self, db, connection):
+        self._db = db
+        self.connection = connection
+        self._rows = []
+        self._values = []
+        self.rowcount = -1
+
+    def execute(self, sql, params=None):
+        self._rows = list(self._db.run(sql, params, self._values))
+        self._values = []
+        self.rowcount = len(self._rows)
+
+    def executemany(self, sql, params_list):
+        for params in params_list:
+            self.execute(sql, params)
+
+    def mogrify(self, _template, args):
+        # execute_values builds one VALUES list from mogrify() output; keep the
+        # raw tuples and hand them to the handler on the following execute().
+        self._values.append(tuple(args))
+        return b"(?)"
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeConnection:
+    encoding = "UTF8"
+    closed = 0
+    autocommit = False
+
+    def __init__(self, db):
+        self._db = db
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self._db, self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def install(run_module, db):
+    """Point run.py's connection helpers at ``db``; returns a restore callable."""
+    saved = (run_module.get_pg_connection, run_module._pooled_connection)
+    run_module.get_pg_connection = db.connect
+    run_module._pooled_connection = db.pooled_connection
+
+    def restore():
+        run_module.get_pg_connection, run_module._pooled_connection = saved
+
+    return restore
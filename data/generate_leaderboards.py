@@ -1,19 +1,38 @@
 #!/usr/bin/env python3
 """
-Generate per-year leaderboard JSON snapshots for the React SPA.
+Build the static JSON artifacts the React SPA loads from the CDN.
 
-Each file (data/leaderboards/<year>.json) contains every team's season EPA/ACE
-summary for that year. These are large, rarely-changing snapshots that the SPA
-loads directly from a CDN/static host instead of paginating the API - this is
-the main cost/latency win for the leaderboard and insights pages.
+Artifacts (written under data/static/, deployed as /data/...):
+    leaderboards/<year>.json   every team's season ACE/RAW summary
+    events/<year>.json         the season's event list
+    map/teams-<year>.json      geocoded teams that played that season
+    map/events-<year>.json     geocoded events for that season
+    search/index.json          team/event lookup tables for navbar search
+
+Each artifact is written twice: under its stable name (what the SPA requests
+today) and under a content-hashed name (``<name>.<sha>.json``) that can be
+cached forever. Both get precompressed ``.gz`` (and ``.br`` when the brotli
+package is installed) siblings. ``manifest.json`` maps every artifact to its
+hashed file, sizes and the DB fingerprint it was built from.
+
+Rebuilds are incremental: a cheap md5 of the source rows is computed in
+Postgres first and compared with the manifest, so an artifact is only
+re-encoded, compressed and rewritten when its rows actually changed.
 
 Usage:
     python data/generate_leaderboards.py            # current + a few recent years
     python data/generate_leaderboards.py 2025       # a single year
     python data/generate_leaderboards.py 2024,2025,2026
     python data/generate_leaderboards.py all        # every year present in team_epas
+
+Flags:
+    --force                 rebuild even when the source fingerprint is unchanged
+    --columnar              encode row lists as parallel arrays (smaller, same data)
+    --only=leaderboards,events,map,search
 """
 
+import gzip
+import hashlib
 import json
 import os
 import sys
@@ -26,7 +45,16 @@ from years_cli import parse_years
 
 load_dotenv()
 
-OUTPUT_DIR = os.path.join("data", "leaderboards")
+try:
+    import brotli
+except ImportError:  # optional: .br siblings are skipped without it
+    brotli = None
+
+STATIC_DIR = os.path.join("data", "static")
+OUTPUT_DIR = os.path.join(STATIC_DIR, "leaderboards")
+MANIFEST_PATH = os.path.join(STATIC_DIR, "manifest.json")
+MANIFEST_VERSION = 1
+ARTIFACT_KINDS = ("leaderboards", "events", "map", "search")
 
 # Columns copied verbatim from team_epas into each leaderboard row.
 COLUMNS = [
@@ -66,6 +94,43 @@ INT_COLS = {
     "count_district",
 }
 
+EVENT_COLUMNS = [
+    "event_key",
+    "name",
+    "event_type",
+    "start_date",
+    "end_date",
+    "week",
+    "city",
+    "state_prov",
+    "country",
+    "district_key",
+]
+MAP_TEAM_COLUMNS = [
+    "team_number",
+    "nickname",
+    "city",
+    "state_prov",
+    "country",
+    "district_key",
+    "lat",
+    "lng",
+]
+MAP_EVENT_COLUMNS = [
+    "event_key",
+    "name",
+    "event_type",
+    "week",
+    "start_date",
+    "end_date",
+    "city",
+    "state_prov",
+    "country",
+    "district_key",
+    "lat",
+    "lng",
+]
+
 
 def _coerce(col, value):
     if value is None:
@@ -74,7 +139,13 @@ def _coerce(col, value):
         return round(float(value), 2)
     if col in INT_COLS:
         return int(value)
-    return value
+    if col in ("lat", "lng"):
+        return round(float(value), 5)
+    if col == "week":
+        return int(value)
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return value if isinstance(value, (int, float, str)) else str(value)
 
 
 def get_years(cur, requested):
@@ -88,37 +159,350 @@ def get_years(cur, requested):
     return list(range(current_year, current_year - 5, -1))
 
 
-def generate_year(cur, year):
-    col_sql = ", ".join(COLUMNS)
-    cur.execute(
-        f"SELECT {col_sql} FROM team_epas WHERE year = %s ORDER BY ace DESC NULLS LAST",
+# ---- Source queries ---------------------------------------------------------
+# Each artifact is (sql, params). The same statement feeds the fingerprint and
+# the build so the two can never disagree about what "changed" means.
+
+def _leaderboard_source(year):
+    return (
+        f"SELECT {', '.join(COLUMNS)} FROM team_epas WHERE year = %s "
+        "ORDER BY ace DESC NULLS LAST, team_number",
         (year,),
     )
-    rows = []
-    for record in cur.fetchall():
-        row = {col: _coerce(col, val) for col, val in zip(COLUMNS, record)}
-        rows.append(row)
-
-    payload = {
-        "year": year,
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "teams": rows,
+
+
+def _events_source(year):
+    return (
+        f"SELECT {', '.join(EVENT_COLUMNS)} FROM events WHERE year = %s "
+        "ORDER BY start_date NULLS LAST, event_key",
+        (int(year),),
+    )
+
+
+def _map_teams_source(year):
+    cols = ", ".join(f"t.{c}" for c in MAP_TEAM_COLUMNS)
+    return (
+        f"""
+        SELECT {cols}
+        FROM teams t
+        WHERE t.lat IS NOT NULL AND t.lng IS NOT NULL
+          AND EXISTS (
+              SELECT 1 FROM event_teams et
+              WHERE et.team_number = t.team_number AND et.year = %s
+          )
+        ORDER BY t.team_number
+        """,
+        (int(year),),
+    )
+
+
+def _map_events_source(year):
+    return (
+        f"SELECT {', '.join(MAP_EVENT_COLUMNS)} FROM events "
+        "WHERE year = %s AND lat IS NOT NULL AND lng IS NOT NULL "
+        "ORDER BY start_date NULLS LAST, event_key",
+        (int(year),),
+    )
+
+
+_SEARCH_TEAMS_SQL = """
+    SELECT t.team_number, COALESCE(t.nickname, ''), ly.last_year
+    FROM teams t
+    LEFT JOIN (
+        SELECT team_number, MAX(year) AS last_year FROM team_epas GROUP BY team_number
+    ) ly ON ly.team_number = t.team_number
+    ORDER BY t.team_number
+"""
+_SEARCH_EVENTS_SQL = "SELECT event_key, COALESCE(name, '') FROM events ORDER BY event_key"
+
+
+def source_fingerprint(cur, sources):
+    """md5 of the source rows, computed in Postgres so unchanged artifacts cost one round trip."""
+    digests = []
+    for sql, params in sources:
+        cur.execute(
+            f"SELECT COUNT(*), md5(COALESCE(string_agg(src::text, '|' ORDER BY src::text), '')) "
+            f"FROM ({sql}) AS src",
+            params,
+        )
+        count, digest = cur.fetchone()
+        digests.append(f"{count}:{digest}")
+    return ";".join(digests)
+
+
+# ---- Encoding / writing ------------------------------------------------------
+
+def _rows_payload(columns, records, columnar):
+    """Row objects, or parallel arrays ({"columns": {...}}) when columnar."""
+    if columnar:
+        arrays = {col: [] for col in columns}
+        for record in records:
+            for col, val in zip(columns, record):
+                arrays[col].append(_coerce(col, val))
+        return {"format": "columnar", "count": len(records), "columns": arrays}
+    return [{col: _coerce(col, val) for col, val in zip(columns, record)} for record in records]
+
+
+def _encode(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+            data.setdefault("artifacts", {})
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "artifacts": {}}
+
+
+def save_manifest(manifest):
+    manifest["generated_at"] = datetime.now(timezone.utc).isoformat()
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    tmp = MANIFEST_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def _write_file(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _write_with_compressed(path, data):
+    """Write ``path`` plus .gz/.br siblings; returns {"gz": n, "br": n} byte counts."""
+    sizes = {}
+    _write_file(path, data)
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    _write_file(path + ".gz", gz)
+    sizes["gz_bytes"] = len(gz)
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        _write_file(path + ".br", br)
+        sizes["br_bytes"] = len(br)
+    return sizes
+
+
+def _remove_artifact_files(rel_path):
+    for suffix in ("", ".gz", ".br"):
+        try:
+            os.remove(os.path.join(STATIC_DIR, rel_path + suffix))
+        except FileNotFoundError:
+            pass
+
+
+def is_fresh(manifest, name, fingerprint, encoding):
+    entry = manifest["artifacts"].get(name)
+    if not entry:
+        return False
+    if entry.get("source") != fingerprint or entry.get("encoding") != encoding:
+        return False
+    return all(
+        os.path.exists(os.path.join(STATIC_DIR, entry[k])) for k in ("path", "stable")
+    )
+
+
+def write_artifact(manifest, name, stable_rel, payload, fingerprint, encoding, rows):
+    """Write stable + content-hashed copies and record them in the manifest.
+
+    The previous hashed file is kept for one generation so clients holding an
+    older manifest can still fetch what it points at; anything older is pruned.
+    """
+    data = _encode(payload)
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    base, ext = os.path.splitext(stable_rel)
+    hashed_rel = f"{base}.{digest}{ext}"
+
+    os.makedirs(os.path.dirname(os.path.join(STATIC_DIR, stable_rel)), exist_ok=True)
+    sizes = _write_with_compressed(os.path.join(STATIC_DIR, stable_rel), data)
+    _write_with_compressed(os.path.join(STATIC_DIR, hashed_rel), data)
+
+    old = manifest["artifacts"].get(name) or {}
+    previous = old.get("path") if old.get("path") != hashed_rel else old.get("previous")
+    stale = old.get("previous")
+    if stale and stale not in (hashed_rel, previous):
+        _remove_artifact_files(stale)
+
+    manifest["artifacts"][name] = {
+        "path": hashed_rel,
+        "stable": stable_rel,
+        "previous": previous,
+        "sha256": digest,
+        "bytes": len(data),
+        "rows": rows,
+        "encoding": encoding,
+        "source": fingerprint,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        **sizes,
     }
+    print(
+        f"Wrote {rows:>5} rows -> {os.path.join(STATIC_DIR, hashed_rel)} "
+        f"({len(data):,} B, gz {sizes['gz_bytes']:,} B"
+        + (f", br {sizes['br_bytes']:,} B" if "br_bytes" in sizes else "")
+        + ")"
+    )
+
+
+# ---- Artifact builders -------------------------------------------------------
+
+def _build(cur, manifest, name, stable_rel, sources, make_payload, force, columnar):
+    encoding = "columnar" if columnar else "rows"
+    fingerprint = source_fingerprint(cur, sources)
+    if not force and is_fresh(manifest, name, fingerprint, encoding):
+        print(f"Unchanged {name}; skipping")
+        return False
+    results = []
+    for sql, params in sources:
+        cur.execute(sql, params)
+        results.append(cur.fetchall())
+    payload, rows = make_payload(*results)
+    write_artifact(manifest, name, stable_rel, payload, fingerprint, encoding, rows)
+    return True
+
+
+def generate_year(cur, year, manifest=None, force=False, columnar=False):
+    """Leaderboard snapshot for one season (the original artifact)."""
+    manifest = manifest if manifest is not None else load_manifest()
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    out_path = os.path.join(OUTPUT_DIR, f"{year}.json")
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False)
-    print(f"Wrote {len(rows):>5} teams -> {out_path}")
+    def _payload(records):
+        return {
+            "year": year,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "teams": _rows_payload(COLUMNS, records, columnar),
+        }, len(records)
+
+    return _build(
+        cur,
+        manifest,
+        f"leaderboards/{year}",
+        f"leaderboards/{year}.json",
+        [_leaderboard_source(year)],
+        _payload,
+        force,
+        columnar,
+    )
+
+
+def generate_events(cur, year, manifest, force=False, columnar=False):
+    def _payload(records):
+        return {
+            "year": year,
+            "count": len(records),
+            "events": _rows_payload(EVENT_COLUMNS, records, columnar),
+        }, len(records)
+
+    return _build(
+        cur,
+        manifest,
+        f"events/{year}",
+        f"events/{year}.json",
+        [_events_source(year)],
+        _payload,
+        force,
+        columnar,
+    )
+
+
+def generate_map(cur, year, manifest, force=False, columnar=False):
+    def _teams_payload(records):
+        return {
+            "year": year,
+            "count": len(records),
+            "teams": _rows_payload(MAP_TEAM_COLUMNS, records, columnar),
+        }, len(records)
+
+    def _events_payload(records):
+        return {
+            "year": year,
+            "count": len(records),
+            "events": _rows_payload(MAP_EVENT_COLUMNS, records, columnar),
+        }, len(records)
+
+    changed = _build(
+        cur,
+        manifest,
+        f"map/teams-{year}",
+        f"map/teams-{year}.json",
+        [_map_teams_source(year)],
+        _teams_payload,
+        force,
+        columnar,
+    )
+    changed |= _build(
+        cur,
+        manifest,
+        f"map/events-{year}",
+        f"map/events-{year}.json",
+        [_map_events_source(year)],
+        _events_payload,
+        force,
+        columnar,
+    )
+    return changed
+
+
+def generate_search_index(cur, manifest, force=False):
+    """Same shape as GET /search/index, so the SPA can use either interchangeably."""
+
+    def _payload(team_rows, event_rows):
+        teams = {
+            str(int(tn)): {"nickname": nickname, "last_year": int(ly) if ly is not None else None}
+            for tn, nickname, ly in team_rows
+        }
+        events = {str(ek): name for ek, name in event_rows}
+        return {"teams": teams, "events": events}, len(teams) + len(events)
+
+    # The index is keyed objects already; columnar encoding does not apply.
+    return _build(
+        cur,
+        manifest,
+        "search/index",
+        "search/index.json",
+        [(_SEARCH_TEAMS_SQL, ()), (_SEARCH_EVENTS_SQL, ())],
+        _payload,
+        force,
+        False,
+    )
 
 
 def main():
-    requested = sys.argv[1] if len(sys.argv) > 1 else None
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    flags = [a for a in sys.argv[1:] if a.startswith("--")]
+    force = "--force" in flags
+    columnar = "--columnar" in flags
+    only = set(ARTIFACT_KINDS)
+    for flag in flags:
+        if flag.startswith("--only="):
+            only = {k.strip() for k in flag.split("=", 1)[1].split(",") if k.strip()}
+            unknown = only - set(ARTIFACT_KINDS)
+            if unknown:
+                print(f"Unknown artifact kind(s): {', '.join(sorted(unknown))}")
+                sys.exit(1)
+
+    requested = args[0] if args else None
+    manifest = load_manifest()
+    changed = 0
     with DatabaseConnection() as conn:
         cur = conn.cursor()
         years = get_years(cur, requested)
         for year in years:
-            generate_year(cur, year)
+            if "leaderboards" in only:
+                changed += generate_year(cur, year, manifest, force=force, columnar=columnar)
+            if "events" in only:
+                changed += generate_events(cur, year, manifest, force=force, columnar=columnar)
+            if "map" in only:
+                changed += generate_map(cur, year, manifest, force=force, columnar=columnar)
+        if "search" in only:
+            changed += generate_search_index(cur, manifest, force=force)
+        cur.close()
+    save_manifest(manifest)
+    print(f"{changed} artifact(s) rebuilt; manifest -> {MANIFEST_PATH}")
 
 
 if __name__ == "__main__":
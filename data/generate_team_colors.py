@@ -1,8 +1,43 @@
+"""Extract primary/secondary colors from team avatars.
+
+Default mode is incremental: every avatar is fingerprinted (mtime + size, then
+sha1 when those change) into team_colors_manifest.json and only new or changed
+images are processed. Extraction runs in a process pool on a downscaled pixel
+array (NumPy k-means when available, else Pillow median-cut). Every team's
+colors go to teams.team_colors in one bulk UPDATE that only writes rows whose
+colors differ, so teams whose avatar was removed (now stock.png) or that a
+--no-db run skipped are caught too.
+
+Usage (from the repo root, where assets/avatars lives):
+    python data/generate_team_colors.py              # incremental
+    python data/generate_team_colors.py --force      # recompute every avatar
+    python data/generate_team_colors.py --workers=8 --no-db
+    python data/generate_team_colors.py --legacy     # old ColorThief path, one team at a time
+"""
+import hashlib
 import json
 import os
-from colorthief import ColorThief
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 
+try:
+    import numpy as np
+except ImportError:  # optional; falls back to Pillow median-cut
+    np = None
+
+AVATAR_DIR = "assets/avatars"
+STOCK_AVATAR = os.path.join(AVATAR_DIR, "stock.png")
+BBOT_AVATAR = os.path.join(AVATAR_DIR, "bbot.png")
+OUTPUT_PATH = "team_colors.json"
+MANIFEST_PATH = "team_colors_manifest.json"
+MANIFEST_VERSION = 1
+FALLBACK_COLORS = ["#1e3a8a", "#3b82f6"]  # Blue gradient
+# Avatars are 40x40 today; anything larger is downscaled before clustering.
+SAMPLE_SIZE = 64
+KMEANS_ITERATIONS = 12
+
 def is_color_lighter(color1, color2):
     """
     Determine which color is lighter by calculating relative luminance.
@@ -22,7 +57,9 @@ def is_color_lighter(color1, color2):
     return get_luminance(color1) > get_luminance(color2)
 
 def get_team_colors(team_number):
-    """Extract dominant colors from team avatar."""
+    """Extract dominant colors from team avatar (legacy ColorThief path, every pixel)."""
+    from colorthief import ColorThief
+
     # Use bbot.png for team numbers 9970-9999
     if 9970 <= team_number <= 9999:
         avatar_path = "assets/avatars/bbot.png"
@@ -94,19 +131,171 @@ def get_team_colors(team_number):
         # Fallback colors if extraction fails
         return ["#1e3a8a", "#3b82f6"]
 
-def generate_team_colors():
-    """Generate colors for all teams and save to JSON."""
-    from dotenv import load_dotenv
-    from db_connection import DatabaseConnection
+def _hex(rgb):
+    return "#%02x%02x%02x" % tuple(int(round(c)) for c in rgb[:3])
 
-    load_dotenv()
 
-    team_numbers: list[int] = []
-    with DatabaseConnection() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT team_number FROM teams ORDER BY team_number")
-        team_numbers = [int(row[0]) for row in cur.fetchall()]
+def _ordered(colors):
+    """Two hex colors, darker first (same convention as get_team_colors)."""
+    if not colors:
+        return list(FALLBACK_COLORS)
+    if len(colors) == 1:
+        return [colors[0], colors[0]]
+    colors = list(colors[:2])
+    if is_color_lighter(colors[0], colors[1]):
+        colors = colors[::-1]
+    return colors
+
+
+def _sample_pixels(path):
+    """Opaque, non-white RGB pixels of a downscaled avatar (ColorThief's filter)."""
+    with Image.open(path) as img:
+        img = img.convert("RGBA")
+        if max(img.size) > SAMPLE_SIZE:
+            img.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE), Image.BILINEAR)
+        pixels = list(img.getdata())
+    return [
+        (r, g, b)
+        for r, g, b, a in pixels
+        if a >= 125 and not (r > 250 and g > 250 and b > 250)
+    ]
+
+
+def _kmeans_palette(pixels, k=2):
+    """Deterministic k-means over an (n, 3) array; centers ordered by cluster size."""
+    data = np.asarray(pixels, dtype=np.float32)
+    luminance = data @ np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+    # Seed from luminance quantiles so results are stable run to run.
+    order = np.argsort(luminance)
+    centers = data[order[np.linspace(0, len(order) - 1, k).astype(int)]].copy()
+    labels = np.zeros(len(data), dtype=np.int64)
+    for it in range(KMEANS_ITERATIONS):
+        dist = ((data[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        new_labels = dist.argmin(axis=1)
+        if it > 0 and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for j in range(k):
+            members = data[labels == j]
+            if len(members):
+                centers[j] = members.mean(axis=0)
+    counts = np.bincount(labels, minlength=k)
+    return [_hex(centers[j]) for j in np.argsort(-counts) if counts[j] > 0]
+
+
+def _median_cut_palette(pixels, k=2):
+    img = Image.new("RGB", (len(pixels), 1))
+    img.putdata(pixels)
+    quantized = img.quantize(colors=k, method=Image.MEDIANCUT)
+    palette = quantized.getpalette() or []
+    counts = sorted(quantized.getcolors() or [], reverse=True)
+    return [_hex(palette[idx * 3 : idx * 3 + 3]) for _count, idx in counts]
+
+
+def extract_colors(path):
+    """[darker, lighter] hex colors for one image, or None if nothing usable."""
+    pixels = _sample_pixels(path)
+    if not pixels:
+        return None
+    palette = _kmeans_palette(pixels) if np is not None else _median_cut_palette(pixels)
+    return _ordered(palette) if palette else None
+
+
+def _extract_job(job):
+    key, path = job
+    try:
+        return key, extract_colors(path), None
+    except Exception as e:
+        return key, None, str(e)
+
+
+def avatar_path_for(team_number):
+    if 9970 <= team_number <= 9999:
+        return BBOT_AVATAR
+    return os.path.join(AVATAR_DIR, f"{team_number}.png")
+
+
+def _file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "images": {}}
 
+
+def save_manifest(manifest):
+    tmp = MANIFEST_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def needs_extract(entry, path, force=False):
+    """Return (changed, stat_fields). mtime/size match -> unchanged without hashing."""
+    st = os.stat(path)
+    fields = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    if force or not entry:
+        return True, fields
+    if entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+        return False, fields
+    # Touched (e.g. fresh checkout) but maybe identical bytes: compare content.
+    fields["sha1"] = _file_sha1(path)
+    return fields["sha1"] != entry.get("sha1"), fields
+
+
+def _parse_flags(argv):
+    flags = {"force": False, "no_db": False, "legacy": False, "workers": None}
+    for arg in argv:
+        if arg == "--force":
+            flags["force"] = True
+        elif arg == "--no-db":
+            flags["no_db"] = True
+        elif arg == "--legacy":
+            flags["legacy"] = True
+        elif arg.startswith("--workers="):
+            flags["workers"] = max(1, int(arg.split("=", 1)[1]))
+    return flags
+
+
+def _bulk_update_team_colors(conn, team_colors):
+    from psycopg2.extras import execute_values
+
+    if not team_colors:
+        return 0
+    cur = conn.cursor()
+    # RETURNING + fetch: rowcount would only cover the last page.
+    updated = execute_values(
+        cur,
+        """
+        UPDATE teams AS t
+        SET team_colors = v.colors
+        FROM (VALUES %s) AS v(team_number, colors)
+        WHERE t.team_number = v.team_number
+          AND t.team_colors IS DISTINCT FROM v.colors
+        RETURNING t.team_number
+        """,
+        [(tn, json.dumps(c)) for tn, c in sorted(team_colors.items())],
+        template="(%s::INTEGER, %s::JSONB)",
+        page_size=1000,
+        fetch=True,
+    )
+    conn.commit()
+    cur.close()
+    return len(updated)
+
+
+def generate_team_colors_legacy(team_numbers):
     team_colors = {}
     total_teams = len(team_numbers)
 
@@ -123,12 +312,92 @@ def generate_team_colors():
         # Progress indicator
         if (i + 1) % 100 == 0:
             print(f"Processed {i + 1}/{total_teams} teams...")
-    
+    return team_colors
+
+
+def generate_team_colors(argv=None):
+    """Generate colors for all teams, save to JSON and bulk-update teams.team_colors."""
+    from dotenv import load_dotenv
+    from db_connection import DatabaseConnection
+
+    load_dotenv()
+    flags = _parse_flags(sys.argv[1:] if argv is None else argv)
+    started = time.time()
+
+    team_numbers: list[int] = []
+    with DatabaseConnection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT team_number FROM teams ORDER BY team_number")
+        team_numbers = [int(row[0]) for row in cur.fetchall()]
+
+    if flags["legacy"]:
+        team_colors = generate_team_colors_legacy(team_numbers)
+    else:
+        manifest = load_manifest()
+        images = manifest["images"]
+
+        # Many teams share one image (stock.png, bbot.png): extract per image path.
+        team_paths = {}
+        for tn in team_numbers:
+            path = avatar_path_for(tn)
+            team_paths[tn] = path if os.path.exists(path) else STOCK_AVATAR
+        jobs = []
+        stat_updates = {}
+        for path in sorted(set(team_paths.values())):
+            if not os.path.exists(path):
+                continue
+            changed, fields = needs_extract(images.get(path), path, flags["force"])
+            stat_updates[path] = fields
+            if changed:
+                jobs.append((path, path))
+            else:
+                images[path].update(fields)
+
+        print(
+            f"Processing {len(team_numbers)} teams: {len(stat_updates)} avatar(s), "
+            f"{len(jobs)} new or changed"
+        )
+        if jobs:
+            workers = flags["workers"] or min(8, os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for i, (path, colors, error) in enumerate(
+                    pool.map(_extract_job, jobs, chunksize=64), start=1
+                ):
+                    entry = dict(stat_updates[path])
+                    entry.setdefault("sha1", _file_sha1(path))
+                    entry["colors"] = colors
+                    if error:
+                        entry["error"] = error
+                        print(f"Error extracting colors for {path}: {error}")
+                    images[path] = entry
+                    if i % 500 == 0:
+                        print(f"Processed {i}/{len(jobs)} avatars...")
+        # Forget avatars that no longer exist.
+        for path in list(images):
+            if path not in stat_updates:
+                del images[path]
+        save_manifest(manifest)
+
+        stock_colors = (images.get(STOCK_AVATAR) or {}).get("colors") or FALLBACK_COLORS
+        team_colors = {}
+        for tn, path in team_paths.items():
+            colors = (images.get(path) or {}).get("colors") or stock_colors
+            team_colors[str(tn)] = {"primary": colors[0], "secondary": colors[1]}
+
     # Save to JSON file
-    with open("team_colors.json", "w", encoding="utf-8") as f:
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
         json.dump(team_colors, f, indent=2)
-    
-    print(f"Generated colors for {len(team_colors)} teams and saved to team_colors.json")
+
+    print(f"Generated colors for {len(team_colors)} teams and saved to {OUTPUT_PATH}")
+
+    if not flags["no_db"]:
+        # Every team: the UPDATE skips rows whose colors already match.
+        with DatabaseConnection() as conn:
+            updated = _bulk_update_team_colors(
+                conn, {int(tn): c for tn, c in team_colors.items()}
+            )
+        print(f"Updated teams.team_colors for {updated} team(s)")
+    print(f"Done in {time.time() - started:.1f}s")
 
 if __name__ == "__main__":
-    generate_team_colors() 
\ No newline at end of file
+    generate_team_colors()
@@ -0,0 +1,224 @@
+"""Offline gazetteer used when Mapbox has no answer (or with --offline).
+
+Resolution order for a (city, state, country) location, most specific first:
+
+1. city centroid learned from earlier Mapbox answers in the geocode cache,
+2. region centroid learned from the cache, else the bundled US/Canada table,
+3. country centroid learned from the cache, else the bundled country table.
+
+Only Mapbox answers are learned from (never coordinates previously written
+from this module), so approximate points do not feed back into themselves.
+
+Region and country names are normalized through data/states.json and
+data/countries.json (the same lists the site filters use), so "MI",
+"Michigan" and "michigan" all hit the same entry and a row with only a
+state can still be placed in its country.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+_DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LatLng = Tuple[float, float]
+
+# Approximate geographic centroids for every country in countries.json.
+COUNTRY_CENTROIDS: Dict[str, LatLng] = {
+    "usa": (39.83, -98.58),
+    "canada": (56.13, -106.35),
+    "mexico": (23.63, -102.55),
+    "australia": (-25.27, 133.78),
+    "china": (35.86, 104.20),
+    "india": (20.59, 78.96),
+    "israel": (31.05, 34.85),
+    "brazil": (-14.24, -51.93),
+    "türkiye": (38.96, 35.24),
+    "chinese taipei": (23.70, 120.96),
+    "argentina": (-38.42, -63.62),
+    "azerbaijan": (40.14, 47.58),
+    "belize": (17.19, -88.50),
+    "bulgaria": (42.73, 25.49),
+    "colombia": (4.57, -74.30),
+    "croatia": (45.10, 15.20),
+    "czech republic": (49.82, 15.47),
+    "dominican republic": (18.74, -70.16),
+    "france": (46.23, 2.21),
+    "greece": (39.07, 21.82),
+    "hungary": (47.16, 19.50),
+    "japan": (36.20, 138.25),
+    "netherlands": (52.13, 5.29),
+    "panama": (8.54, -80.78),
+    "philippines": (12.88, 121.77),
+    "poland": (51.92, 19.15),
+    "singapore": (1.35, 103.82),
+    "south africa": (-30.56, 22.94),
+    "switzerland": (46.82, 8.23),
+    "united kingdom": (55.38, -3.44),
+}
+
+# (abbreviation, name, lat, lng) for US states and Canadian provinces, where most
+# teams are and where TBA mixes postal abbreviations with full names.
+_REGIONS = {
+    "usa": [
+        ("AL", "Alabama", 32.81, -86.79), ("AK", "Alaska", 61.37, -152.40),
+        ("AZ", "Arizona", 33.73, -111.43), ("AR", "Arkansas", 34.97, -92.37),
+        ("CA", "California", 36.12, -119.68), ("CO", "Colorado", 39.06, -105.31),
+        ("CT", "Connecticut", 41.60, -72.76), ("DE", "Delaware", 39.32, -75.51),
+        ("DC", "District of Columbia", 38.90, -77.03), ("FL", "Florida", 27.77, -81.69),
+        ("GA", "Georgia", 33.04, -83.64), ("HI", "Hawaii", 21.09, -157.50),
+        ("ID", "Idaho", 44.24, -114.48), ("IL", "Illinois", 40.35, -88.99),
+        ("IN", "Indiana", 39.85, -86.26), ("IA", "Iowa", 42.01, -93.21),
+        ("KS", "Kansas", 38.53, -96.73), ("KY", "Kentucky", 37.67, -84.67),
+        ("LA", "Louisiana", 31.17, -91.87), ("ME", "Maine", 44.69, -69.38),
+        ("MD", "Maryland", 39.06, -76.80), ("MA", "Massachusetts", 42.23, -71.53),
+        ("MI", "Michigan", 43.33, -84.54), ("MN", "Minnesota", 45.69, -93.90),
+        ("MS", "Mississippi", 32.74, -89.68), ("MO", "Missouri", 38.46, -92.29),
+        ("MT", "Montana", 46.92, -110.45), ("NE", "Nebraska", 41.13, -98.27),
+        ("NV", "Nevada", 38.31, -117.06), ("NH", "New Hampshire", 43.45, -71.56),
+        ("NJ", "New Jersey", 40.30, -74.52), ("NM", "New Mexico", 34.84, -106.25),
+        ("NY", "New York", 42.17, -74.95), ("NC", "North Carolina", 35.63, -79.81),
+        ("ND", "North Dakota", 47.53, -99.78), ("OH", "Ohio", 40.39, -82.76),
+        ("OK", "Oklahoma", 35.57, -96.93), ("OR", "Oregon", 44.57, -122.07),
+        ("PA", "Pennsylvania", 40.59, -77.21), ("RI", "Rhode Island", 41.68, -71.51),
+        ("SC", "South Carolina", 33.86, -80.95), ("SD", "South Dakota", 44.30, -99.44),
+        ("TN", "Tennessee", 35.75, -86.69), ("TX", "Texas", 31.05, -97.56),
+        ("UT", "Utah", 40.15, -111.86), ("VT", "Vermont", 44.05, -72.71),
+        ("VA", "Virginia", 37.77, -78.17), ("WA", "Washington", 47.40, -121.49),
+        ("WV", "West Virginia", 38.49, -80.95), ("WI", "Wisconsin", 44.27, -89.62),
+        ("WY", "Wyoming", 42.76, -107.30), ("PR", "Puerto Rico", 18.22, -66.59),
+    ],
+    "canada": [
+        ("AB", "Alberta", 53.93, -116.58), ("BC", "British Columbia", 53.73, -127.65),
+        ("MB", "Manitoba", 53.76, -98.81), ("NB", "New Brunswick", 46.57, -66.46),
+        ("NL", "Newfoundland and Labrador", 53.14, -57.66), ("NS", "Nova Scotia", 44.68, -63.74),
+        ("ON", "Ontario", 44.50, -79.50), ("PE", "Prince Edward Island", 46.51, -63.42),
+        ("QC", "Quebec", 46.81, -71.21), ("SK", "Saskatchewan", 52.94, -106.45),
+    ],
+}
+
+# TBA / Mapbox spellings that differ from countries.json values.
+_COUNTRY_ALIASES = {
+    "us": "usa",
+    "united states": "usa",
+    "united states of america": "usa",
+    "ca": "canada",
+    "mx": "mexico",
+    "turkey": "türkiye",
+    "taiwan": "chinese taipei",
+    "czechia": "czech republic",
+    "uk": "united kingdom",
+    "england": "united kingdom",
+    "great britain": "united kingdom",
+}
+
+
+def _norm(value: Optional[str]) -> str:
+    return (value or "").strip().lower()
+
+
+def _load_json(name: str):
+    try:
+        with open(os.path.join(_DATA_DIR, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class Gazetteer:
+    """In-memory lookup of approximate coordinates by city / region / country."""
+
+    def __init__(self) -> None:
+        self.countries: Dict[str, str] = {}
+        self.region_country: Dict[str, str] = {}
+        self.region_alias: Dict[Tuple[str, str], str] = {}
+        self.country_coords: Dict[str, LatLng] = dict(COUNTRY_CENTROIDS)
+        self.region_coords: Dict[Tuple[str, str], LatLng] = {}
+        self.city_coords: Dict[Tuple[str, str, str], LatLng] = {}
+
+        for entry in _load_json("countries.json") or []:
+            value = _norm(entry.get("value"))
+            if value and value != "all":
+                self.countries[value] = value
+                self.countries[_norm(entry.get("label"))] = value
+        self.countries.update(_COUNTRY_ALIASES)
+
+        for country, regions in (_load_json("states.json") or {}).items():
+            c = self.country(country)
+            for entry in regions:
+                for name in (entry.get("value"), entry.get("label")):
+                    if _norm(name):
+                        self.region_alias[(c, _norm(name))] = _norm(entry.get("value"))
+                        self.region_country.setdefault(_norm(name), c)
+
+        for country, regions in _REGIONS.items():
+            for abbr, name, lat, lng in regions:
+                region = _norm(name)
+                self.region_alias[(country, _norm(abbr))] = region
+                self.region_alias[(country, region)] = region
+                self.region_country.setdefault(_norm(abbr), country)
+                self.region_country.setdefault(region, country)
+                self.region_coords[(country, region)] = (lat, lng)
+
+    def country(self, country: Optional[str]) -> str:
+        c = _norm(country)
+        return self.countries.get(c, c)
+
+    def region(self, country: str, state: Optional[str]) -> str:
+        s = _norm(state)
+        return self.region_alias.get((country, s), s)
+
+    def normalize(
+        self, city: Optional[str], state: Optional[str], country: Optional[str]
+    ) -> Tuple[str, str, str]:
+        c = self.country(country)
+        if not c and _norm(state):
+            c = self.region_country.get(_norm(state), "")
+        return _norm(city), self.region(c, state), c
+
+    def learn(self, rows: Iterable[Tuple[Optional[str], Optional[str], Optional[str], float, float]]) -> None:
+        """Average known (city, state, country, lat, lng) rows into city/region/country centroids.
+
+        Learned region and country centroids replace the bundled ones: they sit
+        where teams actually are rather than at the geographic center.
+        """
+        sums: Dict[tuple, list] = {}
+        for city, state, country, lat, lng in rows:
+            if lat is None or lng is None:
+                continue
+            ci, st, co = self.normalize(city, state, country)
+            if not co:
+                continue
+            for key in (("city", ci, st, co) if ci else None, ("region", st, co) if st else None, ("country", co)):
+                if key is None:
+                    continue
+                acc = sums.setdefault(key, [0.0, 0.0, 0])
+                acc[0] += lat
+                acc[1] += lng
+                acc[2] += 1
+        for key, (lat_sum, lng_sum, n) in sums.items():
+            point = (lat_sum / n, lng_sum / n)
+            if key[0] == "city":
+                self.city_coords[(key[1], key[2], key[3])] = point
+            elif key[0] == "region":
+                self.region_coords[(key[2], key[1])] = point
+            else:
+                self.country_coords[key[1]] = point
+
+    def lookup(
+        self, city: Optional[str], state: Optional[str], country: Optional[str]
+    ) -> Tuple[Optional[float], Optional[float], Optional[str]]:
+        """Return (lat, lng, precision) where precision is city/region/country, or Nones."""
+        ci, st, co = self.normalize(city, state, country)
+        if ci and (ci, st, co) in self.city_coords:
+            lat, lng = self.city_coords[(ci, st, co)]
+            return lat, lng, "city"
+        if st and (co, st) in self.region_coords:
+            lat, lng = self.region_coords[(co, st)]
+            return lat, lng, "region"
+        if co and co in self.country_coords:
+            lat, lng = self.country_coords[co]
+            return lat, lng, "country"
+        return None, None, None
+
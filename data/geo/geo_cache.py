@@ -0,0 +1,129 @@
+"""SQLite-backed geocode cache keyed by normalized (city, state, postal, country).
+
+Replaces mapbox_geo_cache.json, which was rewritten in full every 50 rows.
+Writes are per-row upserts batched into one transaction, so a crash loses at
+most the last uncommitted batch and the file never has to be reserialized.
+An existing JSON cache is imported the first time the database is created.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+_GEO_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DB_PATH = os.getenv("GEOCODE_CACHE_DB") or os.path.join(_GEO_DIR, "geo_cache.sqlite3")
+LEGACY_JSON_PATH = os.path.join(_GEO_DIR, "mapbox_geo_cache.json")
+
+LocationKey = Tuple[str, str, str, str]
+CachedCoords = Tuple[Optional[float], Optional[float]]
+
+
+def normalize_key(
+    city: Optional[str], state: Optional[str], postal: Optional[str], country: Optional[str]
+) -> LocationKey:
+    return tuple((v or "").strip().lower() for v in (city, state, postal, country))  # type: ignore[return-value]
+
+
+class GeoCache:
+    def __init__(self, path: str = CACHE_DB_PATH) -> None:
+        self.path = path
+        fresh = not os.path.exists(path)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                city TEXT NOT NULL,
+                state TEXT NOT NULL,
+                postal TEXT NOT NULL,
+                country TEXT NOT NULL,
+                lat REAL,
+                lng REAL,
+                source TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (city, state, postal, country)
+            )
+            """
+        )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+        if fresh:
+            self.import_legacy_json(LEGACY_JSON_PATH)
+
+    def import_legacy_json(self, json_path: str) -> int:
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return 0
+        rows = []
+        for raw_key, pair in (data or {}).items():
+            try:
+                k = json.loads(raw_key)
+                lat, lng = pair
+            except (ValueError, TypeError):
+                continue
+            key = normalize_key(k.get("city"), k.get("state"), k.get("postal"), k.get("country"))
+            rows.append((key, lat, lng))
+        self.put_many(rows, source="mapbox")
+        print(f"Imported {len(rows)} entries from {json_path}")
+        return len(rows)
+
+    def get_many(self, keys: Iterable[LocationKey]) -> Dict[LocationKey, CachedCoords]:
+        """Cached coords for ``keys`` (negative answers come back as (None, None))."""
+        found: Dict[LocationKey, CachedCoords] = {}
+        wanted = list(keys)
+        cur = self.conn.cursor()
+        for i in range(0, len(wanted), 200):
+            chunk = wanted[i : i + 200]
+            clause = " OR ".join(["(city = ? AND state = ? AND postal = ? AND country = ?)"] * len(chunk))
+            cur.execute(
+                f"SELECT city, state, postal, country, lat, lng FROM geocode_cache WHERE {clause}",
+                [v for key in chunk for v in key],
+            )
+            for city, state, postal, country, lat, lng in cur.fetchall():
+                found[(city, state, postal, country)] = (lat, lng)
+        cur.close()
+        self.hits += len(found)
+        self.misses += len(wanted) - len(found)
+        return found
+
+    def put_many(
+        self, rows: Sequence[Tuple[LocationKey, Optional[float], Optional[float]]], *, source: str
+    ) -> None:
+        if not rows:
+            return
+        now = time.time()
+        self.conn.executemany(
+            """
+            INSERT INTO geocode_cache (city, state, postal, country, lat, lng, source, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (city, state, postal, country)
+            DO UPDATE SET lat = excluded.lat, lng = excluded.lng,
+                          source = excluded.source, updated_at = excluded.updated_at
+            """,
+            [(*key, lat, lng, source, now) for key, lat, lng in rows],
+        )
+        self.conn.commit()
+
+    def iter_resolved(self, source: str = "mapbox") -> Iterator[Tuple[str, str, str, float, float]]:
+        """(city, state, country, lat, lng) for every positive answer from ``source``."""
+        cur = self.conn.execute(
+            "SELECT city, state, country, lat, lng FROM geocode_cache "
+            "WHERE source = ? AND lat IS NOT NULL AND lng IS NOT NULL",
+            (source,),
+        )
+        yield from cur
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM geocode_cache").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
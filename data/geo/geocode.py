@@ -4,27 +4,38 @@
 Reads city / state_prov / postal_code / country from the database (no TBA
 calls). Teams are always rewritten. Events are only filled when lat/lng is missing.
 
+Rows are collapsed to unique normalized locations before anything is looked
+up (thousands of teams share a few hundred cities). Unique locations are
+served from the SQLite cache (geo_cache.py), then Mapbox is queried for the
+misses from a small thread pool that shares one request-rate budget, and
+anything still unresolved falls back to the offline gazetteer (gazetteer.py).
+Coordinates are written back with one UPDATE ... FROM (VALUES ...) per batch.
+
 Usage:
     python data/geo/geocode.py --teams
     python data/geo/geocode.py --events --year 2026
     python data/geo/geocode.py --dry-run --limit 20
+    python data/geo/geocode.py --offline          # cache + gazetteer only, no Mapbox
 
 Env:
     DB_URL or DATABASE_URL     Postgres connection string
     MAPBOX_ACCESS_TOKEN        Mapbox token (pk. or sk.)
+    GEOCODE_CACHE_DB           SQLite cache path (default data/geo/geo_cache.sqlite3)
     ACE_ALLOW_PROD_WRITE=1     Required when pointing at hosted Neon
 """
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import requests
 from dotenv import load_dotenv
+from psycopg2.extras import execute_values
 from tqdm import tqdm
 
 _DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,17 +43,23 @@ _REPO_ROOT = os.path.dirname(_DATA_DIR)
 for _path in (_DATA_DIR, _REPO_ROOT):
     if _path not in sys.path:
         sys.path.insert(0, _path)
+# migrate.py (schema owner); appended so the API's ``data`` package never shadows ours.
+_API_DIR = os.path.join(_REPO_ROOT, "peekorobo-api")
+if _API_DIR not in sys.path:
+    sys.path.append(_API_DIR)
 
 load_dotenv(os.path.join(_REPO_ROOT, ".env"))
 load_dotenv(os.path.join(_DATA_DIR, ".env.local"), override=True)
 
 from db_connection import get_pg_connection, return_pg_connection  # noqa: E402
 from db_target import assert_safe_db_target, describe_db_target  # noqa: E402
+import migrate  # noqa: E402
+from geo.gazetteer import Gazetteer  # noqa: E402
+from geo.geo_cache import CACHE_DB_PATH, GeoCache, LocationKey, normalize_key  # noqa: E402
 
 MAPBOX_FORWARD_URL = "https://api.mapbox.com/search/geocode/v6/forward"
 MAPBOX_ACCESS_TOKEN = os.getenv("MAPBOX_ACCESS_TOKEN") or os.getenv("MAPBOX_TOKEN") or ""
 
-CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mapbox_geo_cache.json")
 _permanent_ok: Optional[bool] = None
 
 # TBA uses full country names; Mapbox structured `country` is a hard filter when
@@ -136,48 +153,6 @@ def country_iso(country: Optional[str]) -> Optional[str]:
     return COUNTRY_ISO.get(raw.lower())
 
 
-def cache_key(city: Optional[str], state: Optional[str], postal: Optional[str], country: Optional[str]) -> str:
-    return json.dumps(
-        {
-            "city": (city or "").strip().lower(),
-            "state": (state or "").strip().lower(),
-            "postal": (postal or "").strip().lower(),
-            "country": (country or "").strip().lower(),
-        },
-        sort_keys=True,
-    )
-
-
-def load_cache() -> Dict[str, List[Optional[float]]]:
-    if not os.path.exists(CACHE_PATH):
-        return {}
-    try:
-        with open(CACHE_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data if isinstance(data, dict) else {}
-    except Exception:
-        return {}
-
-
-def save_cache(cache: Dict[str, List[Optional[float]]]) -> None:
-    tmp = CACHE_PATH + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(cache, f)
-    os.replace(tmp, CACHE_PATH)
-
-
-def ensure_location_columns(conn) -> None:
-    """Add postal_code if TBA ingest has not created it yet."""
-    cur = conn.cursor()
-    for table in ("teams", "events"):
-        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS lat DOUBLE PRECISION")
-        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS lng DOUBLE PRECISION")
-        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS postal_code TEXT")
-    cur.execute("ALTER TABLE event_teams DROP COLUMN IF EXISTS postal_code")
-    conn.commit()
-    cur.close()
-
-
 def _parse_mapbox_coords(payload: Any) -> Tuple[Optional[float], Optional[float]]:
     if not isinstance(payload, dict):
         return None, None
@@ -198,6 +173,23 @@ def _parse_mapbox_coords(payload: Any) -> Tuple[Optional[float], Optional[float]
     return None, None
 
 
+class _RateLimiter:
+    """Spaces request starts ``min_interval`` apart across all worker threads."""
+
+    def __init__(self, min_interval: float) -> None:
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+
 def _mapbox_get(params: Dict[str, Any], permanent: bool) -> Tuple[Optional[float], Optional[float], Optional[str]]:
     global _permanent_ok
     if _permanent_ok is False:
@@ -246,20 +238,14 @@ def geocode_location(
     postal: Optional[str],
     country: Optional[str],
     *,
-    cache: Dict[str, List[Optional[float]]],
     permanent: bool,
-    min_interval: float,
+    limiter: _RateLimiter,
 ) -> Tuple[Optional[float], Optional[float]]:
+    """Query Mapbox (structured, then free-text) for one location. No caching here."""
     city, state, postal, country = (_clean(city), _clean(state), _clean(postal), _clean(country))
     if not any((city, state, postal, country)):
         return None, None
 
-    key = cache_key(city, state, postal, country)
-    if key in cache:
-        pair = cache[key]
-        if isinstance(pair, (list, tuple)) and len(pair) == 2:
-            return pair[0], pair[1]
-
     iso = country_iso(country)
     structured: Dict[str, Any] = {}
     if city:
@@ -288,30 +274,13 @@ def geocode_location(
 
     lat = lng = None
     for params in attempts:
-        time.sleep(min_interval)
+        limiter.wait()
         lat, lng, _err = _mapbox_get(params, permanent=permanent)
         if lat is not None and lng is not None:
             break
-
-    cache[key] = [lat, lng]
     return lat, lng
 
 
-def _table_has_column(conn, table: str, column: str) -> bool:
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT 1
-        FROM information_schema.columns
-        WHERE table_schema = 'public' AND table_name = %s AND column_name = %s
-        """,
-        (table, column),
-    )
-    found = cur.fetchone() is not None
-    cur.close()
-    return found
-
-
 def fetch_teams(conn, limit: Optional[int]) -> List[dict]:
     sql = """
         SELECT team_number, nickname, city, state_prov, country, postal_code, lat, lng
@@ -346,8 +315,8 @@ def fetch_events(conn, year: Optional[int], limit: Optional[int]) -> List[dict]:
     clauses: List[str] = ["(lat IS NULL OR lng IS NULL)"]
     params: List[Any] = []
     if year is not None:
-        clauses.append("LEFT(event_key, 4) = %s")
-        params.append(str(year))
+        clauses.append("year = %s")
+        params.append(int(year))
     where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
     sql = f"""
         SELECT event_key, name, city, state_prov, country, postal_code, lat, lng
@@ -381,90 +350,175 @@ def update_coords(conn, table: str, id_column: str, rows: Sequence[Tuple[Any, fl
     if not rows:
         return
     cur = conn.cursor()
-    cur.executemany(
-        f"UPDATE {table} SET lat = %s, lng = %s WHERE {id_column} = %s",
-        [(lat, lng, key) for key, lat, lng in rows],
+    execute_values(
+        cur,
+        f"""
+        UPDATE {table} AS t
+        SET lat = v.lat, lng = v.lng
+        FROM (VALUES %s) AS v(id, lat, lng)
+        WHERE t.{id_column} = v.id
+        """,
+        list(rows),
+        template=f"(%s::{'INTEGER' if id_column == 'team_number' else 'TEXT'}, %s::DOUBLE PRECISION, %s::DOUBLE PRECISION)",
+        page_size=1000,
     )
     conn.commit()
     cur.close()
 
 
+def resolve_locations(
+    keys: Sequence[LocationKey],
+    originals: Dict[LocationKey, Tuple[Optional[str], ...]],
+    *,
+    cache: GeoCache,
+    gazetteer: Gazetteer,
+    permanent: bool,
+    limiter: Optional[_RateLimiter],
+    workers: int,
+    label: str,
+    commit_every: int = 50,
+) -> Tuple[Dict[LocationKey, Tuple[float, float]], Dict[str, int]]:
+    """Resolve unique location keys: cache, then Mapbox (unless ``limiter`` is None), then gazetteer."""
+    resolved: Dict[LocationKey, Tuple[float, float]] = {}
+    stats = {"cached": 0, "mapbox": 0, "gazetteer": 0, "unresolved": 0}
+
+    cached = cache.get_many(keys)
+    misses: List[LocationKey] = []
+    for key in keys:
+        pair = cached.get(key)
+        if pair is None:
+            misses.append(key)
+        elif pair[0] is not None and pair[1] is not None:
+            resolved[key] = (pair[0], pair[1])
+            stats["cached"] += 1
+    # Cached negative answers skip Mapbox but still get a gazetteer fallback.
+    unresolved = [k for k in keys if k not in resolved and k not in misses]
+
+    if misses and limiter is not None:
+        print(f"Mapbox lookups for {label}: {len(misses)} unique location(s), {workers} worker(s)")
+        pending: List[Tuple[LocationKey, Optional[float], Optional[float]]] = []
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {
+                pool.submit(geocode_location, *originals[key], permanent=permanent, limiter=limiter): key
+                for key in misses
+            }
+            for future in tqdm(as_completed(futures), total=len(futures), desc=f"Geocoding {label}", unit="loc"):
+                key = futures[future]
+                try:
+                    lat, lng = future.result()
+                except Exception as e:
+                    print(f"  mapbox error for {originals[key]}: {e}")
+                    unresolved.append(key)
+                    continue
+                pending.append((key, lat, lng))
+                if lat is not None and lng is not None:
+                    resolved[key] = (lat, lng)
+                    stats["mapbox"] += 1
+                else:
+                    unresolved.append(key)
+                if len(pending) >= commit_every:
+                    cache.put_many(pending, source="mapbox")
+                    pending = []
+        cache.put_many(pending, source="mapbox")
+    else:
+        unresolved.extend(misses)
+
+    for key in unresolved:
+        city, state, _postal, country = originals[key]
+        lat, lng, precision = gazetteer.lookup(city, state, country)
+        if lat is None or lng is None:
+            stats["unresolved"] += 1
+            continue
+        resolved[key] = (lat, lng)
+        stats["gazetteer"] += 1
+    return resolved, stats
+
+
 def geocode_rows(
     rows: Iterable[dict],
     *,
     id_field: str,
     label: str,
-    cache: Dict[str, List[Optional[float]]],
+    cache: GeoCache,
+    gazetteer: Gazetteer,
     permanent: bool,
-    min_interval: float,
+    limiter: Optional[_RateLimiter],
+    workers: int = 4,
     conn=None,
     table: Optional[str] = None,
     id_column: Optional[str] = None,
     dry_run: bool = False,
-    commit_every: int = 50,
+    write_batch: int = 1000,
 ) -> Tuple[int, int, int]:
-    pending: List[Tuple[Any, float, float]] = []
-    written = 0
+    rows = list(rows)
+    by_key: Dict[LocationKey, List[Any]] = {}
+    originals: Dict[LocationKey, Tuple[Optional[str], ...]] = {}
     skipped = 0
-    failed = 0
-    for row in tqdm(list(rows), desc=f"Geocoding {label}", unit=label.rstrip("s")):
-        city, state, postal, country = (
-            row.get("city"),
-            row.get("state_prov"),
-            row.get("postal_code"),
-            row.get("country"),
-        )
-        if not any(_clean(v) for v in (city, state, postal, country)):
+    for row in rows:
+        loc = tuple(_clean(row.get(f)) for f in ("city", "state_prov", "postal_code", "country"))
+        if not any(loc):
             skipped += 1
             continue
-        lat, lng = geocode_location(
-            city,
-            state,
-            postal,
-            country,
-            cache=cache,
-            permanent=permanent,
-            min_interval=min_interval,
-        )
-        if lat is None or lng is None:
-            failed += 1
-            ident = row.get(id_field)
-            print(f"  no result for {label.rstrip('s')} {ident}: {city}, {state}, {postal}, {country}")
+        key = normalize_key(*loc)
+        by_key.setdefault(key, []).append(row[id_field])
+        originals.setdefault(key, loc)
+    print(f"{label}: {len(rows)} row(s) -> {len(by_key)} unique location(s)")
+
+    resolved, stats = resolve_locations(
+        list(by_key),
+        originals,
+        cache=cache,
+        gazetteer=gazetteer,
+        permanent=permanent,
+        limiter=limiter,
+        workers=workers,
+        label=label,
+    )
+    print(
+        f"  cache {stats['cached']}, mapbox {stats['mapbox']}, "
+        f"gazetteer {stats['gazetteer']}, unresolved {stats['unresolved']}"
+    )
+
+    updates: List[Tuple[Any, float, float]] = []
+    failed = 0
+    for key, idents in by_key.items():
+        pair = resolved.get(key)
+        if pair is None:
+            failed += len(idents)
+            city, state, postal, country = originals[key]
+            print(f"  no result for {len(idents)} {label}: {city}, {state}, {postal}, {country}")
             continue
-        pending.append((row[id_field], lat, lng))
-        if not dry_run and conn and table and id_column and len(pending) >= commit_every:
-            update_coords(conn, table, id_column, pending)
-            written += len(pending)
-            pending = []
-            save_cache(cache)
-    if not dry_run and conn and table and id_column and pending:
-        update_coords(conn, table, id_column, pending)
-        written += len(pending)
-        pending = []
-    elif dry_run:
-        written = len(pending)
-    return written, skipped, failed
+        updates.extend((ident, pair[0], pair[1]) for ident in idents)
+
+    if dry_run or not (conn and table and id_column):
+        return len(updates), skipped, failed
+    for i in range(0, len(updates), write_batch):
+        update_coords(conn, table, id_column, updates[i : i + write_batch])
+    return len(updates), skipped, failed
 
 
 def run(args: argparse.Namespace) -> int:
-    if not MAPBOX_ACCESS_TOKEN:
-        print("MAPBOX_ACCESS_TOKEN is not set.", file=sys.stderr)
+    if not MAPBOX_ACCESS_TOKEN and not args.offline:
+        print("MAPBOX_ACCESS_TOKEN is not set (use --offline for cache + gazetteer only).", file=sys.stderr)
         return 1
 
     assert_safe_db_target("geocode")
     print(f"DB target: {describe_db_target()}")
-    print(f"Mapbox: {'permanent' if args.permanent else 'temporary'} geocoding")
+    if args.offline:
+        print("Mapbox: disabled (--offline)")
+    else:
+        print(f"Mapbox: {'permanent' if args.permanent else 'temporary'} geocoding, {args.workers} worker(s)")
 
     conn = get_pg_connection()
     try:
-        ensure_location_columns(conn)
-        if not _table_has_column(conn, "teams", "lat"):
-            print("teams.lat/lng columns are missing; add them before geocoding.", file=sys.stderr)
-            return 1
+        migrate.apply_pending(conn)
 
         do_teams = args.teams or not args.events
         do_events = args.events or not args.teams
-        cache = load_cache()
+        cache = GeoCache()
+        gazetteer = Gazetteer()
+        gazetteer.learn(cache.iter_resolved())
+        limiter = None if args.offline else _RateLimiter(args.interval)
         started = time.time()
 
         if do_teams:
@@ -475,14 +529,15 @@ def run(args: argparse.Namespace) -> int:
                 id_field="team_number",
                 label="teams",
                 cache=cache,
+                gazetteer=gazetteer,
                 permanent=args.permanent,
-                min_interval=args.interval,
+                limiter=limiter,
+                workers=args.workers,
                 conn=conn,
                 table="teams",
                 id_column="team_number",
                 dry_run=args.dry_run,
             )
-            save_cache(cache)
             verb = "Would update" if args.dry_run else "Updated"
             print(f"{verb} {written} team(s) (skipped {skipped}, failed {failed})")
 
@@ -494,18 +549,23 @@ def run(args: argparse.Namespace) -> int:
                 id_field="event_key",
                 label="events",
                 cache=cache,
+                gazetteer=gazetteer,
                 permanent=args.permanent,
-                min_interval=args.interval,
+                limiter=limiter,
+                workers=args.workers,
                 conn=conn,
                 table="events",
                 id_column="event_key",
                 dry_run=args.dry_run,
             )
-            save_cache(cache)
             verb = "Would update" if args.dry_run else "Updated"
             print(f"{verb} {written} event(s) (skipped {skipped}, failed {failed})")
 
-        print(f"Done in {time.time() - started:.1f}s. Cache: {CACHE_PATH}")
+        print(
+            f"Done in {time.time() - started:.1f}s. Cache: {CACHE_DB_PATH} "
+            f"({len(cache)} entries, {cache.hits} hit(s), {cache.misses} miss(es))"
+        )
+        cache.close()
         return 0
     finally:
         return_pg_connection(conn)
@@ -529,7 +589,18 @@ def build_parser() -> argparse.ArgumentParser:
         "--interval",
         type=float,
         default=0.12,
-        help="Minimum seconds between Mapbox requests (default 0.12)",
+        help="Minimum seconds between Mapbox requests across all workers (default 0.12)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Concurrent Mapbox requests; --interval still caps the overall rate (default 4)",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Do not call Mapbox; resolve from the cache and the offline gazetteer only",
     )
     return parser
 
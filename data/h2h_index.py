@@ -0,0 +1,192 @@
+"""
+Head-to-head index behind the API's /games/h2h.
+
+For one season, aggregates every pair of teams that shared an event into
+``team_pair_years`` (together / against records and score sums, keyed by
+team_lo < team_hi) and writes ``team_matches`` (team -> match_key), so the API
+answers a pair with two primary-key lookups instead of a self-join on
+event_teams plus LIKE scans over event_matches. Tables come from
+peekorobo-api/migrations/0006_h2h_index.sql.
+
+Each rebuild replaces the season in one transaction, so readers see either the
+old or the new index. run.py rebuilds the current season after ranks; this
+script backfills older ones.
+
+Usage:
+    python data/h2h_index.py 2026
+    python data/h2h_index.py 2015-2026
+    python data/h2h_index.py --all       # every season with matches
+"""
+import os
+import sys
+import time
+from collections import defaultdict
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from psycopg2.extras import execute_values
+
+# together, together_wins, together_losses, together_ties, together_score_sum,
+# together_opp_sum, against, lo_wins, hi_wins, against_ties, lo_score_sum, hi_score_sum
+_STAT_FIELDS = 12
+
+
+def _teams(csv):
+    if not csv:
+        return []
+    return [int(t) for t in str(csv).split(",") if t.strip().isdigit()]
+
+
+def _played(red_score, blue_score, winner):
+    # Same rule as the API: unplayed rows carry 0/0 (or -1) and no winner.
+    return (red_score or 0) > 0 or (blue_score or 0) > 0 or winner in ("red", "blue")
+
+
+def aggregate_season(matches, event_rosters):
+    """Pair stats and team->match rows for one season.
+
+    ``matches``: (match_key, event_key, red_teams, blue_teams, red_score,
+    blue_score, winning_alliance). ``event_rosters``: event_key -> team numbers.
+    Returns ({(lo, hi): [events_shared, *stats]}, [(team, match_key, alliance)]).
+    """
+    pairs = defaultdict(lambda: [0] * (1 + _STAT_FIELDS))
+    for roster in event_rosters.values():
+        for lo, hi in combinations(sorted(set(roster)), 2):
+            pairs[(lo, hi)][0] += 1
+
+    team_rows = []
+    for match_key, _event_key, red_csv, blue_csv, red_score, blue_score, winner in matches:
+        red, blue = _teams(red_csv), _teams(blue_csv)
+        winner = (winner or "").strip().lower()
+        played = _played(red_score, blue_score, winner)
+        red_score, blue_score = int(red_score or 0), int(blue_score or 0)
+        side = {}
+        for t in red:
+            side[t] = "red"
+        for t in blue:
+            side.setdefault(t, "blue")
+        for t, alliance in side.items():
+            team_rows.append((t, match_key, alliance))
+        for lo, hi in combinations(sorted(side), 2):
+            s = pairs[(lo, hi)]
+            lo_side, hi_side = side[lo], side[hi]
+            lo_score = red_score if lo_side == "red" else blue_score
+            hi_score = red_score if hi_side == "red" else blue_score
+            if lo_side == hi_side:
+                s[1] += 1
+                if played:
+                    opp = blue_score if lo_side == "red" else red_score
+                    s[5] += lo_score
+                    s[6] += opp
+                    if winner == lo_side:
+                        s[2] += 1
+                    elif winner in ("red", "blue"):
+                        s[3] += 1
+                    else:
+                        s[4] += 1
+            else:
+                s[7] += 1
+                if played:
+                    s[11] += lo_score
+                    s[12] += hi_score
+                    if winner == lo_side:
+                        s[8] += 1
+                    elif winner == hi_side:
+                        s[9] += 1
+                    else:
+                        s[10] += 1
+    return pairs, team_rows
+
+
+def rebuild_h2h_index(conn, year):
+    """Replace ``year`` in the h2h index tables (commits). Returns (matches, pairs)."""
+    started = time.time()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT match_key, event_key, red_teams, blue_teams, red_score, blue_score, winning_alliance
+        FROM event_matches WHERE year = %s
+        """,
+        (year,),
+    )
+    matches = cur.fetchall()
+    cur.execute("SELECT event_key, team_number FROM event_teams WHERE year = %s", (year,))
+    rosters = defaultdict(list)
+    for event_key, team_number in cur.fetchall():
+        if team_number is not None:
+            rosters[event_key].append(int(team_number))
+
+    pairs, team_rows = aggregate_season(matches, rosters)
+
+    cur.execute("DELETE FROM team_pair_years WHERE year = %s", (year,))
+    cur.execute("DELETE FROM team_matches WHERE year = %s", (year,))
+    execute_values(
+        cur,
+        """
+        INSERT INTO team_pair_years (
+            team_lo, team_hi, year, events_shared,
+            together, together_wins, together_losses, together_ties,
+            together_score_sum, together_opp_sum,
+            against, lo_wins, hi_wins, against_ties, lo_score_sum, hi_score_sum
+        ) VALUES %s
+        """,
+        [(lo, hi, year, *stats) for (lo, hi), stats in pairs.items()],
+        page_size=5000,
+    )
+    execute_values(
+        cur,
+        "INSERT INTO team_matches (team_number, year, match_key, alliance) VALUES %s "
+        "ON CONFLICT DO NOTHING",
+        [(t, year, mk, alliance) for t, mk, alliance in team_rows],
+        page_size=5000,
+    )
+    cur.execute(
+        """
+        INSERT INTO h2h_index_builds (year, matches, pairs, built_at)
+        VALUES (%s, %s, %s, NOW())
+        ON CONFLICT (year) DO UPDATE SET
+            matches = EXCLUDED.matches, pairs = EXCLUDED.pairs, built_at = EXCLUDED.built_at
+        """,
+        (year, len(matches), len(pairs)),
+    )
+    conn.commit()
+    cur.close()
+    print(
+        f"h2h index {year}: {len(matches)} match(es), {len(pairs)} pair(s), "
+        f"{len(team_rows)} team-match row(s) in {time.time() - started:.1f}s",
+        flush=True,
+    )
+    return len(matches), len(pairs)
+
+
+def main(argv):
+    from db_connection import get_pg_connection, return_pg_connection
+    from db_target import assert_safe_db_target
+    from run import apply_schema_migrations
+    from years_cli import parse_years
+
+    positional = [a for a in argv if not a.startswith("--")]
+    if not positional and "--all" not in argv:
+        print(__doc__)
+        return 1
+    assert_safe_db_target("h2h_index.py")
+    apply_schema_migrations()
+    conn = get_pg_connection()
+    try:
+        if "--all" in argv:
+            cur = conn.cursor()
+            cur.execute("SELECT DISTINCT year FROM event_matches WHERE year IS NOT NULL ORDER BY year")
+            years = [r[0] for r in cur.fetchall()]
+            cur.close()
+        else:
+            years = parse_years(*positional)
+        for year in years:
+            rebuild_h2h_index(conn, year)
+    finally:
+        return_pg_connection(conn)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,289 @@
+"""
+Phase timing, counters and cache hit rates for a pipeline run.
+
+``run.py`` wraps each phase (event fetch, precompute, team aggregation, ranks,
+predictions) in ``phase(...)`` and the hot helpers in ``span(...)``; counters
+cover TBA calls, DB round trips and rows written/skipped. At the end of the run
+``finish()`` writes one JSON report so a slow run can be split by phase instead
+of read off tqdm bars.
+
+Spans are aggregated by name (count / total / max plus the slowest few with
+their attributes), so per-event and per-team spans stay cheap across thousands
+of calls. Phases are kept in order with the counter deltas they caused.
+
+Environment (CLI flags in run.py override):
+    PIPELINE_REPORT=path.json      report path (default data/run_reports/run-<ts>.json,
+                                   ``0`` disables the report)
+    PIPELINE_PROFILE=phase,phase   profile these phases (``all`` for every phase)
+    PIPELINE_PROFILER=cprofile     or ``pyinstrument`` when installed
+    PIPELINE_OTEL=1                also emit spans through OpenTelemetry when installed
+
+Profilers only see the thread running the phase. Precompute, ranks and
+predictions run on the main thread; the event/team fan-out phases spend their
+time in worker threads, where the span stats are the better signal.
+"""
+import heapq
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+REPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_reports")
+
+# Slowest spans kept per name, with their attributes (e.g. event_key).
+_SLOWEST_PER_SPAN = 10
+
+_lock = threading.Lock()
+_meta = {}
+_started_at = None
+_started_perf = time.perf_counter()
+_counters = {}
+_spans = {}
+_phases = []
+_report_path = os.environ.get("PIPELINE_REPORT", "").strip() or None
+_profile_phases = {p.strip() for p in os.environ.get("PIPELINE_PROFILE", "").split(",") if p.strip()}
+_profiler_name = os.environ.get("PIPELINE_PROFILER", "cprofile").strip().lower()
+
+_tracer = None
+if os.environ.get("PIPELINE_OTEL", "").strip().lower() in ("1", "true", "yes"):
+    try:
+        from opentelemetry import trace as _otel_trace
+
+        _tracer = _otel_trace.get_tracer("peekorobo.pipeline")
+    except ImportError:
+        print("[instrumentation] PIPELINE_OTEL set but opentelemetry is not installed", flush=True)
+
+
+class _SpanStats:
+    __slots__ = ("count", "total", "max", "errors", "slowest")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.slowest = []  # min-heap of (seconds, seq, attrs)
+
+    def add(self, seconds, attrs, failed):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if failed:
+            self.errors += 1
+        entry = (seconds, self.count, attrs)
+        if len(self.slowest) < _SLOWEST_PER_SPAN:
+            heapq.heappush(self.slowest, entry)
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 4),
+            "mean_ms": round(1000.0 * self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(1000.0 * self.max, 3),
+            "errors": self.errors,
+            "slowest": [
+                {"ms": round(1000.0 * s, 3), **attrs}
+                for s, _seq, attrs in sorted(self.slowest, key=lambda e: -e[0])
+            ],
+        }
+
+
+def configure(report_path=None, profile_phases=None, **meta):
+    """Set run metadata (years, flags, ACE config) and override env settings."""
+    global _report_path, _started_at
+    with _lock:
+        _meta.update(meta)
+        if _started_at is None:
+            _started_at = datetime.now(timezone.utc)
+    if report_path:
+        _report_path = report_path
+    if profile_phases:
+        _profile_phases.update(profile_phases)
+
+
+def incr(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def cache_lookup(cache, hit):
+    incr(f"cache.{cache}.{'hits' if hit else 'misses'}")
+
+
+def _record(name, seconds, attrs, failed):
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = _SpanStats()
+        stats.add(seconds, attrs, failed)
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a block; aggregated under ``name`` in the report."""
+    otel_cm = _tracer.start_as_current_span(name, attributes=attrs) if _tracer else None
+    if otel_cm is not None:
+        otel_cm.__enter__()
+    t0 = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _record(name, time.perf_counter() - t0, attrs, failed)
+        if otel_cm is not None:
+            otel_cm.__exit__(None, None, None)
+
+
+def _start_profiler(name):
+    if not (name in _profile_phases or "all" in _profile_phases):
+        return None
+    if _profiler_name == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+        except ImportError:
+            print("[instrumentation] pyinstrument not installed; using cProfile", flush=True)
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler, name):
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    stamp = (_started_at or datetime.now(timezone.utc)).strftime("%Y%m%d-%H%M%S")
+    base = os.path.join(REPORT_DIR, f"profile-{stamp}-{name}")
+    if hasattr(profiler, "output_html"):
+        profiler.stop()
+        path = base + ".html"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(profiler.output_html())
+    else:
+        profiler.disable()
+        path = base + ".prof"
+        profiler.dump_stats(path)
+    print(f"[instrumentation] profile for {name} written to {path}", flush=True)
+    return path
+
+
+@contextmanager
+def phase(name, **attrs):
+    """A top-level pipeline phase: a span plus an ordered record of its counter deltas."""
+    with _lock:
+        before = dict(_counters)
+    profiler = _start_profiler(name)
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        with span(f"phase.{name}", **attrs):
+            yield
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        profile_path = _stop_profiler(profiler, name) if profiler is not None else None
+        with _lock:
+            deltas = {
+                k: v - before.get(k, 0) for k, v in _counters.items() if v != before.get(k, 0)
+            }
+            _phases.append(
+                {
+                    "name": name,
+                    **attrs,
+                    "offset_s": round(started - _started_perf, 3),
+                    "seconds": round(seconds, 3),
+                    "status": status,
+                    "counters": deltas,
+                    **({"profile": profile_path} if profile_path else {}),
+                }
+            )
+
+
+def _cache_rates(counters):
+    caches = {}
+    for key, value in counters.items():
+        if not key.startswith("cache."):
+            continue
+        _, cache, kind = key.split(".", 2)
+        caches.setdefault(cache, {"hits": 0, "misses": 0})[kind] = value
+    for stats in caches.values():
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+    return caches
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS.
+        return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+    except Exception:
+        return None
+
+
+def report():
+    with _lock:
+        counters = dict(_counters)
+        spans = {name: stats.to_dict() for name, stats in sorted(_spans.items())}
+        phases = list(_phases)
+        meta = dict(_meta)
+    return {
+        "started_at": (_started_at or datetime.now(timezone.utc)).isoformat(),
+        "wall_seconds": round(time.perf_counter() - _started_perf, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+        "meta": meta,
+        "phases": phases,
+        "counters": {k: v for k, v in sorted(counters.items()) if not k.startswith("cache.")},
+        "caches": _cache_rates(counters),
+        "spans": spans,
+    }
+
+
+def print_summary(data=None):
+    data = data or report()
+    if not data["phases"]:
+        return
+    print("\nPhase timings:")
+    for p in data["phases"]:
+        label = p["name"] + (f" {p['year']}" if "year" in p else "")
+        print(f"  {label:<40} {p['seconds']:>9.2f}s  {p['status']}")
+    for cache, stats in sorted(data["caches"].items()):
+        rate = "n/a" if stats["hit_rate"] is None else f"{100 * stats['hit_rate']:.1f}%"
+        print(f"  cache {cache}: {stats['hits']} hit / {stats['misses']} miss ({rate})")
+
+
+def finish():
+    """Print the phase summary and write the JSON report; returns its path (or None)."""
+    data = report()
+    print_summary(data)
+    if not data["phases"] or (_report_path or "").lower() in ("0", "false", "no"):
+        return None
+    path = _report_path
+    if not path:
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        stamp = (_started_at or datetime.now(timezone.utc)).strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(REPORT_DIR, f"run-{stamp}.json")
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, default=str)
+    except OSError as e:
+        print(f"[instrumentation] could not write run report {path}: {e}", flush=True)
+        return None
+    print(f"Run report: {path}", flush=True)
+    return path
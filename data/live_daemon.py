@@ -0,0 +1,379 @@
+"""
+Long-running live-event refresher: replaces the cron-driven
+``run.py --active-only`` / ``run_rankings.py --active-only`` /
+``run_awards.py --active-only`` trio during the season.
+
+One process holds the pipeline advisory lock for its whole life (so one-off
+runs started elsewhere exit, as they do today) and keeps warm state between
+ticks:
+
+  - the match store (run.match_cache) for every event an active team attends,
+    so past events are fetched once instead of every tick;
+  - per active event: the last TBA ETag and the match rows last written, so an
+    unchanged poll costs one 304 and no DB work;
+  - the per-season caches (event dates/weeks, team experience) and DB pools.
+
+Each active event is polled on its own cadence from its schedule
+(``predicted_time``): every LIVE_FAST_POLL_SEC while a match is due or just
+overdue, otherwise shortly before the next scheduled match, and every
+LIVE_IDLE_POLL_SEC when nothing is scheduled. When an event's matches change,
+only that event is written, and ACE / predictions / ranks are recomputed for
+the teams at the changed events (run._fetch_and_store_team_data_impl with
+``warm=True``), followed by that event's rankings and playoff odds. Awards and
+the derived API tables (h2h index, predictor pool, rating series) run on the
+slower LIVE_SLOW_REFRESH_SEC tick, only when something changed. The app restart
+would drop every /live stream, so neither the slow tick nor the full
+recompute below restarts dynos unless LIVE_RESTART_APP=1.
+
+Because the lock is held, the scheduled full recompute (pipeline.yml, every 6h
+in season) would find it busy and exit. The daemon runs that full recompute
+itself every LIVE_FULL_REFRESH_SEC (0 disables), so teams not at an active
+event still get refreshed; it behaves exactly like ``run.py <year>``.
+
+Usage:
+    python data/live_daemon.py            # current season
+    python data/live_daemon.py 2026
+"""
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import instrumentation
+import run
+from event_refresh import FETCH_WORKERS, refresh_events
+from event_updates import notify_event_updates
+from playoff_bracket import refresh_playoff_odds
+from run import (
+    _fetch_and_store_team_data_impl,
+    _release_pipeline_lock,
+    acquire_pipeline_lock,
+    apply_schema_migrations,
+    data_has_changed,
+    fetch_tba_matches_by_event,
+    get_active_scope,
+    get_existing_event_data,
+    get_pg_connection,
+    insert_event_data,
+    match_rows_from_tba,
+    preload_event_metadata,
+    restart_heroku_app,
+    shutdown_event,
+    store_h2h_index,
+    store_predictor_pool,
+    store_rating_series,
+    tba_get_conditional,
+)
+from run_awards import awards_spec
+from run_rankings import rankings_spec
+
+FAST_POLL_SEC = float(os.environ.get("LIVE_FAST_POLL_SEC", "30"))
+IDLE_POLL_SEC = float(os.environ.get("LIVE_IDLE_POLL_SEC", "600"))
+# Start fast polling this long before a match's predicted time.
+LEAD_SEC = float(os.environ.get("LIVE_LEAD_SEC", "120"))
+# A match this far past its predicted time without a score is treated as
+# "not happening soon" (end of day, long delay) rather than polled fast forever.
+OVERDUE_GRACE_SEC = float(os.environ.get("LIVE_OVERDUE_GRACE_SEC", "3600"))
+SCOPE_REFRESH_SEC = float(os.environ.get("LIVE_SCOPE_REFRESH_SEC", "600"))
+SLOW_REFRESH_SEC = float(os.environ.get("LIVE_SLOW_REFRESH_SEC", "900"))
+# Full-season recompute cadence; matches the in-season cron in pipeline.yml.
+FULL_REFRESH_SEC = float(os.environ.get("LIVE_FULL_REFRESH_SEC", "21600"))
+RESTART_APP = os.environ.get("LIVE_RESTART_APP", "0").strip().lower() in ("1", "true", "yes")
+LOCK_KEEPALIVE_SEC = 60.0
+
+
+def _match_played(match: dict) -> bool:
+    alliances = match.get("alliances") or {}
+    red = (alliances.get("red") or {}).get("score")
+    blue = (alliances.get("blue") or {}).get("score")
+    return (red is not None and red >= 0) or (blue is not None and blue >= 0) or bool(match.get("winning_alliance"))
+
+
+def next_poll_delay(matches: List[dict], now: float) -> float:
+    """Seconds until an event should be polled again, from its unplayed matches' schedule."""
+    upcoming = []
+    for m in matches or []:
+        if _match_played(m):
+            continue
+        t = m.get("predicted_time") or m.get("time")
+        if isinstance(t, (int, float)) and t > now - OVERDUE_GRACE_SEC:
+            upcoming.append(t)
+    if not upcoming:
+        return IDLE_POLL_SEC
+    soonest = min(upcoming)
+    if soonest <= now + LEAD_SEC:
+        return FAST_POLL_SEC
+    return min(IDLE_POLL_SEC, max(FAST_POLL_SEC, soonest - LEAD_SEC - now))
+
+
+@dataclass
+class LiveEvent:
+    key: str
+    etag: Optional[str] = None
+    rows: Optional[list] = None  # match rows last written (match_rows_from_tba)
+    next_poll: float = 0.0
+
+
+class LiveDaemon:
+    def __init__(self, year: int):
+        self.year = year
+        self.events: Dict[str, LiveEvent] = {}
+        self.scope: Optional[dict] = None
+        self.lock_conn = None
+        self.last_scope = 0.0
+        self.last_slow = time.time()
+        self.last_full = time.time()
+        self.last_keepalive = time.time()
+        self.changed_since_slow = False
+
+    # -- state ----------------------------------------------------------------
+
+    def refresh_scope(self) -> None:
+        """Re-resolve active events; warm the match store for anything new."""
+        scope = get_active_scope(self.year)
+        active = set(scope["active_events"])
+        for key in list(self.events):
+            if key not in active:
+                print(f"[live] {key} no longer active", flush=True)
+                self.events.pop(key)
+        for key in active:
+            if key not in self.events:
+                print(f"[live] tracking {key}", flush=True)
+                self.events[key] = LiveEvent(key=key)
+        missing = [k for k in scope["needed_events"] if k not in run.match_cache and k not in active]
+        if missing:
+            with instrumentation.span("live.warm_match_store", events=len(missing)):
+                run.match_cache.update(fetch_tba_matches_by_event(missing))
+        preload_event_metadata(self.year)
+        self.scope = scope
+        self.last_scope = time.time()
+
+    def keep_lock(self) -> bool:
+        """Ping the lock connection; re-take the lock if the connection dropped."""
+        try:
+            cur = self.lock_conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            return True
+        except Exception as e:
+            print(f"[live] lock connection lost ({e}); re-acquiring", flush=True)
+        _release_pipeline_lock(self.lock_conn)
+        # Cleared first: if acquiring raises, the next keepalive retries it.
+        self.lock_conn = None
+        self.lock_conn = acquire_pipeline_lock()
+        return self.lock_conn is not None
+
+    # -- polling --------------------------------------------------------------
+
+    def _store_matches(self, key: str, rows: list) -> None:
+        insert_event_data(
+            [{
+                "event_key": key,
+                "data": {"event": (key,), "teams": [], "matches": rows},
+                "updates_needed": {"event": False, "teams": False, "matches": True},
+                "has_changes": True,
+            }],
+            self.year,
+        )
+
+    def _apply_poll(self, ev: LiveEvent, result, now: float) -> bool:
+        payload, etag, not_modified = result
+        if payload is None:
+            cached = run.match_cache.get(ev.key) or []
+            ev.next_poll = now + (next_poll_delay(cached, now) if not_modified else FAST_POLL_SEC)
+            return False
+        ev.etag = etag
+        run.match_cache[ev.key] = payload
+        ev.next_poll = now + next_poll_delay(payload, now)
+        rows = match_rows_from_tba(ev.key, payload)
+        if not rows:
+            return False
+        if ev.rows is None:
+            changed = data_has_changed(get_existing_event_data(ev.key), {"matches": rows}, "matches")
+        else:
+            changed = rows != ev.rows
+        if changed:
+            self._store_matches(ev.key, rows)
+        ev.rows = rows
+        return changed
+
+    def poll_due(self) -> Set[str]:
+        """Poll every due event concurrently; returns the keys whose matches changed."""
+        now = time.time()
+        due = [ev for ev in self.events.values() if ev.next_poll <= now]
+        if not due:
+            return set()
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(due))) as pool:
+            results = list(pool.map(
+                lambda ev: tba_get_conditional(f"event/{ev.key}/matches", ev.etag), due
+            ))
+        changed = set()
+        for ev, result in zip(due, results):
+            try:
+                if self._apply_poll(ev, result, now):
+                    changed.add(ev.key)
+            except Exception as e:
+                print(f"[live] failed to apply poll for {ev.key}: {e}", flush=True)
+                traceback.print_exc()
+                ev.next_poll = now + FAST_POLL_SEC
+        return changed
+
+    # -- work -----------------------------------------------------------------
+
+    def run_cycle(self, changed: Set[str]) -> None:
+        """ACE / predictions / ranks for teams at ``changed`` events, then their rankings."""
+        started = time.time()
+        conn = get_pg_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT DISTINCT team_number FROM event_teams WHERE event_key = ANY(%s)",
+                (sorted(changed),),
+            )
+            teams = {r[0] for r in cur.fetchall() if r[0] is not None}
+            cur.close()
+        finally:
+            conn.close()
+        scope = {
+            "active_events": sorted(changed),
+            "active_teams": teams,
+            "needed_events": self.scope["needed_events"] if self.scope else sorted(changed),
+        }
+        with instrumentation.phase("live_cycle", year=self.year, events=len(changed), teams=len(teams)):
+            _fetch_and_store_team_data_impl(self.year, scope=scope, warm=True)
+            conn = get_pg_connection()
+            try:
+                refresh_events(conn, rankings_spec(self.year), sorted(changed))
+                refresh_playoff_odds(conn, sorted(changed))
+                # Predictions and event ACE for these events were rewritten by the cycle.
+                cur = conn.cursor()
+                notify_event_updates(cur, "matches", changed)
+                notify_event_updates(cur, "event_perfs", changed)
+                conn.commit()
+                cur.close()
+            finally:
+                conn.close()
+        self.changed_since_slow = True
+        print(
+            f"[live] cycle for {', '.join(sorted(changed))}: {len(teams)} team(s) "
+            f"in {time.time() - started:.1f}s",
+            flush=True,
+        )
+
+    def slow_tick(self) -> None:
+        """Awards + rankings for every active event; derived tables if anything changed."""
+        keys = sorted(self.events)
+        if keys:
+            conn = get_pg_connection()
+            try:
+                refresh_events(conn, rankings_spec(self.year), keys)
+                refresh_events(conn, awards_spec(), keys)
+            finally:
+                conn.close()
+        if self.changed_since_slow:
+            for name, step in (
+                ("h2h_index", store_h2h_index),
+                ("predictor_pool", store_predictor_pool),
+                ("rating_series", store_rating_series),
+            ):
+                try:
+                    with instrumentation.phase(name, year=self.year):
+                        step(self.year)
+                except Exception as e:
+                    print(f"[live] {name} refresh failed: {e}", flush=True)
+            if RESTART_APP:
+                restart_heroku_app()
+            self.changed_since_slow = False
+        self.last_slow = time.time()
+
+    def full_tick(self) -> None:
+        """The scheduled full-season recompute, run under the lock this process holds."""
+        started = time.time()
+        # Stamped first so a failing run waits a full interval before retrying.
+        self.last_full = started
+        with instrumentation.phase("live_full_recompute", year=self.year):
+            # Non-warm: refetches the season into match_cache, then ranks,
+            # predictions and every derived table, like run.py <year>; the
+            # app restart follows LIVE_RESTART_APP, as in slow_tick.
+            _fetch_and_store_team_data_impl(self.year, restart_app=RESTART_APP)
+        # The full run rebuilt the derived tables and reset the per-season
+        # caches; re-resolve scope on the next tick.
+        self.changed_since_slow = False
+        self.last_scope = 0.0
+        print(f"[live] full recompute for {self.year} in {time.time() - started:.1f}s", flush=True)
+
+    def run_forever(self) -> None:
+        self.lock_conn = acquire_pipeline_lock()
+        if self.lock_conn is None:
+            print("[live] Another pipeline run holds the lock; exiting.", flush=True)
+            return
+        print(f"[live] holding pipeline lock for {self.year}", flush=True)
+        try:
+            while not shutdown_event.is_set():
+                now = time.time()
+                if now - self.last_keepalive >= LOCK_KEEPALIVE_SEC:
+                    try:
+                        held = self.keep_lock()
+                    except Exception as e:
+                        # DB flake outlasting get_pg_connection's retries: skip
+                        # this tick and try the lock again on the next one.
+                        print(f"[live] lock keepalive failed: {e}", flush=True)
+                        traceback.print_exc()
+                        shutdown_event.wait(FAST_POLL_SEC)
+                        continue
+                    if not held:
+                        print("[live] lost the pipeline lock to another run; exiting.", flush=True)
+                        return
+                    self.last_keepalive = now
+                try:
+                    if now - self.last_scope >= SCOPE_REFRESH_SEC:
+                        self.refresh_scope()
+                    changed = self.poll_due()
+                    if changed:
+                        self.run_cycle(changed)
+                    if time.time() - self.last_slow >= SLOW_REFRESH_SEC:
+                        self.slow_tick()
+                    if FULL_REFRESH_SEC > 0 and time.time() - self.last_full >= FULL_REFRESH_SEC:
+                        self.full_tick()
+                except Exception as e:
+                    print(f"[live] tick failed: {e}", flush=True)
+                    traceback.print_exc()
+                # Wake for the next due poll, but at least every FAST_POLL_SEC so
+                # scope / slow-tick / keepalive deadlines are honoured.
+                pending = [ev.next_poll for ev in self.events.values()]
+                wait = (min(pending) - time.time()) if pending else FAST_POLL_SEC
+                shutdown_event.wait(max(1.0, min(wait, FAST_POLL_SEC)))
+        finally:
+            _release_pipeline_lock(self.lock_conn)
+
+
+def main(argv) -> int:
+    from db_target import assert_safe_db_target, describe_db_target
+    from years_cli import parse_years
+
+    positional = [a for a in argv if not a.startswith("--")]
+    years = parse_years(*positional) if positional else [datetime.now(timezone.utc).year]
+    if len(years) != 1:
+        print("live_daemon.py follows a single season.")
+        return 1
+    assert_safe_db_target("live_daemon.py")
+    print(f"DB target: {describe_db_target()}", flush=True)
+    apply_schema_migrations()
+    try:
+        LiveDaemon(years[0]).run_forever()
+    finally:
+        run.finalize()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -215,10 +215,14 @@ def alliance_auto(year: int, breakdown: dict, team_count: int = 3) -> float:
         return 0.0
 
 
-def phase_totals(
-    year: int, breakdown: dict, team_count: int, robot_index: int
-) -> Tuple[float, float, float, bool]:
-    """Return (auto_S, teleop_S, endgame_obs_or_S, endgame_is_per_robot)."""
+def alliance_phase_totals(
+    year: int, breakdown: dict, team_count: int
+) -> Tuple[float, float, float, Optional[List[float]]]:
+    """One pass over an alliance breakdown: (auto_S, teleop_S, endgame_S, per-robot endgame).
+
+    The per-robot list is None when the season's endgame is alliance-shared;
+    otherwise endgame_S is its sum.
+    """
     auto_s = max(0.0, alliance_auto(year, breakdown, team_count))
     total = max(0.0, _tba_total(breakdown))
     extras = _ace_excluded_extras(breakdown)
@@ -233,11 +237,21 @@ def phase_totals(
             ends = [x * scale for x in ends]
             end_alliance = sum(ends)
         teleop_s = max(0.0, total - auto_s - end_alliance - extras)
-        idx = min(max(robot_index, 1), len(ends)) - 1
-        return auto_s, teleop_s, float(ends[idx]), True
+        return auto_s, teleop_s, float(end_alliance), ends
     end_s = max(0.0, _shared_endgame(year, breakdown))
     remaining = max(0.0, total - auto_s - extras)
     if end_s > remaining:
         end_s = remaining
     teleop_s = max(0.0, total - auto_s - end_s - extras)
-    return auto_s, teleop_s, float(end_s), False
+    return auto_s, teleop_s, float(end_s), None
+
+
+def phase_totals(
+    year: int, breakdown: dict, team_count: int, robot_index: int
+) -> Tuple[float, float, float, bool]:
+    """Return (auto_S, teleop_S, endgame_obs_or_S, endgame_is_per_robot)."""
+    auto_s, teleop_s, end_s, ends = alliance_phase_totals(year, breakdown, team_count)
+    if ends is not None:
+        idx = min(max(robot_index, 1), len(ends)) - 1
+        return auto_s, teleop_s, float(ends[idx]), True
+    return auto_s, teleop_s, end_s, False
@@ -0,0 +1,535 @@
+"""
+Playoff odds for the FRC double-elimination bracket (2023+), per event.
+
+The bracket is rebuilt from the event's ``sf`` / ``f`` rows in event_matches:
+round-1 sets 1-4 fix which teams are alliances 1-8 (TBA's standard seeding,
+see DOUBLE_ELIM), later sets are attributed to alliances by majority of their
+teams, and a set is decided by its latest match with a winner (a tied match
+is replayed, so it decides nothing). The finals are best of three.
+
+Each alliance's strength is its most recent lineup aggregated from the latest
+pre-match ACE snapshot (``pre_match_teams``) of each of its teams, with the
+production PredictionConfig; the 8 x 8 pairwise win-probability matrix comes
+from prediction.predict_win_probability and is kept per event until a
+snapshot changes. Advancement probabilities are then exact: a dynamic program
+walks the 13 sets in order over bracket states (which alliance fills each
+slot a later set still reads), merging identical states, then resolves the
+finals series from the current finals score.
+
+When an alliance has fielded more than one lineup (a backup robot came in, or
+a four-team alliance rotated), a single strength per alliance no longer
+describes it and outcomes are correlated through the lineup the alliance
+keeps, so the bracket is simulated instead: PLAYOFF_MC_SIMULATIONS runs, each
+drawing one fielded lineup per alliance.
+
+Results are cached per (event, bracket state): the state key hashes decided
+sets, the finals score, lineups and strengths, so an event is recomputed only
+when one of those changes. ``refresh_playoff_odds`` writes ``event_playoff_odds``
+(peekorobo-api/migrations/0010_event_playoff_odds.sql) for changed events and
+NOTIFYs the live feed. Legacy best-of-three brackets (``qf`` rounds) and
+brackets that do not match the standard layout are skipped.
+
+Usage:
+    python data/playoff_bracket.py 2026
+    python data/playoff_bracket.py 2026 --event 2026casj
+"""
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from event_updates import notify_event_updates
+from prediction import PredictionConfig, predict_win_probability, rating_from_pre_match_team
+
+# set_number -> (red source, blue source); ("A", n) is alliance n,
+# ("W", s) / ("L", s) the winner / loser of set s.
+DOUBLE_ELIM = {
+    1: (("A", 1), ("A", 8)),
+    2: (("A", 4), ("A", 5)),
+    3: (("A", 2), ("A", 7)),
+    4: (("A", 3), ("A", 6)),
+    5: (("L", 1), ("L", 2)),
+    6: (("L", 3), ("L", 4)),
+    7: (("W", 1), ("W", 2)),
+    8: (("W", 3), ("W", 4)),
+    9: (("L", 7), ("W", 6)),
+    10: (("L", 8), ("W", 5)),
+    11: (("W", 7), ("W", 8)),
+    12: (("W", 10), ("W", 9)),
+    13: (("L", 11), ("W", 12)),
+}
+FINALS = (("W", 11), ("W", 13))
+FINALS_WINS = 2
+ROUND_OF_SET = {1: 1, 2: 1, 3: 1, 4: 1, 5: 2, 6: 2, 7: 2, 8: 2, 9: 3, 10: 3, 11: 4, 12: 4, 13: 5}
+ROUNDS = 5
+ALLIANCES = 8
+MC_SIMULATIONS = int(os.environ.get("PLAYOFF_MC_SIMULATIONS", "20000"))
+_CACHE_SIZE = 512
+
+_COMP_ORD = {"qm": 0, "ef": 1, "qf": 2, "sf": 3, "f": 4}
+
+
+def _slots_read_after(set_number: int) -> frozenset:
+    later = [src for s, pair in DOUBLE_ELIM.items() if s > set_number for src in pair]
+    return frozenset(later + list(FINALS))
+
+
+_LIVE_AFTER = {s: _slots_read_after(s) for s in DOUBLE_ELIM}
+
+
+def _teams(csv) -> List[int]:
+    if not csv:
+        return []
+    return [int(t.strip()) for t in str(csv).split(",") if t.strip().isdigit()]
+
+
+@dataclass
+class Bracket:
+    event_key: str
+    # alliance -> distinct lineups in the order they were fielded (round 1 first)
+    lineups: Dict[int, List[Tuple[int, ...]]]
+    # set -> (red alliance, blue alliance) as scheduled; set -> winning alliance once decided
+    set_alliances: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+    set_winners: Dict[int, int] = field(default_factory=dict)
+    finals_wins: Dict[int, int] = field(default_factory=dict)
+
+    def teams(self, alliance: int) -> List[int]:
+        return list(dict.fromkeys(t for lineup in self.lineups[alliance] for t in lineup))
+
+
+@dataclass
+class AllianceOdds:
+    alliance: int
+    teams: List[int]
+    strength: float
+    p_champion: float
+    p_finals: float
+    # p_survive[r - 1]: still alive after round r of the double-elimination bracket
+    p_survive: List[float]
+
+    def to_json(self) -> dict:
+        return {
+            "alliance": self.alliance,
+            "teams": self.teams,
+            "strength": round(self.strength, 2),
+            "p_champion": round(self.p_champion, 4),
+            "p_finals": round(self.p_finals, 4),
+            "p_survive": [round(p, 4) for p in self.p_survive],
+        }
+
+
+@dataclass
+class PlayoffOdds:
+    event_key: str
+    state_key: str
+    engine: str  # "exact" | "monte_carlo"
+    alliances: List[AllianceOdds]
+
+
+def build_bracket(event_key: str, rows: Sequence[tuple]) -> Optional[Bracket]:
+    """Bracket from playoff rows, or None when the event has no standard double-elim bracket yet.
+
+    ``rows``: (comp_level, set_number, match_number, red_teams, blue_teams, winning_alliance).
+    """
+    sets: Dict[int, List[tuple]] = defaultdict(list)
+    finals: List[tuple] = []
+    for comp_level, set_number, match_number, red, blue, winner in rows:
+        if comp_level in ("ef", "qf"):
+            return None
+        if comp_level == "sf":
+            if set_number not in DOUBLE_ELIM:
+                return None
+            sets[set_number].append((match_number or 0, _teams(red), _teams(blue), winner))
+        elif comp_level == "f":
+            finals.append((match_number or 0, _teams(red), _teams(blue), winner))
+
+    lineups: Dict[int, List[Tuple[int, ...]]] = {}
+    owner: Dict[int, int] = {}
+    for s in (1, 2, 3, 4):
+        if not sets.get(s):
+            return None
+        _, red, blue, _ = min(sets[s])
+        for (_, n), teams in zip(DOUBLE_ELIM[s], (red, blue)):
+            if not teams:
+                return None
+            lineups[n] = [tuple(sorted(teams))]
+            owner.update((t, n) for t in teams)
+
+    def alliance_of(teams: List[int]) -> Optional[int]:
+        votes = Counter(owner[t] for t in teams if t in owner)
+        if not votes:
+            return None
+        n = votes.most_common(1)[0][0]
+        lineup = tuple(sorted(teams))
+        if lineup not in lineups[n]:
+            lineups[n].append(lineup)
+        return n
+
+    bracket = Bracket(event_key=event_key, lineups=lineups)
+    for s, matches in sorted(sets.items()):
+        for _, red, blue, winner in sorted(matches):
+            red_a, blue_a = alliance_of(red), alliance_of(blue)
+            if red_a is not None and blue_a is not None:
+                bracket.set_alliances[s] = (red_a, blue_a)
+            if winner in ("red", "blue"):
+                won = red_a if winner == "red" else blue_a
+                if won is None:
+                    return None
+                bracket.set_winners[s] = won
+    for _, red, blue, winner in sorted(finals):
+        red_a, blue_a = alliance_of(red), alliance_of(blue)
+        if winner in ("red", "blue"):
+            won = red_a if winner == "red" else blue_a
+            if won is None:
+                return None
+            bracket.finals_wins[won] = bracket.finals_wins.get(won, 0) + 1
+    return bracket
+
+
+def latest_team_ratings(rows: Sequence[tuple], config: PredictionConfig) -> Dict[int, float]:
+    """team -> rating from its latest pre-match snapshot at the event.
+
+    ``rows``: (comp_level, set_number, match_number, pre_match_teams).
+    """
+    ratings: Dict[int, float] = {}
+    ordered = sorted(rows, key=lambda r: (_COMP_ORD.get(r[0], 9), r[1] or 0, r[2] or 0))
+    for _, _, _, pre_match in ordered:
+        if isinstance(pre_match, str):
+            try:
+                pre_match = json.loads(pre_match)
+            except ValueError:
+                continue
+        if not isinstance(pre_match, dict):
+            continue
+        for team, payload in pre_match.items():
+            if str(team).isdigit() and isinstance(payload, dict):
+                ratings[int(team)] = rating_from_pre_match_team(payload, config.rating_field)
+    return ratings
+
+
+def lineup_strength(lineup: Sequence[int], ratings: Dict[int, float], config: PredictionConfig) -> float:
+    values = [float(ratings.get(t) or 0.0) for t in lineup]
+    if not values:
+        return 0.0
+    if config.aggregation == "mean":
+        return sum(values) / len(values)
+    return sum(values)
+
+
+def win_matrix(strengths: Sequence[float], config: PredictionConfig) -> List[List[float]]:
+    """P(row beats column) for every pair of strengths."""
+    return [[predict_win_probability(a, b, config)[0] for b in strengths] for a in strengths]
+
+
+def series_prob(p: float, need_red: int, need_blue: int) -> float:
+    """P(red takes the series) needing ``need_red`` more wins vs ``need_blue``; ties are replayed."""
+    if need_red <= 0:
+        return 1.0
+    if need_blue <= 0:
+        return 0.0
+    return p * series_prob(p, need_red - 1, need_blue) + (1.0 - p) * series_prob(p, need_red, need_blue - 1)
+
+
+def _set_outcomes(bracket: Bracket, s: int, red: int, blue: int, p_red: float) -> List[Tuple[int, int, float]]:
+    """(winner, loser, probability) for set ``s``; empty when the rows rule this pairing out."""
+    seen = bracket.set_alliances.get(s)
+    if seen is not None and set(seen) != {red, blue}:
+        return []
+    won = bracket.set_winners.get(s)
+    if won is not None:
+        if won not in (red, blue):
+            return []
+        return [(won, blue if won == red else red, 1.0)]
+    return [(red, blue, p_red), (blue, red, 1.0 - p_red)]
+
+
+def exact_odds(bracket: Bracket, matrix: List[List[float]]) -> Tuple[Dict[int, float], Dict[int, float], Dict[int, List[float]]]:
+    """(P(champion), P(finals), P(eliminated in round r)) per alliance, by DP over bracket states.
+
+    A state is the alliance in each slot a later set still reads plus who has
+    been eliminated in which round; paths reaching the same state are merged.
+    Branches contradicting a stored pairing or result are dropped and the rest
+    renormalized, so the odds are conditioned on everything already played.
+    """
+    states: Dict[tuple, float] = {(tuple(sorted((("A", n), n) for n in range(1, ALLIANCES + 1))), ()): 1.0}
+    for s in sorted(DOUBLE_ELIM):
+        live = _LIVE_AFTER[s]
+        red_src, blue_src = DOUBLE_ELIM[s]
+        nxt: Dict[tuple, float] = defaultdict(float)
+        for (state, out), p in states.items():
+            slots = dict(state)
+            red, blue = slots[red_src], slots[blue_src]
+            for won, lost, q in _set_outcomes(bracket, s, red, blue, matrix[red - 1][blue - 1]):
+                if q <= 0.0:
+                    continue
+                new = {k: v for k, v in slots.items() if k in live}
+                new_out = out
+                if ("W", s) in live:
+                    new[("W", s)] = won
+                if ("L", s) in live:
+                    new[("L", s)] = lost
+                else:
+                    new_out = out + ((lost, ROUND_OF_SET[s]),)
+                nxt[(tuple(sorted(new.items())), new_out)] += p * q
+        states = nxt
+    total = sum(states.values())
+    if total <= 0.0:
+        raise ValueError("stored playoff results do not fit the double-elimination bracket")
+
+    champion = defaultdict(float)
+    finals = defaultdict(float)
+    eliminated = {n: [0.0] * ROUNDS for n in range(1, ALLIANCES + 1)}
+    for (state, out), p in states.items():
+        p /= total
+        for n, r in out:
+            eliminated[n][r - 1] += p
+        slots = dict(state)
+        red, blue = slots[FINALS[0]], slots[FINALS[1]]
+        finals[red] += p
+        finals[blue] += p
+        ps = series_prob(
+            matrix[red - 1][blue - 1],
+            FINALS_WINS - bracket.finals_wins.get(red, 0),
+            FINALS_WINS - bracket.finals_wins.get(blue, 0),
+        )
+        champion[red] += p * ps
+        champion[blue] += p * (1.0 - ps)
+    return dict(champion), dict(finals), eliminated
+
+
+def monte_carlo_odds(
+    bracket: Bracket,
+    lineup_matrix: List[List[float]],
+    lineup_index: Dict[int, List[int]],
+    simulations: int,
+    seed: int,
+) -> Tuple[Dict[int, float], Dict[int, float], Dict[int, List[float]]]:
+    """Same outputs as exact_odds, sampling one fielded lineup per alliance per run.
+
+    Runs that contradict a stored pairing or result are rejected.
+    """
+    rng = random.Random(seed)
+    champion = Counter()
+    finals = Counter()
+    eliminated = {n: [0] * ROUNDS for n in range(1, ALLIANCES + 1)}
+    accepted = 0
+    for _ in range(simulations):
+        pick = {n: rng.choice(idx) for n, idx in lineup_index.items()}
+        slots = {("A", n): n for n in range(1, ALLIANCES + 1)}
+        out = []
+        for s in sorted(DOUBLE_ELIM):
+            red_src, blue_src = DOUBLE_ELIM[s]
+            red, blue = slots[red_src], slots[blue_src]
+            outcomes = _set_outcomes(bracket, s, red, blue, lineup_matrix[pick[red]][pick[blue]])
+            if not outcomes:
+                break
+            won, lost, q = outcomes[0]
+            if len(outcomes) > 1 and rng.random() >= q:
+                won, lost, _ = outcomes[1]
+            slots[("W", s)] = won
+            slots[("L", s)] = lost
+            if ("L", s) not in _LIVE_AFTER[s]:
+                out.append((lost, ROUND_OF_SET[s]))
+        else:
+            accepted += 1
+            for n, r in out:
+                eliminated[n][r - 1] += 1
+            red, blue = slots[FINALS[0]], slots[FINALS[1]]
+            finals[red] += 1
+            finals[blue] += 1
+            wins = {red: bracket.finals_wins.get(red, 0), blue: bracket.finals_wins.get(blue, 0)}
+            p_red = lineup_matrix[pick[red]][pick[blue]]
+            while max(wins.values()) < FINALS_WINS:
+                wins[red if rng.random() < p_red else blue] += 1
+            champion[red if wins[red] >= FINALS_WINS else blue] += 1
+    if not accepted:
+        raise ValueError("stored playoff results do not fit the double-elimination bracket")
+    return (
+        {n: c / accepted for n, c in champion.items()},
+        {n: c / accepted for n, c in finals.items()},
+        {n: [c / accepted for c in counts] for n, counts in eliminated.items()},
+    )
+
+
+def _state_key(bracket: Bracket, strengths: Dict[Tuple[int, ...], float], config: PredictionConfig) -> str:
+    payload = (
+        sorted(bracket.set_alliances.items()),
+        sorted(bracket.set_winners.items()),
+        sorted(bracket.finals_wins.items()),
+        sorted((n, lineups) for n, lineups in bracket.lineups.items()),
+        sorted((lineup, round(v, 4)) for lineup, v in strengths.items()),
+        config.label(),
+        config.prob_min,
+        config.prob_max,
+    )
+    return hashlib.sha256(repr(payload).encode()).hexdigest()[:32]
+
+
+# (event, strengths signature) -> (lineups, lineup win matrix); strengths change
+# only when a new pre-match snapshot lands, so the matrix outlives bracket moves.
+_matrix_cache: Dict[str, Tuple[str, List[Tuple[int, ...]], List[List[float]]]] = {}
+# (event, state key) -> PlayoffOdds
+_odds_cache: Dict[Tuple[str, str], PlayoffOdds] = {}
+
+
+def compute_playoff_odds(bracket: Bracket, ratings: Dict[int, float], config: PredictionConfig) -> PlayoffOdds:
+    all_lineups = [lineup for n in sorted(bracket.lineups) for lineup in bracket.lineups[n]]
+    strengths = {lineup: lineup_strength(lineup, ratings, config) for lineup in all_lineups}
+    state_key = _state_key(bracket, strengths, config)
+    cached = _odds_cache.get((bracket.event_key, state_key))
+    if cached is not None:
+        return cached
+
+    signature = repr(sorted((lineup, round(v, 4)) for lineup, v in strengths.items()))
+    hit = _matrix_cache.get(bracket.event_key)
+    if hit is None or hit[0] != signature:
+        hit = (signature, all_lineups, win_matrix([strengths[l] for l in all_lineups], config))
+        _matrix_cache[bracket.event_key] = hit
+    _, order, lineup_matrix = hit
+    index = {lineup: i for i, lineup in enumerate(order)}
+    lineup_index = {n: [index[l] for l in bracket.lineups[n]] for n in bracket.lineups}
+
+    if all(len(v) == 1 for v in lineup_index.values()):
+        engine = "exact"
+        current = [lineup_index[n][0] for n in range(1, ALLIANCES + 1)]
+        matrix = [[lineup_matrix[i][j] for j in current] for i in current]
+        champion, finals, eliminated = exact_odds(bracket, matrix)
+    else:
+        engine = "monte_carlo"
+        seed = int(state_key[:16], 16)
+        champion, finals, eliminated = monte_carlo_odds(bracket, lineup_matrix, lineup_index, MC_SIMULATIONS, seed)
+
+    alliances = []
+    for n in range(1, ALLIANCES + 1):
+        survive, gone = [], 0.0
+        for r in range(ROUNDS):
+            gone += eliminated[n][r]
+            survive.append(max(0.0, 1.0 - gone))
+        alliances.append(AllianceOdds(
+            alliance=n,
+            teams=bracket.teams(n),
+            strength=strengths[bracket.lineups[n][-1]],
+            p_champion=champion.get(n, 0.0),
+            p_finals=finals.get(n, 0.0),
+            p_survive=survive,
+        ))
+    odds = PlayoffOdds(event_key=bracket.event_key, state_key=state_key, engine=engine, alliances=alliances)
+    if len(_odds_cache) >= _CACHE_SIZE:
+        _odds_cache.clear()
+    _odds_cache[(bracket.event_key, state_key)] = odds
+    return odds
+
+
+def load_event_odds(cur, event_key: str, config: PredictionConfig) -> Optional[PlayoffOdds]:
+    cur.execute(
+        """
+        SELECT comp_level, set_number, match_number, red_teams, blue_teams,
+               winning_alliance, pre_match_teams
+        FROM event_matches
+        WHERE event_key = %s
+        """,
+        (event_key,),
+    )
+    rows = cur.fetchall()
+    playoff = [r[:6] for r in rows if r[0] != "qm"]
+    if not playoff:
+        return None
+    bracket = build_bracket(event_key, playoff)
+    if bracket is None:
+        return None
+    ratings = latest_team_ratings([(r[0], r[1], r[2], r[6]) for r in rows if r[6] is not None], config)
+    return compute_playoff_odds(bracket, ratings, config)
+
+
+def refresh_playoff_odds(conn, event_keys, config: Optional[PredictionConfig] = None) -> int:
+    """Recompute odds for ``event_keys``; writes, NOTIFYs and commits those whose state changed."""
+    config = config or PredictionConfig.from_env()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT event_key, state_key FROM event_playoff_odds WHERE event_key = ANY(%s)",
+        (sorted(set(event_keys)),),
+    )
+    stored = dict(cur.fetchall())
+    changed = []
+    for event_key in sorted(set(event_keys)):
+        try:
+            odds = load_event_odds(cur, event_key, config)
+        except ValueError as e:
+            print(f"  playoff odds {event_key}: {e}; skipped", flush=True)
+            continue
+        if odds is None or stored.get(event_key) == odds.state_key:
+            continue
+        cur.execute(
+            """
+            INSERT INTO event_playoff_odds (event_key, year, state_key, engine, alliances, updated_at)
+            VALUES (%s, (SELECT MAX(year) FROM event_matches WHERE event_key = %s), %s, %s, %s::jsonb, NOW())
+            ON CONFLICT (event_key) DO UPDATE SET
+                year = EXCLUDED.year, state_key = EXCLUDED.state_key, engine = EXCLUDED.engine,
+                alliances = EXCLUDED.alliances, updated_at = EXCLUDED.updated_at
+            """,
+            (
+                event_key, event_key, odds.state_key, odds.engine,
+                json.dumps([a.to_json() for a in odds.alliances], separators=(",", ":")),
+            ),
+        )
+        changed.append(event_key)
+    notify_event_updates(cur, "playoff_odds", changed)
+    conn.commit()
+    cur.close()
+    return len(changed)
+
+
+def rebuild_playoff_odds(conn, year: int) -> int:
+    """Odds for every ``year`` event with playoff rows (commits). Returns events written."""
+    started = time.time()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT DISTINCT event_key FROM event_matches WHERE year = %s AND comp_level IN ('sf', 'f')",
+        (year,),
+    )
+    keys = [r[0] for r in cur.fetchall()]
+    cur.close()
+    written = refresh_playoff_odds(conn, keys)
+    print(
+        f"playoff odds {year}: {written} of {len(keys)} event(s) updated in {time.time() - started:.1f}s",
+        flush=True,
+    )
+    return written
+
+
+def main(argv):
+    from db_connection import get_pg_connection, return_pg_connection
+    from db_target import assert_safe_db_target
+    from run import apply_schema_migrations
+    from years_cli import parse_years
+
+    positional = [a for a in argv if not a.startswith("--")]
+    events = [argv[i + 1] for i, a in enumerate(argv[:-1]) if a == "--event"]
+    positional = [a for a in positional if a not in events]
+    if not positional and not events:
+        print(__doc__)
+        return 1
+    assert_safe_db_target("playoff_bracket.py")
+    apply_schema_migrations()
+    conn = get_pg_connection()
+    try:
+        if events:
+            written = refresh_playoff_odds(conn, events)
+            print(f"playoff odds: {written} of {len(events)} event(s) updated", flush=True)
+        else:
+            for year in parse_years(*positional):
+                rebuild_playoff_odds(conn, year)
+    finally:
+        return_pg_connection(conn)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
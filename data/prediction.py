@@ -22,6 +22,7 @@ from ace_attribution import (
     simulate_event,
     simulate_event_pre_match_snapshots,
 )
+from team_keys import TEAM_KEYS, team_slot
 
 RatingField = Literal["ace", "raw"]
 RatingScope = Literal[
@@ -388,35 +389,11 @@ def _parse_event_perf(raw_val) -> Dict[str, Dict[str, float]]:
     return out
 
 
-_PRED_SCORE_COLS: Optional[bool] = None
-
-
-def _event_matches_has_pred_scores(cur) -> bool:
-    global _PRED_SCORE_COLS
-    if _PRED_SCORE_COLS is not None:
-        return _PRED_SCORE_COLS
-    cur.execute(
-        """
-        SELECT 1 FROM information_schema.columns
-        WHERE table_schema = 'public' AND table_name = 'event_matches'
-          AND column_name = 'red_predicted_score'
-        LIMIT 1
-        """
-    )
-    _PRED_SCORE_COLS = cur.fetchone() is not None
-    return _PRED_SCORE_COLS
-
-
-def _event_matches_select_sql(cur) -> str:
-    """SELECT list for event_matches; predicted score cols optional (added by pipeline)."""
-    score_cols = ""
-    if _event_matches_has_pred_scores(cur):
-        score_cols = ", red_predicted_score, blue_predicted_score"
-    return f"""
+_EVENT_MATCHES_SELECT_SQL = """
             SELECT match_key, event_key, red_teams, blue_teams,
                    COALESCE(red_score, 0), COALESCE(blue_score, 0),
                    COALESCE(winning_alliance, ''), predicted_time, COALESCE(comp_level, 'qm'),
-                   red_win_prob, blue_win_prob{score_cols}
+                   red_win_prob, blue_win_prob, red_predicted_score, blue_predicted_score
             """
 
 
@@ -424,17 +401,16 @@ def load_prediction_data_from_db(conn, year: int, *, limit_events: Optional[int]
     """Load matches, event order, and team ratings from Postgres."""
     cur = conn.cursor()
 
-    match_select = _event_matches_select_sql(cur)
-    has_pred_scores = "red_predicted_score" in match_select
+    match_select = _EVENT_MATCHES_SELECT_SQL
 
     cur.execute(
         """
         SELECT event_key, COALESCE(start_date::text, ''), COALESCE(event_type, '')
         FROM events
-        WHERE event_key LIKE %s
+        WHERE year = %s
         ORDER BY start_date NULLS LAST, event_key
         """,
-        (f"{year}%",),
+        (int(year),),
     )
     event_rows = cur.fetchall()
     if limit_events:
@@ -492,45 +468,29 @@ def load_prediction_data_from_db(conn, year: int, *, limit_events: Optional[int]
             match_select
             + """
             FROM event_matches
-            WHERE event_key LIKE %s
+            WHERE year = %s
             ORDER BY event_key, predicted_time NULLS LAST, comp_level, match_key
             """,
-            (f"{year}%",),
+            (int(year),),
         )
 
     matches: List[MatchRow] = []
     for row in cur.fetchall():
-        if has_pred_scores:
-            (
-                match_key,
-                event_key,
-                red_teams,
-                blue_teams,
-                red_score,
-                blue_score,
-                winning_alliance,
-                predicted_time,
-                comp_level,
-                red_win_prob,
-                blue_win_prob,
-                red_pred_score,
-                blue_pred_score,
-            ) = row
-        else:
-            (
-                match_key,
-                event_key,
-                red_teams,
-                blue_teams,
-                red_score,
-                blue_score,
-                winning_alliance,
-                predicted_time,
-                comp_level,
-                red_win_prob,
-                blue_win_prob,
-            ) = row
-            red_pred_score = blue_pred_score = None
+        (
+            match_key,
+            event_key,
+            red_teams,
+            blue_teams,
+            red_score,
+            blue_score,
+            winning_alliance,
+            predicted_time,
+            comp_level,
+            red_win_prob,
+            blue_win_prob,
+            red_pred_score,
+            blue_pred_score,
+        ) = row
         if allowed_events and event_key not in allowed_events:
             continue
         matches.append(
@@ -563,16 +523,16 @@ def load_prediction_data_from_db(conn, year: int, *, limit_events: Optional[int]
 
 def carry_priors_from_season(
     season: Dict[int, TeamSeasonData],
-) -> Dict[str, Tuple[float, ...]]:
-    """Prior-year RAW phases + confidence, keyed by TBA team key (frcXXXX)."""
-    out: Dict[str, Tuple[float, ...]] = {}
+) -> Dict[int, Tuple[float, ...]]:
+    """Prior-year RAW phases + confidence, keyed by the slot of TBA team key frcXXXX."""
+    out: Dict[int, Tuple[float, ...]] = {}
     for tn, td in season.items():
         auto = float(td.auto_raw or 0.0)
         teleop = float(td.teleop_raw or 0.0)
         endgame = float(td.endgame_raw or 0.0)
         if auto == 0.0 and teleop == 0.0 and endgame == 0.0:
             continue
-        out[f"frc{int(tn)}"] = (
+        out[team_slot(tn)] = (
             auto,
             teleop,
             endgame,
@@ -581,7 +541,7 @@ def carry_priors_from_season(
     return out
 
 
-def load_season_carry_priors(conn, year: int) -> Dict[str, Tuple[float, ...]]:
+def load_season_carry_priors(conn, year: int) -> Dict[int, Tuple[float, ...]]:
     """Load team_epas phases for ``year`` as walk-forward seed priors."""
     cur = conn.cursor()
     try:
@@ -607,23 +567,19 @@ def load_season_carry_priors(conn, year: int) -> Dict[str, Tuple[float, ...]]:
 
 
 def team_number_from_tba_key(team_key: str) -> int:
-    tok = str(team_key or "").strip()
-    if tok.lower().startswith("frc"):
-        tok = tok[3:]
-    digits = "".join(ch for ch in tok if ch.isdigit())
-    return int(digits) if digits else 0
+    return TEAM_KEYS.number(team_key)
 
 
 def _prior_with_confidence(
     st: TeamPhaseState,
     finalize_team: Callable[[TeamPhaseState, int, int], Dict[str, float]],
     year: int,
-    team_key: str,
+    slot: int,
 ) -> Optional[Tuple[float, ...]]:
     new = (st.auto, st.teleop, st.endgame)
     if new == (0.0, 0.0, 0.0):
         return None
-    tn = team_number_from_tba_key(team_key)
+    tn = TEAM_KEYS.numbers[slot]
     payload = finalize_team(st, tn, year) if tn > 0 else None
     conf = payload.get("c") if payload else None
     if conf is None:
@@ -632,19 +588,19 @@ def _prior_with_confidence(
 
 
 def _update_carry_priors(
-    priors: Dict[str, Tuple[float, ...]],
-    final_states: Dict[str, TeamPhaseState],
+    priors: Dict[int, Tuple[float, ...]],
+    final_states: Dict[int, TeamPhaseState],
     prior_blend: float,
     finalize_team: Callable[[TeamPhaseState, int, int], Dict[str, float]],
     year: int,
 ) -> None:
-    for key, st in final_states.items():
+    for slot, st in final_states.items():
         if not st.initialized or st.match_count <= 0:
             continue
-        new = _prior_with_confidence(st, finalize_team, year, key)
+        new = _prior_with_confidence(st, finalize_team, year, slot)
         if new is None:
             continue
-        priors[key] = merge_carry_prior(priors.get(key), new, prior_blend)
+        priors[slot] = merge_carry_prior(priors.get(slot), new, prior_blend)
 
 
 def build_pre_match_ratings_by_match(
@@ -654,13 +610,13 @@ def build_pre_match_ratings_by_match(
     ace_params: AceParams,
     finalize_team: Callable[[TeamPhaseState, int, int], Dict[str, float]],
     precomputed: Optional[Dict[str, Dict[int, Dict[str, float]]]] = None,
-    initial_priors: Optional[Dict[str, Tuple[float, ...]]] = None,
+    initial_priors: Optional[Dict[int, Tuple[float, ...]]] = None,
 ) -> Dict[str, Dict[int, Dict[str, float]]]:
     """Walk-forward pre-match team payloads keyed by match_key then team_number."""
     if precomputed and not matches_by_event:
         return dict(precomputed)
 
-    priors: Dict[str, Tuple[float, ...]] = dict(initial_priors or {})
+    priors: Dict[int, Tuple[float, ...]] = dict(initial_priors or {})
     ratings_by_match: Dict[str, Dict[int, Dict[str, float]]] = dict(precomputed or {})
 
     event_keys = sorted(
@@ -713,8 +669,8 @@ def build_pre_match_ratings_by_match(
         for match_key, team_states in snapshots.items():
             if match_key not in ratings_by_match:
                 ratings_by_match[match_key] = {}
-            for team_key, st in team_states.items():
-                tn = team_number_from_tba_key(team_key)
+            for slot, st in team_states.items():
+                tn = TEAM_KEYS.numbers[slot]
                 if tn <= 0:
                     continue
                 if not st.initialized and st.match_count <= 0:
@@ -771,7 +727,7 @@ def predict_all_matches_walk_forward(
     ace_params: AceParams,
     finalize_team: Callable[[TeamPhaseState, int, int], Dict[str, float]],
     precomputed_ratings: Optional[Dict[str, Dict[int, Dict[str, float]]]] = None,
-    initial_priors: Optional[Dict[str, Tuple[float, ...]]] = None,
+    initial_priors: Optional[Dict[int, Tuple[float, ...]]] = None,
 ) -> List[MatchPrediction]:
     """Predict every match using walk-forward pre-match ACE snapshots."""
     strengths, teams_by_match = compute_walk_forward_strengths(
@@ -801,7 +757,7 @@ def compute_walk_forward_strengths(
     ace_params: AceParams,
     finalize_team: Callable[[TeamPhaseState, int, int], Dict[str, float]],
     precomputed_ratings: Optional[Dict[str, Dict[int, Dict[str, float]]]] = None,
-    initial_priors: Optional[Dict[str, Tuple[float, ...]]] = None,
+    initial_priors: Optional[Dict[int, Tuple[float, ...]]] = None,
 ) -> Tuple[Dict[str, Tuple[float, float]], Dict[str, Dict[int, Dict[str, float]]]]:
     """Pre-match alliance strengths and per-team snapshot payloads."""
     pre = dict(precomputed_ratings or {})
@@ -866,8 +822,13 @@ def _probs_unchanged(
     return abs(float(ex_pr) - p_red) < tol and abs(float(ex_pb) - p_blue) < tol
 
 
-def apply_match_predictions_to_db(conn, year: int, predictions: List[MatchPrediction]) -> Dict[str, int]:
-    """Bulk-update event_matches with computed predictions. Returns skip/write counts."""
+def apply_match_predictions_to_db(
+    conn, year: int, predictions: List[MatchPrediction], event_key: Optional[str] = None
+) -> Dict[str, int]:
+    """Bulk-update event_matches with computed predictions. Returns skip/write counts.
+
+    ``event_key`` limits the comparison read to one event (webhook worker).
+    """
     cur = conn.cursor()
     try:
         cur.execute(
@@ -875,9 +836,9 @@ def apply_match_predictions_to_db(conn, year: int, predictions: List[MatchPredic
             SELECT match_key, red_win_prob, blue_win_prob,
                    red_predicted_score, blue_predicted_score, pre_match_teams
             FROM event_matches
-            WHERE LEFT(event_key, 4) = %s
+            WHERE year = %s AND (%s::text IS NULL OR event_key = %s)
             """,
-            (str(year),),
+            (int(year), event_key, event_key),
         )
         existing = {row[0]: row[1:] for row in cur.fetchall()}
 
@@ -0,0 +1,232 @@
+"""
+Match Predictor pools behind the API's /games/predictor.
+
+For one season, writes every playable match (played, decided, with a stored
+win probability) as a ready-to-serve JSON row plus the nicknames of the teams
+in it, and a per-event summary with match / playoff counts. The endpoint then
+samples (event_key, ord) pairs and fetches only the rows it returns instead of
+reading and converting the whole season on every round. Tables come from
+peekorobo-api/migrations/0007_predictor_pool.sql.
+
+Each rebuild replaces the season in one transaction. run.py rebuilds after
+predictions are stored; this script backfills older seasons.
+
+Usage:
+    python data/predictor_pool.py 2026
+    python data/predictor_pool.py 2015-2026
+    python data/predictor_pool.py --all       # every season with predictions
+"""
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from psycopg2.extras import execute_values
+
+PLAYOFF_LEVELS = ("ef", "qf", "sf", "f")
+_COMP_ORD = {"qm": 0, "ef": 1, "qf": 2, "sf": 3, "f": 4}
+
+
+def _teams(csv):
+    if not csv:
+        return []
+    return [int(t.strip()) for t in str(csv).split(",") if t.strip().isdigit()]
+
+
+def _year_of(event_key):
+    if event_key and len(event_key) >= 4 and event_key[:4].isdigit():
+        return int(event_key[:4])
+    return 0
+
+
+def _float(v):
+    return float(v) if v is not None else None
+
+
+def predictor_match(row, event_name, week, event_type):
+    """The API's PredictorMatch as a dict, or None when the match can't be played."""
+    (match_key, event_key, comp_level, match_number, set_number, red_csv, blue_csv,
+     red_score, blue_score, winner, red_prob, blue_prob, red_pred, blue_pred) = row
+    winner = (winner or "").strip().lower()
+    if winner not in ("red", "blue"):
+        return None
+    red, blue = _teams(red_csv), _teams(blue_csv)
+    if not red or not blue:
+        return None
+    if red_prob is None and blue_prob is None:
+        return None
+    return {
+        "match_key": match_key or "",
+        "event_key": event_key or "",
+        "event_name": event_name or "",
+        "year": _year_of(event_key),
+        "week": week,
+        "event_type": event_type,
+        "comp_level": comp_level or "",
+        "match_number": match_number or 0,
+        "set_number": set_number or 0,
+        "red_teams": red,
+        "blue_teams": blue,
+        "red_score": int(red_score or 0),
+        "blue_score": int(blue_score or 0),
+        "winning_alliance": winner,
+        "red_win_prob": _float(red_prob),
+        "blue_win_prob": _float(blue_prob),
+        "red_predicted_score": _float(red_pred),
+        "blue_predicted_score": _float(blue_pred),
+    }
+
+
+def _nicknames(cur, year):
+    """(event_key -> {team: nickname}, team -> fallback nickname from teams)."""
+    cur.execute(
+        "SELECT event_key, team_number, nickname FROM event_teams WHERE year = %s",
+        (year,),
+    )
+    by_event = defaultdict(dict)
+    for event_key, team_number, nickname in cur.fetchall():
+        if team_number is not None and nickname and nickname.strip():
+            by_event[event_key][int(team_number)] = nickname.strip()
+    cur.execute("SELECT team_number, nickname FROM teams")
+    fallback = {
+        int(t): ((nick or "").strip() or f"Team {t}") for t, nick in cur.fetchall() if t is not None
+    }
+    return by_event, fallback
+
+
+def rebuild_predictor_pool(conn, year):
+    """Replace ``year`` in the predictor pool tables (commits). Returns (matches, events)."""
+    started = time.time()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT m.match_key, m.event_key, m.comp_level, m.match_number, m.set_number,
+               m.red_teams, m.blue_teams, m.red_score, m.blue_score, m.winning_alliance,
+               m.red_win_prob, m.blue_win_prob, m.red_predicted_score, m.blue_predicted_score,
+               e.name, e.week, e.event_type, e.start_date
+        FROM event_matches m
+        LEFT JOIN events e ON e.event_key = m.event_key
+        WHERE m.year = %s
+          AND (m.red_win_prob IS NOT NULL OR m.blue_win_prob IS NOT NULL)
+          AND m.winning_alliance IN ('red', 'blue')
+        """,
+        (year,),
+    )
+    rows = cur.fetchall()
+    by_event_nick, fallback = _nicknames(cur, year)
+
+    by_event = defaultdict(list)
+    event_meta = {}
+    for row in rows:
+        event_key = row[1] or ""
+        event_meta[event_key] = (row[14], row[15], row[16], row[17])
+        by_event[event_key].append(row[:14])
+
+    # Same event order as the scan path (start date, then key), matches in bracket order.
+    ordered_events = sorted(
+        by_event,
+        key=lambda k: (event_meta[k][3] is None, event_meta[k][3] or "", k),
+    )
+    pool_rows = []
+    event_rows = []
+    for event_key in ordered_events:
+        name, week, event_type, _start = event_meta[event_key]
+        nicks = by_event_nick.get(event_key, {})
+        matches = sorted(
+            by_event[event_key],
+            key=lambda r: (_COMP_ORD.get(r[2], 9), r[4] or 0, r[3] or 0),
+        )
+        ord_ = playoff_ord = 0
+        for row in matches:
+            item = predictor_match(row, name, week, event_type)
+            if item is None:
+                continue
+            is_playoff = item["comp_level"] in PLAYOFF_LEVELS
+            names = {
+                str(t): nicks.get(t) or fallback.get(t) or f"Team {t}"
+                for t in (*item["red_teams"], *item["blue_teams"])
+            }
+            pool_rows.append((
+                year, event_key, ord_, playoff_ord if is_playoff else None,
+                json.dumps(item), json.dumps(names),
+            ))
+            ord_ += 1
+            if is_playoff:
+                playoff_ord += 1
+        if ord_:
+            event_rows.append((year, event_key, name, week, event_type, ord_, playoff_ord))
+
+    cur.execute("DELETE FROM predictor_pool WHERE year = %s", (year,))
+    cur.execute("DELETE FROM predictor_pool_events WHERE year = %s", (year,))
+    execute_values(
+        cur,
+        "INSERT INTO predictor_pool (year, event_key, ord, playoff_ord, match, nicknames) VALUES %s",
+        pool_rows,
+        template="(%s, %s, %s, %s, %s::jsonb, %s::jsonb)",
+        page_size=2000,
+    )
+    execute_values(
+        cur,
+        """
+        INSERT INTO predictor_pool_events
+            (year, event_key, event_name, week, event_type, matches, playoff_matches)
+        VALUES %s
+        """,
+        event_rows,
+    )
+    cur.execute(
+        """
+        INSERT INTO predictor_pool_builds (year, matches, events, built_at)
+        VALUES (%s, %s, %s, NOW())
+        ON CONFLICT (year) DO UPDATE SET
+            matches = EXCLUDED.matches, events = EXCLUDED.events, built_at = EXCLUDED.built_at
+        """,
+        (year, len(pool_rows), len(event_rows)),
+    )
+    conn.commit()
+    cur.close()
+    print(
+        f"predictor pool {year}: {len(pool_rows)} match(es) across {len(event_rows)} event(s) "
+        f"in {time.time() - started:.1f}s",
+        flush=True,
+    )
+    return len(pool_rows), len(event_rows)
+
+
+def main(argv):
+    from db_connection import get_pg_connection, return_pg_connection
+    from db_target import assert_safe_db_target
+    from run import apply_schema_migrations
+    from years_cli import parse_years
+
+    positional = [a for a in argv if not a.startswith("--")]
+    if not positional and "--all" not in argv:
+        print(__doc__)
+        return 1
+    assert_safe_db_target("predictor_pool.py")
+    apply_schema_migrations()
+    conn = get_pg_connection()
+    try:
+        if "--all" in argv:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT DISTINCT year FROM event_matches "
+                "WHERE year IS NOT NULL AND (red_win_prob IS NOT NULL OR blue_win_prob IS NOT NULL) "
+                "ORDER BY year"
+            )
+            years = [r[0] for r in cur.fetchall()]
+            cur.close()
+        else:
+            years = parse_years(*positional)
+        for year in years:
+            rebuild_predictor_pool(conn, year)
+    finally:
+        return_pg_connection(conn)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,166 @@
+"""
+Per-team walk-forward ACE series behind the API's /team/{n}/match_ratings/{year}.
+
+For one season, walks every match with stored ``pre_match_teams`` in schedule
+order and writes one ``team_rating_series`` row per team: parallel arrays of
+match identity, played flag and the compact a/t/e/r/c/ace snapshot (see
+prediction.PRE_MATCH_TEAM_KEYS). The endpoint reads a single row by primary key
+instead of LIKE-scanning the season and extracting JSONB per match. Tables come
+from peekorobo-api/migrations/0008_team_rating_series.sql.
+
+Each rebuild replaces the season in one transaction. run.py rebuilds after
+predictions (which write pre_match_teams); this script backfills older seasons.
+
+Usage:
+    python data/rating_series.py 2026
+    python data/rating_series.py 2015-2026
+    python data/rating_series.py --all       # every season with pre-match ratings
+"""
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from psycopg2.extras import execute_values
+
+from prediction import PRE_MATCH_TEAM_KEYS
+
+_COMP_ORD = {"qm": 0, "ef": 1, "qf": 2, "sf": 3, "f": 4}
+_COLUMNS = ("match_keys", "event_keys", "comp_levels", "match_numbers", "set_numbers", "played") + PRE_MATCH_TEAM_KEYS
+
+
+def _teams(csv):
+    if not csv:
+        return []
+    return [int(t.strip()) for t in str(csv).split(",") if t.strip().isdigit()]
+
+
+def _compact(raw):
+    """{a,t,e,r,c,ace} floats (None when missing), or None without an ACE value."""
+    if not isinstance(raw, dict):
+        return None
+    out = {}
+    for key in PRE_MATCH_TEAM_KEYS:
+        val = raw.get(key)
+        out[key] = float(val) if isinstance(val, (int, float)) and not isinstance(val, bool) else None
+    return out if out["ace"] is not None else None
+
+
+def build_series(matches):
+    """team -> {column: [values]} from schedule-ordered match rows.
+
+    ``matches``: (match_key, event_key, comp_level, match_number, set_number,
+    red_teams, blue_teams, red_score, blue_score, winning_alliance, pre_match_teams).
+    """
+    series = defaultdict(lambda: {col: [] for col in _COLUMNS})
+    for (match_key, event_key, comp_level, match_number, set_number,
+         red_csv, blue_csv, red_score, blue_score, winner, pre_match) in matches:
+        if isinstance(pre_match, str):
+            try:
+                pre_match = json.loads(pre_match)
+            except ValueError:
+                continue
+        if not isinstance(pre_match, dict):
+            continue
+        played = (red_score or 0) > 0 or (blue_score or 0) > 0 or (winner or "") in ("red", "blue")
+        for team in dict.fromkeys(_teams(red_csv) + _teams(blue_csv)):
+            compact = _compact(pre_match.get(str(team)))
+            if compact is None:
+                continue
+            s = series[team]
+            s["match_keys"].append(match_key or "")
+            s["event_keys"].append(event_key or "")
+            s["comp_levels"].append(comp_level or "")
+            s["match_numbers"].append(match_number or 0)
+            s["set_numbers"].append(set_number or 0)
+            s["played"].append(played)
+            for key in PRE_MATCH_TEAM_KEYS:
+                s[key].append(compact[key])
+    return series
+
+
+def rebuild_rating_series(conn, year):
+    """Replace ``year`` in team_rating_series (commits). Returns the team count."""
+    started = time.time()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT m.match_key, m.event_key, m.comp_level, m.match_number, m.set_number,
+               m.red_teams, m.blue_teams, m.red_score, m.blue_score, m.winning_alliance,
+               m.pre_match_teams, e.start_date
+        FROM event_matches m
+        LEFT JOIN events e ON e.event_key = m.event_key
+        WHERE m.year = %s AND m.pre_match_teams IS NOT NULL
+        """,
+        (year,),
+    )
+    rows = cur.fetchall()
+    # Same order as the API's scan path: event start date, event, bracket order.
+    rows.sort(key=lambda r: (
+        r[11] is None, r[11] or "", r[1] or "", _COMP_ORD.get(r[2], 9), r[4] or 0, r[3] or 0,
+    ))
+    series = build_series([r[:11] for r in rows])
+
+    cur.execute("DELETE FROM team_rating_series WHERE year = %s", (year,))
+    execute_values(
+        cur,
+        f"INSERT INTO team_rating_series (team_number, year, {', '.join(_COLUMNS)}) VALUES %s",
+        [(team, year, *(s[col] for col in _COLUMNS)) for team, s in series.items()],
+        template="(%s, %s, %s::text[], %s::text[], %s::text[], %s::int[], %s::int[], %s::boolean[], "
+        "%s::real[], %s::real[], %s::real[], %s::real[], %s::real[], %s::real[])",
+        page_size=500,
+    )
+    cur.execute(
+        """
+        INSERT INTO team_rating_series_builds (year, teams, built_at)
+        VALUES (%s, %s, NOW())
+        ON CONFLICT (year) DO UPDATE SET teams = EXCLUDED.teams, built_at = EXCLUDED.built_at
+        """,
+        (year, len(series)),
+    )
+    conn.commit()
+    cur.close()
+    print(
+        f"rating series {year}: {len(series)} team(s) from {len(rows)} match(es) "
+        f"in {time.time() - started:.1f}s",
+        flush=True,
+    )
+    return len(series)
+
+
+def main(argv):
+    from db_connection import get_pg_connection, return_pg_connection
+    from db_target import assert_safe_db_target
+    from run import apply_schema_migrations
+    from years_cli import parse_years
+
+    positional = [a for a in argv if not a.startswith("--")]
+    if not positional and "--all" not in argv:
+        print(__doc__)
+        return 1
+    assert_safe_db_target("rating_series.py")
+    apply_schema_migrations()
+    conn = get_pg_connection()
+    try:
+        if "--all" in argv:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT DISTINCT year FROM event_matches "
+                "WHERE year IS NOT NULL AND pre_match_teams IS NOT NULL ORDER BY year"
+            )
+            years = [r[0] for r in cur.fetchall()]
+            cur.close()
+        else:
+            years = parse_years(*positional)
+        for year in years:
+            rebuild_rating_series(conn, year)
+    finally:
+        return_pg_connection(conn)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
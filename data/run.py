@@ -19,11 +19,21 @@ import time  # <-- Added for runtime tracking
 import math
 import traceback
 
+import instrumentation
 from yearmodels import *
 from active_events import get_active_event_keys
+from season_year import backfill_missing_years, season_of
+from team_keys import TEAM_KEYS, intern_season
+from checkpoint import RunCheckpoint, config_key as checkpoint_config_key
+from event_updates import notify_event_updates
+from h2h_index import rebuild_h2h_index
+from playoff_bracket import rebuild_playoff_odds, refresh_playoff_odds
+from predictor_pool import rebuild_predictor_pool
+from rating_series import rebuild_rating_series
 from ace_attribution import (
     Method,
     TeamPhaseState,
+    extract_season_phases,
     merge_carry_prior,
     simulate_event,
     simulate_event_pre_match_snapshots,
@@ -84,7 +94,8 @@ _ACE_PRIOR_BLEND = float(os.environ.get("ACE_PRIOR_BLEND", "0.75"))
 
 # Logistic scale on normalized ACE margin (pooled 2024-2026 tune: 6.4).
 
-TBA_BASE_URL = "https://www.thebluealliance.com/api/v3"
+# Override to point at a local stand-in (data/synthetic_season.py --serve).
+TBA_BASE_URL = (os.getenv("TBA_BASE_URL") or "https://www.thebluealliance.com/api/v3").rstrip("/")
 
 API_KEYS = [k.strip() for k in (os.getenv("TBA_API_KEYS") or "").split(",") if k.strip()]
 
@@ -105,6 +116,24 @@ _PIPELINE_ADV_LOCK_KEY1 = 893741
 _PIPELINE_ADV_LOCK_KEY2 = 20260401
 
 
+def acquire_pipeline_lock():
+    """Take the cross-process pipeline advisory lock; the holding connection, or None if busy."""
+    lock_conn = get_pg_connection()
+    cur = lock_conn.cursor()
+    cur.execute(
+        "SELECT pg_try_advisory_lock(%s, %s)",
+        (_PIPELINE_ADV_LOCK_KEY1, _PIPELINE_ADV_LOCK_KEY2),
+    )
+    locked = bool(cur.fetchone()[0])
+    cur.close()
+    if locked:
+        return lock_conn
+    if lock_conn in active_connections:
+        active_connections.remove(lock_conn)
+    lock_conn.close()
+    return None
+
+
 def _release_pipeline_lock(conn) -> None:
     if conn is None or conn.closed:
         return
@@ -132,8 +161,9 @@ match_cache = {}
 # match_key -> team_number -> pre-match rating (filled during EPA precompute).
 _pre_match_ratings_by_match: Dict[str, Dict[int, dict]] = {}
 # Team phase priors after EPA precompute (for tail walk-forward without replay).
-_carry_priors_snapshot: Dict[str, Tuple[float, ...]] = {}
-_event_epa_cache: Dict[str, Dict[str, dict]] = {}
+# Both are keyed by TEAM_KEYS slot; checkpoints store them by TBA key.
+_carry_priors_snapshot: Dict[int, Tuple[float, ...]] = {}
+_event_epa_cache: Dict[str, Dict[int, dict]] = {}
 _event_epa_lock = threading.Lock()
 
 # API call counter
@@ -206,14 +236,18 @@ def tba_get(endpoint: str):
         "Accept": "application/json",
     }
     url = f"{TBA_BASE_URL}/{endpoint}"
+    instrumentation.incr("tba.requests")
     try:
-        r = requests.get(url, headers=headers, timeout=30)  # Add 30 second timeout
+        with instrumentation.span("tba.get", endpoint=endpoint.split("/", 1)[0]):
+            r = requests.get(url, headers=headers, timeout=30)  # Add 30 second timeout
         if r.status_code == 200:
             return r.json()
         else:
+            instrumentation.incr("tba.http_errors")
             print(f"TBA API error for {endpoint}: {r.status_code}")
             return None
     except requests.exceptions.Timeout:
+        instrumentation.incr("tba.timeouts")
         print(f"Timeout for {endpoint}")
         raise  # Let retry handle it
     except requests.exceptions.RequestException as e:
@@ -223,6 +257,37 @@ def tba_get(endpoint: str):
         print(f"Unexpected error for {endpoint}: {e}")
         raise  # Let retry handle it
 
+def tba_get_conditional(endpoint: str, etag: Optional[str] = None):
+    """One GET with If-None-Match; returns (payload, etag, not_modified).
+
+    Unlike tba_get this does not retry: callers poll on a cadence and simply try
+    again next tick. payload is None on 304 and on any error.
+    """
+    headers = {
+        "X-TBA-Auth-Key": random.choice(API_KEYS),
+        "User-Agent": "peekorobo-eval/1.0 (local bakeoff; contact github.com/peekorobo)",
+        "Accept": "application/json",
+    }
+    if etag:
+        headers["If-None-Match"] = etag
+    instrumentation.incr("tba.requests")
+    try:
+        with instrumentation.span("tba.get", endpoint=endpoint.split("/", 1)[0]):
+            r = requests.get(f"{TBA_BASE_URL}/{endpoint}", headers=headers, timeout=30)
+    except requests.exceptions.RequestException as e:
+        instrumentation.incr("tba.timeouts" if isinstance(e, requests.exceptions.Timeout) else "tba.http_errors")
+        print(f"Request error for {endpoint}: {e}")
+        return None, etag, False
+    if r.status_code == 304:
+        instrumentation.incr("tba.not_modified")
+        return None, etag, True
+    if r.status_code != 200:
+        instrumentation.incr("tba.http_errors")
+        print(f"TBA API error for {endpoint}: {r.status_code}")
+        return None, etag, False
+    return r.json(), r.headers.get("ETag") or etag, False
+
+
 def signal_handler(signum, frame):
     # Handle Ctrl+C and other termination signals gracefully
     print(f"\nReceived signal {signum}. Shutting down gracefully...")
@@ -381,6 +446,20 @@ _db_pool_lock = threading.Lock()
 _db_pool_slots = threading.Semaphore(max(1, _DB_POOL_MAXCONN))
 
 
+class _CountingCursor(psycopg2.extensions.cursor):
+    """Cursor that counts DB round trips for the run report (executemany is one per row)."""
+
+    def execute(self, query, vars=None):
+        instrumentation.incr("db.round_trips")
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        if not isinstance(vars_list, (list, tuple)):
+            vars_list = list(vars_list)
+        instrumentation.incr("db.round_trips", len(vars_list))
+        return super().executemany(query, vars_list)
+
+
 def _connect_kwargs_from_database_url():
     """Shared DSN kwargs for get_pg_connection / the ThreadedConnectionPool."""
     url = os.environ.get("DATABASE_URL") or os.environ.get("DB_URL")
@@ -411,6 +490,7 @@ def _connect_kwargs_from_database_url():
         host=host,
         port=result.port or 5432,
         connect_timeout=int(os.environ.get("PG_CONNECT_TIMEOUT", "60")),
+        cursor_factory=_CountingCursor,
     )
     if hostaddr:
         kwargs["hostaddr"] = hostaddr
@@ -468,6 +548,28 @@ def _return_pooled_connection(pool, conn, *, broken: bool) -> None:
             pass
 
 
+_API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "peekorobo-api")
+
+
+def apply_schema_migrations() -> None:
+    """Apply pending peekorobo-api/migrations once per run (DDL lives only there).
+
+    Data fills that are too heavy for a migration (which also runs on API boot)
+    follow here in short batches; each is a no-op index probe once done.
+    """
+    if _API_DIR not in sys.path:
+        # Appended, not prepended: the API's ``data`` package must not shadow ours.
+        sys.path.append(_API_DIR)
+    import migrate
+
+    conn = get_pg_connection()
+    try:
+        migrate.apply_pending(conn, log=lambda msg: print(msg, flush=True))
+        backfill_missing_years(conn, log=lambda msg: print(msg, flush=True))
+    finally:
+        conn.close()
+
+
 @contextmanager
 def _pooled_connection():
     """
@@ -494,7 +596,8 @@ def _pooled_connection():
     conn = None
     broken = False
     try:
-        conn = pool.getconn()
+        with instrumentation.span("db.pool_checkout"):
+            conn = pool.getconn()
         yield conn
     except Exception:
         broken = True
@@ -545,9 +648,9 @@ def _get_season_bounds(year: int) -> tuple[datetime | None, datetime | None, int
                 """
                 SELECT MIN(start_date), MAX(end_date), MAX(week)
                 FROM events
-                WHERE LEFT(event_key, 4) = %s AND week IS NOT NULL
+                WHERE year = %s AND week IS NOT NULL
                 """,
-                (str(year),),
+                (int(year),),
             )
             row = cur.fetchone()
             cur.close()
@@ -576,9 +679,9 @@ def preload_event_metadata(year):
                 """
                 SELECT event_key, start_date, end_date, week
                 FROM events
-                WHERE LEFT(event_key, 4) = %s
+                WHERE year = %s
                 """,
-                (str(year),),
+                (int(year),),
             )
             rows = cur.fetchall()
             cur.close()
@@ -634,29 +737,9 @@ def upsert_district(cur, district_key, district_abbrev, district_name):
     except Exception:
         pass  # districts table may not exist yet
 
-_location_columns_ready = False
-
-
-def ensure_location_columns(conn) -> None:
-    """postal_code (and lat/lng) used by Mapbox geocoding; TBA already sends postal_code."""
-    global _location_columns_ready
-    if _location_columns_ready:
-        return
-    cur = conn.cursor()
-    for table in ("teams", "events"):
-        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS lat DOUBLE PRECISION")
-        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS lng DOUBLE PRECISION")
-        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS postal_code TEXT")
-    cur.execute("ALTER TABLE event_teams DROP COLUMN IF EXISTS postal_code")
-    conn.commit()
-    cur.close()
-    _location_columns_ready = True
-
-
 def upsert_team_profile(result):
     # Insert or update a team's general profile data
     with _pooled_connection() as conn:
-        ensure_location_columns(conn)
         cur = conn.cursor()
         cur.execute(
             """
@@ -1076,8 +1159,8 @@ def get_team_events(team_number, year):
         cur = conn.cursor()
         cur.execute("""
             SELECT event_key FROM event_teams
-            WHERE team_number = %s AND LEFT(event_key, 4) = %s
-        """, (team_number, str(year)))
+            WHERE team_number = %s AND year = %s
+        """, (team_number, int(year)))
         events = [row[0] for row in cur.fetchall()]
         cur.close()
     return events
@@ -1106,10 +1189,10 @@ def _query_team_played_events(team_number, year):
             """
             SELECT event_key, red_score, blue_score, winning_alliance, predicted_time
             FROM event_matches
-            WHERE LEFT(event_key, 4) = %s
+            WHERE year = %s
               AND (%s = ANY(string_to_array(red_teams, ',')) OR %s = ANY(string_to_array(blue_teams, ',')))
             """,
-            (str(year), str(team_number), str(team_number)),
+            (int(year), str(team_number), str(team_number)),
         )
         rows = cur.fetchall()
         cur.close()
@@ -1132,8 +1215,10 @@ def get_team_played_events(team_number, year):
     # after), so memoize once per team+year instead of re-querying per event.
     key = (team_number, year)
     with _team_played_events_lock:
-        if key in _team_played_events_cache:
-            return list(_team_played_events_cache[key])
+        cached = _team_played_events_cache.get(key)
+    instrumentation.cache_lookup("team_played_events", cached is not None)
+    if cached is not None:
+        return list(cached)
     result = _query_team_played_events(team_number, year)
     with _team_played_events_lock:
         _team_played_events_cache[key] = result
@@ -1142,7 +1227,6 @@ def get_team_played_events(team_number, year):
 def get_teams_for_year(year):
     # Return a list of all teams that played in a given year, using teams table for profile data
     conn = get_pg_connection()
-    ensure_location_columns(conn)
     cur = conn.cursor()
     cur.execute(
         """
@@ -1156,9 +1240,9 @@ def get_teams_for_year(year):
             t.postal_code
         FROM event_teams et
         LEFT JOIN teams t ON et.team_number = t.team_number
-        WHERE LEFT(et.event_key, 4) = %s
+        WHERE et.year = %s
         """,
-        (str(year),),
+        (int(year),),
     )
     teams = []
     for row in cur.fetchall():
@@ -1245,9 +1329,9 @@ def event_keys_for_teams(year: int, team_numbers) -> List[str]:
         """
         SELECT DISTINCT event_key
         FROM event_teams
-        WHERE LEFT(event_key, 4) = %s AND team_number = ANY(%s)
+        WHERE year = %s AND team_number = ANY(%s)
         """,
-        (str(year), team_numbers),
+        (int(year), team_numbers),
     )
     keys = [r[0] for r in cur.fetchall()]
     cur.close()
@@ -1304,9 +1388,9 @@ def get_active_scope(year, buffer_days=2):
             """
             SELECT DISTINCT event_key
             FROM event_teams
-            WHERE LEFT(event_key, 4) = %s AND team_number = ANY(%s)
+            WHERE year = %s AND team_number = ANY(%s)
             """,
-            (str(year), list(active_teams)),
+            (int(year), list(active_teams)),
         )
         needed_events = {r[0] for r in cur.fetchall()}
         needed_events.update(active_events)
@@ -1324,7 +1408,6 @@ def get_active_scope(year, buffer_days=2):
 def get_existing_event_data(event_key):
     # Get existing event data from database for comparison
     with _pooled_connection() as conn:
-        ensure_location_columns(conn)
         cur = conn.cursor()
 
         # Get event (including webcast info)
@@ -1569,6 +1652,81 @@ def data_has_changed(existing, new_data, data_type):
     
     return True  # Default to updating if we don't know
 
+def event_row_from_tba(event):
+    """``events`` row (without year) from a TBA event payload."""
+    district = event.get("district") or {}
+    # Webcast info (store first webcast if available)
+    webcast = (event.get("webcasts", [{}]) or [{}])[0]
+    return (
+        event["key"], event.get("name"),
+        event.get("start_date"), event.get("end_date"),
+        event.get("event_type_string"),
+        district.get("key"),
+        district.get("abbreviation"),
+        district.get("display_name"),
+        event.get("city"), event.get("state_prov"), event.get("country"),
+        event.get("website"),
+        webcast.get("type"),
+        webcast.get("channel"),
+        resolve_event_week(event),
+        event.get("lat"), event.get("lng"),
+        event.get("postal_code"),
+    )
+
+
+def event_team_rows_from_tba(event_key, teams):
+    """``event_teams`` rows (plus postal_code) from TBA ``event/{key}/teams``."""
+    rows = []
+    for t in teams or []:
+        team_number = t.get("team_number")
+        if team_number is None:
+            continue
+        rows.append((
+            event_key,
+            team_number,
+            t.get("nickname"),
+            t.get("city"),
+            t.get("state_prov"),
+            t.get("country"),
+            t.get("postal_code"),
+        ))
+    return rows
+
+
+def match_rows_from_tba(event_key, matches):
+    """``event_matches`` rows (without predictions/year) from TBA ``event/{key}/matches``."""
+    rows = []
+    for m in matches or []:
+        red_teams = []
+        blue_teams = []
+
+        for team_key in m["alliances"]["red"]["team_keys"]:
+            t_num = parse_tba_team_number(team_key)
+            if t_num is not None:
+                red_teams.append(str(t_num))
+        for team_key in m["alliances"]["blue"]["team_keys"]:
+            t_num = parse_tba_team_number(team_key)
+            if t_num is not None:
+                blue_teams.append(str(t_num))
+
+        # Get first YouTube video if available
+        videos = m.get("videos", [])
+        youtube_videos = [v for v in videos if v.get("type") == "youtube"]
+        best_video = youtube_videos[0]["key"] if youtube_videos else None
+
+        rows.append((
+            m["key"], event_key, m["comp_level"], m["match_number"],
+            m["set_number"],
+            ",".join(red_teams),
+            ",".join(blue_teams),
+            m["alliances"]["red"]["score"], m["alliances"]["blue"]["score"],
+            m.get("winning_alliance"),
+            best_video,
+            m.get("predicted_time")
+        ))
+    return rows
+
+
 def create_event_db(year, only_event_keys=None):
     # Create and populate the events database for the specified year, only updating what's changed.
     #
@@ -1579,9 +1737,6 @@ def create_event_db(year, only_event_keys=None):
     # skipped. When None, every event of the season is processed (full-run behavior, unchanged).
     print(f"\nevents database update for {year}...")
 
-    with _pooled_connection() as conn:
-        ensure_location_columns(conn)
-
     only_set = set(only_event_keys) if only_event_keys is not None else None
     if only_set is not None:
         print(f"  active-only: restricting to {len(only_set)} event(s) attended by active teams")
@@ -1640,49 +1795,21 @@ def create_event_db(year, only_event_keys=None):
             return None
             
         key = event["key"]
-        existing_data = get_existing_event_data(key)
+        with instrumentation.span("event.fetch_and_compare", event_key=key):
+            return _fetch_and_compare_event(event, key)
+
+    def _fetch_and_compare_event(event, key):
+        with instrumentation.span("event.read_existing"):
+            existing_data = get_existing_event_data(key)
         
         # Fetch new data
-        event_start = event.get("start_date")
-        event_end = event.get("end_date")
-        event_week = resolve_event_week(event)
-        new_data = {
-            "event": (
-                key, event.get("name"),
-                event_start, event_end,
-                event.get("event_type_string"),
-                (event.get("district") or {}).get("key"),
-                (event.get("district") or {}).get("abbreviation"),
-                (event.get("district") or {}).get("display_name"),
-                event.get("city"), event.get("state_prov"), event.get("country"),
-                event.get("website"),
-                # Webcast info (store first webcast if available)
-                (event.get("webcasts", [{}]) or [{}])[0].get("type"),
-                (event.get("webcasts", [{}]) or [{}])[0].get("channel"),
-                event_week,
-                event.get("lat"), event.get("lng"),
-                event.get("postal_code"),
-            ),
-            "teams": [], "matches": []
-        }
+        new_data = {"event": event_row_from_tba(event), "teams": [], "matches": []}
         
         # Fetch teams once
         try:
             teams = tba_get(f"event/{key}/teams")
             if teams:
-                for t in teams:
-                    team_number = t.get("team_number")
-                    if team_number is None:
-                        continue
-                    new_data["teams"].append((
-                        key,
-                        team_number,
-                        t.get("nickname"),
-                        t.get("city"),
-                        t.get("state_prov"),
-                        t.get("country"),
-                        t.get("postal_code"),
-                    ))
+                new_data["teams"] = event_team_rows_from_tba(key, teams)
         except Exception as e:
             print(f"Error processing teams for event {key}: {e}")
 
@@ -1693,43 +1820,17 @@ def create_event_db(year, only_event_keys=None):
             if matches:
                 # Store raw matches in cache for team processing
                 match_cache[key] = matches
-                for m in matches:
-                    red_teams = []
-                    blue_teams = []
-
-                    for team_key in m["alliances"]["red"]["team_keys"]:
-                        t_num = parse_tba_team_number(team_key)
-                        if t_num is not None:
-                            red_teams.append(str(t_num))
-                    for team_key in m["alliances"]["blue"]["team_keys"]:
-                        t_num = parse_tba_team_number(team_key)
-                        if t_num is not None:
-                            blue_teams.append(str(t_num))
-                    
-                    # Get first YouTube video if available
-                    videos = m.get("videos", [])
-                    youtube_videos = [v for v in videos if v.get("type") == "youtube"]
-                    best_video = youtube_videos[0]["key"] if youtube_videos else None
-                    
-                    new_data["matches"].append((
-                        m["key"], key, m["comp_level"], m["match_number"],
-                        m["set_number"],
-                        ",".join(red_teams),
-                        ",".join(blue_teams),
-                        m["alliances"]["red"]["score"], m["alliances"]["blue"]["score"],
-                        m.get("winning_alliance"),
-                        best_video,
-                        m.get("predicted_time")
-                    ))
+                new_data["matches"] = match_rows_from_tba(key, matches)
         except Exception as e:
             print(f"Error fetching matches for event {key}: {e}")
         
         # Determine what needs updating
-        updates_needed = {
-            "event": data_has_changed(existing_data, new_data, "event"),
-            "teams": data_has_changed(existing_data, new_data, "teams"),
-            "matches": data_has_changed(existing_data, new_data, "matches"),
-        }
+        with instrumentation.span("event.diff"):
+            updates_needed = {
+                "event": data_has_changed(existing_data, new_data, "event"),
+                "teams": data_has_changed(existing_data, new_data, "teams"),
+                "matches": data_has_changed(existing_data, new_data, "matches"),
+            }
         
         return {
             "event_key": key,
@@ -1779,6 +1880,7 @@ def create_event_db(year, only_event_keys=None):
     print(f"  Event data updates: {event_updates}")
     print(f"  Team data updates: {team_updates}")
     print(f"  Match updates: {match_updates}")
+    instrumentation.incr("rows.events_unchanged", total_events - events_with_changes)
 
     # Only update what's changed
     if events_with_changes > 0:
@@ -1786,12 +1888,64 @@ def create_event_db(year, only_event_keys=None):
         print(f"\n{year} events update complete")
     else:
         print(f"\nNo updates needed for {year} events")
+    fill_missing_event_coords(year)
+
+
+# City-level location key shared by events and teams (lower/trimmed city|state|country).
+_LOC_KEY_SQL = (
+    "lower(btrim(COALESCE({t}.city, ''))) || '|' || "
+    "lower(btrim(COALESCE({t}.state_prov, ''))) || '|' || "
+    "lower(btrim(COALESCE({t}.country, '')))"
+)
+
+
+def fill_missing_event_coords(year) -> int:
+    """Give events without TBA lat/lng the coordinates of a peer in the same city.
+
+    TBA often omits lat/lng for offseason venues. Prefer another event in the
+    same city/state/country, then a geocoded team there. Resolved once here so
+    the map API never has to scan teams per request. The upsert in
+    insert_event_data keeps these (COALESCE) until TBA sends real coordinates.
+    """
+    with _pooled_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            WITH src AS (
+                SELECT DISTINCT ON (loc) loc, lat, lng
+                FROM (
+                    SELECT {_LOC_KEY_SQL.format(t='ev')} AS loc, ev.lat, ev.lng, 0 AS pri
+                    FROM events ev
+                    WHERE ev.lat IS NOT NULL AND ev.lng IS NOT NULL
+                    UNION ALL
+                    SELECT {_LOC_KEY_SQL.format(t='tm')} AS loc, tm.lat, tm.lng, 1 AS pri
+                    FROM teams tm
+                    WHERE tm.lat IS NOT NULL AND tm.lng IS NOT NULL
+                ) peers
+                WHERE loc <> '||'
+                ORDER BY loc, pri
+            )
+            UPDATE events e
+            SET lat = src.lat, lng = src.lng
+            FROM src
+            WHERE (e.lat IS NULL OR e.lng IS NULL)
+              AND e.year = %s
+              AND src.loc = {_LOC_KEY_SQL.format(t='e')}
+            """,
+            (int(year),),
+        )
+        filled = cur.rowcount or 0
+        conn.commit()
+        cur.close()
+    if filled:
+        print(f"  filled coordinates for {filled} {year} event(s) from same-city peers")
+    return filled
 
 def insert_event_data(results, year):
     # Insert only the changed data into PostgreSQL
     conn = get_pg_connection()
-    ensure_location_columns(conn)
     cur = conn.cursor()
+    match_events = []
     
     for result in tqdm(results, desc="Updating changed data"):
         if not result["has_changes"]:
@@ -1810,9 +1964,9 @@ def insert_event_data(results, year):
                     event_key, name, start_date, end_date, event_type,
                     district_key, district_abbrev, district_name,
                     city, state_prov, country, website, webcast_type, webcast_channel, week,
-                    lat, lng, postal_code
+                    lat, lng, postal_code, year
                 )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 ON CONFLICT (event_key) DO UPDATE SET
                     name = EXCLUDED.name,
                     start_date = EXCLUDED.start_date,
@@ -1830,8 +1984,10 @@ def insert_event_data(results, year):
                     week = EXCLUDED.week,
                     lat = COALESCE(EXCLUDED.lat, events.lat),
                     lng = COALESCE(EXCLUDED.lng, events.lng),
-                    postal_code = COALESCE(NULLIF(EXCLUDED.postal_code, ''), events.postal_code)
-            """, data["event"])
+                    postal_code = COALESCE(NULLIF(EXCLUDED.postal_code, ''), events.postal_code),
+                    year = EXCLUDED.year
+            """, tuple(data["event"]) + (season_of(data["event"][0]),))
+            instrumentation.incr("rows.events_written")
         
         # Update event_teams if the roster/profile snapshot changed
         if updates["teams"]:
@@ -1840,9 +1996,9 @@ def insert_event_data(results, year):
             else:
                 cur.execute("DELETE FROM event_teams WHERE event_key = %s", (data["event"][0],))
                 cur.executemany("""
-                    INSERT INTO event_teams (event_key, team_number, nickname, city, state_prov, country)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                """, [team[:6] for team in valid_teams])
+                    INSERT INTO event_teams (event_key, team_number, nickname, city, state_prov, country, year)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, [tuple(team[:6]) + (season_of(team[0]),) for team in valid_teams])
                 cur.executemany(
                     """
                     UPDATE teams
@@ -1851,6 +2007,7 @@ def insert_event_data(results, year):
                     """,
                     [(team[6], team[1]) for team in valid_teams if len(team) > 6],
                 )
+                instrumentation.incr("rows.event_teams_written", len(valid_teams))
         
         # Update matches if needed
         if updates["matches"] and data["matches"]:
@@ -1868,27 +2025,34 @@ def insert_event_data(results, year):
             )
             preserved_probs = {r[0]: (r[1], r[2]) for r in cur.fetchall()}
             cur.execute("DELETE FROM event_matches WHERE event_key = %s", (event_key,))
+            match_year = season_of(event_key)
             rows_with_probs = [
-                row + preserved_probs.get(row[0], (None, None)) for row in data["matches"]
+                tuple(row) + preserved_probs.get(row[0], (None, None)) + (match_year,)
+                for row in data["matches"]
             ]
             cur.executemany(
                 """
                 INSERT INTO event_matches (
                     match_key, event_key, comp_level, match_number, set_number,
                     red_teams, blue_teams, red_score, blue_score, winning_alliance,
-                    youtube_key, predicted_time, red_win_prob, blue_win_prob
+                    youtube_key, predicted_time, red_win_prob, blue_win_prob, year
                 )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 """,
                 rows_with_probs,
             )
+            instrumentation.incr("rows.event_matches_written", len(rows_with_probs))
+            match_events.append(event_key)
     
+    notify_event_updates(cur, "matches", match_events)
     conn.commit()
     cur.close()
     conn.close()
 
 
-def fetch_and_store_team_data(year, active_only=False, sample_fraction: Optional[float] = None):
+def fetch_and_store_team_data(
+    year, active_only=False, sample_fraction: Optional[float] = None, resume: bool = False
+):
     """
     Fetch and store team EPA data. Uses a Postgres advisory lock so only one pipeline
     runs at a time across scheduler one-off dynos; if another run holds the lock, exit.
@@ -1902,19 +2066,12 @@ def fetch_and_store_team_data(year, active_only=False, sample_fraction: Optional
     sample_fraction (e.g. 0.1): stratified ~N% of teams across ACE levels for fast
     local iteration. Skips global ranks/predictions so a partial write cannot distort
     the full leaderboard.
+
+    Full runs checkpoint each phase (see checkpoint.py); resume=True loads the
+    last interrupted run's checkpoints and skips completed phases and teams.
     """
-    lock_conn = get_pg_connection()
-    cur = lock_conn.cursor()
-    cur.execute(
-        "SELECT pg_try_advisory_lock(%s, %s)",
-        (_PIPELINE_ADV_LOCK_KEY1, _PIPELINE_ADV_LOCK_KEY2),
-    )
-    locked = bool(cur.fetchone()[0])
-    cur.close()
-    if not locked:
-        if lock_conn in active_connections:
-            active_connections.remove(lock_conn)
-        lock_conn.close()
+    lock_conn = acquire_pipeline_lock()
+    if lock_conn is None:
         print(
             "[pipeline] Another EPA pipeline run is in progress; exiting so schedulers "
             "do not overlap (increase interval or shorten the job if this happens often).",
@@ -1928,29 +2085,50 @@ def fetch_and_store_team_data(year, active_only=False, sample_fraction: Optional
 
     try:
         _fetch_and_store_team_data_impl(
-            year, active_only=active_only, sample_fraction=sample_fraction
+            year, active_only=active_only, sample_fraction=sample_fraction, resume=resume
         )
     finally:
         _release_pipeline_lock(lock_conn)
 
 
 def _fetch_and_store_team_data_impl(
-    year, active_only=False, sample_fraction: Optional[float] = None
+    year,
+    active_only=False,
+    sample_fraction: Optional[float] = None,
+    scope: Optional[dict] = None,
+    warm: bool = False,
+    resume: bool = False,
+    restart_app: bool = True,
 ):
-    # Fetch and store team data, only updating what's changed
+    # Fetch and store team data, only updating what's changed.
+    #
+    # scope: a precomputed get_active_scope()-shaped dict (implies active_only).
+    # warm: the caller (live_daemon.py) keeps match_cache current and has already
+    # written changed matches, so skip create_event_db and keep the static
+    # per-season caches; only ACE-derived state is rebuilt. Derived tables
+    # (h2h index, predictor pool, rating series) and the app restart are left to
+    # the caller's slower cadence.
+    # resume: skip phases / teams an interrupted full run already checkpointed.
+    # restart_app: False skips the closing app restart (live_daemon.py's full
+    # recompute, which would otherwise drop every /live stream).
     global match_cache
-    match_cache.clear()  # Clear cache for new year
+    if not warm:
+        match_cache.clear()  # Clear cache for new year
+        TEAM_KEYS.clear()
     _pre_match_ratings_by_match.clear()
     _carry_priors_snapshot.clear()
     with _event_epa_lock:
         _event_epa_cache.clear()
     # Clear per-run memoization caches (mirrors match_cache) so a re-run in the
     # same process never serves stale team/event values.
-    _team_experience_cache.clear()
     _team_played_events_cache.clear()
-    _event_start_date_cache.clear()
-    _event_week_cache.clear()
-    _season_bounds_cache.clear()
+    if not warm:
+        _team_experience_cache.clear()
+        _event_start_date_cache.clear()
+        _event_week_cache.clear()
+        _season_bounds_cache.clear()
+    if scope is not None:
+        active_only = True
 
     sample_mode = sample_fraction is not None and float(sample_fraction) < 0.999
 
@@ -1960,7 +2138,8 @@ def _fetch_and_store_team_data_impl(
     active_team_numbers = None
     only_event_keys = None
     if active_only:
-        scope = get_active_scope(year)
+        if scope is None:
+            scope = get_active_scope(year)
         active_events = scope["active_events"]
         active_team_numbers = scope["active_teams"]
         only_event_keys = scope["needed_events"]
@@ -1975,10 +2154,19 @@ def _fetch_and_store_team_data_impl(
         if not active_team_numbers:
             # Active events exist but no registered teams yet: refresh those events
             # (schedules/scores) but there is nothing to recompute.
-            create_event_db(year, only_event_keys=only_event_keys)
+            if not warm:
+                with instrumentation.phase("create_event_db", year=year):
+                    create_event_db(year, only_event_keys=only_event_keys)
             print("No active teams registered yet; refreshed active events only.")
             return
 
+    # Only full recomputes checkpoint: active-only scopes move between runs and
+    # warm / sample runs are short.
+    ckpt = _run_checkpoint(year, resume, enabled=not (warm or active_only or sample_mode))
+    if ckpt.done("done"):
+        print(f"Resume: {year} already completed by a previous run; skipping.", flush=True)
+        return
+
     # Sample mode resolves the team list before event fetch so we only pull their events.
     all_teams = get_teams_for_year(year)
     if active_only:
@@ -1993,7 +2181,20 @@ def _fetch_and_store_team_data_impl(
             f"{len(only_event_keys)} event(s) to fetch."
         )
 
-    create_event_db(year, only_event_keys=only_event_keys)
+    if not warm:
+        resumed_events = ckpt.load("events")
+        if resumed_events:
+            match_cache.update(resumed_events)
+            print(
+                f"Resume: {len(resumed_events)} event(s) of TBA matches from checkpoint; "
+                f"skipping event fetch.",
+                flush=True,
+            )
+        else:
+            with instrumentation.phase("create_event_db", year=year):
+                create_event_db(year, only_event_keys=only_event_keys)
+            if match_cache and not shutdown_event.is_set():
+                ckpt.save("events", _events_checkpoint_payload())
     
     if shutdown_event.is_set():
         print("Shutdown requested, stopping team data processing...")
@@ -2004,11 +2205,19 @@ def _fetch_and_store_team_data_impl(
     # dict lookups instead of two identical DB reads per event. This reads every
     # event of the season (cheap single query) so active teams' PAST events still
     # get correct chronological weights during an active-only run.
-    preload_event_metadata(year)
+    with instrumentation.phase("preload_event_metadata", year=year):
+        preload_event_metadata(year)
 
     # One chronological simulation pass over match_cache (applies K/shrink/spike
     # and optional cross-event priors before per-team aggregation).
-    precompute_season_event_epas(year)
+    resumed_precompute = ckpt.load("precompute")
+    if resumed_precompute:
+        _restore_precompute_checkpoint(resumed_precompute, year)
+    else:
+        with instrumentation.phase("precompute_season_event_epas", year=year):
+            precompute_season_event_epas(year)
+        if match_cache and not shutdown_event.is_set():
+            ckpt.save("precompute", _precompute_checkpoint_payload())
 
     # Event + precompute phases share the pool; recycle it before thousands of
     # team tasks so a leaked checkout cannot poison the hot loop.
@@ -2016,6 +2225,16 @@ def _fetch_and_store_team_data_impl(
 
     print(f"\nProcessing year {year} teams...")
 
+    done_teams = ckpt.completed_teams()
+    if done_teams:
+        before = len(all_teams)
+        all_teams = [t for t in all_teams if t["team_number"] not in done_teams]
+        print(
+            f"Resume: {before - len(all_teams)} team(s) already written, "
+            f"{len(all_teams)} left.",
+            flush=True,
+        )
+
     if active_only and not sample_mode:
         print(f"Total active teams to process: {len(all_teams)}")
     elif sample_mode:
@@ -2028,13 +2247,18 @@ def _fetch_and_store_team_data_impl(
             return None
         
         team_number = team["team_number"]
-        
+        with instrumentation.span("team.process", team_number=team_number):
+            return _process_team(team, team_number)
+
+    def _process_team(team, team_number):
         # Get existing ACEdata for comparison
-        existing_epa = get_existing_team_epa(team_number, year)
+        with instrumentation.span("team.read_existing"):
+            existing_epa = get_existing_team_epa(team_number, year)
         
         # Fetch new EPA data
         try:
-            new_epa_data = fetch_team_components(team, year)
+            with instrumentation.span("team.compute"):
+                new_epa_data = fetch_team_components(team, year)
         except Exception as e:
             print(f"FATAL ERROR in fetch_team_components for team {team_number}: {e}")
             traceback.print_exc()
@@ -2045,15 +2269,19 @@ def _fetch_and_store_team_data_impl(
             return None
         
         # Always upsert team profile data
-        upsert_team_profile(new_epa_data)
+        with instrumentation.span("team.upsert_profile"):
+            upsert_team_profile(new_epa_data)
 
         # Check if EPA data has changed
         if not data_has_changed(existing_epa, new_epa_data, "team_epa"):
+            instrumentation.incr("rows.team_epas_skipped")
             return {"team_number": team_number, "updated": False, "reason": "No changes"}
 
         # Write in the worker so the main result loop never borrows a 7th pool slot
         # while up to _PIPELINE_WORKERS tasks are still in flight.
-        insert_team_epa(new_epa_data, year)
+        with instrumentation.span("team.write"):
+            insert_team_epa(new_epa_data, year)
+        instrumentation.incr("rows.team_epas_written")
         return {"team_number": team_number, "updated": True}
 
     updated_count = 0
@@ -2061,51 +2289,55 @@ def _fetch_and_store_team_data_impl(
     failed_teams = []
     executor = None
     
-    try:
-        executor = ThreadPoolExecutor(max_workers=_PIPELINE_WORKERS)
-        active_executors.append(executor)
+    with instrumentation.phase("team_aggregation", year=year, teams=len(all_teams)):
+        try:
+            executor = ThreadPoolExecutor(max_workers=_PIPELINE_WORKERS)
+            active_executors.append(executor)
         
-        future_to_team = {
-            executor.submit(fetch_and_compare_team, team): team.get("team_number")
-            for team in all_teams
-        }
-
-        for future in tqdm(
-            concurrent.futures.as_completed(future_to_team),
-            total=len(future_to_team),
-            desc="Analyzing team changes",
-        ):
-            if shutdown_event.is_set():
-                print("Shutdown requested, stopping team analysis...")
-                break
+            future_to_team = {
+                executor.submit(fetch_and_compare_team, team): team.get("team_number")
+                for team in all_teams
+            }
 
-            team_number = future_to_team.get(future)
-            team_info = f"Team {team_number}" if team_number is not None else "Unknown team"
+            for future in tqdm(
+                concurrent.futures.as_completed(future_to_team),
+                total=len(future_to_team),
+                desc="Analyzing team changes",
+            ):
+                if shutdown_event.is_set():
+                    print("Shutdown requested, stopping team analysis...")
+                    break
 
-            try:
-                result = future.result()
-                if result is None:
-                    failed_teams.append(f"{team_info} (result was None)")
-                elif result["updated"]:
-                    updated_count += 1
-                else:
-                    skipped_count += 1
+                team_number = future_to_team.get(future)
+                team_info = f"Team {team_number}" if team_number is not None else "Unknown team"
 
-                if (updated_count + skipped_count) % 100 == 0:
-                    print(
-                        f"Processed {updated_count + skipped_count} teams "
-                        f"(updated: {updated_count}, skipped: {skipped_count})..."
-                    )
+                try:
+                    result = future.result()
+                    if result is None:
+                        failed_teams.append(f"{team_info} (result was None)")
+                    elif result["updated"]:
+                        updated_count += 1
+                    else:
+                        skipped_count += 1
+                    if result is not None:
+                        ckpt.team_done(team_number)
+
+                    if (updated_count + skipped_count) % 100 == 0:
+                        print(
+                            f"Processed {updated_count + skipped_count} teams "
+                            f"(updated: {updated_count}, skipped: {skipped_count})..."
+                        )
 
-            except Exception as e:
-                failed_teams.append(f"{team_info}: {str(e)}")
-                print(f"Failed to process {team_info}: {e}")
-                continue
-    finally:
-        if executor:
-            cleanup_executor(executor)
-            if executor in active_executors:
-                active_executors.remove(executor)
+                except Exception as e:
+                    failed_teams.append(f"{team_info}: {str(e)}")
+                    print(f"Failed to process {team_info}: {e}")
+                    continue
+        finally:
+            if executor:
+                cleanup_executor(executor)
+                if executor in active_executors:
+                    active_executors.remove(executor)
+            ckpt.flush_teams()
     
     if shutdown_event.is_set():
         print("Shutdown requested, stopping team data update...")
@@ -2113,18 +2345,29 @@ def _fetch_and_store_team_data_impl(
 
     if not shutdown_event.is_set() and not sample_mode:
         try:
-            compute_and_store_team_epa_ranks(year)
+            _run_checkpointed_phase(ckpt, "ranks", year, compute_and_store_team_epa_ranks)
         except Exception as e:
             print(f"Failed to compute/store team ACE ranks for {year}: {e}")
             traceback.print_exc()
     elif sample_mode:
         print("Sample mode: skipping full-season ranks refresh.")
+
+    # Full-season derived tables are rebuilt by full runs only: an active-only
+    # tick (cron, every 30 min in season) would DELETE and reinsert them each time.
+    rebuild_derived = not (warm or active_only)
+    if not shutdown_event.is_set() and not sample_mode and rebuild_derived:
+        try:
+            _run_checkpointed_phase(ckpt, "h2h_index", year, store_h2h_index)
+        except Exception as e:
+            print(f"Failed to rebuild head-to-head index for {year}: {e}")
+            traceback.print_exc()
     
     print(f"\nTeam Update Summary for {year}:")
     print(f"  Total teams processed: {len(all_teams)}")
     print(f"  Teams updated: {updated_count}")
     print(f"  Teams skipped (no changes): {skipped_count}")
     print(f"  Teams failed: {len(failed_teams)}")
+    instrumentation.incr("rows.team_epas_failed", len(failed_teams))
     
     if failed_teams:
         print(f"Failed to process {len(failed_teams)} teams:")
@@ -2136,16 +2379,165 @@ def _fetch_and_store_team_data_impl(
     # Match predictions + Heroku restart (in-memory app cache; see restart_heroku_app).
     if not shutdown_event.is_set() and not sample_mode:
         try:
-            calculate_and_store_match_predictions(year)
+            _run_checkpointed_phase(ckpt, "predictions", year, calculate_and_store_match_predictions)
         except Exception as e:
             print(f"Failed to calculate match predictions for {year}: {e}")
-        finally:
-            # Runs after predictions success or exception; not reached if we returned early above
-            # (e.g. shutdown) or if this process never got the pipeline lock in fetch_and_store_team_data.
+        # Each derived phase fails on its own, like h2h_index above.
+        derived_phases = (
+            (("predictor_pool", store_predictor_pool),
+             ("rating_series", store_rating_series),
+             ("playoff_odds", store_playoff_odds))
+            if rebuild_derived else ()
+        )
+        for stage, step in derived_phases:
+            if shutdown_event.is_set():
+                break
+            try:
+                _run_checkpointed_phase(ckpt, stage, year, step)
+            except Exception as e:
+                print(f"Failed to rebuild {stage} for {year}: {e}")
+                traceback.print_exc()
+        if active_only and not warm and not shutdown_event.is_set():
+            # Only the active events' brackets can have moved since the last full run.
+            try:
+                with instrumentation.phase("playoff_odds", year=year):
+                    store_event_playoff_odds(active_events)
+            except Exception as e:
+                print(f"Failed to refresh playoff odds for {year}: {e}")
+                traceback.print_exc()
+        # Not reached if we returned early above (e.g. shutdown) or if this
+        # process never got the pipeline lock in fetch_and_store_team_data.
+        if not warm and restart_app:
             restart_heroku_app()
     elif sample_mode:
         print("Sample mode: skipping match predictions + app restart.")
 
+    if not shutdown_event.is_set() and all(ckpt.done(s) for s in _CHECKPOINT_STAGES):
+        ckpt.finish()
+
+
+# Stages a full run must complete before its checkpoints are dropped (teams
+# are tracked separately; failed teams are simply retried by the next run).
+_CHECKPOINT_STAGES = (
+    "events",
+    "precompute",
+    "ranks",
+    "h2h_index",
+    "predictions",
+    "predictor_pool",
+    "rating_series",
+    "playoff_odds",
+)
+
+
+def _run_checkpoint(year, resume: bool, enabled: bool) -> RunCheckpoint:
+    """Checkpoint for a full recompute of ``year``, keyed to the ACE / prediction settings."""
+    ckpt = RunCheckpoint(
+        f"run:{int(year)}",
+        checkpoint_config_key(
+            _ACE_METHOD, _ACE_K_BASE, _ACE_SHRINK, _ACE_SPIKE_DAMP, _ACE_K_UP, _ACE_K_DOWN,
+            _ACE_PARTNER_CAP, _ACE_CARRY_PRIOR, _ACE_PRIOR_BLEND, CONFIDENCE_CEILING,
+            PredictionConfig.from_env(),
+        ),
+        get_pg_connection,
+        resume=resume,
+        enabled=enabled,
+    )
+    ckpt.open()
+    return ckpt
+
+
+def _run_checkpointed_phase(ckpt: RunCheckpoint, stage: str, year, fn) -> None:
+    """Run ``fn(year)`` as phase ``stage`` unless a resumed checkpoint says it already ran."""
+    if ckpt.done(stage):
+        print(f"Resume: {stage} already complete for {year}; skipping.", flush=True)
+        return
+    with instrumentation.phase(stage, year=year):
+        fn(year)
+    if not shutdown_event.is_set():
+        ckpt.save(stage)
+
+
+def _events_checkpoint_payload() -> dict:
+    """match_cache as TBA sent it, without the per-process ``_ace_*`` caches on each match."""
+    return {
+        ek: [{k: v for k, v in m.items() if not k.startswith("_")} for m in matches or []]
+        for ek, matches in match_cache.items()
+    }
+
+
+def _precompute_checkpoint_payload() -> dict:
+    # Slots are per-process, so the checkpoint is keyed by TBA team key
+    # (JSON: string keys; restored below).
+    with _event_epa_lock:
+        event_epa = {ck: TEAM_KEYS.keyed(epa_map) for ck, epa_map in _event_epa_cache.items()}
+    return {
+        "event_epa": event_epa,
+        "carry_priors": TEAM_KEYS.keyed(_carry_priors_snapshot),
+        "pre_match": dict(_pre_match_ratings_by_match),
+    }
+
+
+def _restore_precompute_checkpoint(payload: dict, year: int) -> None:
+    """Load precompute_season_event_epas' outputs instead of re-simulating the season."""
+    with _event_epa_lock:
+        for ck, epa_map in (payload.get("event_epa") or {}).items():
+            _event_epa_cache[ck] = TEAM_KEYS.slotted(epa_map)
+    for key, prior in (payload.get("carry_priors") or {}).items():
+        _carry_priors_snapshot[TEAM_KEYS.slot(key)] = tuple(prior)
+    for match_key, row in (payload.get("pre_match") or {}).items():
+        _pre_match_ratings_by_match[match_key] = {int(tn): team for tn, team in row.items()}
+    # The per-team pass and tail walk-forward read these lookups, which
+    # precompute would otherwise have warmed.
+    preload_confidence_lookups_from_match_cache(year)
+    intern_season(match_cache)
+    print(
+        f"Resume: {len(_event_epa_cache)} event EPA map(s), "
+        f"{len(_pre_match_ratings_by_match)} pre-match snapshot(s) from checkpoint; "
+        f"skipping precompute.",
+        flush=True,
+    )
+
+def store_h2h_index(year: int):
+    """Rebuild the season's head-to-head pair index (see h2h_index.py) on its own connection."""
+    conn = get_pg_connection()
+    try:
+        rebuild_h2h_index(conn, year)
+    finally:
+        conn.close()
+
+def store_predictor_pool(year: int):
+    """Rebuild the season's Match Predictor pool (see predictor_pool.py) on its own connection."""
+    conn = get_pg_connection()
+    try:
+        rebuild_predictor_pool(conn, year)
+    finally:
+        conn.close()
+
+def store_rating_series(year: int):
+    """Rebuild the season's per-team ACE series (see rating_series.py) on its own connection."""
+    conn = get_pg_connection()
+    try:
+        rebuild_rating_series(conn, year)
+    finally:
+        conn.close()
+
+def store_playoff_odds(year: int):
+    """Recompute the season's playoff bracket odds (see playoff_bracket.py) on its own connection."""
+    conn = get_pg_connection()
+    try:
+        rebuild_playoff_odds(conn, year)
+    finally:
+        conn.close()
+
+def store_event_playoff_odds(event_keys) -> None:
+    """Playoff odds for just ``event_keys`` (active-only runs) on its own connection."""
+    conn = get_pg_connection()
+    try:
+        refresh_playoff_odds(conn, event_keys)
+    finally:
+        conn.close()
+
 def get_team_experience(team_number: int, up_to_year: int) -> int:
     # Determine how many years a team has competed up to and including up_to_year.
     # Constant within a run for a given (team, year); memoized so the two identical
@@ -2206,26 +2598,6 @@ def calculate_confidence(consistency: float, dominance: float, event_boost: floa
     capped_confidence = max(0.0, min(1.0, raw_confidence / ceiling))
     return raw_confidence, capped_confidence, record_alignment
 
-def _ensure_prediction_score_columns() -> None:
-    """Add prediction columns if missing (idempotent)."""
-    conn = get_pg_connection()
-    cur = conn.cursor()
-    try:
-        cur.execute(
-            """
-            ALTER TABLE event_matches
-            ADD COLUMN IF NOT EXISTS red_predicted_score DOUBLE PRECISION,
-            ADD COLUMN IF NOT EXISTS blue_predicted_score DOUBLE PRECISION,
-            ADD COLUMN IF NOT EXISTS pre_match_teams JSONB
-            """
-        )
-        conn.commit()
-    finally:
-        cur.close()
-        conn.close()
-
-
-
 def parse_tba_team_number(team_key) -> Optional[int]:
     """
     Parse a TBA team key/token into a team number.
@@ -2338,12 +2710,12 @@ def calculate_and_store_match_predictions(year: int):
     if shutdown_event.is_set():
         return
 
-    _ensure_prediction_score_columns()
     config = PredictionConfig.from_env()
 
     conn = get_pg_connection()
     try:
-        data = load_prediction_data_from_db(conn, year)
+        with instrumentation.span("predictions.load"):
+            data = load_prediction_data_from_db(conn, year)
     finally:
         conn.close()
 
@@ -2390,17 +2762,19 @@ def calculate_and_store_match_predictions(year: int):
             preload_confidence_lookups_from_match_cache(year)
 
         ace_params = AceParams.from_env()
-        predictions = predict_all_matches_walk_forward(
-            data,
-            matches_by_event,
-            config,
-            ace_params,
-            finalize_pre_match_team,
-            precomputed_ratings=_pre_match_ratings_by_match,
-            initial_priors=_carry_priors_snapshot if _ACE_CARRY_PRIOR else None,
-        )
+        with instrumentation.span("predictions.compute", scope="pre_match"):
+            predictions = predict_all_matches_walk_forward(
+                data,
+                matches_by_event,
+                config,
+                ace_params,
+                finalize_pre_match_team,
+                precomputed_ratings=_pre_match_ratings_by_match,
+                initial_priors=_carry_priors_snapshot if _ACE_CARRY_PRIOR else None,
+            )
     else:
-        predictions = predict_all_matches_db(data, config)
+        with instrumentation.span("predictions.compute", scope=config.rating_scope):
+            predictions = predict_all_matches_db(data, config)
 
     print(
         f"Match predictions {year}: applying {len(predictions)} computed prediction(s)...",
@@ -2408,9 +2782,15 @@ def calculate_and_store_match_predictions(year: int):
     )
     conn = get_pg_connection()
     try:
-        stats = apply_match_predictions_to_db(conn, year, predictions)
+        with instrumentation.span("predictions.write"):
+            stats = apply_match_predictions_to_db(conn, year, predictions)
     finally:
         conn.close()
+    instrumentation.incr("rows.predictions_written", stats["written"])
+    instrumentation.incr(
+        "rows.predictions_skipped",
+        stats["skipped_unchanged"] + stats["skipped_missing"] + stats["skipped_bad"],
+    )
 
     print(
         f"Match predictions {year}: wrote {stats['written']} of {stats['computed']} computed "
@@ -2555,10 +2935,9 @@ def preload_confidence_lookups_from_match_cache(year: int) -> None:
                 continue
             for color in ("red", "blue"):
                 for key in (match.get("alliances") or {}).get(color, {}).get("team_keys") or []:
-                    digits = "".join(ch for ch in str(key) if ch.isdigit())
-                    if not digits:
+                    tn = TEAM_KEYS.number(key)
+                    if not tn:
                         continue
-                    tn = int(digits)
                     played.setdefault(tn, set()).add(ek)
 
     with _team_played_events_lock:
@@ -2597,13 +2976,14 @@ def preload_confidence_lookups_from_match_cache(year: int) -> None:
                 _team_experience_cache[key] = 1
 
 
-def _get_or_compute_event_epa_map(matches: List[Dict], year: int, method: Method) -> Dict[str, dict]:
+def _get_or_compute_event_epa_map(matches: List[Dict], year: int, method: Method) -> Dict[int, dict]:
     event_key = _event_key_from_matches(matches) or f"unknown-{id(matches)}"
     cache_key = f"{event_key}::{method}"
     with _event_epa_lock:
         cached = _event_epa_cache.get(cache_key)
-        if cached is not None:
-            return cached
+    instrumentation.cache_lookup("event_epa", cached is not None)
+    if cached is not None:
+        return cached
 
     states = simulate_event(
         matches,
@@ -2618,11 +2998,9 @@ def _get_or_compute_event_epa_map(matches: List[Dict], year: int, method: Method
         k_down=_ACE_K_DOWN,
         partner_cap=_ACE_PARTNER_CAP,
     )
-    out: Dict[str, dict] = {}
-    for key, st in states.items():
-        digits = "".join(ch for ch in str(key) if ch.isdigit())
-        tn = int(digits) if digits else 0
-        out[key] = _finalize_state_to_event_epa(st, key, tn, year)
+    out: Dict[int, dict] = {}
+    for slot, st in states.items():
+        out[slot] = _finalize_state_to_event_epa(st, TEAM_KEYS.keys[slot], TEAM_KEYS.numbers[slot], year)
 
     with _event_epa_lock:
         _event_epa_cache[cache_key] = out
@@ -2662,13 +3040,20 @@ def precompute_season_event_epas(year: int) -> None:
         flush=True,
     )
     preload_confidence_lookups_from_match_cache(year)
+    # Intern team keys and parse every score_breakdown once; the walks below
+    # and the walk-forward predictions share the keys and read the stored
+    # phase totals.
+    with instrumentation.span("ace.intern_team_keys", events=len(match_cache)):
+        instrumentation.incr("ace.team_keys_interned", intern_season(match_cache))
+    with instrumentation.span("ace.extract_phases", events=len(match_cache)):
+        instrumentation.incr("ace.phases_extracted", extract_season_phases(match_cache, int(year)))
 
     def _start(ek: str) -> str:
         sd = _event_start_date_cache.get(ek)
         return str(sd) if sd else ""
 
     event_keys = sorted(match_cache.keys(), key=lambda ek: (_start(ek), ek))
-    priors: Dict[str, Tuple[float, ...]] = {}
+    priors: Dict[int, Tuple[float, ...]] = {}
     if _ACE_CARRY_PRIOR:
         conn = get_pg_connection()
         try:
@@ -2704,23 +3089,24 @@ def precompute_season_event_epas(year: int) -> None:
         cache_key = f"{ek}::{_ACE_METHOD}"
         with _event_epa_lock:
             if cache_key in _event_epa_cache:
+                instrumentation.cache_lookup("event_epa", True)
                 if _ACE_CARRY_PRIOR:
-                    for key, epa in _event_epa_cache[cache_key].items():
+                    for slot, epa in _event_epa_cache[cache_key].items():
                         new = _carry_prior_from_epa(epa)
                         if new is None:
                             continue
-                        priors[key] = merge_carry_prior(
-                            priors.get(key), new, _ACE_PRIOR_BLEND
+                        priors[slot] = merge_carry_prior(
+                            priors.get(slot), new, _ACE_PRIOR_BLEND
                         )
                 continue
+        instrumentation.cache_lookup("event_epa", False)
 
         if use_pre_match:
             states, snapshots = simulate_event_pre_match_snapshots(matches, **sim_kwargs)
             for match_key, team_states in snapshots.items():
                 row: Dict[int, dict] = {}
-                for team_key, st in team_states.items():
-                    digits = "".join(ch for ch in str(team_key) if ch.isdigit())
-                    tn = int(digits) if digits else 0
+                for slot, st in team_states.items():
+                    tn = TEAM_KEYS.numbers[slot]
                     if tn <= 0:
                         continue
                     if not st.initialized and st.match_count <= 0:
@@ -2730,18 +3116,18 @@ def precompute_season_event_epas(year: int) -> None:
                     _pre_match_ratings_by_match[match_key] = row
         else:
             states = simulate_event(matches, **sim_kwargs)
-        out: Dict[str, dict] = {}
-        for key, st in states.items():
-            digits = "".join(ch for ch in str(key) if ch.isdigit())
-            tn = int(digits) if digits else 0
-            out[key] = _finalize_state_to_event_epa(st, key, tn, int(year))
+        out: Dict[int, dict] = {}
+        for slot, st in states.items():
+            out[slot] = _finalize_state_to_event_epa(
+                st, TEAM_KEYS.keys[slot], TEAM_KEYS.numbers[slot], int(year)
+            )
             if _ACE_CARRY_PRIOR and st.initialized and st.match_count > 0:
                 new = _carry_prior_from_phases(
-                    st.auto, st.teleop, st.endgame, out[key].get("confidence")
+                    st.auto, st.teleop, st.endgame, out[slot].get("confidence")
                 )
                 if new is not None:
-                    priors[key] = merge_carry_prior(
-                        priors.get(key), new, _ACE_PRIOR_BLEND
+                    priors[slot] = merge_carry_prior(
+                        priors.get(slot), new, _ACE_PRIOR_BLEND
                     )
         with _event_epa_lock:
             _event_epa_cache[cache_key] = out
@@ -2780,10 +3166,11 @@ def calculate_event_epa(matches: List[Dict], team_key: str, team_number: int) ->
             year_int = 2025
 
         epa_map = _get_or_compute_event_epa_map(matches, year_int, _ACE_METHOD)
-        result = epa_map.get(team_key)
+        slot = TEAM_KEYS.find(team_key)
+        result = epa_map.get(slot) if slot is not None else None
         if result is None:
-            alt = f"frc{team_number}"
-            result = epa_map.get(alt)
+            alt = TEAM_KEYS.find(f"frc{team_number}")
+            result = epa_map.get(alt) if alt is not None else None
         return result or _empty_event_epa()
     except Exception as e:
         print(f"EPA FATAL ERROR for team {team_key}: {e}")
@@ -3206,6 +3593,7 @@ def finalize():
         cleanup_connection(conn)
     _close_db_pool()
     print("Cleanup complete.")
+    instrumentation.finish()
     elapsed = time.time() - start_time
     print(f"\nScript runtime: {elapsed:.2f} seconds ({elapsed/60:.2f} minutes)")
 
@@ -3244,12 +3632,23 @@ if __name__ == "__main__":
 
         positional = [a for a in sys.argv[1:] if not a.startswith("--")]
         flags = {a for a in sys.argv[1:] if a.startswith("--")}
+        apply_schema_migrations()
+        if "--migrate" in flags:
+            sys.exit(0)
         ranks_only = "--ranks-only" in flags
         predictions_only = "--predictions-only" in flags
+        h2h_only = "--h2h-only" in flags
         active_only = "--active-only" in flags
+        resume = "--resume" in flags
         sample_fraction = None
+        report_path = None
+        profile_phases = set()
         for a in list(flags):
-            if a.startswith("--sample="):
+            if a.startswith("--report="):
+                report_path = a.split("=", 1)[1]
+            elif a.startswith("--profile="):
+                profile_phases.update(p for p in a.split("=", 1)[1].split(",") if p)
+            elif a.startswith("--sample="):
                 try:
                     sample_fraction = float(a.split("=", 1)[1])
                 except ValueError:
@@ -3258,20 +3657,46 @@ if __name__ == "__main__":
             elif a == "--sample":
                 # Bare flag defaults to 10% stratified sample
                 sample_fraction = 0.1
+        if resume and (active_only or sample_fraction is not None or ranks_only or predictions_only or h2h_only):
+            print("--resume only applies to full recomputes; ignoring it for this run.")
+            resume = False
         if positional:
             try:
                 years = parse_years(*positional)
             except ValueError:
                 print("Year must be an integer or comma-separated list (e.g. 2024,2025,2026).")
                 sys.exit(1)
+            instrumentation.configure(
+                report_path=report_path,
+                profile_phases=profile_phases,
+                years=years,
+                flags=sorted(flags),
+                ace_method=_ACE_METHOD,
+                pipeline_workers=_PIPELINE_WORKERS,
+                db_pool_maxconn=_DB_POOL_MAXCONN,
+            )
             for year in years:
                 if ranks_only:
-                    compute_and_store_team_epa_ranks(year)
+                    with instrumentation.phase("ranks", year=year):
+                        compute_and_store_team_epa_ranks(year)
                 elif predictions_only:
-                    calculate_and_store_match_predictions(year)
+                    with instrumentation.phase("predictions", year=year):
+                        calculate_and_store_match_predictions(year)
+                    with instrumentation.phase("predictor_pool", year=year):
+                        store_predictor_pool(year)
+                    with instrumentation.phase("rating_series", year=year):
+                        store_rating_series(year)
+                    with instrumentation.phase("playoff_odds", year=year):
+                        store_playoff_odds(year)
+                elif h2h_only:
+                    with instrumentation.phase("h2h_index", year=year):
+                        store_h2h_index(year)
                 else:
                     fetch_and_store_team_data(
-                        year, active_only=active_only, sample_fraction=sample_fraction
+                        year,
+                        active_only=active_only,
+                        sample_fraction=sample_fraction,
+                        resume=resume,
                     )
             restart_heroku_app()
         else:
@@ -7,20 +7,10 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from dotenv import load_dotenv
 load_dotenv()
 
-from run import get_pg_connection, tba_get, tba_team_key_is_surrogate, parse_tba_team_number
+from run import apply_schema_migrations, get_pg_connection, tba_get, tba_team_key_is_surrogate, parse_tba_team_number
 from active_events import resolve_event_keys
-
-
-def get_existing_awards(conn, event_key):
-    """Get existing awards for an event from the database."""
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT team_number, award_name FROM event_awards WHERE event_key = %s",
-        (event_key,),
-    )
-    awards = set((row[0], row[1]) for row in cur.fetchall())
-    cur.close()
-    return awards
+from event_refresh import RefreshSpec, refresh_events
+from season_year import season_of
 
 
 def fetch_awards_for_event(event_key):
@@ -38,9 +28,13 @@ def fetch_awards_for_event(event_key):
     if not awards_data:
         # TBA responded but there are genuinely no awards yet.
         return []
+    return award_rows_from_tba(event_key, awards_data)
 
+
+def award_rows_from_tba(event_key, awards_data):
+    """``event_awards`` rows (without year) from a TBA ``event/{key}/awards`` payload."""
     result = []
-    for aw in awards_data:
+    for aw in awards_data or []:
         for r in aw.get("recipient_list", []):
             if r.get("team_key"):
                 team_key = r["team_key"]
@@ -54,89 +48,65 @@ def fetch_awards_for_event(event_key):
     return result
 
 
+def replace_event_awards(cur, event_key, awards):
+    """Swap an event's stored awards for ``awards`` (caller commits)."""
+    cur.execute("DELETE FROM event_awards WHERE event_key = %s", (event_key,))
+    cur.executemany(
+        """
+        INSERT INTO event_awards (event_key, team_number, award_name, year)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (event_key, team_number, award_name) DO NOTHING
+        """,
+        [tuple(award[:3]) + (season_of(event_key),) for award in awards],
+    )
+
+
 def get_events_for_year(conn, year):
     """Get event keys for a year from the database."""
     cur = conn.cursor()
     cur.execute(
-        "SELECT event_key FROM events WHERE event_key LIKE %s",
-        (f"{year}%",),
+        "SELECT event_key FROM events WHERE year = %s",
+        (int(year),),
     )
     event_keys = [row[0] for row in cur.fetchall()]
     cur.close()
     return event_keys
 
 
+def awards_spec():
+    """event_awards keyed by (event_key, team_number, award_name); nothing else to compare."""
+    return RefreshSpec(
+        name="awards",
+        table="event_awards",
+        columns=("event_key", "team_number", "award_name"),
+        key_len=3,
+        fetch=fetch_awards_for_event,
+        on_conflict="ON CONFLICT (event_key, team_number, award_name) DO NOTHING",
+    )
+
+
 def update_awards_for_year(year, active_only=False):
     """Fetch awards for events in a year and update the database.
 
     When active_only is True, only events currently in their competition window
-    are refreshed - the cheap, high-frequency in-season path.
+    are refreshed - the cheap, high-frequency in-season path. Fetching, diffing
+    and the no-wipe rules live in event_refresh.refresh_events.
     """
     print(f"\nFetching awards for {year}{' (active events only)' if active_only else ''}...")
 
     conn = get_pg_connection()
-    event_keys = resolve_event_keys(conn, year, active_only)
-
-    if not event_keys:
-        print(f"No {'active ' if active_only else ''}events found for {year} in database")
+    try:
+        event_keys = resolve_event_keys(conn, year, active_only)
+        if not event_keys:
+            print(f"No {'active ' if active_only else ''}events found for {year} in database")
+            return
+        result = refresh_events(conn, awards_spec(), event_keys)
+    finally:
         conn.close()
-        return
-
-    updated = 0
-    skipped = 0
-
-    for event_key in event_keys:
-        existing = get_existing_awards(conn, event_key)
-        new_awards = fetch_awards_for_event(event_key)
-
-        # Fetch failed (transient TBA error): skip entirely, never wipe.
-        if new_awards is None:
-            print(f"  WARNING: awards fetch failed for {event_key}; skipping to avoid wiping existing data")
-            skipped += 1
-            continue
-
-        # Fetch returned empty but we already have rows: treat as suspicious
-        # (likely a failure that slipped through) and skip rather than wipe.
-        if not new_awards and existing:
-            print(f"  WARNING: awards fetch returned empty for {event_key} which has existing rows; skipping to avoid wiping")
-            skipped += 1
-            continue
-
-        new_set = set((a[1], a[2]) for a in new_awards)
-        if existing == new_set:
-            skipped += 1
-            continue
-
-        # Only reach here when there is new, non-empty data to write. Delete the
-        # old rows and insert the fresh set inside the same branch so we never
-        # delete-then-insert-nothing.
-        seen = set()
-        deduped = []
-        for award in new_awards:
-            key = (award[0], award[1], award[2])
-            if key not in seen:
-                seen.add(key)
-                deduped.append(award)
-
-        cur = conn.cursor()
-        cur.execute("DELETE FROM event_awards WHERE event_key = %s", (event_key,))
-        cur.executemany(
-            """
-            INSERT INTO event_awards (event_key, team_number, award_name)
-            VALUES (%s, %s, %s)
-            ON CONFLICT (event_key, team_number, award_name) DO NOTHING
-            """,
-            deduped,
-        )
-        cur.close()
-        updated += 1
-
-    conn.commit()
-    conn.close()
 
     print(f"\nAwards update complete for {year}:")
-    print(f"  Updated: {updated} events")
-    print(f"  Unchanged: {skipped} events")
+    print(f"  Updated: {result.updated} events")
+    print(f"  Unchanged: {result.unchanged + result.failed} events ({result.failed} skipped on failed/empty fetch)")
 
 
 if __name__ == "__main__":
@@ -156,5 +126,6 @@ if __name__ == "__main__":
         print("Year must be an integer or comma-separated list (e.g. 2024,2025,2026).")
         sys.exit(1)
 
+    apply_schema_migrations()
     for year in years:
         update_awards_for_year(year, active_only=active_only)
@@ -13,20 +13,10 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from dotenv import load_dotenv
 load_dotenv()
 
-from run import get_pg_connection, tba_get, tba_team_key_is_surrogate, parse_tba_team_number
+from run import apply_schema_migrations, get_pg_connection, tba_get, tba_team_key_is_surrogate, parse_tba_team_number
 from active_events import resolve_event_keys
-
-
-def get_existing_rankings(conn, event_key):
-    """Get existing rankings for an event from the database."""
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT team_number, rank, wins, losses, ties, dq FROM event_rankings WHERE event_key = %s",
-        (event_key,),
-    )
-    rankings = {row[0]: {"rank": row[1], "wins": row[2], "losses": row[3], "ties": row[4], "dq": row[5]} for row in cur.fetchall()}
-    cur.close()
-    return rankings or {}
+from event_refresh import RefreshSpec, refresh_events
+from season_year import season_of
 
 
 def fetch_rankings_for_event(event_key, year):
@@ -44,9 +34,13 @@ def fetch_rankings_for_event(event_key, year):
     if not ranks.get("rankings"):
         # TBA responded but there are genuinely no rankings yet.
         return []
+    return ranking_rows_from_tba(event_key, year, ranks)
+
 
+def ranking_rows_from_tba(event_key, year, ranks):
+    """``event_rankings`` rows (without year) from a TBA ``event/{key}/rankings`` payload."""
     result = []
-    for r in ranks.get("rankings", []):
+    for r in (ranks or {}).get("rankings") or []:
         if not isinstance(r, dict):
             continue
         team_key = r.get("team_key", "frc0")
@@ -74,102 +68,79 @@ def fetch_rankings_for_event(event_key, year):
     return result
 
 
-def rankings_changed(existing, new_rankings):
-    """Check if rankings have changed."""
-    existing_team_nums = set(existing.keys())
-    new_team_nums = set(r[1] for r in new_rankings)
-    if existing_team_nums != new_team_nums:
-        return True
-    for row in new_rankings:
-        team_num = row[1]
-        if team_num not in existing:
-            return True
-        ex = existing[team_num]
-        if (ex["rank"] != row[2] or ex["wins"] != row[3] or ex["losses"] != row[4] or
-                ex["ties"] != row[5] or ex["dq"] != row[6]):
-            return True
-    return False
+def replace_event_rankings(cur, event_key, new_rankings):
+    """Swap an event's stored rankings for ``new_rankings`` (caller commits)."""
+    cur.execute("DELETE FROM event_rankings WHERE event_key = %s", (event_key,))
+    cur.executemany(
+        """
+        INSERT INTO event_rankings (event_key, team_number, rank, wins, losses, ties, dq, year)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (event_key, team_number) DO UPDATE SET
+            rank = EXCLUDED.rank,
+            wins = EXCLUDED.wins,
+            losses = EXCLUDED.losses,
+            ties = EXCLUDED.ties,
+            dq = EXCLUDED.dq,
+            year = EXCLUDED.year
+        """,
+        [tuple(r[:7]) + (season_of(event_key),) for r in new_rankings],
+    )
 
 
 def get_events_for_year(conn, year):
     """Get event keys for a year from the database."""
     cur = conn.cursor()
     cur.execute(
-        "SELECT event_key FROM events WHERE event_key LIKE %s",
-        (f"{year}%",),
+        "SELECT event_key FROM events WHERE year = %s",
+        (int(year),),
     )
     event_keys = [row[0] for row in cur.fetchall()]
     cur.close()
     return event_keys
 
 
+def rankings_spec(year):
+    """event_rankings for ``year``'s events, keyed by (event_key, team_number)."""
+    return RefreshSpec(
+        name="rankings",
+        table="event_rankings",
+        columns=("event_key", "team_number", "rank", "wins", "losses", "ties", "dq"),
+        key_len=2,
+        fetch=lambda event_key: fetch_rankings_for_event(event_key, year),
+        on_conflict="""
+            ON CONFLICT (event_key, team_number) DO UPDATE SET
+                rank = EXCLUDED.rank,
+                wins = EXCLUDED.wins,
+                losses = EXCLUDED.losses,
+                ties = EXCLUDED.ties,
+                dq = EXCLUDED.dq,
+                year = EXCLUDED.year
+        """,
+    )
+
+
 def update_rankings_for_year(year, active_only=False):
     """Fetch rankings for events in a year and update the database.
 
     When active_only is True, only events currently in their competition window
-    are refreshed - the cheap, high-frequency in-season path.
+    are refreshed - the cheap, high-frequency in-season path. Fetching, diffing
+    and the no-wipe rules live in event_refresh.refresh_events.
     """
     print(f"\nFetching rankings for {year}{' (active events only)' if active_only else ''}...")
 
     conn = get_pg_connection()
-    event_keys = resolve_event_keys(conn, year, active_only)
-
-    if not event_keys:
-        print(f"No {'active ' if active_only else ''}events found for {year} in database")
+    try:
+        event_keys = resolve_event_keys(conn, year, active_only)
+        if not event_keys:
+            print(f"No {'active ' if active_only else ''}events found for {year} in database")
+            return
+        result = refresh_events(conn, rankings_spec(year), event_keys)
+    finally:
         conn.close()
-        return
-
-    updated = 0
-    skipped = 0
-
-    for event_key in event_keys:
-        existing = get_existing_rankings(conn, event_key)
-        new_rankings = fetch_rankings_for_event(event_key, year)
-
-        # Fetch failed (transient TBA error): skip entirely, never wipe.
-        if new_rankings is None:
-            print(f"  WARNING: rankings fetch failed for {event_key}; skipping to avoid wiping existing data")
-            skipped += 1
-            continue
-
-        # Fetch returned empty but we already have rows: treat as suspicious
-        # (likely a failure that slipped through) and skip rather than wipe.
-        if not new_rankings and existing:
-            print(f"  WARNING: rankings fetch returned empty for {event_key} which has existing rows; skipping to avoid wiping")
-            skipped += 1
-            continue
-
-        if not rankings_changed(existing, new_rankings):
-            skipped += 1
-            continue
-
-        # Only reach here when there is new, non-empty data to write. Delete the
-        # old rows and insert the fresh set inside the same branch so we never
-        # delete-then-insert-nothing.
-        cur = conn.cursor()
-        cur.execute("DELETE FROM event_rankings WHERE event_key = %s", (event_key,))
-        cur.executemany(
-            """
-            INSERT INTO event_rankings (event_key, team_number, rank, wins, losses, ties, dq)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (event_key, team_number) DO UPDATE SET
-                rank = EXCLUDED.rank,
-                wins = EXCLUDED.wins,
-                losses = EXCLUDED.losses,
-                ties = EXCLUDED.ties,
-                dq = EXCLUDED.dq
-            """,
-            new_rankings,
-        )
-        cur.close()
-        updated += 1
-
-    conn.commit()
-    conn.close()
 
     print(f"\nRankings update complete for {year}:")
-    print(f"  Updated: {updated} events")
-    print(f"  Unchanged: {skipped} events")
+    print(f"  Updated: {result.updated} events")
+    print(f"  Unchanged: {result.unchanged + result.failed} events ({result.failed} skipped on failed/empty fetch)")
 
 
 if __name__ == "__main__":
@@ -189,5 +160,6 @@ if __name__ == "__main__":
         print("Year must be an integer or comma-separated list (e.g. 2024,2025,2026).")
         sys.exit(1)
 
+    apply_schema_migrations()
     for year in years:
         update_rankings_for_year(year, active_only=active_only)
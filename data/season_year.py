@@ -0,0 +1,130 @@
+"""
+Season ``year`` column on the event-scoped tables.
+
+Year filters used to be ``LEFT(event_key, 4) = %s`` / ``event_key LIKE '2026%'``
+(and ``EXTRACT(year FROM start_date)`` for events), which Postgres can only
+serve with a sequential scan or a matching expression index. Every event-scoped
+table now carries a plain ``year`` column, written at ingest, with composite
+indexes that lead with it. The columns are added by
+peekorobo-api/migrations/0004_season_year.sql (schema only, since the API
+applies it on boot) and the indexes by 0012_season_year_indexes.sql; this
+module derives the value and fills existing rows in short batches. run.py runs
+that backfill after every migration pass, which is a handful of index probes
+once every row has its year. Deploys run it before the API that filters on
+year goes live (see peekorobo-api/migrate.py); the API logs a warning on boot
+while events still lack a year.
+
+Usage:
+    python data/season_year.py              # apply migrations, backfill NULL years
+    python data/season_year.py --batch=20000
+    python data/season_year.py --check      # report rows still missing a year
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+YEAR_TABLES = ("events", "event_matches", "event_teams", "event_awards", "event_rankings")
+
+# Primary key used to walk each table in backfill batches.
+_BATCH_KEY = {
+    "events": "event_key",
+    "event_matches": "match_key",
+    "event_teams": "ctid",
+    "event_awards": "ctid",
+    "event_rankings": "ctid",
+}
+
+
+def season_of(event_key):
+    """Season year from an event/match key (``2026miket`` -> 2026), or None."""
+    if not event_key:
+        return None
+    head = str(event_key)[:4]
+    return int(head) if head.isdigit() else None
+
+
+def backfill_year(conn, table, batch_size=50000):
+    """Fill NULL ``year`` from the event_key prefix in batches (short transactions)."""
+    key = _BATCH_KEY[table]
+    total = 0
+    cur = conn.cursor()
+    while True:
+        cur.execute(
+            f"""
+            UPDATE {table} SET year = CAST(LEFT(event_key, 4) AS INTEGER)
+            WHERE {key} IN (
+                SELECT {key} FROM {table}
+                WHERE year IS NULL AND event_key ~ '^[0-9]{{4}}'
+                LIMIT %s
+            )
+            """,
+            (batch_size,),
+        )
+        updated = cur.rowcount
+        conn.commit()
+        total += updated
+        if updated < batch_size:
+            break
+        print(f"  {table}: {total} row(s) so far...", flush=True)
+    cur.close()
+    return total
+
+
+def backfill_missing_years(conn, batch_size=50000, log=print):
+    """Backfill every YEAR_TABLES table; ANALYZE the ones that changed. Returns rows filled per table."""
+    filled = {}
+    for table in YEAR_TABLES:
+        filled[table] = backfill_year(conn, table, batch_size=batch_size)
+        if filled[table]:
+            log(f"{table}: backfilled year on {filled[table]} row(s)")
+    changed = [t for t, n in filled.items() if n]
+    if changed:
+        cur = conn.cursor()
+        for table in changed:
+            cur.execute(f"ANALYZE {table}")
+        conn.commit()
+        cur.close()
+    return filled
+
+
+def missing_year_counts(conn):
+    cur = conn.cursor()
+    counts = {}
+    for table in YEAR_TABLES:
+        cur.execute(f"SELECT COUNT(*) FROM {table} WHERE year IS NULL")
+        counts[table] = cur.fetchone()[0]
+    cur.close()
+    return counts
+
+
+def main(argv):
+    from db_connection import get_pg_connection, return_pg_connection
+    from run import apply_schema_migrations
+
+    batch_size = 50000
+    check_only = False
+    for arg in argv:
+        if arg.startswith("--batch="):
+            batch_size = max(1, int(arg.split("=", 1)[1]))
+        elif arg == "--check":
+            check_only = True
+
+    if not check_only:
+        apply_schema_migrations()
+    conn = get_pg_connection()
+    try:
+        if not check_only:
+            backfill_missing_years(conn, batch_size=batch_size, log=lambda msg: print(msg, flush=True))
+        for table, n in missing_year_counts(conn).items():
+            print(f"{table}: {n} row(s) without year")
+    finally:
+        return_pg_connection(conn)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
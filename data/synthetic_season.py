@@ -0,0 +1,1185 @@
+#!/usr/bin/env python3
+"""Synthetic FRC season for scale-testing the pipeline and the API.
+
+Generates a season at 1x / 5x / 20x the size of a real one: teams with
+persistent (and slowly improving) skill, regionals, district events, district
+championships and Championship divisions, 6-robot qualification schedules,
+8-alliance double-elimination playoffs, rankings and awards. Match payloads
+carry the ``score_breakdown`` fields phase_totals.py / yearmodels.py read for
+the chosen game (2024, 2025 or 2026), and totals add up the way TBA's do
+(``totalPoints = autoPoints + teleopPoints + foulPoints``).
+
+Everything is derived from ``--seed`` and the event key, so a given
+(year, scale, seed) produces the same season on every machine. ``--as-of``
+freezes the season mid-week: later matches come back unplayed (score -1, no
+breakdown), rankings only count played quals and awards only exist for
+finished events, which is what a Championship-week rehearsal needs.
+
+Usage:
+    # write TBA-shaped JSON (events/2026.json, event/<key>/matches.json, ...)
+    python data/synthetic_season.py --year 2026 --scale 5 --out data/synthetic/2026x5
+
+    # serve it as a TBA stand-in, then point run.py at it
+    python data/synthetic_season.py --serve data/synthetic/2026x5 --port 8765
+    TBA_BASE_URL=http://127.0.0.1:8765/api/v3 TBA_API_KEYS=synthetic python data/run.py 2026
+
+    # load straight into a local Postgres through insert_event_data
+    python data/synthetic_season.py --year 2026 --scale 1 --load
+
+    # freeze the first 40 events as a benchmark.py fixture
+    python data/synthetic_season.py --year 2026 --bench-fixture synthetic-2026 --events 40
+
+Not modelled: Einstein, offseason events, surrogates / DQs, red cards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Size of a real season at scale=1 (2025: ~3,600 teams, ~2.5 events each).
+BASE_TEAMS = 3600
+BASE_CHAMPIONSHIP_TEAMS = 600
+REGIONAL_SIZE = 42
+DISTRICT_EVENT_SIZE = 36
+DCMP_DIVISION_SIZE = 80
+DIVISION_SIZE = 75
+MIN_EVENT_SIZE = 24
+QUAL_MATCHES_PER_TEAM = 11
+QUAL_CYCLE_MIN = 7
+PLAYOFF_CYCLE_MIN = 12
+MATCHES_PER_DAY = 60
+
+# (country, state_prov, share of teams, district abbreviation, lat, lng, cities)
+_REGIONS = [
+    ("USA", "MI", 0.080, "FIM", 43.33, -84.54, ["Detroit", "Grand Rapids", "Lansing", "Traverse City"]),
+    ("USA", "IN", 0.018, "FIN", 39.85, -86.26, ["Indianapolis", "Kokomo"]),
+    ("USA", "TX", 0.060, "FIT", 31.05, -97.56, ["Houston", "Austin", "Dallas", "San Antonio"]),
+    ("USA", "NC", 0.020, "FNC", 35.63, -79.81, ["Raleigh", "Charlotte"]),
+    ("USA", "PA", 0.025, "FMA", 40.59, -77.21, ["Philadelphia", "Hatboro"]),
+    ("USA", "NJ", 0.030, "FMA", 40.30, -74.52, ["Mount Olive", "Robbinsville"]),
+    ("USA", "MA", 0.025, "NE", 42.23, -71.53, ["Worcester", "Boston"]),
+    ("USA", "CT", 0.015, "NE", 41.60, -72.76, ["Hartford", "Waterbury"]),
+    ("USA", "WA", 0.030, "PNW", 47.40, -121.49, ["Seattle", "Tacoma"]),
+    ("USA", "OR", 0.012, "PNW", 44.57, -122.07, ["Portland", "Salem"]),
+    ("USA", "GA", 0.025, "PCH", 33.04, -83.64, ["Atlanta", "Macon"]),
+    ("USA", "VA", 0.020, "CHS", 37.77, -78.17, ["Richmond", "Portsmouth"]),
+    ("USA", "MD", 0.012, "CHS", 39.06, -76.80, ["Baltimore", "Annapolis"]),
+    ("Canada", "ON", 0.045, "ONT", 44.50, -79.50, ["Toronto", "Waterloo", "Ottawa"]),
+    ("Israel", "", 0.020, "ISR", 31.05, 34.85, ["Tel Aviv", "Haifa"]),
+    ("USA", "CA", 0.090, None, 36.12, -119.68, ["San Jose", "Los Angeles", "San Diego", "Sacramento"]),
+    ("USA", "NY", 0.040, None, 42.17, -74.95, ["New York", "Rochester", "Buffalo"]),
+    ("USA", "MN", 0.035, None, 45.69, -93.90, ["Minneapolis", "Duluth"]),
+    ("USA", "OH", 0.020, None, 40.39, -82.76, ["Cleveland", "Cincinnati"]),
+    ("USA", "FL", 0.025, None, 27.77, -81.69, ["Orlando", "Miami"]),
+    ("USA", "IL", 0.020, None, 40.35, -88.99, ["Chicago", "Peoria"]),
+    ("USA", "MO", 0.012, None, 38.46, -92.29, ["St. Louis", "Kansas City"]),
+    ("USA", "AZ", 0.012, None, 33.73, -111.43, ["Phoenix", "Tucson"]),
+    ("USA", "CO", 0.010, None, 39.06, -105.31, ["Denver", "Colorado Springs"]),
+    ("USA", "WI", 0.012, None, 44.27, -89.62, ["Milwaukee", "Madison"]),
+    ("USA", "UT", 0.008, None, 40.15, -111.86, ["Salt Lake City"]),
+    ("Canada", "QC", 0.012, None, 46.81, -71.21, ["Montreal", "Quebec City"]),
+    ("Canada", "BC", 0.008, None, 53.73, -127.65, ["Vancouver"]),
+    ("Türkiye", "", 0.030, None, 38.96, 35.24, ["Istanbul", "Ankara"]),
+    ("China", "", 0.030, None, 35.86, 104.20, ["Shanghai", "Shenzhen"]),
+    ("Australia", "NSW", 0.010, None, -33.87, 151.21, ["Sydney"]),
+    ("Brazil", "SP", 0.010, None, -23.55, -46.63, ["São Paulo"]),
+    ("Mexico", "NL", 0.012, None, 25.69, -100.32, ["Monterrey"]),
+    ("Chinese Taipei", "", 0.008, None, 23.70, 120.96, ["Taipei"]),
+]
+
+_DISTRICT_NAMES = {
+    "FIM": "FIRST In Michigan",
+    "FIN": "FIRST Indiana Robotics",
+    "FIT": "FIRST In Texas",
+    "FNC": "FIRST North Carolina",
+    "FMA": "FIRST Mid-Atlantic",
+    "NE": "New England",
+    "PNW": "Pacific Northwest",
+    "PCH": "Peachtree",
+    "CHS": "FIRST Chesapeake",
+    "ONT": "Ontario",
+    "ISR": "Israel",
+}
+
+_DIVISIONS = ["Archimedes", "Curie", "Daly", "Galileo", "Hopper", "Johnson", "Milstein", "Newton"]
+
+_NICK_A = ["Robo", "Iron", "Cyber", "Thunder", "Steel", "Quantum", "Atomic", "Electric",
+           "Mechanical", "Flying", "Golden", "Techno", "Circuit", "Rogue", "Byte", "Voltage"]
+_NICK_B = ["Hawks", "Panthers", "Wolves", "Dragons", "Knights", "Bots", "Eagles", "Vikings",
+           "Pirates", "Titans", "Falcons", "Owls", "Bears", "Rams", "Sparks", "Gears"]
+
+# 2023+ double elimination: set -> (red source, blue source). ("A", n) is alliance
+# n, ("W"/"L", s) the winner/loser of set s. Finals (best of 3) follow set 13.
+_DOUBLE_ELIM = {
+    1: (("A", 1), ("A", 8)),
+    2: (("A", 4), ("A", 5)),
+    3: (("A", 2), ("A", 7)),
+    4: (("A", 3), ("A", 6)),
+    5: (("L", 1), ("L", 2)),
+    6: (("L", 3), ("L", 4)),
+    7: (("W", 1), ("W", 2)),
+    8: (("W", 3), ("W", 4)),
+    9: (("L", 7), ("W", 6)),
+    10: (("L", 8), ("W", 5)),
+    11: (("W", 7), ("W", 8)),
+    12: (("W", 10), ("W", 9)),
+    13: (("L", 11), ("W", 12)),
+}
+
+# (award name, TBA award_type, who gets it)
+_JUDGED_AWARDS = [
+    ("Impact Award", 0, "any"),
+    ("Engineering Inspiration Award", 9, "any"),
+    ("Rookie All Star Award", 10, "rookie"),
+    ("Gracious Professionalism Award", 11, "any"),
+    ("Judges' Award", 13, "any"),
+    ("Rookie Inspiration Award", 15, "rookie"),
+    ("Industrial Design Award", 16, "skill"),
+    ("Quality Award", 17, "skill"),
+    ("Creativity Award", 20, "skill"),
+    ("Excellence in Engineering Award", 21, "skill"),
+]
+
+
+# ---------------------------------------------------------------------------
+# Games: per-robot performance -> TBA alliance score_breakdown
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class RobotPlay:
+    leave: bool
+    auto_pieces: int
+    teleop_pieces: int
+    tier: int  # endgame 0 (nothing) .. 3 (best climb)
+
+
+@dataclass
+class Game:
+    year: int
+    auto_rate: Tuple[float, float]  # mean, sd of pieces per match across teams
+    teleop_rate: Tuple[float, float]
+    win_rp: int
+    foul_points: Tuple[int, int]  # minor, major
+
+
+GAMES = {
+    2024: Game(2024, auto_rate=(1.8, 1.1), teleop_rate=(7.0, 4.5), win_rp=2, foul_points=(2, 5)),
+    2025: Game(2025, auto_rate=(1.4, 1.0), teleop_rate=(8.0, 4.5), win_rp=3, foul_points=(2, 6)),
+    2026: Game(2026, auto_rate=(9.0, 6.0), teleop_rate=(38.0, 22.0), win_rp=3, foul_points=(5, 15)),
+}
+
+
+def _split(rng: random.Random, n: int, weights: List[float]) -> List[int]:
+    """Distribute ``n`` pieces over buckets with the given weights."""
+    counts = [0] * len(weights)
+    for _ in range(n):
+        counts[_weighted_index(rng, weights)] += 1
+    return counts
+
+
+def _weighted_index(rng: random.Random, weights: List[float]) -> int:
+    r = rng.random() * sum(weights)
+    for i, w in enumerate(weights):
+        r -= w
+        if r <= 0:
+            return i
+    return len(weights) - 1
+
+
+def _breakdown_2024(rng, robots: List[RobotPlay], opp_fouls: Tuple[int, int]) -> dict:
+    b: dict = {}
+    leave_pts = 0
+    auto_speaker = auto_amp = 0
+    tele_speaker = tele_amped = tele_amp = 0
+    park = onstage = trap = 0
+    chains: Dict[str, int] = {}
+    for i, r in enumerate(robots, 1):
+        b[f"autoLineRobot{i}"] = "Yes" if r.leave else "No"
+        leave_pts += 2 if r.leave else 0
+        s, a = _split(rng, r.auto_pieces, [0.85, 0.15])
+        auto_speaker += s
+        auto_amp += a
+        s, amped, a = _split(rng, r.teleop_pieces, [0.55, 0.2, 0.25])
+        tele_speaker += s
+        tele_amped += amped
+        tele_amp += a
+        status = "None"
+        if r.tier == 1:
+            status = "Parked"
+            park += 1
+        elif r.tier >= 2:
+            status = rng.choice(["StageLeft", "CenterStage", "StageRight"])
+            chains[status] = chains.get(status, 0) + 1
+            onstage += 3
+            if r.tier == 3 and rng.random() < 0.35:
+                trap += 5
+        b[f"endGameRobot{i}"] = status
+    harmony = sum(2 for n in chains.values() if n >= 2)
+    auto_notes = auto_speaker * 5 + auto_amp * 2
+    tele_notes = tele_speaker * 2 + tele_amped * 5 + tele_amp
+    stage = park + onstage + harmony + trap
+    b.update(
+        autoLeavePoints=leave_pts,
+        autoSpeakerNoteCount=auto_speaker,
+        autoAmpNoteCount=auto_amp,
+        autoSpeakerNotePoints=auto_speaker * 5,
+        autoAmpNotePoints=auto_amp * 2,
+        autoTotalNotePoints=auto_notes,
+        autoPoints=leave_pts + auto_notes,
+        teleopSpeakerNoteCount=tele_speaker,
+        teleopSpeakerNoteAmplifiedCount=tele_amped,
+        teleopAmpNoteCount=tele_amp,
+        teleopTotalNotePoints=tele_notes,
+        endGameParkPoints=park,
+        endGameOnStagePoints=onstage,
+        endGameHarmonyPoints=harmony,
+        endGameNoteInTrapPoints=trap,
+        endGameSpotLightBonusPoints=0,
+        endGameTotalStagePoints=stage,
+        teleopPoints=tele_notes + stage,
+        coopertitionBonusAchieved=False,
+        melodyBonusAchieved=(auto_speaker + auto_amp + tele_speaker + tele_amped + tele_amp) >= 18,
+        ensembleBonusAchieved=stage >= 10 and onstage >= 6,
+    )
+    b["bonusRp"] = int(b["melodyBonusAchieved"]) + int(b["ensembleBonusAchieved"])
+    return b
+
+
+def _breakdown_2025(rng, robots: List[RobotPlay], opp_fouls: Tuple[int, int]) -> dict:
+    b: dict = {}
+    auto_reef = [0, 0, 0, 0]
+    tele_reef = [0, 0, 0, 0]
+    net = wall = 0
+    mobility = barge = 0
+    for i, r in enumerate(robots, 1):
+        b[f"autoLineRobot{i}"] = "Yes" if r.leave else "No"
+        mobility += 3 if r.leave else 0
+        for lvl, n in enumerate(_split(rng, r.auto_pieces, [0.15, 0.1, 0.15, 0.6])):
+            auto_reef[lvl] += n
+        coral, algae = _split(rng, r.teleop_pieces, [0.72, 0.28])
+        for lvl, n in enumerate(_split(rng, coral, [0.2, 0.2, 0.25, 0.35])):
+            tele_reef[lvl] += n
+        n_net, n_wall = _split(rng, algae, [0.6, 0.4])
+        net += n_net
+        wall += n_wall
+        status = ["None", "Parked", "ShallowCage", "DeepCage"][r.tier]
+        b[f"endGameRobot{i}"] = status
+        barge += {"Parked": 2, "ShallowCage": 6, "DeepCage": 12}.get(status, 0)
+
+    def reef(counts):
+        return {
+            "trough": counts[0],
+            "tba_botRowCount": counts[1],
+            "tba_midRowCount": counts[2],
+            "tba_topRowCount": counts[3],
+        }
+
+    auto_coral_pts = auto_reef[0] * 3 + auto_reef[1] * 4 + auto_reef[2] * 6 + auto_reef[3] * 7
+    tele_coral_pts = tele_reef[0] * 2 + tele_reef[1] * 3 + tele_reef[2] * 4 + tele_reef[3] * 5
+    algae_pts = net * 4 + wall * 6
+    b.update(
+        autoMobilityPoints=mobility,
+        autoReef=reef(auto_reef),
+        autoCoralCount=sum(auto_reef),
+        autoCoralPoints=auto_coral_pts,
+        autoPoints=mobility + auto_coral_pts,
+        teleopReef=reef(tele_reef),
+        teleopCoralCount=sum(tele_reef),
+        teleopCoralPoints=tele_coral_pts,
+        netAlgaeCount=net,
+        wallAlgaeCount=wall,
+        algaePoints=algae_pts,
+        endGameBargePoints=barge,
+        teleopPoints=tele_coral_pts + algae_pts + barge,
+        autoBonusAchieved=mobility == 3 * len(robots) and sum(auto_reef) >= 1,
+        coralBonusAchieved=sum(tele_reef) >= 20,
+        bargeBonusAchieved=barge >= 14,
+    )
+    b["bonusRp"] = sum(int(b[k]) for k in ("autoBonusAchieved", "coralBonusAchieved", "bargeBonusAchieved"))
+    return b
+
+
+def _breakdown_2026(rng, robots: List[RobotPlay], opp_fouls: Tuple[int, int]) -> dict:
+    b: dict = {}
+    auto_fuel = tele_fuel = end_fuel = 0
+    auto_tower = tower = 0
+    auto_climbs = 0
+    for i, r in enumerate(robots, 1):
+        auto_fuel += r.auto_pieces
+        tele, end = _split(rng, r.teleop_pieces, [0.85, 0.15])
+        tele_fuel += tele
+        end_fuel += end
+        climbs_auto = r.leave and r.tier >= 1 and auto_climbs < 2 and rng.random() < 0.3
+        b[f"autoTowerRobot{i}"] = "Level1" if climbs_auto else "None"
+        if climbs_auto:
+            auto_climbs += 1
+            auto_tower += 15
+        status = ["None", "Level1", "Level2", "Level3"][r.tier]
+        b[f"endGameTowerRobot{i}"] = status
+        tower += 10 * r.tier
+    total_fuel = auto_fuel + tele_fuel + end_fuel
+    b.update(
+        hubScore={
+            "autoCount": auto_fuel,
+            "autoPoints": auto_fuel,
+            "teleopCount": tele_fuel,
+            "teleopPoints": tele_fuel,
+            "endgameCount": end_fuel,
+            "endgamePoints": end_fuel,
+            "totalCount": total_fuel,
+            "totalPoints": total_fuel,
+        },
+        autoTowerPoints=auto_tower,
+        endGameTowerPoints=tower,
+        autoPoints=auto_fuel + auto_tower,
+        teleopPoints=tele_fuel + end_fuel + tower,
+        energizedAchieved=total_fuel >= 100,
+        superchargedAchieved=total_fuel >= 360,
+        traversalAchieved=tower + auto_tower >= 50,
+    )
+    b["bonusRp"] = sum(int(b[k]) for k in ("energizedAchieved", "superchargedAchieved", "traversalAchieved"))
+    return b
+
+
+_BREAKDOWNS = {2024: _breakdown_2024, 2025: _breakdown_2025, 2026: _breakdown_2026}
+
+
+# ---------------------------------------------------------------------------
+# Season model
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Team:
+    number: int
+    nickname: str
+    city: str
+    state_prov: str
+    country: str
+    postal_code: Optional[str]
+    rookie_year: int
+    district: Optional[str]
+    lat: float
+    lng: float
+    z: float  # latent overall strength
+    auto_rate: float
+    teleop_rate: float
+    end_skill: float
+    leave_p: float
+    growth: float
+    foul_rate: float
+
+    @property
+    def key(self) -> str:
+        return f"frc{self.number}"
+
+
+@dataclass
+class Event:
+    key: str
+    name: str
+    event_type: int
+    event_type_string: str
+    district: Optional[str]
+    city: str
+    state_prov: str
+    country: str
+    lat: float
+    lng: float
+    week: Optional[int]
+    start: date
+    team_numbers: List[int] = field(default_factory=list)
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=2 if self.event_type == 1 else 3)
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    if lam <= 0:
+        return 0
+    if lam > 30:
+        return max(0, int(round(rng.gauss(lam, math.sqrt(lam)))))
+    threshold = math.exp(-lam)
+    k, p = 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= threshold:
+            return k
+        k += 1
+
+
+class SyntheticSeason:
+    def __init__(self, year: int, scale: float = 1.0, seed: int = 0, as_of: Optional[datetime] = None):
+        if year not in GAMES:
+            raise SystemExit(f"Synthetic seasons support {sorted(GAMES)}; got {year}.")
+        self.year = year
+        self.scale = scale
+        self.seed = seed
+        self.as_of = as_of
+        self.game = GAMES[year]
+        self.rng = random.Random(f"{seed}:{year}:{scale}")
+        # First Wednesday on/after Feb 26 = start of week 0 (TBA weeks are 0-based).
+        d = date(year, 2, 26)
+        self.season_start = d + timedelta(days=(2 - d.weekday()) % 7)
+        self.teams: Dict[int, Team] = {}
+        self.events: List[Event] = []
+        self._make_teams()
+        self._make_events()
+
+    # -- teams ---------------------------------------------------------------
+
+    def _make_teams(self) -> None:
+        rng = self.rng
+        n = max(MIN_EVENT_SIZE, int(round(BASE_TEAMS * self.scale)))
+        span = int(11000 * max(1.0, self.scale))
+        pool = [x for x in range(1, span) if not 9970 <= x <= 9999]
+        numbers = sorted(rng.sample(pool, min(n, len(pool))))
+        rookie_cut = numbers[int(len(numbers) * 0.96)]
+        weights = [r[2] for r in _REGIONS]
+        a_mu, a_sd = self.game.auto_rate
+        t_mu, t_sd = self.game.teleop_rate
+        for number in numbers:
+            country, state, _share, district, lat, lng, cities = _REGIONS[_weighted_index(rng, weights)]
+            z = rng.gauss(0.0, 1.0)
+            rookie = number >= rookie_cut
+            if rookie:
+                z -= 0.8
+            self.teams[number] = Team(
+                number=number,
+                nickname=f"{rng.choice(_NICK_A)} {rng.choice(_NICK_B)}",
+                city=rng.choice(cities),
+                state_prov=state,
+                country=country,
+                postal_code=f"{rng.randint(10000, 99999)}" if country == "USA" else None,
+                rookie_year=self.year if rookie else max(1992, self.year - int(abs(rng.gauss(0, 9))) - 1),
+                district=district,
+                lat=lat + rng.uniform(-1.0, 1.0),
+                lng=lng + rng.uniform(-1.0, 1.0),
+                z=z,
+                auto_rate=max(0.0, a_mu + a_sd * (0.8 * z + 0.6 * rng.gauss(0, 1))),
+                teleop_rate=max(0.3, t_mu + t_sd * (0.9 * z + 0.43 * rng.gauss(0, 1))),
+                end_skill=0.85 * z + 0.5 * rng.gauss(0, 1),
+                leave_p=min(0.99, max(0.3, 0.8 + 0.12 * z)),
+                growth=max(-0.05, rng.gauss(0.15, 0.1)),
+                foul_rate=max(0.05, rng.gauss(0.5, 0.2)),
+            )
+
+    # -- events --------------------------------------------------------------
+
+    def _event_start(self, week: int) -> date:
+        return self.season_start + timedelta(days=7 * week)
+
+    def _new_event(self, key, name, etype, etype_str, district, region_team: Team, week) -> Event:
+        rng = self.rng
+        start = self._event_start(week if week is not None else 7)
+        if etype == 1:
+            start += timedelta(days=2)  # district events run Friday - Sunday
+        ev = Event(
+            key=f"{self.year}{key}",
+            name=name,
+            event_type=etype,
+            event_type_string=etype_str,
+            district=district,
+            city=region_team.city,
+            state_prov=region_team.state_prov,
+            country=region_team.country,
+            lat=round(region_team.lat + rng.uniform(-0.3, 0.3), 5),
+            lng=round(region_team.lng + rng.uniform(-0.3, 0.3), 5),
+            week=week,
+            start=start,
+        )
+        self.events.append(ev)
+        return ev
+
+    def _assign(self, events: List[Event], attendance: List[Tuple[int, int]]) -> None:
+        """Give each (team, n_events) pair n distinct events, different weeks when possible."""
+        rng = self.rng
+        slots = sum(n for _, n in attendance)
+        cap = {ev.key: math.ceil(slots / max(1, len(events))) + 2 for ev in events}
+        order = list(attendance)
+        rng.shuffle(order)
+        for tn, n in order:
+            chosen: List[Event] = []
+            for _ in range(n):
+                weeks = {e.week for e in chosen}
+                open_events = [e for e in events if cap[e.key] > 0 and e not in chosen]
+                spread = [e for e in open_events if e.week not in weeks] or open_events
+                if not spread:
+                    break
+                spread.sort(key=lambda e: -cap[e.key])
+                ev = rng.choice(spread[: max(1, len(spread) // 2)])
+                cap[ev.key] -= 1
+                chosen.append(ev)
+                ev.team_numbers.append(tn)
+
+    def _make_events(self) -> None:
+        rng = self.rng
+        by_district: Dict[str, List[Team]] = {}
+        by_country: Dict[str, List[Team]] = {}
+        for t in self.teams.values():
+            if t.district:
+                by_district.setdefault(t.district, []).append(t)
+            else:
+                by_country.setdefault(t.country, []).append(t)
+
+        # Districts: two district events (weeks 0-4), then a DCMP in week 5.
+        for abbr, teams in sorted(by_district.items()):
+            n_events = max(1, round(len(teams) * 2 / DISTRICT_EVENT_SIZE))
+            events = [
+                self._new_event(
+                    f"{abbr.lower()}{i + 1}",
+                    f"{abbr} {rng.choice(teams).city} District Event",
+                    1, "District", abbr, rng.choice(teams), i % 5,
+                )
+                for i in range(n_events)
+            ]
+            self._assign(events, [(t.number, 2) for t in teams])
+            for ev in events:
+                if len(ev.team_numbers) < MIN_EVENT_SIZE:
+                    ev.team_numbers.extend(
+                        t.number for t in rng.sample(teams, min(len(teams), MIN_EVENT_SIZE))
+                        if t.number not in ev.team_numbers
+                    )
+                    del ev.team_numbers[max(MIN_EVENT_SIZE, len(ev.team_numbers)):]
+            ranked = sorted(teams, key=lambda t: t.z + rng.gauss(0, 0.6), reverse=True)
+            qualified = ranked[: max(MIN_EVENT_SIZE, int(len(teams) * 0.45))]
+            n_div = max(1, math.ceil(len(qualified) / DCMP_DIVISION_SIZE))
+            for d in range(n_div):
+                suffix = f"cmp{d + 1}" if n_div > 1 else "cmp"
+                dcmp = self._new_event(
+                    f"{abbr.lower()}{suffix}",
+                    f"{_DISTRICT_NAMES[abbr]} District Championship"
+                    + (f" Division {d + 1}" if n_div > 1 else ""),
+                    2, "District Championship", abbr, rng.choice(teams), 5,
+                )
+                dcmp.team_numbers = [t.number for t in qualified[d::n_div]]
+
+        # Regionals (weeks 0-5); small countries travel to US regionals.
+        usa = by_country.setdefault("USA", [])
+        for country in list(by_country):
+            if country != "USA" and len(by_country[country]) < 2 * MIN_EVENT_SIZE:
+                usa.extend(by_country.pop(country))
+        code = {"USA": "us", "Canada": "ca", "Türkiye": "tr", "China": "cn", "Australia": "au",
+                "Brazil": "br", "Mexico": "mx", "Chinese Taipei": "tw"}
+        for country, teams in sorted(by_country.items()):
+            attendance = [(t.number, _weighted_index(rng, [0.55, 0.35, 0.10]) + 1) for t in teams]
+            slots = sum(n for _, n in attendance)
+            n_events = max(1, round(slots / REGIONAL_SIZE))
+            prefix = code.get(country, country[:2].lower())
+            events = []
+            for i in range(n_events):
+                host = rng.choice(teams)
+                events.append(
+                    self._new_event(
+                        f"{prefix}{host.state_prov.lower()}{i + 1}",
+                        f"{host.city} Regional",
+                        0, "Regional", None, host, i % 6,
+                    )
+                )
+            self._assign(events, attendance)
+
+        # Championship divisions: strongest teams (with noise) that played this season.
+        played = {tn for ev in self.events for tn in ev.team_numbers}
+        contenders = sorted(
+            (self.teams[tn] for tn in played), key=lambda t: t.z + rng.gauss(0, 0.7), reverse=True
+        )
+        qualified = contenders[: int(BASE_CHAMPIONSHIP_TEAMS * self.scale)]
+        n_div = max(1, math.ceil(len(qualified) / DIVISION_SIZE))
+        rng.shuffle(qualified)
+        for d in range(n_div):
+            name = _DIVISIONS[d % len(_DIVISIONS)]
+            suffix = "" if d < len(_DIVISIONS) else str(d // len(_DIVISIONS) + 1)
+            div = self._new_event(
+                f"{name[:3].lower()}{suffix}", f"{name}{suffix and ' ' + suffix} Division",
+                3, "Championship Division", None, self.teams[qualified[0].number], None,
+            )
+            div.city, div.state_prov, div.country = "Houston", "TX", "USA"
+            div.lat, div.lng = 29.7530, -95.3580
+            div.team_numbers = [t.number for t in qualified[d::n_div]]
+
+        self.events = [ev for ev in self.events if len(ev.team_numbers) >= MIN_EVENT_SIZE]
+        self.events.sort(key=lambda e: (e.start, e.key))
+
+    # -- TBA payloads --------------------------------------------------------
+
+    def event_payload(self, ev: Event) -> dict:
+        district = None
+        if ev.district:
+            district = {
+                "key": f"{self.year}{ev.district.lower()}",
+                "abbreviation": ev.district.lower(),
+                "display_name": _DISTRICT_NAMES[ev.district],
+                "year": self.year,
+            }
+        return {
+            "key": ev.key,
+            "name": ev.name,
+            "event_code": ev.key[4:],
+            "event_type": ev.event_type,
+            "event_type_string": ev.event_type_string,
+            "district": district,
+            "city": ev.city,
+            "state_prov": ev.state_prov,
+            "country": ev.country,
+            "start_date": ev.start.isoformat(),
+            "end_date": ev.end.isoformat(),
+            "year": self.year,
+            "week": ev.week,
+            "website": None,
+            "webcasts": [{"type": "twitch", "channel": f"synthetic_{ev.key}"}],
+            "lat": ev.lat,
+            "lng": ev.lng,
+            "postal_code": None,
+            "timezone": "UTC",
+        }
+
+    def team_payload(self, team: Team) -> dict:
+        return {
+            "key": team.key,
+            "team_number": team.number,
+            "nickname": team.nickname,
+            "name": f"Synthetic Team {team.number}",
+            "city": team.city,
+            "state_prov": team.state_prov,
+            "country": team.country,
+            "postal_code": team.postal_code,
+            "website": None,
+            "rookie_year": team.rookie_year,
+        }
+
+    def _played_by(self, when: datetime) -> bool:
+        return self.as_of is None or when <= self.as_of
+
+    def _robot_play(self, rng: random.Random, team: Team, week: int) -> RobotPlay:
+        boost = 1.0 + team.growth * min(week, 7) / 7.0
+        end = team.end_skill + rng.gauss(0, 0.8) + 0.15 * week
+        tier = 0 if end < -1.2 else 1 if end < -0.3 else 2 if end < 0.7 else 3
+        return RobotPlay(
+            leave=rng.random() < team.leave_p,
+            auto_pieces=_poisson(rng, team.auto_rate * boost),
+            teleop_pieces=_poisson(rng, team.teleop_rate * boost),
+            tier=tier,
+        )
+
+    def _play_match(self, rng, key, comp_level, set_number, match_number, red, blue, when, week) -> dict:
+        match = {
+            "key": key,
+            "event_key": key.split("_", 1)[0],
+            "comp_level": comp_level,
+            "set_number": set_number,
+            "match_number": match_number,
+            "alliances": {
+                color: {"score": -1, "team_keys": [f"frc{t}" for t in side],
+                        "surrogate_team_keys": [], "dq_team_keys": []}
+                for color, side in (("red", red), ("blue", blue))
+            },
+            "winning_alliance": "",
+            "time": int(when.timestamp()),
+            "predicted_time": int(when.timestamp()),
+            "actual_time": None,
+            "post_result_time": None,
+            "videos": [],
+            "score_breakdown": None,
+        }
+        if not self._played_by(when):
+            return match
+        minor, major = self.game.foul_points
+        breakdown = {}
+        fouls = {}
+        for color, side in (("red", red), ("blue", blue)):
+            plays = [self._robot_play(rng, self.teams[t], week) for t in side]
+            committed = sum(_poisson(rng, self.teams[t].foul_rate) for t in side)
+            tech = sum(1 for _ in range(committed) if rng.random() < 0.2)
+            fouls[color] = (committed - tech, tech)
+            breakdown[color] = _BREAKDOWNS[self.year](rng, plays, (0, 0))
+        for color, opp in (("red", "blue"), ("blue", "red")):
+            b = breakdown[color]
+            b["foulCount"], b["techFoulCount"] = fouls[opp]
+            b["foulPoints"] = fouls[opp][0] * minor + fouls[opp][1] * major
+            b["adjustPoints"] = 0
+            b["totalPoints"] = b["autoPoints"] + b["teleopPoints"] + b["foulPoints"]
+        red_score = breakdown["red"]["totalPoints"]
+        blue_score = breakdown["blue"]["totalPoints"]
+        for color, own, other in (("red", red_score, blue_score), ("blue", blue_score, red_score)):
+            b = breakdown[color]
+            b["rp"] = (self.game.win_rp if own > other else 1 if own == other else 0) + b.pop("bonusRp")
+            match["alliances"][color]["score"] = own
+        match["winning_alliance"] = "red" if red_score > blue_score else "blue" if blue_score > red_score else ""
+        match["actual_time"] = match["time"]
+        match["post_result_time"] = match["time"] + 300
+        match["score_breakdown"] = breakdown
+        return match
+
+    def _schedule(self, rng: random.Random, teams: List[int]) -> List[Tuple[List[int], List[int]]]:
+        n_matches = math.ceil(len(teams) * QUAL_MATCHES_PER_TEAM / 6)
+        stream: List[int] = []
+        while len(stream) < n_matches * 6:
+            perm = list(teams)
+            rng.shuffle(perm)
+            stream.extend(perm)
+        schedule = []
+        for m in range(n_matches):
+            six = stream[m * 6 : m * 6 + 6]
+            # Avoid a team twice in one match at permutation seams.
+            seen = set()
+            for i, t in enumerate(six):
+                if t in seen:
+                    six[i] = next(x for x in teams if x not in seen and x not in six)
+                seen.add(six[i])
+            schedule.append((six[:3], six[3:]))
+        return schedule
+
+    def _rank(self, matches: List[dict], teams: List[int]) -> List[dict]:
+        stats = {t: {"rp": 0, "pts": 0, "w": 0, "l": 0, "t": 0, "n": 0} for t in teams}
+        for m in matches:
+            if m["comp_level"] != "qm" or m["alliances"]["red"]["score"] < 0:
+                continue
+            for color, opp in (("red", "blue"), ("blue", "red")):
+                own = m["alliances"][color]["score"]
+                other = m["alliances"][opp]["score"]
+                rp = m["score_breakdown"][color]["rp"]
+                for key in m["alliances"][color]["team_keys"]:
+                    s = stats[int(key[3:])]
+                    s["rp"] += rp
+                    s["pts"] += own
+                    s["n"] += 1
+                    s["w" if own > other else "l" if own < other else "t"] += 1
+        played = [t for t in teams if stats[t]["n"]]
+        played.sort(key=lambda t: (stats[t]["rp"] / stats[t]["n"], stats[t]["pts"] / stats[t]["n"]), reverse=True)
+        return [
+            {
+                "team_key": f"frc{t}",
+                "rank": i + 1,
+                "matches_played": stats[t]["n"],
+                "record": {"wins": stats[t]["w"], "losses": stats[t]["l"], "ties": stats[t]["t"]},
+                "dq": 0,
+                "qual_average": None,
+                "extra_stats": [stats[t]["rp"]],
+                "sort_orders": [round(stats[t]["rp"] / stats[t]["n"], 2), round(stats[t]["pts"] / stats[t]["n"], 2)],
+            }
+            for i, t in enumerate(played)
+        ]
+
+    def _alliances(self, rng: random.Random, rankings: List[dict]) -> List[List[int]]:
+        order = [int(r["team_key"][3:]) for r in rankings]
+        captains: List[List[int]] = []
+        available = list(order)
+        while len(captains) < 8 and available:
+            captains.append([available.pop(0)])
+        # Serpentine draft by perceived strength.
+        for rnd, seq in ((1, range(8)), (2, range(7, -1, -1))):
+            for i in seq:
+                if i >= len(captains) or not available:
+                    continue
+                pick = max(available, key=lambda t: self.teams[t].z + rng.gauss(0, 0.5))
+                available.remove(pick)
+                captains[i].append(pick)
+                # A declined invite promotes the next captain in real life; not modelled.
+        return captains
+
+    def _playoffs(self, rng, ev: Event, alliances, start: datetime, week):
+        """Double-elimination matches plus (champion, finalist) alliance numbers once decided."""
+        matches: List[dict] = []
+        winners: Dict[int, int] = {}
+        losers: Dict[int, int] = {}
+        when = start
+        resolved = True
+
+        def side(src):
+            kind, n = src
+            if kind == "A":
+                return n
+            return (winners if kind == "W" else losers).get(n)
+
+        for set_number in range(1, 14):
+            red_src, blue_src = _DOUBLE_ELIM[set_number]
+            red_a, blue_a = side(red_src), side(blue_src)
+            if red_a is None or blue_a is None:
+                resolved = False
+                break
+            key = f"{ev.key}_sf{set_number}m1"
+            m = self._play_match(rng, key, "sf", set_number, 1, alliances[red_a - 1], alliances[blue_a - 1], when, week)
+            while m["alliances"]["red"]["score"] >= 0 and not m["winning_alliance"]:
+                when += timedelta(minutes=PLAYOFF_CYCLE_MIN)  # playoff ties are replayed
+                m = self._play_match(rng, key, "sf", set_number, 1, alliances[red_a - 1], alliances[blue_a - 1], when, week)
+            matches.append(m)
+            when += timedelta(minutes=PLAYOFF_CYCLE_MIN)
+            if m["alliances"]["red"]["score"] < 0:
+                resolved = False
+                break
+            red_won = m["winning_alliance"] == "red"
+            winners[set_number] = red_a if red_won else blue_a
+            losers[set_number] = blue_a if red_won else red_a
+        if not resolved:
+            return matches, None, None
+
+        finalists = (winners[11], winners[13])
+        wins = {finalists[0]: 0, finalists[1]: 0}
+        match_number = 0
+        while max(wins.values()) < 2:
+            match_number += 1
+            m = self._play_match(
+                rng, f"{ev.key}_f1m{match_number}", "f", 1, match_number,
+                alliances[finalists[0] - 1], alliances[finalists[1] - 1], when, week,
+            )
+            matches.append(m)
+            when += timedelta(minutes=PLAYOFF_CYCLE_MIN)
+            if m["alliances"]["red"]["score"] < 0:
+                return matches, None, None
+            if m["winning_alliance"]:
+                wins[finalists[0] if m["winning_alliance"] == "red" else finalists[1]] += 1
+        champion = max(wins, key=wins.get)
+        return matches, champion, finalists[1] if champion == finalists[0] else finalists[0]
+
+    def _awards(self, rng, ev: Event, rankings, alliances, champion, finalist) -> List[dict]:
+        label = {0: "Regional", 1: "District Event", 2: "District Championship", 3: "Championship Subdivision"}[ev.event_type]
+        awards = []
+
+        def award(name, award_type, teams, awardee=None):
+            awards.append({
+                "name": name,
+                "award_type": award_type,
+                "event_key": ev.key,
+                "year": self.year,
+                "recipient_list": [{"team_key": f"frc{t}", "awardee": awardee} for t in teams],
+            })
+
+        if champion is not None:
+            award(f"{label} Winners", 1, alliances[champion - 1])
+            award(f"{label} Finalists", 2, alliances[finalist - 1])
+        rookies = [t for t in ev.team_numbers if self.teams[t].rookie_year == self.year]
+        by_skill = sorted(ev.team_numbers, key=lambda t: self.teams[t].z + rng.gauss(0, 0.8), reverse=True)
+        given = set()
+        for name, award_type, pool in _JUDGED_AWARDS:
+            if pool == "rookie":
+                candidates = [t for t in rookies if t not in given]
+            elif pool == "skill":
+                candidates = [t for t in by_skill[: max(6, len(by_skill) // 3)] if t not in given]
+            else:
+                candidates = [t for t in ev.team_numbers if t not in given]
+            if not candidates:
+                continue
+            pick = rng.choice(candidates)
+            given.add(pick)
+            award(name, award_type, [pick])
+        seeded_rookies = [int(r["team_key"][3:]) for r in rankings if int(r["team_key"][3:]) in rookies]
+        if seeded_rookies:
+            award("Highest Rookie Seed", 14, [seeded_rookies[0]])
+        return awards
+
+    def simulate_event(self, ev: Event) -> dict:
+        """TBA teams / matches / rankings / awards payloads for one event."""
+        rng = random.Random(f"{self.seed}:{ev.key}")
+        week = ev.week if ev.week is not None else 7
+        teams = sorted(ev.team_numbers)
+        last_day = datetime(ev.end.year, ev.end.month, ev.end.day, 14, 0, tzinfo=timezone.utc)
+        schedule = self._schedule(rng, teams)
+        # Quals run up to the morning of the last day; playoffs that afternoon.
+        qual_days = max(2, math.ceil(len(schedule) / MATCHES_PER_DAY))
+        quals_start = last_day - timedelta(days=qual_days - 1)
+        matches: List[dict] = []
+        # TBA publishes the qual schedule the evening before quals start.
+        if self.as_of is None or self.as_of >= quals_start - timedelta(hours=18):
+            for i, (red, blue) in enumerate(schedule):
+                day, slot = divmod(i, MATCHES_PER_DAY)
+                when = quals_start + timedelta(days=day, minutes=slot * QUAL_CYCLE_MIN)
+                matches.append(self._play_match(rng, f"{ev.key}_qm{i + 1}", "qm", 1, i + 1, red, blue, when, week))
+        rankings = self._rank(matches, teams)
+        quals_done = bool(matches) and all(m["alliances"]["red"]["score"] >= 0 for m in matches)
+        alliances: List[List[int]] = []
+        champion = finalist = None
+        if quals_done and len(rankings) >= 24:
+            alliances = self._alliances(rng, rankings)
+            last_qual = max(m["time"] for m in matches)
+            start = max(
+                datetime.fromtimestamp(last_qual, tz=timezone.utc) + timedelta(hours=1),
+                last_day + timedelta(hours=4),
+            )
+            playoff_matches, champion, finalist = self._playoffs(rng, ev, alliances, start, week)
+            matches.extend(playoff_matches)
+        awards = self._awards(rng, ev, rankings, alliances, champion, finalist) if champion is not None else []
+        return {
+            "teams": [self.team_payload(self.teams[t]) for t in teams],
+            "matches": matches,
+            "rankings": {"rankings": rankings} if rankings else None,
+            "awards": awards,
+        }
+
+    def iter_events(self) -> Iterator[Tuple[dict, dict]]:
+        for ev in self.events:
+            yield self.event_payload(ev), self.simulate_event(ev)
+
+
+# ---------------------------------------------------------------------------
+# Outputs
+# ---------------------------------------------------------------------------
+
+
+def write_tba_tree(season: SyntheticSeason, out_dir: str, *, events: Optional[int] = None) -> dict:
+    """Write TBA-shaped JSON under ``out_dir`` (paths mirror /api/v3 endpoints)."""
+    os.makedirs(os.path.join(out_dir, "events"), exist_ok=True)
+    payloads = []
+    counts = {"events": 0, "teams": len(season.teams), "matches": 0}
+    for i, (event, data) in enumerate(season.iter_events()):
+        if events is not None and i >= events:
+            break
+        payloads.append(event)
+        ev_dir = os.path.join(out_dir, "event", event["key"])
+        os.makedirs(ev_dir, exist_ok=True)
+        for name in ("teams", "matches", "rankings", "awards"):
+            with open(os.path.join(ev_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+                json.dump(data[name], f, separators=(",", ":"), ensure_ascii=False)
+        counts["events"] += 1
+        counts["matches"] += len(data["matches"])
+    with open(os.path.join(out_dir, "events", f"{season.year}.json"), "w", encoding="utf-8") as f:
+        json.dump(payloads, f, separators=(",", ":"), ensure_ascii=False)
+    manifest = {
+        "year": season.year,
+        "scale": season.scale,
+        "seed": season.seed,
+        "as_of": season.as_of.isoformat() if season.as_of else None,
+        **counts,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def serve(root: str, host: str, port: int, *, latency_ms: float = 0.0, error_rate: float = 0.0) -> None:
+    """Serve a written tree as a TBA API v3 stand-in (``/api/v3/<endpoint>``)."""
+    root = os.path.abspath(root)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(random.expovariate(1.0 / (latency_ms / 1000.0)))
+            path = self.path.split("?", 1)[0]
+            if not path.startswith("/api/v3/"):
+                return self._send(404, {"Error": "unknown path"})
+            if error_rate and random.random() < error_rate:
+                return self._send(503, {"Error": "injected failure"})
+            target = os.path.normpath(os.path.join(root, path[len("/api/v3/"):].strip("/") + ".json"))
+            if not target.startswith(root + os.sep) or not os.path.isfile(target):
+                return self._send(404, {"Errors": [{"path": path}]})
+            with open(target, "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving {root} as TBA stand-in on http://{host}:{port}/api/v3 (Ctrl+C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def load_into_db(season: SyntheticSeason, *, events: Optional[int] = None, batch_events: int = 100) -> None:
+    """Load through run.insert_event_data (plus the rankings/awards writers) into a local DB."""
+    from db_target import assert_safe_db_target, describe_db_target
+
+    assert_safe_db_target("load a synthetic season")
+    print(f"DB target: {describe_db_target()}", flush=True)
+
+    import run
+    from run_awards import award_rows_from_tba, replace_event_awards
+    from run_rankings import ranking_rows_from_tba, replace_event_rankings
+
+    run.apply_schema_migrations()
+    year = season.year
+    for team in season.teams.values():
+        run.upsert_team_profile(season.team_payload(team))
+
+    conn = run.get_pg_connection()
+    try:
+        batch = []
+        loaded = 0
+
+        def flush():
+            if not batch:
+                return
+            run.insert_event_data([r for r, _ in batch], year)
+            cur = conn.cursor()
+            for result, data in batch:
+                key = result["event_key"]
+                rankings = ranking_rows_from_tba(key, year, data["rankings"])
+                if rankings:
+                    replace_event_rankings(cur, key, rankings)
+                awards = award_rows_from_tba(key, data["awards"])
+                if awards:
+                    replace_event_awards(cur, key, awards)
+            conn.commit()
+            cur.close()
+            batch.clear()
+
+        for i, (event, data) in enumerate(season.iter_events()):
+            if events is not None and i >= events:
+                break
+            key = event["key"]
+            result = {
+                "event_key": key,
+                "data": {
+                    "event": run.event_row_from_tba(event),
+                    "teams": run.event_team_rows_from_tba(key, data["teams"]),
+                    "matches": run.match_rows_from_tba(key, data["matches"]),
+                },
+                "updates_needed": {"event": True, "teams": True, "matches": True},
+                "has_changes": True,
+            }
+            batch.append((result, data))
+            loaded += 1
+            if len(batch) >= batch_events:
+                flush()
+        flush()
+    finally:
+        conn.close()
+    run.fill_missing_event_coords(year)
+    print(f"Loaded {loaded} synthetic event(s) and {len(season.teams)} team(s) for {year}.", flush=True)
+
+
+def bench_fixture(season: SyntheticSeason, *, events: Optional[int]) -> dict:
+    """A benchmark.py fixture: generated matches plus team_epas priors from latent skill."""
+    from benchmark import FIXTURE_FORMAT
+
+    rng = random.Random(f"{season.seed}:fixture")
+    event_payloads, matches_by_event = [], {}
+    record: Dict[int, List[int]] = {}
+    for i, (event, data) in enumerate(season.iter_events()):
+        if events is not None and i >= events:
+            break
+        event_payloads.append(event)
+        matches_by_event[event["key"]] = data["matches"]
+        for m in data["matches"]:
+            for color, opp in (("red", "blue"), ("blue", "red")):
+                own, other = m["alliances"][color]["score"], m["alliances"][opp]["score"]
+                if own < 0:
+                    continue
+                for key in m["alliances"][color]["team_keys"]:
+                    wlt = record.setdefault(int(key[3:]), [0, 0, 0])
+                    wlt[0 if own > other else 1 if own < other else 2] += 1
+
+    def epa_row(team: Team, noise: float) -> dict:
+        scale = season.game.teleop_rate[0] / 8.0
+        raw = max(0.0, 12.0 + 9.0 * (team.z + rng.gauss(0, noise))) * scale
+        conf = min(0.98, max(0.5, 0.8 + rng.gauss(0, 0.07)))
+        wins, losses, ties = record.get(team.number, (0, 0, 0))
+        return {
+            "team_number": team.number,
+            "raw": round(raw, 2),
+            "auto_raw": round(raw * 0.2, 2),
+            "teleop_raw": round(raw * 0.6, 2),
+            "endgame_raw": round(raw * 0.2, 2),
+            "confidence": round(conf, 2),
+            "ace": round(raw * conf, 2),
+            "wins": wins,
+            "losses": losses,
+            "ties": ties,
+        }
+
+    teams = [season.teams[tn] for tn in sorted(record)]
+    return {
+        "format": FIXTURE_FORMAT,
+        "year": season.year,
+        "events": [
+            {"event_key": e["key"], "start_date": e["start_date"], "end_date": e["end_date"],
+             "week": e["week"], "event_type": e["event_type_string"]}
+            for e in event_payloads
+        ],
+        "matches_by_event": matches_by_event,
+        "team_epas": {
+            str(season.year): [epa_row(t, 0.2) for t in teams],
+            str(season.year - 1): [epa_row(t, 0.6) for t in teams if t.rookie_year < season.year],
+        },
+        "teams": [
+            {"team_number": t.number, "country": t.country, "state_prov": t.state_prov,
+             "district_key": f"{season.year}{t.district.lower()}" if t.district else None,
+             "district": _DISTRICT_NAMES.get(t.district or "")}
+            for t in teams
+        ],
+        "experience": {str(t.number): max(1, season.year - t.rookie_year + 1) for t in teams},
+    }
+
+
+def _parse_as_of(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic FRC season.")
+    parser.add_argument("--year", type=int, default=2026, help=f"Game year {sorted(GAMES)} (default: 2026)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Season size vs a real one (1, 5, 20, ...)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--as-of", help="ISO datetime; later matches are unplayed (live-event rehearsal)")
+    parser.add_argument("--events", type=int, help="Only the first N events (by start date)")
+    parser.add_argument("--out", help="Write TBA-shaped JSON to this directory")
+    parser.add_argument("--load", action="store_true", help="Load into the local DATABASE_URL")
+    parser.add_argument("--bench-fixture", metavar="NAME", help="Write a benchmark.py fixture")
+    parser.add_argument("--serve", metavar="DIR", help="Serve a written directory as a TBA stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean injected latency when serving")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503s when serving")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.host, args.port, latency_ms=args.latency_ms, error_rate=args.error_rate)
+        return 0
+    if not (args.out or args.load or args.bench_fixture):
+        parser.error("nothing to do: pass --out, --load, --bench-fixture or --serve")
+
+    t0 = time.perf_counter()
+    season = SyntheticSeason(args.year, args.scale, args.seed, _parse_as_of(args.as_of))
+    print(
+        f"Synthetic {args.year} x{args.scale:g} (seed {args.seed}): {len(season.teams)} teams, "
+        f"{len(season.events)} events",
+        flush=True,
+    )
+    if args.out:
+        manifest = write_tba_tree(season, args.out, events=args.events)
+        print(f"Wrote {manifest['events']} event(s), {manifest['matches']} match(es) to {args.out}", flush=True)
+    if args.bench_fixture:
+        from benchmark import write_fixture
+
+        path = write_fixture(bench_fixture(season, events=args.events), args.bench_fixture)
+        print(f"Wrote benchmark fixture {path}", flush=True)
+    if args.load:
+        load_into_db(season, events=args.events)
+    print(f"Done in {time.perf_counter() - t0:.1f}s", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Season-level interning table for TBA team keys.
+
+Every distinct TBA team key (``frc254``; surrogates such as ``frc254B`` are
+distinct keys) gets a dense integer slot the first time it is seen, with the
+parsed team number kept per slot. The ACE walk (ace_attribution), the season
+precompute and walk-forward predictions key TeamPhaseStates, carry priors,
+pre-match snapshots and the per-event ACE cache by slot, so the hot loops hash
+small ints instead of strings and never re-parse a key. Strings come back only
+at the boundaries: DB writers read ``numbers[slot]``, and anything persisted
+across processes (checkpoints) goes through ``keyed`` / ``slotted`` because
+slots are only meaningful inside the process that assigned them.
+
+  - ``intern_matches`` / ``intern_season`` run at ingest: each match's
+    ``team_keys`` become the shared canonical strings and its alliance slots are
+    stored on the match dict (``match_slots``);
+  - ``TEAM_KEYS.number(key)`` is one dict lookup and a list index.
+
+Team numbers ignore the surrogate suffix (``frc254B`` -> 254), as the digit
+parse did; slots do not, so surrogate appearances keep their own state.
+"""
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (table token, red team_keys list, blue team_keys list, red slots, blue slots)
+# on each match dict.
+SLOTS_KEY = "_ace_slots"
+
+
+def _parse_number(key: str) -> int:
+    digits = "".join(ch for ch in key if ch.isdigit())
+    return int(digits) if digits else 0
+
+
+class TeamKeyTable:
+    def __init__(self):
+        self._slots: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.numbers: List[int] = []
+        self._lock = threading.Lock()
+        # Identifies this table's slot numbering on cached match slots; a fresh
+        # object after clear(), so stale slots are redone.
+        self._token = object()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def slot(self, key) -> int:
+        """Dense slot for ``key``, assigned on first sight."""
+        s = self._slots.get(key)
+        if s is not None:
+            return s
+        key = sys.intern(str(key).strip())
+        with self._lock:
+            s = self._slots.get(key)
+            if s is None:
+                s = len(self.keys)
+                self.keys.append(key)
+                self.numbers.append(_parse_number(key))
+                self._slots[key] = s
+        return s
+
+    def find(self, key) -> Optional[int]:
+        """Slot for ``key`` if it has been seen; lookups never grow the table."""
+        s = self._slots.get(key)
+        if s is None and key:
+            s = self._slots.get(str(key).strip())
+        return s
+
+    def number(self, key) -> int:
+        """Team number for ``key`` (0 when it has no digits)."""
+        s = self._slots.get(key)
+        if s is None:
+            if not key:
+                return 0
+            s = self.slot(key)
+        return self.numbers[s]
+
+    def canonical(self, key) -> str:
+        return self.keys[self.slot(key)]
+
+    def match_slots(self, match: dict) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """(red slots, blue slots) for a TBA match, kept on the match dict.
+
+        Reused while the alliance ``team_keys`` lists are the same objects and
+        the table has not been cleared; a payload whose lists were replaced
+        (re-fetch, webhook) or that was restored from a checkpoint is re-slotted.
+        """
+        alliances = match["alliances"]
+        red = alliances["red"].get("team_keys") or []
+        blue = alliances["blue"].get("team_keys") or []
+        cached = match.get(SLOTS_KEY)
+        if cached is not None and cached[0] is self._token and cached[1] is red and cached[2] is blue:
+            return cached[3], cached[4]
+        red_slots = tuple(self.slot(k) for k in red)
+        blue_slots = tuple(self.slot(k) for k in blue)
+        match[SLOTS_KEY] = (self._token, red, blue, red_slots, blue_slots)
+        return red_slots, blue_slots
+
+    def intern_matches(self, matches: Iterable[dict]) -> int:
+        """Canonical key strings and stored slots for every match; returns keys seen."""
+        seen = 0
+        for match in matches or []:
+            alliances = match.get("alliances") or {}
+            if "red" not in alliances or "blue" not in alliances:
+                continue
+            for color in ("red", "blue"):
+                side = alliances[color] or {}
+                team_keys = side.get("team_keys")
+                if team_keys:
+                    side["team_keys"] = [self.keys[self.slot(k)] for k in team_keys]
+                    seen += len(team_keys)
+            self.match_slots(match)
+        return seen
+
+    def keyed(self, by_slot: Dict[int, object]) -> Dict[str, object]:
+        """Slot-keyed mapping -> TBA-key-keyed (for anything leaving the process)."""
+        return {self.keys[s]: v for s, v in by_slot.items()}
+
+    def slotted(self, by_key: Dict[str, object]) -> Dict[int, object]:
+        """TBA-key-keyed mapping -> slot-keyed."""
+        return {self.slot(k): v for k, v in by_key.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slots.clear()
+            self.keys.clear()
+            self.numbers.clear()
+            self._token = object()
+
+
+TEAM_KEYS = TeamKeyTable()
+
+
+def team_slot(team_number: int) -> int:
+    """Slot of a team's plain TBA key, for team-number-keyed DB rows."""
+    return TEAM_KEYS.slot(f"frc{int(team_number)}")
+
+
+def intern_season(matches_by_event: Dict[str, List[dict]]) -> int:
+    """Ingest stage: intern every team key in a season's match store; returns distinct keys."""
+    for matches in matches_by_event.values():
+        TEAM_KEYS.intern_matches(matches)
+    return len(TEAM_KEYS)
@@ -28,6 +28,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import run as run_module
+from ace_attribution import extract_season_phases
+from team_keys import intern_season
 from db_target import describe_db_target
 from prediction import (
     AceParams,
@@ -239,9 +241,9 @@ def _discover_years(conn) -> List[int]:
     try:
         cur.execute(
             """
-            SELECT DISTINCT CAST(LEFT(event_key, 4) AS INTEGER) AS yr
+            SELECT DISTINCT year AS yr
             FROM events
-            WHERE event_key ~ '^[0-9]{4}'
+            WHERE year IS NOT NULL
             ORDER BY yr
             """
         )
@@ -304,6 +306,9 @@ def load_year_bundle(
         print(f"  {year}: no TBA match data", flush=True)
         return None
 
+    intern_season(matches_by_event)
+    parsed = extract_season_phases(matches_by_event, year)
+    print(f"  {year}: parsed score breakdowns for {parsed} match(es)", flush=True)
     for ek, matches in matches_by_event.items():
         match_cache[ek] = matches
     preload_confidence_lookups_from_match_cache(year)
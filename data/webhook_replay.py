@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Local TBA webhook stand-in: record and replay signed pushes against /webhooks/tba.
+
+Builds TBA-shaped ``match_score`` / ``schedule_updated`` deliveries from a
+TBA tree written by synthetic_season.py (or any directory laid out like
+/api/v3), in the order TBA would send them, and POSTs them with the
+``X-TBA-HMAC`` signature the API checks. Recorded deliveries can be saved as
+JSON lines and replayed later, so a webhook_worker.py change can be exercised
+against the same pushes every time.
+
+A live-event rehearsal serves a tree frozen with ``--as-of`` as the TBA
+stand-in (the worker warms events from it) and replays the full season's
+results after that instant:
+
+    python data/synthetic_season.py --year 2026 --events 4 --out /tmp/full
+    python data/synthetic_season.py --year 2026 --events 4 --as-of 2026-03-07T15:00 --out /tmp/live
+    python data/synthetic_season.py --serve /tmp/live --port 8765
+    TBA_BASE_URL=http://127.0.0.1:8765/api/v3 TBA_API_KEYS=synthetic python data/webhook_worker.py
+    python data/webhook_replay.py --tree /tmp/full --since 2026-03-07T15:00 \\
+        --post http://127.0.0.1:8000/webhooks/tba --secret "$TBA_WEBHOOK_SECRET" --interval 0.5
+
+Usage:
+    python data/webhook_replay.py --tree DIR [--event KEY ...] [--since ISO] --out pushes.jsonl
+    python data/webhook_replay.py --from pushes.jsonl --post URL --secret S [--interval SEC]
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+from urllib.parse import urlparse
+
+USER_AGENT = "peekorobo-webhook-replay/1"
+
+
+def _played(match: dict) -> bool:
+    a = match.get("alliances") or {}
+    red = (a.get("red") or {}).get("score")
+    blue = (a.get("blue") or {}).get("score")
+    return (red is not None and red >= 0) or (blue is not None and blue >= 0)
+
+
+def _load_json(path: str):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def record(tree: str, event_keys: Optional[List[str]] = None, since: Optional[float] = None) -> List[dict]:
+    """Deliveries for ``event_keys`` (default: every event in the tree), oldest first.
+
+    Each event gets a ``schedule_updated`` at its first match time, then one
+    ``match_score`` per played match at its result time. ``since`` (epoch
+    seconds) drops anything earlier.
+    """
+    names = {}
+    for path in glob.glob(os.path.join(tree, "events", "*.json")):
+        for ev in _load_json(path):
+            names[ev["key"]] = ev.get("name") or ev["key"]
+    if not event_keys:
+        event_keys = sorted(os.listdir(os.path.join(tree, "event")))
+
+    timed = []
+    for key in event_keys:
+        path = os.path.join(tree, "event", key, "matches.json")
+        if not os.path.isfile(path):
+            print(f"  no matches.json for {key}; skipped", flush=True)
+            continue
+        matches = _load_json(path)
+        times = [m.get("time") or m.get("predicted_time") for m in matches]
+        first = min((t for t in times if t), default=0)
+        timed.append((first, 0, {
+            "message_type": "schedule_updated",
+            "message_data": {"event_key": key, "event_name": names.get(key, key), "first_match_time": first},
+        }))
+        for m in matches:
+            if not _played(m):
+                continue
+            at = m.get("post_result_time") or m.get("actual_time") or m.get("time") or 0
+            timed.append((at, 1, {
+                "message_type": "match_score",
+                "message_data": {
+                    "event_key": key,
+                    "match_key": m["key"],
+                    "event_name": names.get(key, key),
+                    "match": m,
+                },
+            }))
+    timed.sort(key=lambda t: (t[0], t[1], t[2]["message_data"].get("match_key") or ""))
+    return [payload for at, _, payload in timed if since is None or at >= since]
+
+
+def sign(secret: str, body: bytes) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def replay(deliveries: Iterable[dict], url: str, secret: str, *, interval: float = 0.0) -> Counter:
+    """POST each delivery in order; returns a Counter of HTTP status codes."""
+    parsed = urlparse(url)
+    conn_cls = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+    conn = conn_cls(parsed.netloc, timeout=30)
+    statuses: Counter = Counter()
+    latencies = []
+    try:
+        for i, delivery in enumerate(deliveries, 1):
+            body = json.dumps(delivery, separators=(",", ":")).encode("utf-8")
+            headers = {
+                "Content-Type": "application/json",
+                "User-Agent": USER_AGENT,
+                "X-TBA-HMAC": sign(secret, body),
+            }
+            started = time.perf_counter()
+            conn.request("POST", parsed.path or "/", body=body, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            statuses[resp.status] += 1
+            if resp.status >= 300:
+                print(f"  #{i} {delivery['message_type']}: HTTP {resp.status}", flush=True)
+            if interval:
+                time.sleep(interval)
+    finally:
+        conn.close()
+    if latencies:
+        latencies.sort()
+        print(
+            f"Replayed {len(latencies)} delivery(ies): "
+            f"p50={latencies[len(latencies) // 2]:.1f}ms max={latencies[-1]:.1f}ms "
+            f"statuses={dict(statuses)}",
+            flush=True,
+        )
+    return statuses
+
+
+def _parse_since(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value)
+    return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Record / replay TBA webhook deliveries.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--tree", help="TBA-shaped directory (synthetic_season.py --out)")
+    source.add_argument("--from", dest="from_file", help="JSON lines written by --out")
+    parser.add_argument("--event", action="append", help="Only this event (repeatable)")
+    parser.add_argument("--since", help="ISO datetime; skip deliveries before it")
+    parser.add_argument("--out", help="Save the deliveries as JSON lines")
+    parser.add_argument("--post", metavar="URL", help="POST them to this receiver")
+    parser.add_argument("--secret", default=os.environ.get("TBA_WEBHOOK_SECRET", ""))
+    parser.add_argument("--interval", type=float, default=0.0, help="Seconds between POSTs")
+    args = parser.parse_args()
+
+    if args.tree:
+        deliveries = record(args.tree, args.event, _parse_since(args.since))
+    else:
+        with open(args.from_file, encoding="utf-8") as f:
+            deliveries = [json.loads(line) for line in f if line.strip()]
+    print(f"{len(deliveries)} delivery(ies)", flush=True)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for delivery in deliveries:
+                f.write(json.dumps(delivery, separators=(",", ":")) + "\n")
+        print(f"Wrote {args.out}", flush=True)
+    if args.post:
+        if not args.secret:
+            parser.error("--post needs --secret (or TBA_WEBHOOK_SECRET)")
+        statuses = replay(deliveries, args.post, args.secret, interval=args.interval)
+        return 0 if all(200 <= s < 300 for s in statuses) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
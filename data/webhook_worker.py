@@ -0,0 +1,571 @@
+"""
+TBA webhook worker: applies the deliveries the API queues from POST /webhooks/tba.
+
+The API validates the X-TBA-HMAC signature and stores each ``match_score`` /
+``schedule_updated`` push in ``webhook_queue`` (peekorobo-api/migrations/
+0009_webhook_queue.sql), then NOTIFYs ``webhook_queue``. This process LISTENs
+on that channel, claims pending rows with FOR UPDATE SKIP LOCKED (several
+workers can share the queue) and, per delivery:
+
+  match_score
+    1. upserts just that match's ``event_matches`` row (predictions kept);
+    2. advances the event's warm ACE state by that one match through
+       ``apply_match_updates`` when it is the next match in schedule order,
+       or re-simulates the event when a result arrives out of order or an
+       already-applied score is corrected;
+    3. rewrites pre-match snapshots and win probabilities for the event's
+       remaining matches (all of its matches after a re-simulation), then
+       the event's playoff odds when its bracket state changed
+       (playoff_bracket.py).
+    4. NOTIFYs event_updates so the API's live feed pushes the new rows.
+  schedule_updated
+    refetches the event's schedule, stores it and re-simulates the event.
+
+Warm state per event is the TBA match list, the carry priors the event was
+seeded with and the walked TeamPhaseStates. It is built on first use from
+``event/{key}/matches`` plus the priors recoverable from the event's stored
+pre-match snapshots (falling back to the season / prior-season ``team_epas``
+phases). A push that warms a cold (or expired) event is usually already in
+that schedule, so its predictions come from the warm-up re-simulation.
+Season aggregates (``team_epas``, ranks, rankings, awards, derived API
+tables) stay on live_daemon.py / run.py; this worker only keeps match rows
+and per-match predictions current between their cycles.
+
+Repeated pushes for the same match in one drain are coalesced to the newest.
+A failed delivery keeps its error and stays claimed, so it is retried
+WEBHOOK_CLAIM_TIMEOUT_SEC later, up to WEBHOOK_MAX_ATTEMPTS times. LISTEN needs
+a session-level connection: behind a transaction pooler (Neon ``-pooler``
+hosts) notifies never arrive and the worker falls back to WEBHOOK_POLL_SEC.
+
+Usage:
+    python data/webhook_worker.py            # LISTEN and drain until stopped
+    python data/webhook_worker.py --once     # drain what is pending and exit
+"""
+import json
+import os
+import select
+import sys
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import instrumentation
+# The simulation's own ordering / played rule, so the incremental path and a
+# full re-simulation agree on which match comes next.
+from ace_attribution import (
+    TeamPhaseState,
+    _match_sort_key,
+    _played,
+    apply_match_updates,
+    simulate_event_pre_match_snapshots,
+)
+from prediction import (
+    AceParams,
+    DbPredictionData,
+    MatchPrediction,
+    MatchRow,
+    PredictionConfig,
+    alliance_strength_pre_match,
+    apply_match_predictions_to_db,
+    load_prediction_data_from_db,
+    load_season_carry_priors,
+    predict_win_probability,
+    resolve_pre_match_teams_for_match,
+)
+from run import (
+    finalize_pre_match_team,
+    get_pg_connection,
+    insert_event_data,
+    match_rows_from_tba,
+    shutdown_event,
+    tba_get,
+)
+from event_updates import notify_event_updates
+from playoff_bracket import refresh_playoff_odds
+from season_year import season_of
+from team_keys import TEAM_KEYS
+
+CHANNEL = "webhook_queue"
+POLL_SEC = float(os.environ.get("WEBHOOK_POLL_SEC", "30"))
+BATCH = int(os.environ.get("WEBHOOK_BATCH", "50"))
+MAX_ATTEMPTS = int(os.environ.get("WEBHOOK_MAX_ATTEMPTS", "5"))
+# A row claimed longer ago than this belongs to a worker that died mid-delivery.
+CLAIM_TIMEOUT_SEC = int(os.environ.get("WEBHOOK_CLAIM_TIMEOUT_SEC", "300"))
+# Rebuild an event's warm state (and the season fallback ratings) after this long.
+STATE_TTL_SEC = float(os.environ.get("WEBHOOK_STATE_TTL_SEC", "3600"))
+
+
+def normalize_match(match: dict, event_key: str) -> dict:
+    """TBA webhook match -> the API v3 shape ace_attribution / match_rows_from_tba read.
+
+    Webhook payloads may list alliance teams under ``teams`` instead of
+    ``team_keys`` and can omit ``winning_alliance``.
+    """
+    m = dict(match)
+    m.setdefault("event_key", event_key)
+    alliances = {}
+    for color in ("red", "blue"):
+        a = dict((match.get("alliances") or {}).get(color) or {})
+        if "team_keys" not in a:
+            a["team_keys"] = list(a.get("teams") or [])
+        alliances[color] = a
+    m["alliances"] = alliances
+    if "winning_alliance" not in m:
+        red, blue = alliances["red"].get("score"), alliances["blue"].get("score")
+        if isinstance(red, int) and isinstance(blue, int) and (red > 0 or blue > 0):
+            m["winning_alliance"] = "red" if red > blue else "blue" if blue > red else ""
+        else:
+            m["winning_alliance"] = ""
+    return m
+
+
+def _fingerprint(match: dict) -> tuple:
+    """What an applied match contributed to ACE; a change forces a re-simulation."""
+    a = match["alliances"]
+    return (
+        a["red"].get("score"),
+        a["blue"].get("score"),
+        match.get("winning_alliance") or "",
+        tuple(a["red"].get("team_keys") or ()),
+        tuple(a["blue"].get("team_keys") or ()),
+        json.dumps(match.get("score_breakdown"), sort_keys=True),
+    )
+
+
+def _priors_from_snapshots(rows) -> Dict[str, Tuple[float, ...]]:
+    """Each team's (a, t, e, c) before its first match at the event, from stored pre_match_teams.
+
+    ``rows``: (comp_level, set_number, match_number, pre_match_teams) in any order.
+    """
+    priors: Dict[int, Tuple[float, ...]] = {}
+    ordered = sorted(rows, key=lambda r: _match_sort_key(
+        {"comp_level": r[0], "set_number": r[1], "match_number": r[2]}
+    ))
+    for _comp, _set, _num, pre_match in ordered:
+        if isinstance(pre_match, str):
+            try:
+                pre_match = json.loads(pre_match)
+            except ValueError:
+                continue
+        if not isinstance(pre_match, dict):
+            continue
+        for tn, payload in pre_match.items():
+            slot = TEAM_KEYS.slot(f"frc{tn}")
+            if slot in priors or not isinstance(payload, dict):
+                continue
+            a, t, e = (float(payload.get(k) or 0.0) for k in ("a", "t", "e"))
+            if a == 0.0 and t == 0.0 and e == 0.0:
+                continue
+            priors[slot] = (a, t, e, float(payload.get("c") or 0.0))
+    return priors
+
+
+@dataclass
+class EventState:
+    key: str
+    year: int
+    matches: Dict[str, dict]
+    # Priors and states are keyed by TEAM_KEYS slot (see team_keys.py).
+    priors: Dict[int, Tuple[float, ...]]
+    states: Dict[int, TeamPhaseState] = field(default_factory=dict)
+    # match_key -> fingerprint of every played match folded into ``states``.
+    applied: Dict[str, tuple] = field(default_factory=dict)
+    last_applied: Optional[tuple] = None  # _match_sort_key of the newest applied match
+    loaded_at: float = field(default_factory=time.time)
+
+
+class WebhookWorker:
+    def __init__(self):
+        self.events: Dict[str, EventState] = {}
+        self.season_data: Dict[int, Tuple[float, DbPredictionData]] = {}
+        self.ace = AceParams.from_env()
+        self.config = PredictionConfig.from_env()
+
+    def _sim_kwargs(self, ev: EventState) -> dict:
+        return dict(
+            year=ev.year,
+            method=self.ace.method,
+            k_base=self.ace.k_base,
+            shrink=self.ace.shrink,
+            spike_damp=self.ace.spike_damp,
+            k_up=self.ace.k_up,
+            k_down=self.ace.k_down,
+            partner_cap=self.ace.partner_cap,
+        )
+
+    # -- warm state -----------------------------------------------------------
+
+    def _load_event(self, conn, event_key: str) -> EventState:
+        matches = tba_get(f"event/{event_key}/matches")
+        if matches is None:
+            raise RuntimeError(f"TBA returned no schedule for {event_key}")
+        year = season_of(event_key)
+        priors: Dict[int, Tuple[float, ...]] = {}
+        if self.ace.carry_prior:
+            priors.update(load_season_carry_priors(conn, year - 1))
+            priors.update(load_season_carry_priors(conn, year))
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT comp_level, set_number, match_number, pre_match_teams
+                FROM event_matches
+                WHERE event_key = %s AND pre_match_teams IS NOT NULL
+                """,
+                (event_key,),
+            )
+            priors.update(_priors_from_snapshots(cur.fetchall()))
+            cur.close()
+        ev = EventState(
+            key=event_key,
+            year=year,
+            matches={m["key"]: m for m in matches if m.get("key")},
+            priors=priors,
+        )
+        self.events[event_key] = ev
+        return ev
+
+    def event_state(
+        self, conn, event_key: str
+    ) -> Tuple[EventState, Optional[Dict[str, Dict[int, TeamPhaseState]]]]:
+        """Warm state for ``event_key``, plus the warm-up re-simulation's snapshots
+        when it was (re)loaded just now (None when the cached state was reused)."""
+        ev = self.events.get(event_key)
+        if ev is not None and time.time() - ev.loaded_at <= STATE_TTL_SEC:
+            return ev, None
+        ev = self._load_event(conn, event_key)
+        snapshots = self._resimulate(ev)
+        print(f"[webhook] warmed {event_key}: {len(ev.matches)} match(es), {len(ev.applied)} played", flush=True)
+        return ev, snapshots
+
+    def prediction_data(self, conn, year: int) -> DbPredictionData:
+        """Season ratings used for teams without a walk-forward snapshot (cached)."""
+        cached = self.season_data.get(year)
+        if cached is None or time.time() - cached[0] > STATE_TTL_SEC:
+            with instrumentation.span("webhook.load_season", year=year):
+                data = load_prediction_data_from_db(conn, year)
+            # Only the rating fallbacks are used; drop the season's match rows.
+            data.matches = []
+            cached = (time.time(), data)
+            self.season_data[year] = cached
+        return cached[1]
+
+    # -- ACE ------------------------------------------------------------------
+
+    def _resimulate(self, ev: EventState) -> Dict[str, Dict[int, TeamPhaseState]]:
+        """Walk the whole event from its priors; returns pre-match snapshots for every match."""
+        kwargs = self._sim_kwargs(ev)
+        states, snapshots = simulate_event_pre_match_snapshots(
+            list(ev.matches.values()),
+            prior_means=ev.priors if self.ace.carry_prior else None,
+            seed_priors=self.ace.carry_prior,
+            **kwargs,
+        )
+        ev.states = states
+        ev.applied = {}
+        ev.last_applied = None
+        for m in sorted(ev.matches.values(), key=_match_sort_key):
+            if _played(m):
+                ev.applied[m["key"]] = _fingerprint(m)
+                ev.last_applied = _match_sort_key(m)
+        return snapshots
+
+    def _advance(self, ev: EventState, match: dict) -> None:
+        """Fold one newly played match into the event's states (the incremental path)."""
+        apply_match_updates(
+            ev.states,
+            match,
+            ev.year,
+            self.ace.method,
+            self.ace.k_base,
+            self.ace.shrink,
+            ev.priors if self.ace.carry_prior else None,
+            spike_damp=self.ace.spike_damp,
+            k_up=self.ace.k_up,
+            k_down=self.ace.k_down,
+            partner_cap=self.ace.partner_cap,
+        )
+        ev.applied[match["key"]] = _fingerprint(match)
+        ev.last_applied = _match_sort_key(match)
+
+    def _remaining_snapshots(self, ev: EventState) -> Dict[str, Dict[int, TeamPhaseState]]:
+        """Unplayed matches after the newest applied one all see the current states."""
+        out: Dict[str, Dict[int, TeamPhaseState]] = {}
+        for key, m in ev.matches.items():
+            if _played(m) or (ev.last_applied is not None and _match_sort_key(m) <= ev.last_applied):
+                continue
+            out[key] = {
+                slot: ev.states.get(slot) or TeamPhaseState()
+                for team_slots in TEAM_KEYS.match_slots(m)
+                for slot in team_slots
+            }
+        return out
+
+    # -- predictions ----------------------------------------------------------
+
+    def _write_predictions(self, conn, ev: EventState, snapshots: Dict[str, Dict[int, TeamPhaseState]]) -> int:
+        if self.config.rating_scope != "pre_match" or not snapshots:
+            return 0
+        data = self.prediction_data(conn, ev.year)
+        predictions: List[MatchPrediction] = []
+        for match_key, team_states in snapshots.items():
+            m = ev.matches.get(match_key)
+            if m is None:
+                continue
+            snap: Dict[int, Dict[str, float]] = {}
+            for slot, st in team_states.items():
+                tn = TEAM_KEYS.numbers[slot]
+                if tn <= 0 or (not st.initialized and st.match_count <= 0):
+                    continue
+                snap[tn] = finalize_pre_match_team(st, tn, ev.year)
+            red_slots, blue_slots = TEAM_KEYS.match_slots(m)
+            red = [t for t in (TEAM_KEYS.numbers[s] for s in red_slots) if t > 0]
+            blue = [t for t in (TEAM_KEYS.numbers[s] for s in blue_slots) if t > 0]
+            row = MatchRow(
+                match_key=match_key,
+                event_key=ev.key,
+                red_teams=red,
+                blue_teams=blue,
+                red_score=int(m["alliances"]["red"].get("score") or 0),
+                blue_score=int(m["alliances"]["blue"].get("score") or 0),
+                winning_alliance=m.get("winning_alliance") or "",
+                comp_level=m.get("comp_level") or "qm",
+            )
+            red_strength = alliance_strength_pre_match(data, red, ev.key, self.config, snap)
+            blue_strength = alliance_strength_pre_match(data, blue, ev.key, self.config, snap)
+            p_red, p_blue = predict_win_probability(red_strength, blue_strength, self.config)
+            predictions.append(MatchPrediction(
+                match_key=match_key,
+                p_red=p_red,
+                p_blue=p_blue,
+                red_predicted_score=red_strength,
+                blue_predicted_score=blue_strength,
+                pre_match_teams=resolve_pre_match_teams_for_match(data, row, snap),
+            ))
+        stats = apply_match_predictions_to_db(conn, ev.year, predictions, event_key=ev.key)
+        instrumentation.incr("rows.predictions_written", stats["written"])
+        return stats["written"]
+
+    # -- deliveries -----------------------------------------------------------
+
+    def _upsert_match_row(self, conn, event_key: str, match: dict) -> None:
+        row = match_rows_from_tba(event_key, [match])[0]
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE event_matches
+            SET comp_level = %s, match_number = %s, set_number = %s,
+                red_teams = %s, blue_teams = %s, red_score = %s, blue_score = %s,
+                winning_alliance = %s, youtube_key = COALESCE(%s, youtube_key),
+                predicted_time = %s, year = %s
+            WHERE match_key = %s AND event_key = %s
+            """,
+            tuple(row[2:]) + (season_of(event_key), row[0], event_key),
+        )
+        if cur.rowcount == 0:
+            cur.execute(
+                """
+                INSERT INTO event_matches (
+                    match_key, event_key, comp_level, match_number, set_number,
+                    red_teams, blue_teams, red_score, blue_score, winning_alliance,
+                    youtube_key, predicted_time, year
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                tuple(row) + (season_of(event_key),),
+            )
+        conn.commit()
+        cur.close()
+        instrumentation.incr("rows.event_matches_written")
+
+    def apply_match_score(self, conn, event_key: str, raw_match: dict) -> str:
+        ev, warmed = self.event_state(conn, event_key)
+        match = normalize_match(raw_match, event_key)
+        key = match["key"]
+        ev.matches[key] = match
+        self._upsert_match_row(conn, event_key, match)
+
+        played = _played(match)
+        if key in ev.applied and played and ev.applied[key] == _fingerprint(match):
+            if warmed is None:
+                # Nothing to re-rate, but the row was rewritten.
+                self._notify(conn, event_key)
+                return "duplicate"
+            # The schedule fetched to warm the event already had this result;
+            # the warm-up walk is the update.
+            mode, snapshots = "warmed", warmed
+        elif key in ev.applied:
+            mode, snapshots = "resimulated", self._resimulate(ev)
+        elif not played:
+            mode, snapshots = "scheduled", self._remaining_snapshots(ev)
+        elif ev.last_applied is None or _match_sort_key(match) > ev.last_applied:
+            self._advance(ev, match)
+            mode, snapshots = "incremental", self._remaining_snapshots(ev)
+        else:
+            mode, snapshots = "resimulated", self._resimulate(ev)
+        if warmed is not None and mode in ("scheduled", "incremental"):
+            # Matches up to this one keep their warm-up snapshots; the rest were rewalked.
+            snapshots = {**warmed, **snapshots}
+        written = self._write_predictions(conn, ev, snapshots)
+        refresh_playoff_odds(conn, [event_key], self.config)
+        self._notify(conn, event_key)
+        return f"{mode}, {written} prediction(s)"
+
+    def _notify(self, conn, event_key: str) -> None:
+        cur = conn.cursor()
+        notify_event_updates(cur, "matches", [event_key])
+        conn.commit()
+        cur.close()
+
+    def apply_schedule_updated(self, conn, event_key: str) -> str:
+        ev = self._load_event(conn, event_key)
+        rows = match_rows_from_tba(event_key, list(ev.matches.values()))
+        if rows:
+            insert_event_data(
+                [{
+                    "event_key": event_key,
+                    "data": {"event": (event_key,), "teams": [], "matches": rows},
+                    "updates_needed": {"event": False, "teams": False, "matches": True},
+                    "has_changes": True,
+                }],
+                ev.year,
+            )
+        written = self._write_predictions(conn, ev, self._resimulate(ev))
+        refresh_playoff_odds(conn, [event_key], self.config)
+        self._notify(conn, event_key)
+        return f"{len(rows)} match row(s), {written} prediction(s)"
+
+    # -- queue ----------------------------------------------------------------
+
+    def claim(self, conn) -> list:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE webhook_queue q
+            SET claimed_at = NOW(), attempts = q.attempts + 1
+            FROM (
+                SELECT id FROM webhook_queue
+                WHERE done_at IS NULL AND attempts < %s
+                  AND (claimed_at IS NULL OR claimed_at < NOW() - make_interval(secs => %s))
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            ) pending
+            WHERE q.id = pending.id
+            RETURNING q.id, q.message_type, q.event_key, q.match_key, q.payload
+            """,
+            (MAX_ATTEMPTS, CLAIM_TIMEOUT_SEC, BATCH),
+        )
+        rows = sorted(cur.fetchall())
+        conn.commit()
+        cur.close()
+        return rows
+
+    def _finish(self, conn, ids: List[int], error: Optional[str] = None) -> None:
+        cur = conn.cursor()
+        if error is None:
+            cur.execute(
+                "UPDATE webhook_queue SET done_at = NOW(), error = NULL WHERE id = ANY(%s)",
+                (ids,),
+            )
+        else:
+            cur.execute(
+                "UPDATE webhook_queue SET error = %s WHERE id = ANY(%s)",
+                (error[:2000], ids),
+            )
+        conn.commit()
+        cur.close()
+
+    def drain(self, conn) -> int:
+        """Apply every pending delivery; returns how many queue rows were settled."""
+        settled = 0
+        while not shutdown_event.is_set():
+            rows = self.claim(conn)
+            if not rows:
+                break
+            # Newest push per match wins; older ones in the batch are settled unapplied.
+            newest = {}
+            for row in rows:
+                if row[1] == "match_score":
+                    newest[row[3]] = row[0]
+            for queue_id, message_type, event_key, match_key, payload in rows:
+                if message_type == "match_score" and newest.get(match_key) != queue_id:
+                    self._finish(conn, [queue_id])
+                    settled += 1
+                    continue
+                started = time.time()
+                try:
+                    message = payload if isinstance(payload, dict) else json.loads(payload)
+                    with instrumentation.span(f"webhook.{message_type}", event=event_key):
+                        if message_type == "match_score":
+                            detail = self.apply_match_score(
+                                conn, event_key, message["message_data"]["match"]
+                            )
+                        else:
+                            detail = self.apply_schedule_updated(conn, event_key)
+                    self._finish(conn, [queue_id])
+                    print(
+                        f"[webhook] #{queue_id} {message_type} {match_key or event_key}: "
+                        f"{detail} in {time.time() - started:.2f}s",
+                        flush=True,
+                    )
+                except Exception as e:
+                    conn.rollback()
+                    # Warm state may be half-updated; rebuild it on the retry.
+                    self.events.pop(event_key, None)
+                    print(f"[webhook] #{queue_id} {message_type} failed: {e}", flush=True)
+                    traceback.print_exc()
+                    self._finish(conn, [queue_id], error=str(e))
+                settled += 1
+        return settled
+
+    def run_forever(self) -> None:
+        listen_conn = get_pg_connection()
+        listen_conn.commit()  # end the statement_timeout transaction pooler hosts open
+        listen_conn.autocommit = True
+        cur = listen_conn.cursor()
+        cur.execute(f"LISTEN {CHANNEL}")
+        cur.close()
+        conn = get_pg_connection()
+        print(f"[webhook] listening on {CHANNEL}", flush=True)
+        try:
+            while not shutdown_event.is_set():
+                self.drain(conn)
+                # Wake on NOTIFY, or every POLL_SEC to pick up retries and missed notifies.
+                if select.select([listen_conn], [], [], POLL_SEC) != ([], [], []):
+                    listen_conn.poll()
+                    listen_conn.notifies.clear()
+        finally:
+            conn.close()
+            listen_conn.close()
+
+
+def main(argv) -> int:
+    from db_target import assert_safe_db_target, describe_db_target
+    from run import apply_schema_migrations, finalize
+
+    assert_safe_db_target("webhook_worker.py")
+    print(f"DB target: {describe_db_target()}", flush=True)
+    apply_schema_migrations()
+    worker = WebhookWorker()
+    try:
+        if "--once" in argv:
+            conn = get_pg_connection()
+            try:
+                print(f"[webhook] settled {worker.drain(conn)} delivery(ies)", flush=True)
+            finally:
+                conn.close()
+        else:
+            worker.run_forever()
+    finally:
+        finalize()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
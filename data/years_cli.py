@@ -1,4 +1,4 @@
-"""Parse season year CLI args: ``2026``, ``2024,2025,2026``, or multiple args."""
+"""Parse season year CLI args: ``2026``, ``2024,2025,2026``, ``2015-2026``, or multiple args."""
 
 from __future__ import annotations
 
@@ -8,8 +8,9 @@ from typing import List
 def parse_years(*raw_parts: str) -> List[int]:
     """Return unique years in the order first seen.
 
-    Accepts comma- and/or whitespace-separated tokens across one or more args.
-    Raises ValueError on empty input or non-integer tokens.
+    Accepts comma- and/or whitespace-separated tokens across one or more args;
+    a token may be an inclusive range (``2015-2026``).
+    Raises ValueError on empty input, non-integer tokens or descending ranges.
     """
     tokens: List[str] = []
     for part in raw_parts:
@@ -24,8 +25,16 @@ def parse_years(*raw_parts: str) -> List[int]:
     years: List[int] = []
     seen = set()
     for tok in tokens:
-        year = int(tok)
-        if year not in seen:
-            seen.add(year)
-            years.append(year)
+        start, sep, end = tok.partition("-")
+        if sep:
+            first, last = int(start), int(end)
+            if first > last:
+                raise ValueError(f"Descending year range: {tok}")
+            span = range(first, last + 1)
+        else:
+            span = (int(tok),)
+        for year in span:
+            if year not in seen:
+                seen.add(year)
+                years.append(year)
     return years
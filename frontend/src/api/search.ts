@@ -17,10 +17,29 @@ async function fetchJson<T>(path: string): Promise<T> {
   return (await res.json()) as T;
 }
 
+/** Static /data JSON, or null when missing (Pages' SPA fallback answers 200 HTML). */
+async function fetchStaticJson<T>(path: string): Promise<T | null> {
+  try {
+    const res = await fetch(`${SEARCH_BASE}${path}`, { headers: { Accept: "application/json" } });
+    if (!res.ok) return null;
+    const ctype = res.headers.get("content-type") || "";
+    if (!ctype.includes("application/json")) return null;
+    return (await res.json()) as T;
+  } catch {
+    return null;
+  }
+}
+
 export async function loadSearchIndex(): Promise<SearchIndex> {
   if (cache) return cache;
   if (inflight) return inflight;
   inflight = (async () => {
+    // Static export (data/static/search/index.json) first; the API is the fallback.
+    const staticIndex = await fetchStaticJson<SearchIndexResponse>("/search/index.json");
+    if (staticIndex && staticIndex.teams && staticIndex.events) {
+      cache = staticIndex;
+      return cache;
+    }
     try {
       cache = await apiGet<SearchIndexResponse>("/search/index");
     } catch {
@@ -31,7 +50,7 @@ export async function loadSearchIndex(): Promise<SearchIndex> {
   return inflight;
 }
 
-// A row in a static per-year leaderboard snapshot (data/leaderboards/<year>.json).
+// A row in a static per-year leaderboard snapshot (data/static/leaderboards/<year>.json).
 interface StaticLeaderboardRow {
   team_number: number;
   ace: number | null;
@@ -53,10 +72,30 @@ interface StaticLeaderboardRow {
   count_district: number | null;
 }
 
+// `generate_leaderboards.py --columnar` writes parallel arrays instead of row objects.
+interface ColumnarRows<T> {
+  format: "columnar";
+  count: number;
+  columns: { [K in keyof T]: T[K][] };
+}
+
 interface StaticLeaderboard {
   year: number;
   generated_at: string;
-  teams: StaticLeaderboardRow[];
+  teams: StaticLeaderboardRow[] | ColumnarRows<StaticLeaderboardRow>;
+}
+
+function expandRows<T>(rows: T[] | ColumnarRows<T>): T[] | null {
+  if (Array.isArray(rows)) return rows;
+  if (!rows || rows.format !== "columnar" || !rows.columns) return null;
+  const keys = Object.keys(rows.columns) as (keyof T)[];
+  const out: T[] = [];
+  for (let i = 0; i < rows.count; i++) {
+    const row = {} as T;
+    for (const k of keys) row[k] = rows.columns[k][i];
+    out.push(row);
+  }
+  return out;
 }
 
 /**
@@ -66,16 +105,11 @@ interface StaticLeaderboard {
  */
 export async function loadStaticLeaderboard(year: number): Promise<TeamPerfResponse[] | null> {
   try {
-    const res = await fetch(`${SEARCH_BASE}/leaderboards/${year}.json`, {
-      headers: { Accept: "application/json" },
-    });
-    if (!res.ok) return null;
-    // Pages SPA fallback returns 200 HTML when the snapshot is missing; don't treat that as data.
-    const ctype = res.headers.get("content-type") || "";
-    if (!ctype.includes("application/json")) return null;
-    const data = (await res.json()) as StaticLeaderboard;
-    if (!data || !Array.isArray(data.teams)) return null;
-    return data.teams.map((r) => ({
+    const data = await fetchStaticJson<StaticLeaderboard>(`/leaderboards/${year}.json`);
+    if (!data) return null;
+    const teams = expandRows(data.teams);
+    if (!teams) return null;
+    return teams.map((r) => ({
       team_number: r.team_number,
       team_perfs: [
         {
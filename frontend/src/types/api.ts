@@ -62,6 +62,7 @@ export interface TeamPerfResponse {
 export interface TeamPerfListResponse {
   team_perfs: TeamPerfResponse[];
   next: number | null;
+  next_cursor?: string | null;
 }
 
 // ---- Events (query/events.py) ----
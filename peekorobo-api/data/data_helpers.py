@@ -1,4 +1,10 @@
-from typing import Optional, TypeVar, Callable
+import threading
+import time
+from typing import Callable, Dict, Optional, Set, Tuple, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
 T = TypeVar('T')
 
@@ -7,4 +13,29 @@ def convert_optional(input: T, converter: Callable[Optional[T], Optional[T]]) ->
         return input
     else:
         return None
- 
+
+
+# Which seasons the pipeline's precomputed tables cover (h2h index, predictor
+# pool, rating series). Rebuilds happen at most a few times an hour, so a short
+# process cache keeps these lookups off the request path.
+BUILD_YEARS_TTL_SEC = 300.0
+_build_years: Dict[str, Tuple[float, Set[int]]] = {}
+_build_years_lock = threading.Lock()
+
+
+def cached_distinct_years(db: Session, name: str, column) -> Set[int]:
+    """Distinct non-null ``column`` values, cached for BUILD_YEARS_TTL_SEC under ``name``."""
+    now = time.monotonic()
+    with _build_years_lock:
+        hit = _build_years.get(name)
+        if hit is not None and (now - hit[0]) < BUILD_YEARS_TTL_SEC:
+            return hit[1]
+    try:
+        years = {int(y) for y in db.scalars(select(column).distinct()).all() if y is not None}
+    except SQLAlchemyError:
+        # Build table missing (migration not applied yet): callers stay on the scan path.
+        db.rollback()
+        years = set()
+    with _build_years_lock:
+        _build_years[name] = (now, years)
+    return years
@@ -1,3 +1,4 @@
+from typing import Optional
 from sqlalchemy import Text, INT, select
 from sqlalchemy.orm import Mapped, mapped_column, Session
 from data.db import Base
@@ -11,6 +12,7 @@ class EventAwards(Base):
     event_key: Mapped[str] = mapped_column(Text, primary_key=True)
     team_number: Mapped[int] = mapped_column(INT, primary_key=True)
     award_name: Mapped[str] = mapped_column(Text, primary_key=True)
+    year: Mapped[Optional[int]] = mapped_column(INT, nullable=True)
 
 
 def get_event_awards(db: Session, event_key: str, query: EventAwardsQuery) -> EventAwardsResponse:
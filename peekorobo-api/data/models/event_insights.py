@@ -114,7 +114,7 @@ def get_event_insights(db: Session, year: int) -> EventInsightsResponse:
 
     et_rows = db.execute(
         select(EventTeams.event_key, EventTeams.team_number).where(
-            EventTeams.event_key.like(f"{year}%")
+            EventTeams.year == year
         )
     ).all()
     teams_by_event: dict[str, List[int]] = defaultdict(list)
@@ -1,7 +1,8 @@
 from typing import Optional, List, Dict, Any
-from sqlalchemy import Text, INT, select, or_, case, func
-from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, JSONB
+from sqlalchemy import Text, INT, BOOLEAN, REAL, select, or_, case
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, Session
+from data.data_helpers import cached_distinct_years
 from data.db import Base
 from data.models.events import Events
 from query.event_matches import (
@@ -9,6 +10,7 @@ from query.event_matches import (
     EventMatchResponse,
     MatchResponse,
     TeamMatchRating,
+    TeamMatchRatingSeriesResponse,
     TeamMatchRatingsResponse,
 )
 
@@ -54,6 +56,7 @@ class EventMatch(Base):
     red_predicted_score: Mapped[Optional[float]] = mapped_column(DOUBLE_PRECISION)
     blue_predicted_score: Mapped[Optional[float]] = mapped_column(DOUBLE_PRECISION)
     pre_match_teams: Mapped[Optional[dict]] = mapped_column(JSONB)
+    year: Mapped[Optional[int]] = mapped_column(INT, nullable=True)
 
 
 def get_event_matches(db: Session, event_key: str, query: EventMatchesRequest) -> EventMatchResponse:
@@ -111,8 +114,123 @@ def _compact_floats(raw: Any) -> Optional[Dict[str, float]]:
     return out if "ace" in out else None
 
 
+class TeamRatingSeries(Base):
+    """Per-(team, season) parallel arrays written by data/rating_series.py."""
+
+    __tablename__ = "team_rating_series"
+
+    team_number: Mapped[int] = mapped_column(INT, primary_key=True)
+    year: Mapped[int] = mapped_column(INT, primary_key=True)
+    match_keys: Mapped[List[str]] = mapped_column(ARRAY(Text))
+    event_keys: Mapped[List[str]] = mapped_column(ARRAY(Text))
+    comp_levels: Mapped[List[str]] = mapped_column(ARRAY(Text))
+    match_numbers: Mapped[List[int]] = mapped_column(ARRAY(INT))
+    set_numbers: Mapped[List[int]] = mapped_column(ARRAY(INT))
+    played: Mapped[List[bool]] = mapped_column(ARRAY(BOOLEAN))
+    a: Mapped[List[Optional[float]]] = mapped_column(ARRAY(REAL))
+    t: Mapped[List[Optional[float]]] = mapped_column(ARRAY(REAL))
+    e: Mapped[List[Optional[float]]] = mapped_column(ARRAY(REAL))
+    r: Mapped[List[Optional[float]]] = mapped_column(ARRAY(REAL))
+    c: Mapped[List[Optional[float]]] = mapped_column(ARRAY(REAL))
+    ace: Mapped[List[Optional[float]]] = mapped_column(ARRAY(REAL))
+
+
+class TeamRatingSeriesBuild(Base):
+    __tablename__ = "team_rating_series_builds"
+
+    year: Mapped[int] = mapped_column(INT, primary_key=True)
+    teams: Mapped[int] = mapped_column(INT)
+
+
+def get_team_match_rating_series(db: Session, team_number: int, year: int) -> TeamMatchRatingSeriesResponse:
+    """Walk-forward ACE components for one team in one season, as parallel arrays.
+
+    One primary-key read of the precomputed series when the season has been
+    built; otherwise the row-shaped scan is transposed.
+    """
+    if year not in cached_distinct_years(db, "rating_series", TeamRatingSeriesBuild.year):
+        rows = _team_match_ratings_scan(db, team_number, year)
+        out = TeamMatchRatingSeriesResponse(team_number=team_number, year=year)
+        for m in rows:
+            out.match_key.append(m.match_key)
+            out.event_key.append(m.event_key)
+            out.comp_level.append(m.comp_level)
+            out.match_number.append(m.match_number)
+            out.set_number.append(m.set_number)
+            out.played.append(m.played)
+            for key in ("a", "t", "e", "r", "c", "ace"):
+                getattr(out, key).append(getattr(m, key))
+        return out
+
+    row = db.get(TeamRatingSeries, (team_number, year))
+    if row is None:
+        return TeamMatchRatingSeriesResponse(team_number=team_number, year=year)
+    played = list(row.played)
+    pending = [k for k, p in zip(row.match_keys, played) if not p]
+    if pending:
+        # Scores land between pipeline runs; re-check only the matches the
+        # build saw as unplayed (none for a finished season).
+        now_played = set(
+            db.scalars(
+                select(EventMatch.match_key).where(
+                    EventMatch.match_key.in_(pending),
+                    or_(
+                        EventMatch.red_score > 0,
+                        EventMatch.blue_score > 0,
+                        EventMatch.winning_alliance.in_(("red", "blue")),
+                    ),
+                )
+            ).all()
+        )
+        if now_played:
+            played = [p or k in now_played for k, p in zip(row.match_keys, played)]
+    return TeamMatchRatingSeriesResponse(
+        team_number=team_number,
+        year=year,
+        match_key=row.match_keys,
+        event_key=row.event_keys,
+        comp_level=row.comp_levels,
+        match_number=row.match_numbers,
+        set_number=row.set_numbers,
+        played=played,
+        a=row.a,
+        t=row.t,
+        e=row.e,
+        r=row.r,
+        c=row.c,
+        ace=row.ace,
+    )
+
+
 def get_team_match_ratings(db: Session, team_number: int, year: int) -> TeamMatchRatingsResponse:
-    """Walk-forward ACE components for one team in one season.
+    """Walk-forward ACE components for one team in one season (one object per match)."""
+    if year not in cached_distinct_years(db, "rating_series", TeamRatingSeriesBuild.year):
+        return TeamMatchRatingsResponse(
+            team_number=team_number, year=year, matches=_team_match_ratings_scan(db, team_number, year)
+        )
+    s = get_team_match_rating_series(db, team_number, year)
+    matches = [
+        TeamMatchRating(
+            match_key=s.match_key[i],
+            event_key=s.event_key[i],
+            comp_level=s.comp_level[i],
+            match_number=s.match_number[i],
+            set_number=s.set_number[i],
+            played=s.played[i],
+            a=s.a[i],
+            t=s.t[i],
+            e=s.e[i],
+            r=s.r[i],
+            c=s.c[i],
+            ace=s.ace[i],
+        )
+        for i in range(len(s.match_key))
+    ]
+    return TeamMatchRatingsResponse(team_number=team_number, year=year, matches=matches)
+
+
+def _team_match_ratings_scan(db: Session, team_number: int, year: int) -> List[TeamMatchRating]:
+    """Fallback for seasons without a rating series build.
 
     Extracts only this team's compact JSONB object in SQL so the API does not
     ship six-robot payloads or other matches at the event.
@@ -142,7 +260,7 @@ def get_team_match_ratings(db: Session, team_number: int, year: int) -> TeamMatc
         .select_from(EventMatch)
         .outerjoin(Events, Events.event_key == EventMatch.event_key)
         .where(
-            func.left(EventMatch.event_key, 4) == str(year),
+            EventMatch.year == year,
             or_(*_team_in_list(team_number)),
             rating_col.is_not(None),
         )
@@ -180,4 +298,4 @@ def get_team_match_ratings(db: Session, team_number: int, year: int) -> TeamMatc
                 ace=compact.get("ace"),
             )
         )
-    return TeamMatchRatingsResponse(team_number=team_number, year=year, matches=matches)
+    return matches
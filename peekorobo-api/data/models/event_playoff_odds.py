@@ -0,0 +1,33 @@
+from typing import List, Optional
+from datetime import datetime
+from sqlalchemy import INT, Text, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, Session
+from data.db import Base
+from query.event_playoff_odds import AlliancePlayoffOdds, EventPlayoffOddsResponse
+
+
+class EventPlayoffOdds(Base):
+    """One row per event, written by data/playoff_bracket.py when its bracket state changes."""
+
+    __tablename__ = "event_playoff_odds"
+
+    event_key: Mapped[str] = mapped_column(Text, primary_key=True)
+    year: Mapped[Optional[int]] = mapped_column(INT, nullable=True)
+    state_key: Mapped[str] = mapped_column(Text)
+    engine: Mapped[str] = mapped_column(Text)
+    alliances: Mapped[List[dict]] = mapped_column(JSONB)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+def get_event_playoff_odds(db: Session, event_key: str) -> EventPlayoffOddsResponse:
+    row = db.get(EventPlayoffOdds, event_key)
+    if row is None:
+        return EventPlayoffOddsResponse(event_key=event_key)
+    return EventPlayoffOddsResponse(
+        event_key=event_key,
+        engine=row.engine,
+        state_key=row.state_key,
+        updated_at=row.updated_at.isoformat() if row.updated_at else None,
+        alliances=[AlliancePlayoffOdds(**a) for a in row.alliances or []],
+    )
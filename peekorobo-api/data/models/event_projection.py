@@ -0,0 +1,284 @@
+"""Monte Carlo projection of an event's final qualification rankings.
+
+Inputs are the event's qual schedule (``event_matches``, comp_level ``qm``),
+its current ``event_rankings`` and the stored pre-match win probability of
+each unplayed match (``red_win_prob``, written by the pipeline from pre-match
+ACE). Every remaining match is drawn independently for all simulations at
+once: a (simulations x matches) boolean array of red wins is multiplied into
+(matches x teams) alliance incidence matrices to give every simulated final
+record, which is ranked per simulation and histogrammed per team.
+
+Ranking uses win-loss-tie ranking points; bonus RPs and the official
+tiebreakers are not stored, so ties on RP fall back to the current rank
+(which already reflects them), then to a random draw for teams not yet
+ranked.
+
+Requested simulation counts are rounded up to a fixed tier
+(``SIMULATION_TIERS``), so arbitrary counts cannot each force a fresh run.
+Results are cached per (event, tier) together with a fingerprint of the rows
+they were computed from; a newly played match, a changed prediction
+or a rankings refresh changes the fingerprint and the next request re-runs
+the simulation. The RNG is seeded from the fingerprint, so every dyno serves
+the same numbers for the same state.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from data.models.event_matches import EventMatch, _parse_team_list
+from data.models.event_rankings import EventRankings
+from query.event_projection import EventProjectionResponse, TeamProjection
+
+try:
+    import numpy as np
+except ImportError:  # the pure-Python loop below runs a capped number of simulations
+    np = None
+
+TOP_N = 8
+# Served simulation counts; requests round up to the next tier.
+SIMULATION_TIERS = (1000, 5000, 20000, 50000)
+# Simulations per vectorized batch; bounds peak memory at ~batch x matches bytes.
+_BATCH = 10_000
+# Without numpy the loop costs ~matches x teams per simulation.
+_PY_MAX_SIMULATIONS = int(os.getenv("PROJECTION_PY_MAX_SIMULATIONS", "2000"))
+_CACHE_SIZE = int(os.getenv("PROJECTION_CACHE_SIZE", "256"))
+
+_cache: "OrderedDict[Tuple[str, int], Tuple[str, EventProjectionResponse]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+@dataclass
+class EventState:
+    teams: List[int]
+    wins: List[int]
+    losses: List[int]
+    ties: List[int]
+    # Lower is better; ranked teams get their current rank, others None.
+    current_rank: List[Optional[int]]
+    # Remaining matches as (red team indexes, blue team indexes, P(red wins)).
+    remaining: List[Tuple[List[int], List[int], float]]
+    played: int
+
+
+def _played(m: EventMatch) -> bool:
+    return (m.red_score or 0) > 0 or (m.blue_score or 0) > 0 or m.winning_alliance in ("red", "blue")
+
+
+def _red_prob(m: EventMatch) -> float:
+    if m.red_win_prob is not None:
+        p = m.red_win_prob
+    elif m.blue_win_prob is not None:
+        p = 1.0 - m.blue_win_prob
+    else:
+        p = 0.5
+    return min(1.0, max(0.0, float(p)))
+
+
+def _fingerprint(matches: List[EventMatch], rankings: List[EventRankings]) -> str:
+    h = hashlib.sha256()
+    for m in matches:
+        h.update(repr((
+            m.match_key, m.red_teams, m.blue_teams, m.red_score, m.blue_score,
+            m.winning_alliance, m.red_win_prob, m.blue_win_prob,
+        )).encode())
+    for r in rankings:
+        h.update(repr((r.team_number, r.rank, r.wins, r.losses, r.ties)).encode())
+    return h.hexdigest()
+
+
+def build_state(matches: List[EventMatch], rankings: List[EventRankings]) -> EventState:
+    """Current records from played quals; the rest of the qual schedule as draws."""
+    roster = {r.team_number for r in rankings if r.team_number is not None}
+    parsed = []
+    for m in matches:
+        red, blue = _parse_team_list(m.red_teams), _parse_team_list(m.blue_teams)
+        roster.update(red)
+        roster.update(blue)
+        parsed.append((m, red, blue))
+    teams = sorted(roster)
+    index = {t: i for i, t in enumerate(teams)}
+    wins, losses, ties = [0] * len(teams), [0] * len(teams), [0] * len(teams)
+    rank_by_team = {r.team_number: r.rank for r in rankings if r.rank}
+    remaining = []
+    played = 0
+    for m, red, blue in parsed:
+        red_i, blue_i = [index[t] for t in red], [index[t] for t in blue]
+        if not _played(m):
+            remaining.append((red_i, blue_i, _red_prob(m)))
+            continue
+        played += 1
+        if m.winning_alliance == "red":
+            win, lose = red_i, blue_i
+        elif m.winning_alliance == "blue":
+            win, lose = blue_i, red_i
+        else:
+            for i in red_i + blue_i:
+                ties[i] += 1
+            continue
+        for i in win:
+            wins[i] += 1
+        for i in lose:
+            losses[i] += 1
+    return EventState(
+        teams=teams,
+        wins=wins,
+        losses=losses,
+        ties=ties,
+        current_rank=[rank_by_team.get(t) for t in teams],
+        remaining=remaining,
+        played=played,
+    )
+
+
+def _tiebreak_prior(state: EventState) -> List[float]:
+    """Higher is better: ranked teams above unranked ones, in current-rank order."""
+    n = len(state.teams)
+    return [float(n + 1 - r) if r else 0.0 for r in state.current_rank]
+
+
+def simulate_numpy(state: EventState, simulations: int, seed: int) -> Tuple[List[List[int]], List[float]]:
+    """(rank counts [team][rank - 1], mean simulated wins) over ``simulations`` completions."""
+    n, m = len(state.teams), len(state.remaining)
+    rng = np.random.default_rng(seed)
+    red_inc = np.zeros((m, n), dtype=np.float32)
+    blue_inc = np.zeros((m, n), dtype=np.float32)
+    p_red = np.empty(m, dtype=np.float64)
+    for j, (red_i, blue_i, p) in enumerate(state.remaining):
+        red_inc[j, red_i] = 1.0
+        blue_inc[j, blue_i] = 1.0
+        p_red[j] = p
+    base_wins = np.asarray(state.wins, dtype=np.float32)
+    ties = np.asarray(state.ties, dtype=np.float32)
+    prior = np.asarray(_tiebreak_prior(state), dtype=np.float32)
+    counts = np.zeros(n * n, dtype=np.int64)
+    win_sum = np.zeros(n, dtype=np.float64)
+    offsets = np.arange(n, dtype=np.int64) * n
+
+    done = 0
+    while done < simulations:
+        batch = min(_BATCH, simulations - done)
+        red_won = (rng.random((batch, m)) < p_red).astype(np.float32)
+        wins = base_wins + red_won @ red_inc + (1.0 - red_won) @ blue_inc
+        win_sum += wins.sum(axis=0)
+        # W-L-T RP (2 per win, 1 per tie) scaled so the tiebreak prior (<= n)
+        # plus jitter (< 1) only orders teams level on RP.
+        key = (2.0 * wins + ties) * (n + 2) + prior + rng.random((batch, n), dtype=np.float32)
+        order = np.argsort(-key, axis=1)
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(n), axis=1)
+        counts += np.bincount((ranks + offsets).ravel(), minlength=n * n)
+        done += batch
+    return counts.reshape(n, n).tolist(), (win_sum / simulations).tolist()
+
+
+def simulate_python(state: EventState, simulations: int, seed: int) -> Tuple[List[List[int]], List[float]]:
+    """Same model as simulate_numpy, one simulation at a time."""
+    n = len(state.teams)
+    rng = random.Random(seed)
+    prior = _tiebreak_prior(state)
+    counts = [[0] * n for _ in range(n)]
+    win_sum = [0.0] * n
+    for _ in range(simulations):
+        wins = list(state.wins)
+        for red_i, blue_i, p in state.remaining:
+            for i in (red_i if rng.random() < p else blue_i):
+                wins[i] += 1
+        key = [(2 * wins[i] + state.ties[i], prior[i], rng.random()) for i in range(n)]
+        for rank, i in enumerate(sorted(range(n), key=key.__getitem__, reverse=True)):
+            counts[i][rank] += 1
+            win_sum[i] += wins[i]
+    return counts, [w / simulations for w in win_sum]
+
+
+def project(event_key: str, state: EventState, simulations: int, seed: int) -> EventProjectionResponse:
+    n = len(state.teams)
+    if np is not None:
+        engine = "numpy"
+    else:
+        engine = "python"
+        simulations = min(simulations, _PY_MAX_SIMULATIONS)
+    if n == 0:
+        counts, mean_wins = [], []
+    elif engine == "numpy":
+        counts, mean_wins = simulate_numpy(state, simulations, seed)
+    else:
+        counts, mean_wins = simulate_python(state, simulations, seed)
+
+    remaining_by_team = [0] * n
+    for red_i, blue_i, _ in state.remaining:
+        for i in red_i + blue_i:
+            remaining_by_team[i] += 1
+    teams = []
+    for i, team in enumerate(state.teams):
+        probs = [c / simulations for c in counts[i]]
+        teams.append(TeamProjection(
+            team_number=team,
+            current_rank=state.current_rank[i],
+            wins=state.wins[i],
+            losses=state.losses[i],
+            ties=state.ties[i],
+            remaining=remaining_by_team[i],
+            mean_wins=round(mean_wins[i], 3),
+            mean_rank=round(sum((r + 1) * p for r, p in enumerate(probs)), 3),
+            p_first=round(probs[0], 4),
+            p_top8=round(sum(probs[:TOP_N]), 4),
+            rank_probs=[round(p, 4) for p in probs],
+        ))
+    teams.sort(key=lambda t: (t.mean_rank, t.team_number))
+    return EventProjectionResponse(
+        event_key=event_key,
+        simulations=simulations,
+        engine=engine,
+        played_matches=state.played,
+        remaining_matches=len(state.remaining),
+        teams=teams,
+    )
+
+
+def snap_simulations(simulations: int) -> int:
+    for tier in SIMULATION_TIERS:
+        if simulations <= tier:
+            return tier
+    return SIMULATION_TIERS[-1]
+
+
+def get_event_projection(db: Session, event_key: str, simulations: int) -> EventProjectionResponse:
+    """Blocking (DB reads plus up to a full simulation); call off the event loop."""
+    simulations = snap_simulations(simulations)
+    matches = db.scalars(
+        select(EventMatch)
+        .where(EventMatch.event_key == event_key, EventMatch.comp_level == "qm")
+        .order_by(EventMatch.match_number, EventMatch.match_key)
+    ).all()
+    rankings = db.scalars(
+        select(EventRankings)
+        .where(EventRankings.event_key == event_key)
+        .order_by(EventRankings.team_number)
+    ).all()
+    fingerprint = _fingerprint(matches, rankings)
+    key = (event_key, simulations)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None and hit[0] == fingerprint:
+            _cache.move_to_end(key)
+            return hit[1]
+
+    seed = int(fingerprint[:16], 16)
+    result = project(event_key, build_state(matches, rankings), simulations, seed)
+    with _cache_lock:
+        _cache[key] = (fingerprint, result)
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
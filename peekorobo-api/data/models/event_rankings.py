@@ -1,3 +1,4 @@
+from typing import Optional
 from sqlalchemy import INT, Text, select
 from sqlalchemy.orm import mapped_column, Mapped, Session
 from data.db import Base
@@ -13,6 +14,7 @@ class EventRankings(Base):
     losses : Mapped[int] = mapped_column(INT)
     ties : Mapped[int] = mapped_column(INT)
     dq : Mapped[int] = mapped_column(INT)
+    year : Mapped[Optional[int]] = mapped_column(INT, nullable=True)
 
 def get_event_rankings(db: Session, event_key: str, query: EventRankingsQuery) -> EventRankingsResponse:
     stmt = select(EventRankings).where(EventRankings.event_key == event_key)
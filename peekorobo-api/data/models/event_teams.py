@@ -1,3 +1,4 @@
+from typing import Optional
 from sqlalchemy import Text, INT, select
 from sqlalchemy.orm import Mapped, mapped_column, Session
 from data.db import Base
@@ -12,6 +13,7 @@ class EventTeams(Base):
     city : Mapped[str] = mapped_column(Text)
     state_prov : Mapped[str] = mapped_column(Text)
     country : Mapped[str] = mapped_column(Text)
+    year : Mapped[Optional[int]] = mapped_column(INT, nullable=True)
 
 def get_event_teams(db: Session, event_key: str, query: EventTeamsQuery) -> EventTeamsResponse:
     stmt = select(EventTeams).where(EventTeams.event_key == event_key)
@@ -44,6 +44,8 @@ class Events(Base):
     lat: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     lng: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     postal_code: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Season from event_key, written at ingest (indexed with event_key / start_date).
+    year: Mapped[Optional[int]] = mapped_column(INT, nullable=True)
 
 def _opt_str(s: str | None) -> str | None:
     t = (s or "").strip()
@@ -89,7 +91,7 @@ def get_events(db: Session, event_year : int, event_query : EventQuery) -> Event
         cond = _district_match(Events.district_key, event_query.district_key)
         if cond is not None:
             where_clause.append(cond)
-    where_clause.append(func.extract("year", _start_date_as_datetime()) == event_year)
+    where_clause.append(Events.year == event_year)
 
     stmt = select(Events).where(*where_clause).order_by(_start_date_as_datetime())
     if event_query.limit is not None:
@@ -105,7 +107,7 @@ def get_events(db: Session, event_year : int, event_query : EventQuery) -> Event
 
 def get_event_keys(db: Session, year: int, event_query: EventQuery):
     """Return event keys for a given year, sorted by start_date. Uses same filters as get_events."""
-    where_clause = [func.extract("year", _start_date_as_datetime()) == year]
+    where_clause = [Events.year == year]
     if event_query.city is not None:
         where_clause.append(func.lower(Events.city) == func.lower(event_query.city))
     if event_query.state_prov is not None:
@@ -1,9 +1,13 @@
 import random
 from collections import defaultdict
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import select, or_, func, case
-from sqlalchemy.orm import Session, aliased
+from sqlalchemy import BIGINT, INT, Text, select, or_, case, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, Session, aliased, mapped_column
+
+from data.data_helpers import cached_distinct_years
+from data.db import Base
 
 from data.models.event_matches import EventMatch, _parse_team_list, _team_in_list
 from data.models.event_teams import EventTeams
@@ -38,6 +42,79 @@ _PLAYED = or_(
 )
 
 
+class TeamPairYear(Base):
+    """Per-season pair aggregates written by data/h2h_index.py (team_lo < team_hi)."""
+
+    __tablename__ = "team_pair_years"
+
+    team_lo: Mapped[int] = mapped_column(INT, primary_key=True)
+    team_hi: Mapped[int] = mapped_column(INT, primary_key=True)
+    year: Mapped[int] = mapped_column(INT, primary_key=True)
+    events_shared: Mapped[int] = mapped_column(INT)
+    together: Mapped[int] = mapped_column(INT)
+    together_wins: Mapped[int] = mapped_column(INT)
+    together_losses: Mapped[int] = mapped_column(INT)
+    together_ties: Mapped[int] = mapped_column(INT)
+    together_score_sum: Mapped[int] = mapped_column(BIGINT)
+    together_opp_sum: Mapped[int] = mapped_column(BIGINT)
+    against: Mapped[int] = mapped_column(INT)
+    lo_wins: Mapped[int] = mapped_column(INT)
+    hi_wins: Mapped[int] = mapped_column(INT)
+    against_ties: Mapped[int] = mapped_column(INT)
+    lo_score_sum: Mapped[int] = mapped_column(BIGINT)
+    hi_score_sum: Mapped[int] = mapped_column(BIGINT)
+
+
+class TeamMatch(Base):
+    __tablename__ = "team_matches"
+
+    team_number: Mapped[int] = mapped_column(INT, primary_key=True)
+    year: Mapped[int] = mapped_column(INT, primary_key=True)
+    match_key: Mapped[str] = mapped_column(Text, primary_key=True)
+    alliance: Mapped[str] = mapped_column(Text)
+
+
+class H2HIndexBuild(Base):
+    __tablename__ = "h2h_index_builds"
+
+    year: Mapped[int] = mapped_column(INT, primary_key=True)
+    matches: Mapped[int] = mapped_column(INT)
+    pairs: Mapped[int] = mapped_column(INT)
+
+
+class PredictorPoolRow(Base):
+    """One servable Match Predictor match, written by data/predictor_pool.py."""
+
+    __tablename__ = "predictor_pool"
+
+    year: Mapped[int] = mapped_column(INT, primary_key=True)
+    event_key: Mapped[str] = mapped_column(Text, primary_key=True)
+    ord: Mapped[int] = mapped_column(INT, primary_key=True)
+    playoff_ord: Mapped[Optional[int]] = mapped_column(INT, nullable=True)
+    match: Mapped[Dict[str, Any]] = mapped_column(JSONB)
+    nicknames: Mapped[Dict[str, str]] = mapped_column(JSONB)
+
+
+class PredictorPoolEvent(Base):
+    __tablename__ = "predictor_pool_events"
+
+    year: Mapped[int] = mapped_column(INT, primary_key=True)
+    event_key: Mapped[str] = mapped_column(Text, primary_key=True)
+    event_name: Mapped[Optional[str]] = mapped_column(Text)
+    week: Mapped[Optional[int]] = mapped_column(INT)
+    event_type: Mapped[Optional[str]] = mapped_column(Text)
+    matches: Mapped[int] = mapped_column(INT)
+    playoff_matches: Mapped[int] = mapped_column(INT)
+
+
+class PredictorPoolBuild(Base):
+    __tablename__ = "predictor_pool_builds"
+
+    year: Mapped[int] = mapped_column(INT, primary_key=True)
+    matches: Mapped[int] = mapped_column(INT)
+    events: Mapped[int] = mapped_column(INT)
+
+
 def _year_of(event_key: Optional[str]) -> int:
     if event_key and len(event_key) >= 4 and event_key[:4].isdigit():
         return int(event_key[:4])
@@ -48,24 +125,28 @@ def _empty_team(team_number: int) -> H2HTeamInfo:
     return H2HTeamInfo(team_number=team_number, nickname=f"Team {team_number}")
 
 
-def _team_info(db: Session, team_number: int, year: Optional[int]) -> H2HTeamInfo:
-    row = db.get(Teams, team_number)
-    info = _empty_team(team_number)
-    if row is not None:
+def _team_infos(db: Session, team_numbers: List[int], year: Optional[int]) -> Dict[int, H2HTeamInfo]:
+    """Team rows (plus that season's ACE when ``year`` is set) in one round trip."""
+    infos = {t: _empty_team(t) for t in team_numbers}
+    if year is not None:
+        rows = db.execute(
+            select(Teams, TeamEpa)
+            .outerjoin(TeamEpa, (TeamEpa.team_number == Teams.team_number) & (TeamEpa.year == year))
+            .where(Teams.team_number.in_(team_numbers))
+        ).all()
+    else:
+        rows = [(t, None) for t in db.scalars(select(Teams).where(Teams.team_number.in_(team_numbers)))]
+    for row, epa in rows:
         data = to_team_response(row)
         info = H2HTeamInfo(
             team_number=data.team_number,
-            nickname=data.nickname or info.nickname,
+            nickname=data.nickname or infos[row.team_number].nickname,
             city=data.city or "",
             state_prov=data.state_prov or "",
             country=data.country or "",
             district_key=data.district_key,
             team_colors=data.team_colors,
         )
-    if year is not None:
-        epa = db.scalars(
-            select(TeamEpa).where(TeamEpa.team_number == team_number, TeamEpa.year == year)
-        ).first()
         if epa is not None:
             info.ace = float(epa.ace) if epa.ace is not None else None
             info.raw = float(epa.raw) if epa.raw is not None else None
@@ -73,7 +154,8 @@ def _team_info(db: Session, team_number: int, year: Optional[int]) -> H2HTeamInf
             info.losses = int(epa.losses) if epa.losses is not None else None
             info.ties = int(epa.ties) if epa.ties is not None else None
             info.rank_global = int(epa.rank_global) if epa.rank_global is not None else None
-    return info
+        infos[row.team_number] = info
+    return infos
 
 
 def _shared_event_keys(db: Session, team_a: int, team_b: int, year: Optional[int]) -> List[str]:
@@ -85,7 +167,7 @@ def _shared_event_keys(db: Session, team_a: int, team_b: int, year: Optional[int
         .where(a.team_number == team_a, b.team_number == team_b)
     )
     if year is not None:
-        stmt = stmt.where(a.event_key.like(f"{year}%"))
+        stmt = stmt.where(a.year == year)
     return [row[0] for row in db.execute(stmt).all() if row[0]]
 
 
@@ -99,9 +181,169 @@ def _mean(xs: List[float]) -> Optional[float]:
     return (sum(xs) / len(xs)) if xs else None
 
 
+def _use_h2h_index(db: Session, year: Optional[int]) -> bool:
+    built = cached_distinct_years(db, "h2h", H2HIndexBuild.year)
+    if year is not None:
+        return year in built
+    return bool(built) and cached_distinct_years(db, "seasons", Events.year) <= built
+
+
+def _h2h_match(
+    m: EventMatch,
+    event_name: Optional[str],
+    week: Optional[int],
+    red: List[int],
+    blue: List[int],
+    a_all: str,
+    b_all: str,
+) -> H2HMatch:
+    return H2HMatch(
+        match_key=m.match_key or "",
+        event_key=m.event_key or "",
+        event_name=(event_name or None),
+        year=_year_of(m.event_key),
+        week=week,
+        comp_level=m.comp_level or "",
+        match_number=m.match_number or 0,
+        set_number=m.set_number or 0,
+        red_teams=red,
+        blue_teams=blue,
+        red_score=int(m.red_score or 0),
+        blue_score=int(m.blue_score or 0),
+        winning_alliance=(m.winning_alliance or "").strip().lower(),
+        relation="together" if a_all == b_all else "against",
+        a_alliance=a_all,
+        b_alliance=b_all,
+        youtube_key=m.youtube_key,
+        red_win_prob=m.red_win_prob,
+        blue_win_prob=m.blue_win_prob,
+    )
+
+
 def get_h2h(db: Session, team_a: int, team_b: int, year: Optional[int] = None) -> H2HResponse:
-    info_a = _team_info(db, team_a, year)
-    info_b = _team_info(db, team_b, year)
+    infos = _team_infos(db, [team_a, team_b], year)
+    if team_a != team_b and _use_h2h_index(db, year):
+        return _get_h2h_indexed(db, team_a, team_b, year, infos[team_a], infos[team_b])
+    return _get_h2h_scan(db, team_a, team_b, year, infos[team_a], infos[team_b])
+
+
+def _get_h2h_indexed(
+    db: Session,
+    team_a: int,
+    team_b: int,
+    year: Optional[int],
+    info_a: H2HTeamInfo,
+    info_b: H2HTeamInfo,
+) -> H2HResponse:
+    """Pair stats from team_pair_years, match list from the team_matches intersection."""
+    lo, hi = min(team_a, team_b), max(team_a, team_b)
+    a_is_lo = team_a == lo
+    pair_stmt = select(TeamPairYear).where(TeamPairYear.team_lo == lo, TeamPairYear.team_hi == hi)
+    if year is not None:
+        pair_stmt = pair_stmt.where(TeamPairYear.year == year)
+    pair_rows = db.scalars(pair_stmt).all()
+
+    events_shared = sum(int(r.events_shared or 0) for r in pair_rows)
+    together = H2HTogetherStats()
+    against = H2HAgainstStats()
+    by_year: List[H2HYearSlice] = []
+    t_score = t_opp = a_score = b_score = 0
+    for r in pair_rows:
+        a_wins = r.lo_wins if a_is_lo else r.hi_wins
+        b_wins = r.hi_wins if a_is_lo else r.lo_wins
+        together.matches += r.together
+        together.wins += r.together_wins
+        together.losses += r.together_losses
+        together.ties += r.together_ties
+        t_score += r.together_score_sum
+        t_opp += r.together_opp_sum
+        against.matches += r.against
+        against.a_wins += a_wins
+        against.b_wins += b_wins
+        against.ties += r.against_ties
+        a_score += r.lo_score_sum if a_is_lo else r.hi_score_sum
+        b_score += r.hi_score_sum if a_is_lo else r.lo_score_sum
+        if r.together or r.against:
+            by_year.append(
+                H2HYearSlice(
+                    year=r.year,
+                    together=r.together,
+                    against=r.against,
+                    together_wins=r.together_wins,
+                    a_wins=a_wins,
+                    b_wins=b_wins,
+                )
+            )
+
+    if not events_shared and not together.matches and not against.matches:
+        return H2HResponse(
+            team_a=info_a,
+            team_b=info_b,
+            year=year,
+            events_shared=0,
+            together=together,
+            against=against,
+        )
+
+    t_played = together.wins + together.losses + together.ties
+    together.win_pct = _pct(together.wins, t_played)
+    if t_played:
+        together.avg_score = t_score / t_played
+        together.avg_opp_score = t_opp / t_played
+        together.avg_margin = (t_score - t_opp) / t_played
+    decided = against.a_wins + against.b_wins + against.ties
+    against.a_win_pct = _pct(against.a_wins, decided)
+    if decided:
+        against.avg_a_score = a_score / decided
+        against.avg_b_score = b_score / decided
+        against.avg_margin = (a_score - b_score) / decided
+
+    ta = aliased(TeamMatch)
+    tb = aliased(TeamMatch)
+    stmt = (
+        select(EventMatch, Events.name, Events.week, ta.alliance, tb.alliance)
+        .join(ta, ta.match_key == EventMatch.match_key)
+        .join(tb, (tb.match_key == ta.match_key) & (tb.year == ta.year))
+        .outerjoin(Events, Events.event_key == EventMatch.event_key)
+        .where(ta.team_number == team_a, tb.team_number == team_b)
+        .order_by(
+            Events.start_date.nulls_last(),
+            EventMatch.event_key,
+            _COMP_ORD,
+            EventMatch.set_number,
+            EventMatch.match_number,
+        )
+    )
+    if year is not None:
+        stmt = stmt.where(ta.year == year)
+    matches = [
+        _h2h_match(
+            m, event_name, week, _parse_team_list(m.red_teams), _parse_team_list(m.blue_teams), a_all, b_all
+        )
+        for m, event_name, week, a_all, b_all in db.execute(stmt).all()
+    ]
+
+    return H2HResponse(
+        team_a=info_a,
+        team_b=info_b,
+        year=year,
+        events_shared=events_shared,
+        together=together,
+        against=against,
+        by_year=sorted(by_year, key=lambda s: s.year, reverse=True),
+        matches=matches,
+    )
+
+
+def _get_h2h_scan(
+    db: Session,
+    team_a: int,
+    team_b: int,
+    year: Optional[int],
+    info_a: H2HTeamInfo,
+    info_b: H2HTeamInfo,
+) -> H2HResponse:
+    """Fallback for seasons the h2h index has not been built for yet."""
     shared = _shared_event_keys(db, team_a, team_b, year)
     empty = H2HResponse(
         team_a=info_a,
@@ -200,29 +442,7 @@ def get_h2h(db: Session, team_a: int, team_b: int, year: Optional[int] = None) -
                 else:
                     against.ties += 1
 
-        matches.append(
-            H2HMatch(
-                match_key=m.match_key or "",
-                event_key=m.event_key or "",
-                event_name=(event_name or None),
-                year=y,
-                week=week,
-                comp_level=m.comp_level or "",
-                match_number=m.match_number or 0,
-                set_number=m.set_number or 0,
-                red_teams=red,
-                blue_teams=blue,
-                red_score=red_score,
-                blue_score=blue_score,
-                winning_alliance=winner,
-                relation=relation,
-                a_alliance=a_all,
-                b_alliance=b_all,
-                youtube_key=m.youtube_key,
-                red_win_prob=m.red_win_prob,
-                blue_win_prob=m.blue_win_prob,
-            )
-        )
+        matches.append(_h2h_match(m, event_name, week, red, blue, a_all, b_all))
 
     together.win_pct = _pct(together.wins, together.wins + together.losses + together.ties)
     together.avg_score = _mean(together_scores)
@@ -306,6 +526,118 @@ def _to_predictor_match(m: EventMatch, event_name: str, week: Optional[int], eve
 
 
 def get_predictor_matches(db: Session, query: PredictorQuery) -> PredictorMatchesResponse:
+    if query.year in cached_distinct_years(db, "predictor", PredictorPoolBuild.year):
+        return _get_predictor_matches_pooled(db, query)
+    return _get_predictor_matches_scan(db, query)
+
+
+class _LazyDraw:
+    """Draw from range(n) without replacement in O(1) per draw (sparse Fisher-Yates)."""
+
+    __slots__ = ("n", "i", "swaps")
+
+    def __init__(self, n: int):
+        self.n = n
+        self.i = 0
+        self.swaps: Dict[int, int] = {}
+
+    def next(self, rng: random.Random) -> Optional[int]:
+        if self.i >= self.n:
+            return None
+        j = rng.randrange(self.i, self.n)
+        value = self.swaps.get(j, j)
+        self.swaps[j] = self.swaps.get(self.i, self.i)
+        self.i += 1
+        return value
+
+
+def _sample_pool(
+    rng: random.Random, events: List[Tuple[str, int]], limit: int
+) -> List[Tuple[str, int]]:
+    """Round-robin (event_key, ord) picks over shuffled events, like the scan path.
+
+    One match per event per round so a mix isn't one regional; each event is
+    drawn lazily, so the cost is O(limit + events) rather than O(matches).
+    """
+    order = rng.sample(range(len(events)), min(len(events), limit))
+    queues = [(events[i][0], _LazyDraw(events[i][1])) for i in order]
+    picked: List[Tuple[str, int]] = []
+    while len(picked) < limit and queues:
+        still: List[Tuple[str, _LazyDraw]] = []
+        for key, draw in queues:
+            ord_ = draw.next(rng)
+            if ord_ is None:
+                continue
+            picked.append((key, ord_))
+            still.append((key, draw))
+            if len(picked) >= limit:
+                break
+        queues = still
+    return picked
+
+
+def _get_predictor_matches_pooled(db: Session, query: PredictorQuery) -> PredictorMatchesResponse:
+    """Serve from predictor_pool: a small per-event count read, then only the sampled rows."""
+    year = query.year
+    ord_col = PredictorPoolRow.playoff_ord if query.playoffs_only else PredictorPoolRow.ord
+
+    if query.event_key:
+        stmt = (
+            select(PredictorPoolRow)
+            .where(PredictorPoolRow.year == year, PredictorPoolRow.event_key == query.event_key)
+            .order_by(PredictorPoolRow.ord)
+        )
+        if query.week is not None:
+            stmt = stmt.join(
+                PredictorPoolEvent,
+                (PredictorPoolEvent.year == PredictorPoolRow.year)
+                & (PredictorPoolEvent.event_key == PredictorPoolRow.event_key),
+            ).where(PredictorPoolEvent.week == query.week)
+        if query.playoffs_only:
+            stmt = stmt.where(PredictorPoolRow.playoff_ord.is_not(None))
+        rows = db.scalars(stmt).all()
+    else:
+        count_col = (
+            PredictorPoolEvent.playoff_matches if query.playoffs_only else PredictorPoolEvent.matches
+        )
+        ev_stmt = (
+            select(PredictorPoolEvent.event_key, count_col)
+            .where(PredictorPoolEvent.year == year, count_col > 0)
+            .order_by(PredictorPoolEvent.event_key)
+        )
+        if query.week is not None:
+            ev_stmt = ev_stmt.where(PredictorPoolEvent.week == query.week)
+        events = [(k, int(n)) for k, n in db.execute(ev_stmt).all()]
+        picks = _sample_pool(random.Random(query.seed), events, query.limit)
+        rows = []
+        if picks:
+            by_pick = {
+                (r.event_key, getattr(r, ord_col.key)): r
+                for r in db.scalars(
+                    select(PredictorPoolRow).where(
+                        PredictorPoolRow.year == year,
+                        tuple_(PredictorPoolRow.event_key, ord_col).in_(picks),
+                    )
+                ).all()
+            }
+            rows = [by_pick[p] for p in picks if p in by_pick]
+
+    matches = [PredictorMatch(**r.match) for r in rows]
+    nicknames: Dict[str, str] = {}
+    for r in rows:
+        for team, nick in (r.nicknames or {}).items():
+            nicknames.setdefault(team, nick)
+    return PredictorMatchesResponse(
+        year=year,
+        event_key=query.event_key,
+        event_name=(matches[0].event_name or None) if query.event_key and matches else None,
+        nicknames=nicknames,
+        matches=matches,
+    )
+
+
+def _get_predictor_matches_scan(db: Session, query: PredictorQuery) -> PredictorMatchesResponse:
+    """Fallback for seasons without a predictor pool build."""
     year = query.year
     playoff_levels = ("ef", "qf", "sf", "f")
 
@@ -313,7 +645,7 @@ def get_predictor_matches(db: Session, query: PredictorQuery) -> PredictorMatche
         select(EventMatch, Events.name, Events.week, Events.event_type)
         .outerjoin(Events, Events.event_key == EventMatch.event_key)
         .where(
-            func.left(EventMatch.event_key, 4) == str(year),
+            EventMatch.year == year,
             _PLAYED,
             or_(EventMatch.red_win_prob.is_not(None), EventMatch.blue_win_prob.is_not(None)),
         )
@@ -26,7 +26,7 @@ from query.insights_overview import (
 
 LEADER_LIMIT = 12
 TEAMUP_LIMIT = 12
-_YEAR_FILTER = "event_key ~ '^[0-9]{4}'"
+_YEAR_FILTER = "year IS NOT NULL"
 # Overview changes only when the data pipeline runs; keep a long process cache.
 _CACHE_TTL_SEC = 3600.0
 _cache_payload: InsightsOverviewResponse | None = None
@@ -53,7 +53,7 @@ IMPACT_REGIONAL_DCMP_TYPES = REGIONAL_TYPES | DCMP_TYPES
 _PRED_MATERIALIZED_CTE = """
 WITH pred AS MATERIALIZED (
   SELECT
-    CAST(LEFT(m.event_key, 4) AS INT) AS year,
+    m.year,
     COALESCE(m.comp_level, '') AS comp_level,
     m.red_win_prob,
     m.winning_alliance,
@@ -79,7 +79,7 @@ WITH pred AS MATERIALIZED (
   FROM event_matches m
   LEFT JOIN events e ON e.event_key = m.event_key
   WHERE m.red_win_prob IS NOT NULL
-    AND m.event_key ~ '^[0-9]{4}'
+    AND m.year IS NOT NULL
     AND (
       COALESCE(m.red_score, 0) > 0
       OR COALESCE(m.blue_score, 0) > 0
@@ -315,7 +315,7 @@ def _compute_insights_overview(db: Session) -> InsightsOverviewResponse:
     team_rows = db.execute(
         text(
             f"""
-            SELECT CAST(LEFT(event_key, 4) AS INT) AS year,
+            SELECT year,
                    COUNT(DISTINCT team_number) AS team_count
             FROM event_teams
             WHERE {_YEAR_FILTER}
@@ -330,7 +330,7 @@ def _compute_insights_overview(db: Session) -> InsightsOverviewResponse:
     match_rows = db.execute(
         text(
             f"""
-            SELECT CAST(LEFT(event_key, 4) AS INT) AS year,
+            SELECT year,
                    COUNT(*) AS match_count
             FROM event_matches
             WHERE {_YEAR_FILTER}
@@ -0,0 +1,211 @@
+"""Tiled, server-side clustered map points.
+
+/map/teams returns every geocoded team of a season (~3500 points with address
+fields), which is the heaviest first load on mobile. This module builds a
+per-(year, layer) spatial index once per process and answers tile (z/x/y) and
+bbox+zoom queries from it with compact, integer-quantized parallel arrays.
+
+Index layout: points are projected to Web Mercator world pixels at zoom 0
+(0..256). For each zoom level 0..CLUSTER_MAX_ZOOM points are bucketed into a
+grid of CLUSTER_CELL_PX screen-pixel cells; each non-empty cell is one cluster
+(count + centroid). 256 is a multiple of the cell size, so cells never straddle
+tiles and a tile query is a handful of dict lookups.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from data.models.map import get_map_events, get_map_teams
+from query.map import MapClusterArrays, MapClustersResponse, MapTileResponse
+
+LAYERS = ("teams", "events")
+TILE_SIZE = 256
+TILE_EXTENT = 4096
+CLUSTER_CELL_PX = 64
+CLUSTER_MAX_ZOOM = int(os.getenv("MAP_CLUSTER_MAX_ZOOM", "14"))
+COORD_PRECISION = 100_000
+# Above this many cells a bbox query scans the level's clusters instead.
+_MAX_CELL_LOOKUPS = 20_000
+_MAX_LAT = 85.05112878
+_INDEX_TTL_SEC = float(os.getenv("MAP_INDEX_TTL_SEC", "3600"))
+
+
+@dataclass
+class _Cluster:
+    count: int = 0
+    sum_x: float = 0.0
+    sum_y: float = 0.0
+    point_id: Optional[str] = None
+
+    @property
+    def x0(self) -> float:
+        return self.sum_x / self.count
+
+    @property
+    def y0(self) -> float:
+        return self.sum_y / self.count
+
+
+@dataclass
+class SpatialIndex:
+    year: int
+    layer: str
+    count: int
+    # levels[z][(cell_x, cell_y)] -> cluster
+    levels: List[Dict[Tuple[int, int], _Cluster]] = field(default_factory=list)
+    built_at: float = 0.0
+
+
+_index_cache: Dict[Tuple[int, str], SpatialIndex] = {}
+_index_lock = threading.Lock()
+
+
+def project(lat: float, lng: float) -> Tuple[float, float]:
+    """Lat/lng -> Web Mercator world pixel at zoom 0 (both axes in [0, 256))."""
+    lat = max(-_MAX_LAT, min(_MAX_LAT, lat))
+    x = (lng + 180.0) / 360.0 * TILE_SIZE
+    sin_lat = math.sin(math.radians(lat))
+    y = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * TILE_SIZE
+    return min(max(x, 0.0), TILE_SIZE - 1e-9), min(max(y, 0.0), TILE_SIZE - 1e-9)
+
+
+def unproject(x0: float, y0: float) -> Tuple[float, float]:
+    lng = x0 / TILE_SIZE * 360.0 - 180.0
+    n = math.pi - 2 * math.pi * y0 / TILE_SIZE
+    lat = math.degrees(math.atan(math.sinh(n)))
+    return lat, lng
+
+
+def build_index(year: int, layer: str, points: Iterable[Tuple[str, float, float]]) -> SpatialIndex:
+    projected = [(pid, *project(lat, lng)) for pid, lat, lng in points]
+    levels: List[Dict[Tuple[int, int], _Cluster]] = []
+    for z in range(CLUSTER_MAX_ZOOM + 1):
+        scale = (2 ** z) / CLUSTER_CELL_PX
+        cells: Dict[Tuple[int, int], _Cluster] = {}
+        for pid, x0, y0 in projected:
+            key = (int(x0 * scale), int(y0 * scale))
+            cluster = cells.get(key)
+            if cluster is None:
+                cluster = cells[key] = _Cluster(point_id=pid)
+            else:
+                cluster.point_id = None
+            cluster.count += 1
+            cluster.sum_x += x0
+            cluster.sum_y += y0
+        levels.append(cells)
+    return SpatialIndex(year=year, layer=layer, count=len(projected), levels=levels, built_at=time.time())
+
+
+def _load_points(db: Session, year: int, layer: str) -> List[Tuple[str, float, float]]:
+    if layer == "events":
+        return [(e.event_key, e.lat, e.lng) for e in get_map_events(db, year).events]
+    return [(str(t.team_number), t.lat, t.lng) for t in get_map_teams(db, year).teams]
+
+
+def get_index(db: Session, year: int, layer: str) -> SpatialIndex:
+    """Process-cached index; rebuilt after MAP_INDEX_TTL_SEC (coords change only via the pipeline)."""
+    key = (year, layer)
+    idx = _index_cache.get(key)
+    if idx is not None and (time.time() - idx.built_at) < _INDEX_TTL_SEC:
+        return idx
+    with _index_lock:
+        idx = _index_cache.get(key)
+        if idx is not None and (time.time() - idx.built_at) < _INDEX_TTL_SEC:
+            return idx
+        idx = build_index(year, layer, _load_points(db, year, layer))
+        _index_cache[key] = idx
+        return idx
+
+
+def _clusters_in(
+    idx: SpatialIndex, level: int, x_min: float, x_max: float, y_min: float, y_max: float
+) -> List[_Cluster]:
+    """Clusters at ``level`` whose centroid lies in the zoom-0 pixel box [min, max)."""
+    cells = idx.levels[level]
+    scale = (2 ** level) / CLUSTER_CELL_PX
+    cx0, cx1 = int(x_min * scale), int(max(x_min, x_max - 1e-12) * scale)
+    cy0, cy1 = int(y_min * scale), int(max(y_min, y_max - 1e-12) * scale)
+    if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > min(_MAX_CELL_LOOKUPS, max(1, len(cells)) * 4):
+        candidates: Iterable[_Cluster] = cells.values()
+    else:
+        candidates = (
+            c
+            for cx in range(cx0, cx1 + 1)
+            for cy in range(cy0, cy1 + 1)
+            if (c := cells.get((cx, cy))) is not None
+        )
+    return [c for c in candidates if x_min <= c.x0 < x_max and y_min <= c.y0 < y_max]
+
+
+def _arrays(clusters: List[_Cluster], xs: List[int], ys: List[int]) -> MapClusterArrays:
+    return MapClusterArrays(
+        x=xs,
+        y=ys,
+        count=[c.count for c in clusters],
+        id=[c.point_id for c in clusters],
+    )
+
+
+def get_map_tile(db: Session, year: int, layer: str, z: int, x: int, y: int) -> MapTileResponse:
+    idx = get_index(db, year, layer)
+    world = TILE_SIZE / (2 ** z)  # tile edge in zoom-0 pixels
+    x_min, y_min = x * world, y * world
+    level = min(z, CLUSTER_MAX_ZOOM)
+    clusters = _clusters_in(idx, level, x_min, x_min + world, y_min, y_min + world)
+    q = TILE_EXTENT / world
+    xs = [min(TILE_EXTENT - 1, int((c.x0 - x_min) * q)) for c in clusters]
+    ys = [min(TILE_EXTENT - 1, int((c.y0 - y_min) * q)) for c in clusters]
+    return MapTileResponse(
+        year=year,
+        layer=layer,
+        z=z,
+        x=x,
+        y=y,
+        extent=TILE_EXTENT,
+        count=sum(c.count for c in clusters),
+        clusters=_arrays(clusters, xs, ys),
+    )
+
+
+def get_map_clusters(
+    db: Session,
+    year: int,
+    layer: str,
+    zoom: int,
+    bbox: Tuple[float, float, float, float],
+) -> MapClustersResponse:
+    """Clusters inside ``bbox`` = (min_lng, min_lat, max_lng, max_lat) at ``zoom``.
+
+    A bbox crossing the antimeridian (min_lng > max_lng) is split in two.
+    """
+    idx = get_index(db, year, layer)
+    min_lng, min_lat, max_lng, max_lat = bbox
+    level = max(0, min(zoom, CLUSTER_MAX_ZOOM))
+    x_a, y_top = project(max_lat, min_lng)
+    x_b, y_bottom = project(min_lat, max_lng)
+    spans = [(x_a, x_b)] if min_lng <= max_lng else [(x_a, float(TILE_SIZE)), (0.0, x_b)]
+    clusters: List[_Cluster] = []
+    for x_min, x_max in spans:
+        clusters.extend(_clusters_in(idx, level, x_min, x_max, y_top, y_bottom))
+    xs: List[int] = []
+    ys: List[int] = []
+    for c in clusters:
+        lat, lng = unproject(c.x0, c.y0)
+        xs.append(round(lng * COORD_PRECISION))
+        ys.append(round(lat * COORD_PRECISION))
+    return MapClustersResponse(
+        year=year,
+        layer=layer,
+        zoom=level,
+        precision=COORD_PRECISION,
+        count=sum(c.count for c in clusters),
+        clusters=_arrays(clusters, xs, ys),
+    )
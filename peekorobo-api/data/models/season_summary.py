@@ -10,24 +10,22 @@ from query.season_summary import SeasonSummaryResponse
 def get_season_summary(db: Session, year: int) -> SeasonSummaryResponse:
     """Season-wide totals in a few cheap COUNT queries.
 
-    Event keys are prefixed with the season year in TBA format (e.g. ``2024cmp``),
-    so a ``LIKE '{year}%'`` scan matches the pattern used by ``event_insights`` and
-    the legacy ``count_season_matches`` helper. Teams are counted distinctly across
-    every event that season (teams that actually competed).
+    Each count filters on the indexed ``year`` column (written at ingest from
+    the event key prefix). Teams are counted distinctly across every event that
+    season (teams that actually competed).
     """
-    prefix = f"{year}%"
     team_count = db.scalar(
         select(func.count(distinct(EventTeams.team_number))).where(
-            EventTeams.event_key.like(prefix)
+            EventTeams.year == year
         )
     )
     event_count = db.scalar(
-        select(func.count()).select_from(Events).where(Events.event_key.like(prefix))
+        select(func.count()).select_from(Events).where(Events.year == year)
     )
     match_count = db.scalar(
         select(func.count())
         .select_from(EventMatch)
-        .where(EventMatch.event_key.like(prefix))
+        .where(EventMatch.year == year)
     )
     return SeasonSummaryResponse(
         year=year,
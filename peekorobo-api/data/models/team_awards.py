@@ -18,7 +18,7 @@ def get_team_awards(db: Session, team_number: int, query: TeamAwardsQuery) -> Te
         .where(EventAwards.team_number == team_number)
     )
     if query.year is not None:
-        stmt = stmt.where(EventAwards.event_key.like(f"{query.year}%"))
+        stmt = stmt.where(EventAwards.year == query.year)
     if query.district_key:
         cond = _district_match(Events.district_key, query.district_key)
         if cond is not None:
@@ -3,7 +3,7 @@ from typing import Optional
 
 from sqlalchemy.util import NoneType
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy import INT, REAL, select, func
+from sqlalchemy import INT, REAL, select, func, and_, or_, cast, literal
 from sqlalchemy.orm import Mapped, mapped_column, Session
 from data.db import Base
 from data.models.teams import Teams, _district_match
@@ -33,17 +33,66 @@ class TeamEpa(Base):
     count_state : Mapped[Optional[int]] = mapped_column(INT, nullable=True)
     count_district : Mapped[Optional[int]] = mapped_column(INT, nullable=True)
 
-def from_db_row(team_epa : TeamEpa) -> TeamPerfInfo:
-    event_perf_raw = team_epa.event_perf
+# Scalar columns a /team_perfs list caller can project with ``fields=``.
+# ``event_perf`` is deliberately absent: it is the large JSONB blob and is only
+# returned when asked for via ``include=event_perf``.
+LIST_FLOAT_FIELDS = ("raw", "ace", "confidence", "auto_raw", "teleop_raw", "endgame_raw")
+LIST_INT_FIELDS = (
+    "wins",
+    "losses",
+    "ties",
+    "rank_global",
+    "rank_country",
+    "rank_state",
+    "rank_district",
+    "count_global",
+    "count_country",
+    "count_state",
+    "count_district",
+)
+LIST_FIELDS = LIST_FLOAT_FIELDS + LIST_INT_FIELDS
+LIST_INCLUDES = ("event_perf",)
+
+
+def _parse_event_perf(event_perf_raw) -> list:
     if event_perf_raw is None:
-        event_perf_raw = []
-    elif isinstance(event_perf_raw, str):
+        return []
+    if isinstance(event_perf_raw, str):
         try:
             event_perf_raw = json.loads(event_perf_raw)
         except (json.JSONDecodeError, TypeError):
-            event_perf_raw = []
+            return []
     if not isinstance(event_perf_raw, list):
-        event_perf_raw = []
+        return []
+    return event_perf_raw
+
+
+def split_csv_param(value: Optional[str]) -> list[str]:
+    """``"ace, raw,,ace"`` -> ``["ace", "raw"]`` (order kept, duplicates dropped)."""
+    out: list[str] = []
+    for tok in (value or "").split(","):
+        tok = tok.strip().lower()
+        if tok and tok not in out:
+            out.append(tok)
+    return out
+
+
+def encode_rank_cursor(ace: Optional[float], team_number: int) -> str:
+    """Keyset cursor for the ACE-ordered list: last row's (ace, team_number)."""
+    return f"{'n' if ace is None else repr(float(ace))}:{int(team_number)}"
+
+
+def decode_rank_cursor(cursor: str) -> Optional[tuple[Optional[float], int]]:
+    try:
+        ace_s, tn_s = cursor.rsplit(":", 1)
+        ace = None if ace_s == "n" else float(ace_s)
+        return ace, int(tn_s)
+    except (ValueError, AttributeError):
+        return None
+
+
+def from_db_row(team_epa : TeamEpa) -> TeamPerfInfo:
+    event_perf_raw = _parse_event_perf(team_epa.event_perf)
     return TeamPerfInfo(
         year=team_epa.year.numerator,
         raw=float(team_epa.raw) if not isinstance(team_epa.raw, NoneType) else None,
@@ -76,8 +125,36 @@ def get_team_epa(db : Session, team_number : int, query: TeamPerfRequest) -> Tea
     perfs = list(map(from_db_row, result.all()))
     return TeamPerfResponse(team_number=team_number, team_perfs=perfs)
 
+def _projected_perf(row, fields: list[str], with_event_perf: bool) -> TeamPerfInfo:
+    """Build a TeamPerfInfo with only the projected fields set (others stay unset)."""
+    values = {"year": int(row.year)}
+    for name in fields:
+        val = getattr(row, name)
+        if val is None:
+            values[name] = None
+        elif name in LIST_FLOAT_FIELDS:
+            values[name] = float(val)
+        else:
+            values[name] = int(val)
+    if with_event_perf:
+        values["event_perf"] = _parse_event_perf(row.event_perf)
+    return TeamPerfInfo(**values)
+
+
 def get_team_perfs_list(db: Session, query: TeamPerfListRequest) -> TeamPerfListResponse:
-    stmt = select(TeamEpa).where(TeamEpa.year == query.year)
+    # Only the requested columns are selected, so leaderboard pages never read
+    # the event_perf JSONB unless the caller opts in. Each distinct column set
+    # compiles to its own (cached) statement.
+    fields = [f for f in split_csv_param(query.fields) if f in LIST_FIELDS] or list(LIST_FIELDS)
+    with_event_perf = "event_perf" in split_csv_param(query.include)
+    columns = [TeamEpa.team_number, TeamEpa.year]
+    columns += [getattr(TeamEpa, name) for name in fields if name != "ace"]
+    # ACE is always read: it is the keyset column for sort=rank.
+    columns.append(TeamEpa.ace)
+    if with_event_perf:
+        columns.append(TeamEpa.event_perf)
+
+    stmt = select(*columns).where(TeamEpa.year == query.year)
     needs_teams_join = query.city or query.state_prov or query.country or query.district_key
     if needs_teams_join:
         stmt = stmt.join(Teams, TeamEpa.team_number == Teams.team_number)
@@ -91,29 +168,52 @@ def get_team_perfs_list(db: Session, query: TeamPerfListRequest) -> TeamPerfList
             cond = _district_match(Teams.district_key, query.district_key)
             if cond is not None:
                 stmt = stmt.where(cond)
-    # Fast "top N" path for the leaderboard preview: order by ACE descending
-    # (nulls last) and return the top `limit` with no cursor. We sort by ACE
-    # rather than rank_global because ranks aren't computed for the in-progress
-    # season, whereas ACE is always populated.
+
+    def _page(rows):
+        return [
+            TeamPerfResponse(
+                team_number=r.team_number,
+                team_perfs=[_projected_perf(r, fields, with_event_perf)],
+            )
+            for r in rows[: query.limit]
+        ]
+
+    # ACE-ordered path (leaderboard preview and ranked paging): ACE descending,
+    # nulls last, team_number as the tiebreak. We sort by ACE rather than
+    # rank_global because ranks aren't computed for the in-progress season,
+    # whereas ACE is always populated. The keyset mirrors that ordering.
     if query.sort == "rank":
+        cursor = decode_rank_cursor(query.next_cursor) if query.next_cursor else None
+        if cursor is not None:
+            c_ace, c_tn = cursor
+            if c_ace is None:
+                stmt = stmt.where(TeamEpa.ace.is_(None), TeamEpa.team_number > c_tn)
+            else:
+                # ace is REAL: compare in REAL, or Postgres widens the column to
+                # float8 and the boundary value never equals the float8 literal.
+                c_ace_real = cast(literal(c_ace), REAL)
+                stmt = stmt.where(
+                    or_(
+                        TeamEpa.ace.is_(None),
+                        TeamEpa.ace < c_ace_real,
+                        and_(TeamEpa.ace == c_ace_real, TeamEpa.team_number > c_tn),
+                    )
+                )
         stmt = stmt.order_by(
             TeamEpa.ace.is_(None), TeamEpa.ace.desc(), TeamEpa.team_number
-        ).limit(query.limit)
-        rows = db.scalars(stmt).all()
-        team_perfs_list = [
-            TeamPerfResponse(team_number=r.team_number, team_perfs=[from_db_row(r)])
-            for r in rows
-        ]
-        return TeamPerfListResponse(team_perfs=team_perfs_list, next=None)
+        ).limit(query.limit + 1)
+        rows = db.execute(stmt).all()
+        next_cursor = None
+        if len(rows) > query.limit:
+            last = rows[query.limit - 1]
+            next_cursor = encode_rank_cursor(last.ace, last.team_number)
+        return TeamPerfListResponse(team_perfs=_page(rows), next=None, next_cursor=next_cursor)
 
     if query.next_team_number is not None:
         stmt = stmt.where(TeamEpa.team_number > query.next_team_number)
     stmt = stmt.order_by(TeamEpa.team_number).limit(query.limit + 1)
-    result = db.scalars(stmt)
-    rows = result.all()
-    team_perfs_list = [
-        TeamPerfResponse(team_number=r.team_number, team_perfs=[from_db_row(r)])
-        for r in rows[: query.limit]
-    ]
-    next_val = rows[query.limit].team_number if len(rows) > query.limit else None
-    return TeamPerfListResponse(team_perfs=team_perfs_list, next=next_val)
+    rows = db.execute(stmt).all()
+    # The cursor is exclusive (team_number > next), so hand back the last row
+    # actually returned, not the first row of the following page.
+    next_val = rows[query.limit - 1].team_number if len(rows) > query.limit else None
+    return TeamPerfListResponse(team_perfs=_page(rows), next=next_val, next_cursor=None)
@@ -11,7 +11,7 @@ def get_team_events(db: Session, team_number: int, query: TeamEventsQuery) -> Te
         .where(EventTeams.team_number == team_number)
     )
     if query.year is not None:
-        stmt = stmt.where(EventTeams.event_key.like(f"{query.year}%"))
+        stmt = stmt.where(EventTeams.year == query.year)
     if query.district_key:
         cond = _district_match(Events.district_key, query.district_key)
         if cond is not None:
@@ -20,57 +20,6 @@ _USER_COLUMNS = (
 )
 
 
-def init_user_tables(db: Session) -> None:
-    """Create the users/saved_items tables if they do not exist.
-
-    On production these already exist (with data); this is a no-op safety net so
-    the API also works against a fresh database. It never drops or mutates data.
-    """
-    db.execute(text(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id SERIAL PRIMARY KEY,
-            username VARCHAR(50) NOT NULL,
-            password_hash BYTEA NOT NULL,
-            email VARCHAR(255),
-            role VARCHAR(100),
-            team VARCHAR(50),
-            bio TEXT,
-            avatar_key VARCHAR(100),
-            color VARCHAR(20),
-            followers JSONB DEFAULT '[]'::jsonb,
-            following JSONB DEFAULT '[]'::jsonb,
-            preferences JSONB,
-            higher_lower_highscore INTEGER DEFAULT 0,
-            api_key TEXT
-        )
-        """
-    ))
-    db.execute(text(
-        """
-        CREATE TABLE IF NOT EXISTS saved_items (
-            id SERIAL PRIMARY KEY,
-            user_id INTEGER NOT NULL,
-            item_type TEXT NOT NULL,
-            item_key TEXT NOT NULL
-        )
-        """
-    ))
-    db.execute(text(
-        """
-        CREATE INDEX IF NOT EXISTS idx_saved_items_user
-        ON saved_items (user_id, item_type)
-        """
-    ))
-    db.execute(text(
-        """
-        CREATE INDEX IF NOT EXISTS idx_saved_items_item
-        ON saved_items (item_type, item_key)
-        """
-    ))
-    db.commit()
-
-
 def _row_to_user_response(row) -> UserResponse:
     followers = row.followers or []
     following = row.following or []
@@ -0,0 +1,81 @@
+"""TBA webhook intake: validate a delivery and enqueue it for data/webhook_worker.py.
+
+The API never touches event_matches here. ``match_score`` and
+``schedule_updated`` deliveries become one ``webhook_queue`` row each
+(migrations/0009_webhook_queue.sql) and a ``NOTIFY webhook_queue`` wakes the
+worker, which owns the match upsert, the incremental ACE step and the
+prediction refresh.
+"""
+
+import json
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Deliveries that carry data the worker applies; everything else is acknowledged only.
+QUEUED_TYPES = ("match_score", "schedule_updated")
+NOTIFY_CHANNEL = "webhook_queue"
+
+_EVENT_KEY_RE = re.compile(r"^\d{4}[a-z0-9]+$")
+
+
+def _alliance_ok(alliance) -> bool:
+    if not isinstance(alliance, dict):
+        return False
+    teams = alliance.get("team_keys", alliance.get("teams"))
+    return isinstance(teams, list) and isinstance(alliance.get("score"), int)
+
+
+def parse_delivery(message) -> Tuple[str, Optional[str], Optional[str]]:
+    """(message_type, event_key, match_key) for a TBA webhook body; ValueError if malformed."""
+    if not isinstance(message, dict):
+        raise ValueError("body must be a JSON object")
+    message_type = message.get("message_type")
+    data = message.get("message_data")
+    if not isinstance(message_type, str) or not message_type:
+        raise ValueError("message_type is required")
+    if not isinstance(data, dict):
+        raise ValueError("message_data must be an object")
+    if message_type not in QUEUED_TYPES:
+        return message_type, None, None
+
+    if message_type == "schedule_updated":
+        event_key = data.get("event_key")
+        if not isinstance(event_key, str) or not _EVENT_KEY_RE.match(event_key):
+            raise ValueError("schedule_updated needs a valid event_key")
+        return message_type, event_key, None
+
+    match = data.get("match")
+    if not isinstance(match, dict):
+        raise ValueError("match_score needs message_data.match")
+    match_key = match.get("key") or data.get("match_key")
+    event_key = match.get("event_key") or data.get("event_key")
+    if not isinstance(event_key, str) or not _EVENT_KEY_RE.match(event_key):
+        raise ValueError("match_score needs a valid event_key")
+    if not isinstance(match_key, str) or not match_key.startswith(f"{event_key}_"):
+        raise ValueError("match key does not belong to the event")
+    alliances = match.get("alliances")
+    if not isinstance(alliances, dict) or not all(_alliance_ok(alliances.get(c)) for c in ("red", "blue")):
+        raise ValueError("match alliances need teams and integer scores")
+    if not isinstance(match.get("comp_level"), str):
+        raise ValueError("match comp_level is required")
+    return message_type, event_key, match_key
+
+
+def enqueue(db: Session, message_type: str, event_key: Optional[str], match_key: Optional[str], message: dict) -> int:
+    """Insert one delivery and notify the worker (commits). Returns the queue id."""
+    queue_id = db.execute(
+        text(
+            """
+            INSERT INTO webhook_queue (message_type, event_key, match_key, payload)
+            VALUES (:t, :e, :m, CAST(:p AS JSONB))
+            RETURNING id
+            """
+        ),
+        {"t": message_type, "e": event_key, "m": match_key, "p": json.dumps(message)},
+    ).scalar()
+    db.execute(text("SELECT pg_notify(:c, :id)"), {"c": NOTIFY_CHANNEL, "id": str(queue_id)})
+    db.commit()
+    return int(queue_id)
@@ -0,0 +1,250 @@
+"""Live event feed: Postgres LISTEN/NOTIFY fanned out to Server-Sent Events.
+
+During an event the SPA polls ``/event/{key}/matches``, ``/rankings``,
+``/event_perfs`` and ``/playoff_odds``; every poll is a full query behind
+``_db_semaphore``. Instead, the data pipeline (run.py, live_daemon.py,
+webhook_worker.py, the rankings refresh, playoff_bracket.py) NOTIFYs
+``event_updates`` with ``{"event_key", "kind"}`` when it commits a change, and
+each dyno keeps one LISTEN connection for the feed.
+
+Per event with at least one subscriber the hub keeps the last snapshot of each
+kind. A notification for a subscribed event is debounced (bursts of match
+writes collapse into one reload), the kind is reloaded once for the whole dyno,
+diffed against the snapshot by row key, and only the changed / removed rows are
+pushed to every subscriber. Notifications for events nobody watches cost
+nothing. New subscribers get the cached snapshots, so a hot event page costs
+one query per change instead of one per viewer per poll.
+
+A subscriber whose queue fills up (a stalled client) is dropped; its
+EventSource reconnects and starts again from a snapshot. After the LISTEN
+connection is re-established every watched event is reloaded, since
+notifications sent while it was down are lost.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+CHANNEL = "event_updates"
+# kind -> field identifying a row within the kind's list.
+KINDS = {
+    "matches": "match_key",
+    "rankings": "team_number",
+    "event_perfs": "team_number",
+    "playoff_odds": "alliance",
+}
+
+_logger = logging.getLogger("peekorobo.api.live")
+
+Loader = Callable[[str, str], Awaitable[List[dict]]]
+
+
+class LiveFeedFull(Exception):
+    """The dyno already serves LIVE_MAX_SUBSCRIBERS streams."""
+
+
+def diff_rows(old: List[dict], new: List[dict], key: str) -> dict:
+    """{"upsert": changed or new rows, "remove": keys that disappeared}."""
+    old_by = {r.get(key): r for r in old}
+    new_by = {r.get(key): r for r in new}
+    return {
+        "upsert": [r for k, r in new_by.items() if old_by.get(k) != r],
+        "remove": [k for k in old_by if k not in new_by],
+    }
+
+
+def format_sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n".encode()
+
+
+@dataclass(eq=False)
+class Subscriber:
+    queue: asyncio.Queue
+    dropped: bool = False
+
+
+@dataclass
+class _Topic:
+    subscribers: Set[Subscriber] = field(default_factory=set)
+    snapshots: Dict[str, List[dict]] = field(default_factory=dict)
+    pending: Set[str] = field(default_factory=set)  # kinds with a reload scheduled
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+@dataclass
+class LiveStats:
+    notifies: int = 0
+    reloads: int = 0
+    diffs_sent: int = 0
+    dropped: int = 0
+    listener_reconnects: int = 0
+
+
+class LiveHub:
+    def __init__(
+        self,
+        connect: Callable[[], object],
+        loader: Loader,
+        *,
+        debounce_sec: float = 1.0,
+        max_subscribers: int = 2000,
+        queue_size: int = 64,
+        heartbeat_sec: float = 15.0,
+        reconnect_sec: float = 5.0,
+    ):
+        self._connect = connect
+        self._loader = loader
+        self.debounce_sec = debounce_sec
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.heartbeat_sec = heartbeat_sec
+        self.reconnect_sec = reconnect_sec
+        self.topics: Dict[str, _Topic] = {}
+        self.stats = LiveStats()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -- lifecycle ------------------------------------------------------------
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._thread = threading.Thread(target=self._listen, name="live-listen", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def subscriber_count(self) -> int:
+        return sum(len(t.subscribers) for t in self.topics.values())
+
+    # -- LISTEN thread ----------------------------------------------------------
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                conn.autocommit = True
+                cur = conn.cursor()
+                cur.execute(f"LISTEN {CHANNEL}")
+                cur.close()
+                self._loop.call_soon_threadsafe(self._resync)
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.reconnect_sec) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        payload = conn.notifies.pop(0).payload
+                        self._loop.call_soon_threadsafe(self._on_notify, payload)
+            except Exception as e:
+                self.stats.listener_reconnects += 1
+                _logger.warning("live feed LISTEN connection failed: %s", e)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            self._stop.wait(self.reconnect_sec)
+
+    # -- event loop side --------------------------------------------------------
+
+    def _schedule(self, event_key: str, kind: str) -> None:
+        topic = self.topics.get(event_key)
+        if topic is None or kind in topic.pending:
+            return
+        topic.pending.add(kind)
+        self._loop.call_later(
+            self.debounce_sec, lambda: asyncio.ensure_future(self._reload(event_key, kind))
+        )
+
+    def _on_notify(self, payload: str) -> None:
+        self.stats.notifies += 1
+        try:
+            message = json.loads(payload)
+            event_key, kind = message["event_key"], message["kind"]
+        except (ValueError, KeyError, TypeError):
+            return
+        if kind in KINDS:
+            self._schedule(event_key, kind)
+
+    def _resync(self) -> None:
+        for event_key, topic in self.topics.items():
+            for kind in topic.snapshots:
+                self._schedule(event_key, kind)
+
+    async def _reload(self, event_key: str, kind: str) -> None:
+        topic = self.topics.get(event_key)
+        if topic is None:
+            return
+        topic.pending.discard(kind)
+        try:
+            async with topic.lock:
+                rows = await self._loader(event_key, kind)
+                self.stats.reloads += 1
+                diff = diff_rows(topic.snapshots.get(kind, []), rows, KINDS[kind])
+                topic.snapshots[kind] = rows
+        except Exception as e:
+            _logger.warning("live feed reload %s/%s failed: %s", event_key, kind, e)
+            return
+        if diff["upsert"] or diff["remove"]:
+            self._publish(event_key, topic, format_sse("diff", {"event_key": event_key, "kind": kind, **diff}))
+
+    def _publish(self, event_key: str, topic: _Topic, message: bytes) -> None:
+        for sub in list(topic.subscribers):
+            try:
+                sub.queue.put_nowait(message)
+                self.stats.diffs_sent += 1
+            except asyncio.QueueFull:
+                sub.dropped = True
+                self.stats.dropped += 1
+                self.unsubscribe(event_key, sub)
+
+    # -- subscribers ------------------------------------------------------------
+
+    async def subscribe(self, event_key: str) -> Subscriber:
+        if self.subscriber_count() >= self.max_subscribers:
+            raise LiveFeedFull()
+        topic = self.topics.setdefault(event_key, _Topic())
+        sub = Subscriber(queue=asyncio.Queue(maxsize=self.queue_size))
+        topic.subscribers.add(sub)
+        try:
+            async with topic.lock:
+                for kind in KINDS:
+                    if kind not in topic.snapshots:
+                        topic.snapshots[kind] = await self._loader(event_key, kind)
+                        self.stats.reloads += 1
+                    sub.queue.put_nowait(format_sse(
+                        "snapshot", {"event_key": event_key, "kind": kind, "rows": topic.snapshots[kind]}
+                    ))
+        except BaseException:
+            self.unsubscribe(event_key, sub)
+            raise
+        return sub
+
+    def unsubscribe(self, event_key: str, sub: Subscriber) -> None:
+        topic = self.topics.get(event_key)
+        if topic is None:
+            return
+        topic.subscribers.discard(sub)
+        if not topic.subscribers:
+            self.topics.pop(event_key, None)
+
+    async def stream(self, event_key: str, sub: Subscriber):
+        """SSE body for one subscriber: snapshots, then diffs, with heartbeat comments."""
+        try:
+            yield f"retry: {int(self.reconnect_sec * 1000)}\n\n".encode()
+            while not sub.dropped:
+                try:
+                    yield await asyncio.wait_for(sub.queue.get(), timeout=self.heartbeat_sec)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+        finally:
+            self.unsubscribe(event_key, sub)
@@ -0,0 +1,649 @@
+"""Load test and latency SLO harness for the API.
+
+Replays a weighted mix of the page views the SPA generates (team pages, event
+pages, live-event polling, ``/games/h2h``, ``/search/index``, map, insights,
+leaderboard) against a local uvicorn and reports, per endpoint, p50/p95/p99
+latency, 503 / 429 rates, throughput, single-flight coalescing and the DB wait
+the server spent in ``_db_semaphore`` and the SQLAlchemy pool (read from the
+``Server-Timing`` header the API emits when ``SERVER_TIMING=1``).
+
+Arrivals are open-loop (Poisson at ``--rate`` page views per second) and
+latency is measured from the intended send time, so a saturated server shows
+up as queueing delay instead of being hidden by a slower request rate. This
+measures the origin only; in production the CDN absorbs most reads.
+
+``--spawn`` starts ``uvicorn main:app`` with the knobs under test
+(``--env DB_MAX_CONCURRENT=8``; ``--sweep`` runs one server per value) and
+refuses to point it at a non-local database unless ``--allow-remote`` is given.
+A synthetic season (data/synthetic_season.py --load) makes a good fixture.
+
+Usage:
+    python peekorobo-api/loadtest.py --spawn --rate 20 --duration 60
+    python peekorobo-api/loadtest.py --url http://127.0.0.1:8000 --mix live --rate 40
+    python peekorobo-api/loadtest.py --spawn --sweep DB_MAX_CONCURRENT=4,6,8,12 --sweep DB_POOL_SIZE=8,12
+    python peekorobo-api/loadtest.py --spawn --save-baseline local
+    python peekorobo-api/loadtest.py --spawn --baseline local --slo p95=400,p99=1500,errors=0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(API_DIR, "loadtest_baselines")
+USER_AGENT = "peekorobo-loadtest/1"
+_LOCAL_DB_HOSTS = ("localhost", "127.0.0.1", "::1", "postgres", "db")
+# Endpoints with fewer samples than this are too noisy to flag against a baseline.
+_MIN_COMPARE_REQUESTS = 50
+
+# Page views per mix (relative weights). Each page view fires the requests the
+# SPA route makes on load (see frontend/src/api/queries.ts).
+MIXES: Dict[str, Dict[str, float]] = {
+    "browse": {"team": 40, "event": 18, "leaderboard": 10, "search": 10, "h2h": 8, "map": 7, "insights": 7},
+    "live": {"live_event": 55, "live_poll": 15, "team": 15, "search": 7, "h2h": 4, "leaderboard": 4},
+    "mixed": {"team": 30, "live_event": 20, "live_poll": 10, "event": 10, "leaderboard": 8,
+              "search": 8, "h2h": 6, "map": 4, "insights": 4},
+}
+
+
+@dataclass
+class Catalog:
+    """IDs the page builders draw from, discovered through the API itself."""
+
+    year: int
+    teams: List[int]
+    team_weights: List[float]
+    events: List[str]
+    live_events: List[str]
+
+    def team(self, rng: random.Random) -> int:
+        return rng.choices(self.teams, weights=self.team_weights, k=1)[0]
+
+
+def _q(path: str, **params) -> str:
+    params = {k: v for k, v in params.items() if v is not None}
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def _team_page(c: Catalog, rng: random.Random) -> List[Tuple[str, str]]:
+    n, y = c.team(rng), c.year
+    return [
+        ("/teams", _q("/teams", team_number=n)),
+        ("/team_perfs/{n}", _q(f"/team_perfs/{n}", year=y)),
+        ("/team/{n}/events/{year}", f"/team/{n}/events/{y}"),
+        ("/team/{n}/match_ratings/{year}", f"/team/{n}/match_ratings/{y}"),
+        ("/team/{n}/awards/{year}", f"/team/{n}/awards/{y}"),
+        ("/team/{n}/awards", f"/team/{n}/awards"),
+        ("/team/{n}/notables", f"/team/{n}/notables"),
+        ("/events/{year}", f"/events/{y}"),
+    ]
+
+
+def _event_bundle(event_key: str) -> List[Tuple[str, str]]:
+    return [
+        ("/events/{year}", f"/events/{event_key[:4]}"),
+        ("/event/{key}/teams", f"/event/{event_key}/teams"),
+        ("/event/{key}/event_perfs", f"/event/{event_key}/event_perfs"),
+        ("/event/{key}/matches", f"/event/{event_key}/matches"),
+        ("/event/{key}/rankings", f"/event/{event_key}/rankings"),
+        ("/event/{key}/awards", f"/event/{event_key}/awards"),
+        ("/search/index", "/search/index"),
+    ]
+
+
+def _event_page(c: Catalog, rng: random.Random) -> List[Tuple[str, str]]:
+    return _event_bundle(rng.choice(c.events))
+
+
+def _live_event_page(c: Catalog, rng: random.Random) -> List[Tuple[str, str]]:
+    return _event_bundle(rng.choice(c.live_events))
+
+
+def _live_poll(c: Catalog, rng: random.Random) -> List[Tuple[str, str]]:
+    # An open event tab refetching after a match is posted.
+    key = rng.choice(c.live_events)
+    return [
+        ("/event/{key}/matches", f"/event/{key}/matches"),
+        ("/event/{key}/rankings", f"/event/{key}/rankings"),
+    ]
+
+
+def _h2h(c: Catalog, rng: random.Random) -> List[Tuple[str, str]]:
+    a, b = c.team(rng), c.team(rng)
+    while b == a and len(c.teams) > 1:
+        b = c.team(rng)
+    year = c.year if rng.random() < 0.5 else None
+    return [("/games/h2h", _q("/games/h2h", team_a=a, team_b=b, year=year))]
+
+
+def _search(c: Catalog, rng: random.Random) -> List[Tuple[str, str]]:
+    return [("/search/index", "/search/index")]
+
+
+def _map(c: Catalog, rng: random.Random) -> List[Tuple[str, str]]:
+    return [
+        ("/map/teams", _q("/map/teams", year=c.year)),
+        ("/map/events", _q("/map/events", year=c.year)),
+    ]
+
+
+def _insights(c: Catalog, rng: random.Random) -> List[Tuple[str, str]]:
+    return [
+        ("/insights/overview", "/insights/overview"),
+        ("/events/{year}/insights", f"/events/{c.year}/insights"),
+    ]
+
+
+def _leaderboard(c: Catalog, rng: random.Random) -> List[Tuple[str, str]]:
+    return [("/team_perfs", _q("/team_perfs", year=c.year, limit=500))]
+
+
+PAGES: Dict[str, Callable[[Catalog, random.Random], List[Tuple[str, str]]]] = {
+    "team": _team_page,
+    "event": _event_page,
+    "live_event": _live_event_page,
+    "live_poll": _live_poll,
+    "h2h": _h2h,
+    "search": _search,
+    "map": _map,
+    "insights": _insights,
+    "leaderboard": _leaderboard,
+}
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+
+class _Client:
+    """Keep-alive connection per worker thread."""
+
+    def __init__(self, base_url: str, timeout: float, client_ips: int):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self.https = parsed.scheme == "https"
+        self.prefix = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self.client_ips = client_ips
+        self._local = threading.local()
+
+    def _conn(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def get(self, path: str, rng: Optional[random.Random] = None) -> Tuple[int, Dict[str, str], bytes]:
+        headers = {"User-Agent": USER_AGENT, "Accept": "application/json", "Accept-Encoding": "gzip"}
+        if self.client_ips and rng is not None:
+            # Spread requests over simulated clients so per-IP rate limits behave as in prod.
+            n = rng.randrange(self.client_ips)
+            headers["X-Forwarded-For"] = f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+        for attempt in (0, 1):
+            conn = self._conn()
+            try:
+                conn.request("GET", self.prefix + path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                return resp.status, {k.lower(): v for k, v in resp.getheaders()}, body
+            except (http.client.HTTPException, ConnectionError, OSError):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        raise RuntimeError("unreachable")
+
+    def get_json(self, path: str):
+        status, _headers, body = self.get(path)
+        if status != 200:
+            raise RuntimeError(f"GET {path} -> {status}")
+        return json.loads(body)
+
+
+def discover(client: _Client, year: int, live: Optional[List[str]], live_count: int, seed: int) -> Catalog:
+    events = client.get_json(f"/events/{year}").get("events") or []
+    if not events:
+        raise SystemExit(f"/events/{year} returned no events; load a season first.")
+    teams: List[int] = []
+    cursor = None
+    for _ in range(20):
+        page = client.get_json(_q("/team_perfs", year=year, limit=500, next_team_number=cursor))
+        teams.extend(int(t["team_number"]) for t in page.get("team_perfs") or [])
+        cursor = page.get("next")
+        if cursor is None:
+            break
+    if not teams:
+        raise SystemExit(f"/team_perfs returned no teams for {year}.")
+
+    def _d(e, k):
+        return str((e.get("event_data") or {}).get(k) or "")[:10]
+
+    keys = [e["event_key"] for e in events]
+    if not live:
+        today = datetime.now(timezone.utc).date().isoformat()
+        live = [e["event_key"] for e in events if _d(e, "start_date") <= today <= _d(e, "end_date")]
+    if not live:
+        # Off-season: treat the most recent events as the "live" ones.
+        ordered = sorted(events, key=lambda e: _d(e, "start_date"))
+        live = [e["event_key"] for e in ordered[-live_count:]]
+    rng = random.Random(seed)
+    rng.shuffle(teams)
+    # Page views are skewed: a few teams get most of the traffic.
+    weights = [1.0 / (i + 1) ** 0.8 for i in range(len(teams))]
+    return Catalog(year=year, teams=teams, team_weights=weights, events=keys, live_events=live[:live_count])
+
+
+# ---------------------------------------------------------------------------
+# Run + stats
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _Sample:
+    label: str
+    status: int
+    latency_ms: float  # from intended send time (includes client-side queueing)
+    service_ms: float  # on the wire
+    sem_ms: Optional[float]
+    pool_ms: Optional[float]
+    coalesced: bool
+    nbytes: int
+
+
+def _parse_server_timing(value: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in (value or "").split(","):
+        name, _, rest = part.strip().partition(";")
+        if rest.startswith("dur="):
+            try:
+                out[name] = float(rest[4:])
+            except ValueError:
+                pass
+    return out
+
+
+def _pct(sorted_values: List[float], p: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return round(sorted_values[idx], 2)
+
+
+def summarize(samples: List[_Sample], seconds: float) -> dict:
+    def block(rows: List[_Sample]) -> dict:
+        lat = sorted(s.latency_ms for s in rows)
+        statuses: Dict[str, int] = defaultdict(int)
+        for s in rows:
+            statuses[str(s.status)] += 1
+        n = len(rows)
+        sem = sorted(s.sem_ms for s in rows if s.sem_ms is not None and not s.coalesced)
+        pool = sorted(s.pool_ms for s in rows if s.pool_ms is not None and not s.coalesced)
+        ok = sum(1 for s in rows if 200 <= s.status < 300)
+        errors = sum(1 for s in rows if s.status == 0 or s.status >= 500)
+        return {
+            "requests": n,
+            "throughput_rps": round(ok / seconds, 2) if seconds else None,
+            "p50_ms": _pct(lat, 50),
+            "p95_ms": _pct(lat, 95),
+            "p99_ms": _pct(lat, 99),
+            "max_ms": round(lat[-1], 2) if lat else None,
+            "service_p95_ms": _pct(sorted(s.service_ms for s in rows), 95),
+            "rate_503": round(statuses.get("503", 0) / n, 4) if n else 0.0,
+            "rate_429": round(statuses.get("429", 0) / n, 4) if n else 0.0,
+            "error_rate": round(errors / n, 4) if n else 0.0,
+            "coalesced_rate": round(sum(s.coalesced for s in rows) / n, 4) if n else 0.0,
+            "db_sem_wait_ms": {"mean": round(sum(sem) / len(sem), 2), "p95": _pct(sem, 95)} if sem else None,
+            "db_pool_wait_ms": {"mean": round(sum(pool) / len(pool), 2), "p95": _pct(pool, 95)} if pool else None,
+            "kb_per_request": round(sum(s.nbytes for s in rows) / n / 1024, 1) if n else 0.0,
+            "statuses": dict(sorted(statuses.items())),
+        }
+
+    by_label: Dict[str, List[_Sample]] = defaultdict(list)
+    for s in samples:
+        by_label[s.label].append(s)
+    return {
+        "seconds": round(seconds, 2),
+        "overall": block(samples),
+        "endpoints": {label: block(rows) for label, rows in sorted(by_label.items())},
+    }
+
+
+def run_load(client: _Client, catalog: Catalog, *, mix: Dict[str, float], rate: float, duration: float,
+             warmup: float, max_inflight: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    pages = list(mix)
+    weights = [mix[p] for p in pages]
+    samples: List[_Sample] = []
+    lock = threading.Lock()
+    inflight = [0]
+    dropped = [0]
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + duration
+
+    def do(label: str, path: str, intended: float, req_rng: random.Random) -> None:
+        sent = time.perf_counter()
+        try:
+            status, headers, body = client.get(path, req_rng)
+        except Exception:
+            status, headers, body = 0, {}, b""
+        done = time.perf_counter()
+        with lock:
+            inflight[0] -= 1
+        if intended < measure_from:
+            return
+        timing = _parse_server_timing(headers.get("server-timing", ""))
+        sample = _Sample(
+            label=label,
+            status=status,
+            latency_ms=(done - intended) * 1000.0,
+            service_ms=(done - sent) * 1000.0,
+            sem_ms=timing.get("db-sem"),
+            pool_ms=timing.get("db-pool"),
+            coalesced=headers.get("x-single-flight") == "coalesced",
+            nbytes=len(body),
+        )
+        with lock:
+            samples.append(sample)
+
+    with ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="load") as pool:
+        next_at = time.perf_counter()
+        while next_at < stop_at:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            page = pages[_weighted(rng, weights)]
+            for label, path in PAGES[page](catalog, rng):
+                with lock:
+                    backlog = inflight[0]
+                    if backlog >= max_inflight * 10:
+                        dropped[0] += 1
+                        continue
+                    inflight[0] += 1
+                pool.submit(do, label, path, next_at, random.Random(rng.random()))
+            next_at += rng.expovariate(rate)
+    summary = summarize(samples, duration)
+    summary["client_dropped"] = dropped[0]
+    return summary
+
+
+def _weighted(rng: random.Random, weights: List[float]) -> int:
+    r = rng.random() * sum(weights)
+    for i, w in enumerate(weights):
+        r -= w
+        if r <= 0:
+            return i
+    return len(weights) - 1
+
+
+# ---------------------------------------------------------------------------
+# Server, baselines, SLOs
+# ---------------------------------------------------------------------------
+
+
+def _db_host() -> str:
+    url = os.environ.get("DB_URL") or os.environ.get("DATABASE_URL") or ""
+    return (urlparse(url).hostname or "").lower()
+
+
+class _Server:
+    """uvicorn main:app on a local port with env overrides."""
+
+    def __init__(self, port: int, env: Dict[str, str], workers: int):
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        full_env = dict(os.environ)
+        full_env.update({
+            "SERVER_TIMING": "1",
+            # One client IP would trip the anonymous limit in seconds; --client-ips
+            # plus --env RATE_LIMIT_ANONYMOUS=... re-enables realistic limits.
+            "RATE_LIMIT_ANONYMOUS": "1000000/minute",
+            "RATE_LIMIT_APPLICATION": "1000000/minute",
+        })
+        full_env.update(env)
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+            cwd=API_DIR,
+            env=full_env,
+        )
+
+    def wait_ready(self, timeout: float = 60.0) -> None:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.proc.poll() is not None:
+                raise SystemExit(f"uvicorn exited with code {self.proc.returncode}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=2)
+                conn.request("GET", "/")
+                if conn.getresponse().status == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.5)
+        self.stop()
+        raise SystemExit("uvicorn did not become ready in time")
+
+    def stop(self) -> None:
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+def _baseline_path(name: str) -> str:
+    return name if name.endswith(".json") else os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def _machine() -> dict:
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def save_baseline(name: str, run: dict) -> str:
+    path = _baseline_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({**run, "machine": _machine()}, f, indent=2)
+    return path
+
+
+def compare_baseline(name: str, run: dict, tolerance: float) -> List[str]:
+    with open(_baseline_path(name), "r", encoding="utf-8") as f:
+        base = json.load(f)
+    if base.get("config", {}).get("mix") != run["config"]["mix"] or base.get("config", {}).get("rate") != run["config"]["rate"]:
+        print("note: baseline was recorded with a different mix/rate; comparison is indicative only")
+    if base.get("machine") != _machine():
+        print("note: baseline was recorded on a different machine")
+    regressions = []
+    pairs = [("overall", base["result"]["overall"], run["result"]["overall"])]
+    pairs += [
+        (label, base["result"]["endpoints"][label], stats)
+        for label, stats in run["result"]["endpoints"].items()
+        if label in base["result"]["endpoints"]
+    ]
+    for label, old, new in pairs:
+        if min(old["requests"], new["requests"]) < _MIN_COMPARE_REQUESTS:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            o, n = old.get(metric), new.get(metric)
+            # Ignore sub-5ms jitter on fast endpoints.
+            if o and n and n > o * (1 + tolerance) and n - o > 5:
+                regressions.append(f"{label} {metric}: {o:.1f} -> {n:.1f}")
+        if new["error_rate"] > old["error_rate"] + 0.01:
+            regressions.append(f"{label} error_rate: {old['error_rate']:.2%} -> {new['error_rate']:.2%}")
+    return regressions
+
+
+def parse_slo(spec: Optional[str]) -> Dict[str, float]:
+    slo: Dict[str, float] = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        key, _, value = part.partition("=")
+        key = key.strip()
+        if key not in ("p50", "p95", "p99", "errors", "503"):
+            raise SystemExit(f"unknown SLO {key!r} (use p50, p95, p99, errors, 503)")
+        slo[key] = float(value)
+    return slo
+
+
+def check_slo(result: dict, slo: Dict[str, float]) -> List[str]:
+    fields = {"p50": "p50_ms", "p95": "p95_ms", "p99": "p99_ms", "errors": "error_rate", "503": "rate_503"}
+    violations = []
+    for scope, stats in [("overall", result["overall"])] + list(result["endpoints"].items()):
+        for key, limit in slo.items():
+            value = stats.get(fields[key])
+            if value is not None and value > limit:
+                violations.append(f"{scope} {key}={value} > {limit}")
+    return violations
+
+
+def print_result(result: dict, title: str) -> None:
+    print(f"\n{title}")
+    header = f"  {'endpoint':<34}{'req':>7}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'503%':>7}{'429%':>7}{'coal%':>7}{'sem95':>8}{'pool95':>8}"
+    print(header)
+    rows = list(result["endpoints"].items()) + [("overall", result["overall"])]
+    for label, s in rows:
+        sem = (s["db_sem_wait_ms"] or {}).get("p95")
+        pool = (s["db_pool_wait_ms"] or {}).get("p95")
+        print(
+            f"  {label:<34}{s['requests']:>7}{s['throughput_rps'] or 0:>8.1f}"
+            f"{s['p50_ms'] or 0:>9.1f}{s['p95_ms'] or 0:>9.1f}{s['p99_ms'] or 0:>9.1f}"
+            f"{100 * s['rate_503']:>7.1f}{100 * s['rate_429']:>7.1f}{100 * s['coalesced_rate']:>7.1f}"
+            f"{sem if sem is not None else '-':>8}{pool if pool is not None else '-':>8}"
+        )
+    if result.get("client_dropped"):
+        print(f"  client dropped {result['client_dropped']} request(s): raise --max-inflight or lower --rate")
+
+
+def _parse_env_pairs(items: List[str]) -> Dict[str, str]:
+    out = {}
+    for item in items or []:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"expected KEY=VALUE, got {item!r}")
+        out[key.strip()] = value.strip()
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the API and check latency SLOs.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Existing server, e.g. http://127.0.0.1:8000")
+    target.add_argument("--spawn", action="store_true", help="Start uvicorn main:app locally")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when spawning")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Server env override")
+    parser.add_argument("--sweep", action="append", default=[], metavar="KEY=v1,v2",
+                        help="Run once per value (repeatable; combinations are crossed)")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow a spawned server on a non-local DB")
+    parser.add_argument("--year", type=int, default=datetime.now().year)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--rate", type=float, default=10.0, help="Page views per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=10.0, help="Unmeasured seconds first")
+    parser.add_argument("--max-inflight", type=int, default=64, help="Concurrent client requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request client timeout")
+    parser.add_argument("--client-ips", type=int, default=0, help="Spread over N simulated X-Forwarded-For IPs")
+    parser.add_argument("--live-events", help="Comma-separated event keys treated as live")
+    parser.add_argument("--live-count", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--slo", help="e.g. p95=400,p99=1500,errors=0.01,503=0")
+    parser.add_argument("--baseline", help="Compare against a saved baseline (name or path)")
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95/p99 regression")
+    parser.add_argument("--json", metavar="PATH", help="Write all results as JSON")
+    args = parser.parse_args()
+
+    slo = parse_slo(args.slo)
+    base_env = _parse_env_pairs(args.env)
+    sweep = [(k, v.split(",")) for k, v in _parse_env_pairs(args.sweep).items()]
+    if sweep and not args.spawn:
+        parser.error("--sweep needs --spawn")
+    if args.spawn and not args.allow_remote and _db_host() not in _LOCAL_DB_HOSTS:
+        raise SystemExit(f"DB host {_db_host() or '(unset)'} is not local; pass --allow-remote to load-test it")
+
+    combos = [dict(zip([k for k, _ in sweep], values)) for values in itertools.product(*[v for _, v in sweep])] or [{}]
+    live = [k.strip() for k in (args.live_events or "").split(",") if k.strip()] or None
+    runs = []
+    exit_code = 0
+    for combo in combos:
+        env = {**base_env, **combo}
+        server = _Server(args.port, env, args.workers) if args.spawn else None
+        try:
+            if server:
+                server.wait_ready()
+            client = _Client(server.url if server else args.url, args.timeout, args.client_ips)
+            catalog = discover(client, args.year, live, args.live_count, args.seed)
+            print(
+                f"{len(catalog.teams)} teams, {len(catalog.events)} events, live: {', '.join(catalog.live_events)}"
+                + (f" | {' '.join(f'{k}={v}' for k, v in env.items())}" if env else ""),
+                flush=True,
+            )
+            result = run_load(
+                client, catalog, mix=MIXES[args.mix], rate=args.rate, duration=args.duration,
+                warmup=args.warmup, max_inflight=args.max_inflight, seed=args.seed,
+            )
+        finally:
+            if server:
+                server.stop()
+        run = {
+            "config": {"mix": args.mix, "rate": args.rate, "duration": args.duration, "year": args.year, "env": env},
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "result": result,
+        }
+        runs.append(run)
+        print_result(result, f"mix={args.mix} rate={args.rate}/s " + " ".join(f"{k}={v}" for k, v in env.items()))
+        violations = check_slo(result, slo)
+        for v in violations:
+            print(f"  SLO violated: {v}")
+        if violations:
+            exit_code = 2
+
+    if len(runs) > 1:
+        print("\nSweep summary:")
+        for run in runs:
+            o = run["result"]["overall"]
+            sem = (o["db_sem_wait_ms"] or {}).get("p95")
+            label = " ".join(f"{k}={v}" for k, v in run["config"]["env"].items())
+            print(f"  {label:<40} p95 {o['p95_ms']}ms  p99 {o['p99_ms']}ms  503 {100 * o['rate_503']:.1f}%  "
+                  f"{o['throughput_rps']} rps  sem95 {sem}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(runs if len(runs) > 1 else runs[0], f, indent=2)
+    if args.save_baseline:
+        print(f"Baseline written to {save_baseline(args.save_baseline, runs[-1])}")
+    if args.baseline:
+        regressions = compare_baseline(args.baseline, runs[-1], args.tolerance)
+        for r in regressions:
+            print(f"  regression: {r}")
+        if regressions:
+            exit_code = exit_code or 1
+        else:
+            print("No regressions against baseline.")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
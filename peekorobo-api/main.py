@@ -1,36 +1,43 @@
 import asyncio
+import hashlib
+import hmac
+import json
 import os
 import re
 import logging
 import threading
 from typing import Annotated, Optional
-from time import time
+from time import perf_counter, time
 from datetime import datetime
 from dotenv import load_dotenv
 from fastapi import FastAPI, Query, Path, Depends, Security, HTTPException, status, Request, Response
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
+from starlette.routing import Match
 from query.teams import TeamQuery, TeamResponse
 from query.events import EventQuery, EventResponse
 from query.event_keys import EventKeysResponse
 from query.team_epas import TeamPerfRequest, TeamPerfResponse, TeamPerfListRequest, TeamPerfListResponse
 from query.event_teams import EventTeamsQuery, EventTeamsResponse
-from query.event_matches import EventMatchesRequest, EventMatchResponse, TeamMatchRatingsResponse
+from query.event_matches import EventMatchesRequest, EventMatchResponse, TeamMatchRatingSeriesResponse, TeamMatchRatingsResponse
 from query.event_awards import EventAwardsResponse, EventAwardsQuery
 from query.event_rankings import EventRankingsResponse, EventRankingsQuery
 from query.event_perfs import EventPerfsResponse, EventPerfInfo
+from query.event_projection import EventProjectionQuery, EventProjectionResponse
+from query.event_playoff_odds import EventPlayoffOddsResponse
 from query.team_awards import TeamAwardsResponse, TeamAwardsQuery
 from query.team_events import TeamEventsResponse, TeamEventsQuery
 from query.notables import TeamNotablesResponse
 from query.frc_games import FrcGamesResponse
 from query.event_insights import EventInsightsResponse
 from query.insights_overview import InsightsOverviewResponse
-from query.map import MapTeamsResponse, MapEventsResponse
+from query.map import MapTeamsResponse, MapEventsResponse, MapTileResponse, MapClustersResponse
 from query.search_index import SearchIndexResponse
 from query.games import H2HResponse, PredictorMatchesResponse, PredictorQuery
-from data.db import SessionLocal
+from query.webhooks import WebhookAck
+from data.db import SessionLocal, engine
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from sqlalchemy.exc import DBAPIError, TimeoutError as SATimeoutError
@@ -41,6 +48,8 @@ import data.models.event_matches as event_matches
 import data.models.event_awards as event_awards
 import data.models.event_rankings as event_rankings
 import data.models.event_perfs as event_perfs
+import data.models.event_projection as event_projection
+import data.models.event_playoff_odds as event_playoff_odds
 import data.models.team_awards as team_awards
 import data.models.team_events as team_events
 import data.models.notables as notables
@@ -49,11 +58,17 @@ import data.models.frc_games as frc_games
 import data.models.event_insights as event_insights
 import data.models.insights_overview as insights_overview
 import data.models.map as map_data
+import data.models.map_tiles as map_tiles
 import data.models.search_index as search_index
 import data.models.games as games
 import data.models.users as users_model
 import data.models.favorites as favorites_model
+import data.models.webhooks as webhooks_model
+import live
+import metrics
 import security
+import migrate
+from singleflight import SharedResponse, SingleFlight, request_key
 from query.auth import (
     RegisterRequest,
     LoginRequest,
@@ -115,6 +130,32 @@ SEARCH_INDEX_CACHE_CONTROL_VALUE = (
     f"public, max-age={SEARCH_INDEX_CACHE_MAX_AGE}, stale-while-revalidate={SEARCH_INDEX_CACHE_SWR}"
 )
 
+# Coalesce identical concurrent anonymous GETs (same path + query) into one DB
+# computation. Thundering herds after a CDN expiry are what exhaust _db_semaphore.
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "true").strip().lower() not in ("false", "0", "no")
+
+# Apply pending migrations/ on startup (one SELECT when the schema is current).
+# Boot only applies transactional files and never waits on the migration lock;
+# CONCURRENTLY index files are left to `python migrate.py` (heroku.yml release
+# step) or the pipeline. Turn off where the release step covers everything.
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "true").strip().lower() not in ("false", "0", "no")
+
+# Per-request DB wait (``_db_semaphore`` and pool checkout) as a Server-Timing
+# header. Off by default; loadtest.py turns it on for the servers it spawns.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").strip().lower() in ("1", "true", "yes")
+
+# Bearer token for /metrics and /metrics/slow_queries; unset disables both.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "").strip()
+
+# Shared secret registered with TBA for /webhooks/tba (X-TBA-HMAC); unset disables it.
+TBA_WEBHOOK_SECRET = os.getenv("TBA_WEBHOOK_SECRET", "").strip()
+WEBHOOK_MAX_BODY_BYTES = 256 * 1024
+
+# Live event feed (/live/event/{key}): one LISTEN connection per dyno fanned out over SSE.
+LIVE_FEED = os.getenv("LIVE_FEED", "true").strip().lower() not in ("false", "0", "no")
+LIVE_MAX_SUBSCRIBERS = int(os.getenv("LIVE_MAX_SUBSCRIBERS", "2000"))
+LIVE_DEBOUNCE_SEC = float(os.getenv("LIVE_DEBOUNCE_SEC", "1.0"))
+
 # Comma-separated list of allowed SPA origins, or "*" for any (read-only, no cookies).
 CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "*").split(",") if o.strip()]
 
@@ -135,9 +176,15 @@ def _apply_auth_timeout(db: Session) -> None:
     _apply_statement_timeout(db, AUTH_TIMEOUT_MS)
 
 
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
     try:
+        ctx = metrics.current_request.get()
+        if ctx is not None:
+            ctx.route = metrics.route_label(request.scope)
+        started = perf_counter()
+        db.connection()  # pool checkout; blocks up to DB_POOL_TIMEOUT when exhausted
+        request.state.db_pool_wait_ms = (perf_counter() - started) * 1000.0
         _apply_statement_timeout(db, READ_STATEMENT_TIMEOUT_MS)
         yield db
     finally:
@@ -330,7 +377,12 @@ try:
         headers_enabled=True,
     )
     app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    def _on_rate_limited(request: Request, exc: RateLimitExceeded):
+        metrics.reject("rate_limit")
+        return _rate_limit_exceeded_handler(request, exc)
+
+    app.add_exception_handler(RateLimitExceeded, _on_rate_limited)
     app.add_middleware(SlowAPIMiddleware)
 except ImportError:
     limiter = None
@@ -359,7 +411,7 @@ _BOT_BLOCK_PREFIXES = (
 )
 
 
-NO_CACHE_PREFIXES = ("/authorize", "/docs", "/openapi.json", "/redoc", "/auth", "/favorites")
+NO_CACHE_PREFIXES = ("/authorize", "/docs", "/openapi.json", "/redoc", "/auth", "/favorites", "/metrics", "/live")
 
 
 @app.middleware("http")
@@ -386,6 +438,7 @@ async def reject_suspicious_scrapers(request: Request, call_next):
         return await call_next(request)
     ua = request.headers.get("user-agent") or ""
     if _SUSPICIOUS_UA.search(ua):
+        metrics.reject("scraper")
         return JSONResponse(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             content={"detail": "Too many requests"},
@@ -394,7 +447,9 @@ async def reject_suspicious_scrapers(request: Request, call_next):
     return await call_next(request)
 
 
-_DB_GUARD_SKIP_PREFIXES = ("/docs", "/openapi.json", "/redoc")
+# /live streams hold no DB session; their reloads take _db_semaphore themselves.
+_DB_GUARD_SKIP_PREFIXES = ("/docs", "/openapi.json", "/redoc", "/metrics", "/live")
+_db_inflight = 0
 
 
 @app.middleware("http")
@@ -403,22 +458,172 @@ async def guard_db_concurrency(request: Request, call_next):
     path = request.url.path
     if path == "/" or any(path == p or path.startswith(p) for p in _DB_GUARD_SKIP_PREFIXES):
         return await call_next(request)
+    global _db_inflight
+    started = perf_counter()
     try:
         await asyncio.wait_for(_db_semaphore.acquire(), timeout=DB_WAIT_TIMEOUT)
     except asyncio.TimeoutError:
-        return JSONResponse(
+        request.state.db_semaphore_wait_ms = (perf_counter() - started) * 1000.0
+        metrics.reject("db_semaphore")
+        response = JSONResponse(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             content={"detail": "Server busy, try again shortly"},
             headers={"Retry-After": "5"},
         )
+        if SERVER_TIMING:
+            response.headers["Server-Timing"] = _server_timing(request, started)
+        return response
+    acquired = perf_counter()
+    request.state.db_semaphore_wait_ms = (acquired - started) * 1000.0
+    _db_inflight += 1
     try:
-        return await call_next(request)
+        response = await call_next(request)
     finally:
+        _db_inflight -= 1
         _db_semaphore.release()
+    if SERVER_TIMING:
+        response.headers["Server-Timing"] = _server_timing(request, started)
+    return response
+
+
+def _server_timing(request: Request, started: float) -> str:
+    parts = [f"db-sem;dur={request.state.db_semaphore_wait_ms:.2f}"]
+    pool_ms = getattr(request.state, "db_pool_wait_ms", None)
+    if pool_ms is not None:
+        parts.append(f"db-pool;dur={pool_ms:.2f}")
+    parts.append(f"app;dur={(perf_counter() - started) * 1000.0:.2f}")
+    return ", ".join(parts)
+
+
+# Registered after guard_db_concurrency so it wraps it: followers wait on the
+# leader's result without ever taking a DB semaphore slot.
+_single_flight = SingleFlight()
+_SINGLE_FLIGHT_SKIP_PREFIXES = NO_CACHE_PREFIXES + ("/users",)
+# Per-client headers that must not be copied from the leader to followers.
+_SINGLE_FLIGHT_DROP_HEADERS = {"set-cookie", "x-ratelimit-limit", "x-ratelimit-remaining", "x-ratelimit-reset", "retry-after"}
+
+
+async def _read_shared_response(response) -> SharedResponse:
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = [
+        (k, v) for k, v in response.headers.items() if k.lower() not in _SINGLE_FLIGHT_DROP_HEADERS
+    ]
+    return SharedResponse(
+        status_code=response.status_code,
+        headers=headers,
+        body=body,
+        media_type=response.media_type,
+    )
+
+
+def _response_from_shared(shared: SharedResponse, coalesced: bool) -> Response:
+    response = Response(
+        content=shared.body,
+        status_code=shared.status_code,
+        media_type=shared.media_type,
+    )
+    for k, v in shared.headers:
+        if k.lower() != "content-length":
+            response.headers[k] = v
+    response.headers["X-Single-Flight"] = "coalesced" if coalesced else "leader"
+    return response
+
+
+@app.middleware("http")
+async def coalesce_identical_reads(request: Request, call_next):
+    """Share one in-flight computation between identical concurrent anonymous GETs."""
+    path = request.url.path
+    if (
+        not SINGLE_FLIGHT
+        or request.method != "GET"
+        or request.headers.get("Authorization")
+        or path == "/"
+        or any(path == p or path.startswith(p) for p in _SINGLE_FLIGHT_SKIP_PREFIXES + _DB_GUARD_SKIP_PREFIXES)
+        # Let reject_suspicious_scrapers see scrapers rather than handing them a shared 200.
+        or (not request.headers.get("X-API-Key") and _SUSPICIOUS_UA.search(request.headers.get("user-agent") or ""))
+    ):
+        return await call_next(request)
+
+    # With PUBLIC_READ off the response depends on the key being valid, so keys
+    # never share a flight with each other (or with anonymous callers).
+    scope_token = "" if PUBLIC_READ else (request.headers.get("X-API-Key") or "")
+    key = request_key(path, list(request.query_params.multi_items()), scope_token)
+
+    async def _leader():
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response, None
+        shared = await _read_shared_response(response)
+        return _response_from_shared(shared, coalesced=False), shared
+
+    label = "/" + path.strip("/").split("/", 1)[0]
+    result, coalesced = await _single_flight.do(key, _leader, label=label)
+    if coalesced:
+        _logger.debug("single-flight coalesced %s", key)
+        return _response_from_shared(result, coalesced=True)
+    return result
+
+
+# Registered last so it is the outermost middleware: it sees coalesced
+# followers, scraper rejections and 503s from the guards as well.
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    ctx = metrics.RequestContext(request.method, request.url.path)
+    token = metrics.current_request.set(ctx)
+    started = perf_counter()
+    response = None
+    try:
+        response = await call_next(request)
+        return response
+    finally:
+        metrics.current_request.reset(token)
+        seconds = perf_counter() - started
+        ctx.route = ctx.route or _route_template(request)
+        length = response.headers.get("content-length") if response is not None else None
+        sem_ms = getattr(request.state, "db_semaphore_wait_ms", None)
+        pool_ms = getattr(request.state, "db_pool_wait_ms", None)
+        metrics.record_request(
+            ctx,
+            status=response.status_code if response is not None else 500,
+            seconds=seconds,
+            response_bytes=int(length) if length and length.isdigit() else None,
+            semaphore_wait=None if sem_ms is None else sem_ms / 1000.0,
+            pool_wait=None if pool_ms is None else pool_ms / 1000.0,
+            coalesced=response is not None and response.headers.get("X-Single-Flight") == "coalesced",
+        )
+
+
+def _route_template(request: Request) -> str:
+    """Route template for metrics labels, also for requests that never reached the router."""
+    label = metrics.route_label(request.scope)
+    if label != "unmatched":
+        return label
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+def _single_flight_metrics():
+    stats = _single_flight.stats
+    yield "peekorobo_single_flight_leaders_total", "counter", "Single-flight computations run.", {}, stats.leaders
+    yield "peekorobo_single_flight_coalesced_total", "counter", "Requests answered by a leader.", {}, stats.coalesced
+    yield "peekorobo_single_flight_fallbacks_total", "counter", "Followers that ran their own request.", {}, stats.fallbacks
+    yield "peekorobo_single_flight_inflight", "gauge", "Keys with a leader in flight.", {}, _single_flight.inflight_count()
+    for prefix, n in sorted(stats.per_path.items()):
+        yield "peekorobo_single_flight_coalesced_by_prefix_total", "counter", "Coalesced requests by path prefix.", {"prefix": prefix}, n
+    yield "peekorobo_db_semaphore_in_use", "gauge", "Requests holding a _db_semaphore slot.", {}, _db_inflight
+    yield "peekorobo_db_semaphore_limit", "gauge", "DB_MAX_CONCURRENT.", {}, DB_MAX_CONCURRENT
+
+
+metrics.registry.collector(_single_flight_metrics)
+metrics.install_sqlalchemy_hooks(engine)
 
 
 @app.exception_handler(SATimeoutError)
 async def sqlalchemy_pool_timeout_handler(_request: Request, _exc: SATimeoutError):
+    metrics.reject("pool_timeout")
     return JSONResponse(
         status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         content={"detail": "Database busy, try again shortly"},
@@ -521,8 +726,17 @@ def get_insights_overview(
 async def get_events(year : Annotated[int , Path(title="Events from this year")], query : Annotated[EventQuery, Query()], db: Session = Depends(get_db)) -> EventResponse:
     return events.get_events(db, year, query)
 
-@app.get("/team_perfs", dependencies=[Depends(read_access)], tags=["Teams"])
+@app.get("/team_perfs", dependencies=[Depends(read_access)], tags=["Teams"], response_model_exclude_unset=True)
 async def get_team_perfs_list(query: TeamPerfListRequest = Depends(), db: Session = Depends(get_db)) -> TeamPerfListResponse:
+    """Season team performances. `fields=` projects columns; `include=event_perf` adds per-event detail."""
+    unknown = [f for f in team_epas.split_csv_param(query.fields) if f not in team_epas.LIST_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown fields: {', '.join(unknown)}")
+    unknown = [f for f in team_epas.split_csv_param(query.include) if f not in team_epas.LIST_INCLUDES]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown include: {', '.join(unknown)}")
+    if query.next_cursor and team_epas.decode_rank_cursor(query.next_cursor) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid next_cursor")
     return team_epas.get_team_perfs_list(db, query)
 
 @app.get("/team_perfs/{team_number}", dependencies=[Depends(read_access)], tags=["Teams"])
@@ -558,6 +772,15 @@ async def get_team_match_ratings(
     """Compact walk-forward ACE (auto/teleop/endgame/raw/conf) for each of a team's matches."""
     return event_matches.get_team_match_ratings(db, team_number, year)
 
+@app.get("/team/{team_number}/match_ratings/{year}/series", dependencies=[Depends(read_access)], tags=["Teams"])
+async def get_team_match_rating_series(
+    team_number: Annotated[int, Path(title="Team number")],
+    year: Annotated[int, Path(title="Year")],
+    db: Session = Depends(get_db),
+) -> TeamMatchRatingSeriesResponse:
+    """Same data as /match_ratings/{year} in columnar form: one array per field, one element per match."""
+    return event_matches.get_team_match_rating_series(db, team_number, year)
+
 # Event data routes (nested under /event/{event_key}/...)
 @app.get("/event/{event_key}/teams", dependencies=[Depends(read_access)], tags=["Event Data"])
 async def get_event_teams_nested(event_key: Annotated[str, Path(title="Event key (e.g. 2024cmp)")], query: Annotated[EventTeamsQuery, Query()], db: Session = Depends(get_db)) -> EventTeamsResponse:
@@ -583,6 +806,108 @@ async def get_event_rankings_by_team(event_key: Annotated[str, Path(title="Event
 async def get_event_rankings(event_key: Annotated[str, Path(title="Event key (e.g. 2024cmp)")], query: EventRankingsQuery = Depends(), db: Session = Depends(get_db)) -> EventRankingsResponse:
     return event_rankings.get_event_rankings(db, event_key, query)
 
+@app.get("/event/{event_key}/projection", dependencies=[Depends(read_access)], tags=["Event Data"])
+async def get_event_projection(event_key: Annotated[str, Path(title="Event key (e.g. 2024cmp)")], query: EventProjectionQuery = Depends(), db: Session = Depends(get_db)) -> EventProjectionResponse:
+    """Monte Carlo projection of final qualification ranks from the remaining schedule and pre-match win probabilities."""
+    # A cache miss runs the whole simulation; keep it off the event loop.
+    return await asyncio.to_thread(event_projection.get_event_projection, db, event_key, query.simulations)
+
+@app.get("/event/{event_key}/playoff_odds", dependencies=[Depends(read_access)], tags=["Event Data"])
+async def get_event_playoff_odds(event_key: Annotated[str, Path(title="Event key (e.g. 2024cmp)")], db: Session = Depends(get_db)) -> EventPlayoffOddsResponse:
+    """Per-alliance double-elimination advancement and championship odds for the current bracket state."""
+    return event_playoff_odds.get_event_playoff_odds(db, event_key)
+
+def _live_rows(event_key: str, kind: str) -> list:
+    db = SessionLocal()
+    try:
+        _apply_statement_timeout(db, READ_STATEMENT_TIMEOUT_MS)
+        if kind == "matches":
+            rows = event_matches.get_event_matches(db, event_key, EventMatchesRequest()).matches
+        elif kind == "rankings":
+            rows = event_rankings.get_event_rankings(db, event_key, EventRankingsQuery()).event_rankings
+        elif kind == "playoff_odds":
+            rows = event_playoff_odds.get_event_playoff_odds(db, event_key).alliances
+        else:
+            rows = event_perfs.get_event_perfs(db, event_key).perfs
+        return [r.model_dump() for r in rows]
+    finally:
+        db.close()
+
+
+async def _live_load(event_key: str, kind: str) -> list:
+    """One reload per dyno per change, under the same concurrency cap as requests."""
+    async with _db_semaphore:
+        return await asyncio.to_thread(_live_rows, event_key, kind)
+
+
+def _live_connect():
+    import psycopg2
+
+    return psycopg2.connect(engine.url.set(drivername="postgresql").render_as_string(hide_password=False))
+
+
+_live_hub = live.LiveHub(
+    _live_connect,
+    _live_load,
+    debounce_sec=LIVE_DEBOUNCE_SEC,
+    max_subscribers=LIVE_MAX_SUBSCRIBERS,
+)
+
+
+def _live_metrics():
+    stats = _live_hub.stats
+    yield "peekorobo_live_subscribers", "gauge", "Open /live event streams.", {}, _live_hub.subscriber_count()
+    yield "peekorobo_live_events", "gauge", "Events with at least one live subscriber.", {}, len(_live_hub.topics)
+    yield "peekorobo_live_notifies_total", "counter", "event_updates notifications received.", {}, stats.notifies
+    yield "peekorobo_live_reloads_total", "counter", "Snapshot reloads run for live subscribers.", {}, stats.reloads
+    yield "peekorobo_live_messages_total", "counter", "Diff messages queued to subscribers.", {}, stats.diffs_sent
+    yield "peekorobo_live_dropped_total", "counter", "Subscribers dropped for a full queue.", {}, stats.dropped
+
+
+metrics.registry.collector(_live_metrics)
+
+
+def live_access(api_key: Optional[str] = Security(api_key_header)):
+    """read_access without holding a pooled session for the life of the stream."""
+    if PUBLIC_READ:
+        return
+    db = SessionLocal()
+    try:
+        verify_api_key(api_key, db)
+    finally:
+        db.close()
+
+
+@app.get("/live/event/{event_key}", dependencies=[Depends(live_access)], tags=["Event Data"])
+async def stream_event_updates(event_key: Annotated[str, Path(title="Event key (e.g. 2024cmp)")]):
+    """Server-Sent Events for an event page.
+
+    Sends one ``snapshot`` per kind (``matches``, ``rankings``, ``event_perfs``,
+    ``playoff_odds``; rows as returned by the matching /event/{key}/... endpoint, for
+    ``playoff_odds`` its ``alliances`` list keyed by ``alliance``), then a ``diff`` with
+    the changed rows (``upsert``) and removed row keys (``remove``) whenever the
+    pipeline updates that kind.
+    """
+    if not LIVE_FEED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not re.fullmatch(r"\d{4}[a-z0-9]+", event_key):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid event key")
+    try:
+        sub = await _live_hub.subscribe(event_key)
+    except live.LiveFeedFull:
+        metrics.reject("live_full")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Live feed is full, fall back to polling",
+            headers={"Retry-After": "30"},
+        )
+    return StreamingResponse(
+        _live_hub.stream(event_key, sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
 def _parse_team_key(team_key: str) -> int:
     """Parse team_key (e.g. '254' or 'frc254') to team number."""
     s = str(team_key).strip().lower()
@@ -665,21 +990,147 @@ async def get_map_events(response: Response, year: Annotated[Optional[int], Quer
     resolved_year = year if year is not None else datetime.now().year
     return map_data.get_map_events(db, resolved_year)
 
+@app.get("/map/tiles/{z}/{x}/{y}", dependencies=[Depends(read_access)], tags=["Map"])
+async def get_map_tile(
+    response: Response,
+    z: Annotated[int, Path(title="Tile zoom", ge=0, le=22)],
+    x: Annotated[int, Path(title="Tile column", ge=0)],
+    y: Annotated[int, Path(title="Tile row", ge=0)],
+    year: Annotated[Optional[int], Query(title="Season year")] = None,
+    layer: Annotated[str, Query(title="teams or events")] = "teams",
+    db: Session = Depends(get_db),
+) -> MapTileResponse:
+    """Clustered points for one web-mercator tile; x/y are quantized to 0..extent within the tile."""
+    if layer not in map_tiles.LAYERS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="layer must be 'teams' or 'events'")
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="tile x/y out of range for zoom")
+    response.headers["Cache-Control"] = MAP_CACHE_CONTROL_VALUE
+    resolved_year = year if year is not None else datetime.now().year
+    return map_tiles.get_map_tile(db, resolved_year, layer, z, x, y)
+
+@app.get("/map/clusters", dependencies=[Depends(read_access)], tags=["Map"])
+async def get_map_clusters(
+    response: Response,
+    zoom: Annotated[int, Query(title="Map zoom", ge=0, le=22)],
+    bbox: Annotated[str, Query(title="Bounding box", description="minLng,minLat,maxLng,maxLat")] = "-180,-85,180,85",
+    year: Annotated[Optional[int], Query(title="Season year")] = None,
+    layer: Annotated[str, Query(title="teams or events")] = "teams",
+    db: Session = Depends(get_db),
+) -> MapClustersResponse:
+    """Clustered points in a viewport; x/y are lng/lat multiplied by ``precision``."""
+    if layer not in map_tiles.LAYERS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="layer must be 'teams' or 'events'")
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="bbox must be minLng,minLat,maxLng,maxLat")
+    if not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="bbox out of range")
+    response.headers["Cache-Control"] = MAP_CACHE_CONTROL_VALUE
+    resolved_year = year if year is not None else datetime.now().year
+    return map_tiles.get_map_clusters(db, resolved_year, layer, zoom, (min_lng, min_lat, max_lng, max_lat))
+
 @app.get("/authorize", dependencies=[Depends(verify_api_key)], tags=["Authentication"])
 async def authorize_user():
     return {"authorized": True}
 
 
-@app.on_event("startup")
-def _startup_init_tables():
-    """Ensure the users/saved_items tables exist (no-op on production)."""
-    db = SessionLocal()
+def _require_metrics_token(request: Request) -> None:
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    supplied = request.headers.get("X-Metrics-Token") or ""
+    auth = request.headers.get("Authorization") or ""
+    if auth.lower().startswith("bearer "):
+        supplied = auth[7:].strip()
+    if not secrets.compare_digest(supplied.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    """Prometheus text exposition for this process."""
+    _require_metrics_token(request)
+    return Response(content=metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/metrics/slow_queries", include_in_schema=False)
+async def get_slow_queries(request: Request):
+    """Most recent sampled slow statements (newest first)."""
+    _require_metrics_token(request)
+    return {"threshold_ms": metrics.SLOW_QUERY_MS, "samples": metrics.slow_queries()}
+
+
+def _verify_tba_signature(request: Request, body: bytes) -> None:
+    if not TBA_WEBHOOK_SECRET:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    supplied = (request.headers.get("X-TBA-HMAC") or "").strip().lower()
+    expected = hmac.new(TBA_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    if not secrets.compare_digest(supplied.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook signature")
+
+
+@app.post("/webhooks/tba", include_in_schema=False, status_code=status.HTTP_202_ACCEPTED)
+async def receive_tba_webhook(request: Request, response: Response, db: Session = Depends(get_db)) -> WebhookAck:
+    """Validate a signed TBA push and queue it for data/webhook_worker.py."""
+    body = await request.body()
+    if len(body) > WEBHOOK_MAX_BODY_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Payload too large")
+    _verify_tba_signature(request, body)
     try:
-        users_model.init_user_tables(db)
-    except Exception as e:  # pragma: no cover - defensive
-        print("User table init failed:", e)
-    finally:
-        db.close()
+        message = json.loads(body)
+        message_type, event_key, match_key = webhooks_model.parse_delivery(message)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if message_type not in webhooks_model.QUEUED_TYPES:
+        if message_type == "verification":
+            _logger.warning(
+                "TBA webhook verification key: %s",
+                (message.get("message_data") or {}).get("verification_key"),
+            )
+        response.status_code = status.HTTP_200_OK
+        return WebhookAck(message_type=message_type)
+    queue_id = webhooks_model.enqueue(db, message_type, event_key, match_key, message)
+    return WebhookAck(message_type=message_type, queued=True, queue_id=queue_id)
+
+
+# TBA pushes from a handful of addresses; per-IP limits would drop deliveries on busy days.
+if limiter is not None:
+    limiter.exempt(receive_tba_webhook)
+
+
+@app.on_event("startup")
+async def _start_live_feed():
+    if LIVE_FEED:
+        _live_hub.start(asyncio.get_running_loop())
+
+
+@app.on_event("shutdown")
+def _stop_live_feed():
+    _live_hub.stop()
+
+
+@app.on_event("startup")
+def _startup_migrate():
+    """Apply pending schema migrations once per process (see migrate.py)."""
+    if MIGRATE_ON_STARTUP:
+        raw = engine.raw_connection()
+        try:
+            migrate.apply_pending(raw.driver_connection, online=True, log=_logger.info)
+            # 0004's year column is filled by data/season_year.py, not by the
+            # migration (see migrate.py's deploy order note).
+            cur = raw.driver_connection.cursor()
+            cur.execute("SELECT EXISTS (SELECT 1 FROM events WHERE year IS NULL)")
+            if cur.fetchone()[0]:
+                _logger.warning(
+                    "events.year is not backfilled; year-filtered endpoints miss those rows "
+                    "until `python data/season_year.py` runs"
+                )
+            cur.close()
+        except Exception as e:  # pragma: no cover - defensive
+            print("Schema migration failed:", e)
+        finally:
+            raw.close()
 
     def _prewarm():
         try:
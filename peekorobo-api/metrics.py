@@ -0,0 +1,352 @@
+"""In-process request and database metrics in Prometheus text format.
+
+``main.py`` records, per matched route, a latency histogram, status counts,
+response size and the time the request spent waiting for ``_db_semaphore`` and
+for a pool connection. A SQLAlchemy hook times every statement, charges it to
+the current request and samples slow ones (with their bound parameters,
+credentials redacted) into a small ring buffer and a structured log line.
+
+Everything lives in this process; with several uvicorn workers each exposes its
+own ``/metrics`` and Prometheus sums them. Route labels are the route templates
+(``/team/{team_number}/events/{year}``), never raw paths, so cardinality stays
+bounded.
+
+Environment:
+    METRICS_TOKEN             bearer token for /metrics (unset: endpoint disabled)
+    SLOW_QUERY_MS             statements slower than this are sampled (default 500)
+    SLOW_QUERY_SAMPLE_RATE    fraction of slow statements kept (default 1.0)
+    SLOW_REQUEST_MS           requests slower than this are logged (default 2000)
+    ACCESS_LOG                ``slow`` (default), ``all`` or ``off``
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "2000"))
+ACCESS_LOG = os.getenv("ACCESS_LOG", "slow").strip().lower()
+SLOW_QUERY_BUFFER = 100
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+_REDACT_KEYS = ("password", "hash", "token", "api_key", "secret", "email")
+
+_access_logger = logging.getLogger("peekorobo.api.access")
+_slow_logger = logging.getLogger("peekorobo.api.slow_query")
+
+
+def log_event(logger: logging.Logger, level: int, event: str, **fields) -> None:
+    """One JSON object per line, so log drains can index the fields."""
+    if logger.isEnabledFor(level):
+        logger.log(level, json.dumps({"event": event, **fields}, default=str, separators=(",", ":")))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class Registry:
+    """Counters, gauges and histograms keyed by (name, sorted labels)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple], _Histogram] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]] = []
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._help[name] = ("counter", help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...]) -> None:
+        self._help[name] = ("histogram", help_text)
+        self._buckets[name] = buckets
+
+    def collector(self, fn: Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]) -> None:
+        """``fn`` yields (name, type, help, labels, value) at scrape time (gauges, external stats)."""
+        self._collectors.append(fn)
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1.0) -> None:
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram(self._buckets[name])
+            hist.observe(value)
+
+    def render(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                k: (h.buckets, list(h.counts), h.sum, h.count) for k, h in self._histograms.items()
+            }
+        lines: List[str] = []
+        seen = set()
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, *self._help[name])
+            lines.append(f"{name}{_labels(labels)} {_num(value)}")
+        for (name, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+            header(name, *self._help[name])
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(labels + (('le', _num(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {_num(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        for fn in self._collectors:
+            try:
+                samples = list(fn())
+            except Exception:  # a broken collector must not take /metrics down
+                continue
+            for name, kind, help_text, labels, value in samples:
+                header(name, kind, help_text)
+                lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {_num(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(pairs: Tuple) -> str:
+    if not pairs:
+        return ""
+    escaped = (
+        f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+        for k, v in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+registry = Registry()
+registry.counter("peekorobo_http_requests_total", "Requests by route, method and status.")
+registry.counter("peekorobo_http_rejected_total", "Requests turned away before the handler, by reason.")
+registry.counter("peekorobo_http_coalesced_total", "Responses served from a single-flight leader, by route.")
+registry.histogram("peekorobo_http_request_duration_seconds", "End-to-end request latency by route.", LATENCY_BUCKETS)
+registry.histogram("peekorobo_http_response_bytes", "Response body size by route.", SIZE_BUCKETS)
+registry.histogram("peekorobo_http_db_seconds", "Time spent executing SQL per request, by route.", LATENCY_BUCKETS)
+registry.histogram("peekorobo_db_semaphore_wait_seconds", "Wait for a _db_semaphore slot.", WAIT_BUCKETS)
+registry.histogram("peekorobo_db_pool_checkout_seconds", "Wait for a pooled DB connection.", WAIT_BUCKETS)
+registry.histogram("peekorobo_db_statement_duration_seconds", "SQL statement latency by route.", LATENCY_BUCKETS)
+registry.counter("peekorobo_db_slow_statements_total", "Statements slower than SLOW_QUERY_MS, by route.")
+registry.counter("peekorobo_db_statement_errors_total", "Statements that raised, by route.")
+
+
+# ---------------------------------------------------------------------------
+# Per-request context
+# ---------------------------------------------------------------------------
+
+
+class RequestContext:
+    """Mutable per-request record shared by the middleware, get_db and the SQL hooks."""
+
+    __slots__ = ("method", "path", "route", "db_seconds", "statements")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.db_seconds = 0.0
+        self.statements = 0
+
+
+current_request: contextvars.ContextVar[Optional[RequestContext]] = contextvars.ContextVar(
+    "peekorobo_request", default=None
+)
+
+
+def route_label(scope: dict) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path or "unmatched"
+
+
+def record_request(
+    ctx: RequestContext,
+    *,
+    status: int,
+    seconds: float,
+    response_bytes: Optional[int],
+    semaphore_wait: Optional[float],
+    pool_wait: Optional[float],
+    coalesced: bool,
+) -> None:
+    route = ctx.route or "unmatched"
+    labels = {"route": route}
+    registry.inc("peekorobo_http_requests_total", {"route": route, "method": ctx.method, "status": str(status)})
+    registry.observe("peekorobo_http_request_duration_seconds", seconds, labels)
+    if response_bytes is not None:
+        registry.observe("peekorobo_http_response_bytes", response_bytes, labels)
+    if semaphore_wait is not None:
+        registry.observe("peekorobo_db_semaphore_wait_seconds", semaphore_wait)
+    if pool_wait is not None:
+        registry.observe("peekorobo_db_pool_checkout_seconds", pool_wait)
+    if ctx.statements:
+        registry.observe("peekorobo_http_db_seconds", ctx.db_seconds, labels)
+    if coalesced:
+        registry.inc("peekorobo_http_coalesced_total", labels)
+
+    slow = seconds * 1000.0 >= SLOW_REQUEST_MS
+    if ACCESS_LOG == "all" or (ACCESS_LOG != "off" and (slow or status >= 500)):
+        log_event(
+            _access_logger,
+            logging.WARNING if slow or status >= 500 else logging.INFO,
+            "request",
+            method=ctx.method,
+            path=ctx.path,
+            route=route,
+            status=status,
+            ms=round(seconds * 1000.0, 1),
+            db_ms=round(ctx.db_seconds * 1000.0, 1),
+            statements=ctx.statements,
+            sem_wait_ms=None if semaphore_wait is None else round(semaphore_wait * 1000.0, 1),
+            pool_wait_ms=None if pool_wait is None else round(pool_wait * 1000.0, 1),
+            bytes=response_bytes,
+            coalesced=coalesced,
+        )
+
+
+def reject(reason: str) -> None:
+    registry.inc("peekorobo_http_rejected_total", {"reason": reason})
+
+
+# ---------------------------------------------------------------------------
+# SQLAlchemy statement timing + slow-query sampling
+# ---------------------------------------------------------------------------
+
+_slow_samples: deque = deque(maxlen=SLOW_QUERY_BUFFER)
+_slow_lock = threading.Lock()
+
+
+def _redact(params):
+    if isinstance(params, dict):
+        return {
+            k: "***" if any(s in str(k).lower() for s in _REDACT_KEYS) else _short(v)
+            for k, v in params.items()
+        }
+    if isinstance(params, (list, tuple)):
+        if params and isinstance(params[0], (dict, list, tuple)):  # executemany
+            head = [_redact(p) for p in params[:3]]
+            return head + ([f"... {len(params) - 3} more"] if len(params) > 3 else [])
+        return [_short(v) for v in params]
+    return _short(params)
+
+
+def _short(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value)
+        if len(items) > 20:
+            return [_short(v) for v in items[:20]] + [f"... {len(items) - 20} more"]
+        return [_short(v) for v in items]
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    text = str(value)
+    return text if len(text) <= 200 else text[:200] + "..."
+
+
+def slow_queries() -> List[dict]:
+    with _slow_lock:
+        return list(reversed(_slow_samples))
+
+
+def install_sqlalchemy_hooks(engine) -> None:
+    """Time every statement on ``engine``; sample the slow ones."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("peekorobo_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("peekorobo_query_start")
+        if not starts:
+            return
+        seconds = time.perf_counter() - starts.pop()
+        ctx = current_request.get()
+        route = (ctx.route if ctx else None) or ("background" if ctx is None else "unmatched")
+        if ctx is not None:
+            ctx.db_seconds += seconds
+            ctx.statements += 1
+        registry.observe("peekorobo_db_statement_duration_seconds", seconds, {"route": route})
+        if seconds * 1000.0 < SLOW_QUERY_MS:
+            return
+        registry.inc("peekorobo_db_slow_statements_total", {"route": route})
+        if SLOW_QUERY_SAMPLE_RATE < 1.0 and random.random() >= SLOW_QUERY_SAMPLE_RATE:
+            return
+        sample = {
+            "at": time.time(),
+            "ms": round(seconds * 1000.0, 1),
+            "route": route,
+            "path": ctx.path if ctx else None,
+            "statement": " ".join(str(statement).split())[:2000],
+            "params": _redact(parameters),
+            "executemany": bool(executemany),
+        }
+        with _slow_lock:
+            _slow_samples.append(sample)
+        log_event(_slow_logger, logging.WARNING, "slow_query", **sample)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None:
+            starts = conn.info.get("peekorobo_query_start")
+            if starts:
+                starts.pop()
+        ctx = current_request.get()
+        route = (ctx.route if ctx else None) or ("background" if ctx is None else "unmatched")
+        registry.inc("peekorobo_db_statement_errors_total", {"route": route})
+
+    def _pool_stats():
+        pool = engine.pool
+        for name, help_text, getter in (
+            ("peekorobo_db_pool_checked_out", "Pooled connections in use.", "checkedout"),
+            ("peekorobo_db_pool_size", "Configured pool size.", "size"),
+            ("peekorobo_db_pool_overflow", "Connections beyond pool_size.", "overflow"),
+        ):
+            fn = getattr(pool, getter, None)
+            if fn is not None:
+                yield name, "gauge", help_text, {}, float(fn())
+
+    registry.collector(_pool_stats)
@@ -0,0 +1,274 @@
+"""Versioned schema migrations shared by the API and the data pipeline.
+
+Migrations are plain SQL files in ``migrations/`` named ``NNNN_description.sql``
+and applied in version order. Applied versions are recorded in
+``schema_migrations``; a Postgres advisory lock keeps concurrent starters (API
+dynos, a pipeline run) from applying the same file twice.
+
+A file whose first line is ``-- migrate: no-transaction`` runs statement by
+statement in autocommit mode (needed for ``CREATE INDEX CONCURRENTLY``);
+everything else runs in one transaction. A killed concurrent build leaves an
+INVALID index that ``IF NOT EXISTS`` would skip, so such leftovers of the
+file's indexes are dropped before it runs, and it is only recorded once all of
+them are valid.
+
+The API applies migrations on boot with ``online=True``: it only tries the
+lock (a busy lock means another starter is on it) and leaves no-transaction
+files to ``python migrate.py`` (the Heroku release step) or the pipeline's
+``data/run.py``, so a dyno never builds indexes inside its boot timeout or
+waits on the lock while a concurrent build waits on that dyno's transactions.
+
+Deploy order for data backfills: a migration that adds a column the API
+filters on (0004's ``year``) leaves existing rows NULL until the batched
+backfill in data/ runs (``python data/season_year.py``, also run after every
+pipeline migration pass). Run it before pointing the API at the new schema,
+or year-filtered endpoints return nothing for older seasons in between.
+
+The runner only needs a DB-API (psycopg2) connection, so ``data/run.py`` can
+import it without SQLAlchemy. In steady state ``apply_pending`` costs a single
+SELECT; DDL only runs when a new file ships.
+
+Usage:
+    python peekorobo-api/migrate.py            # apply pending migrations
+    python peekorobo-api/migrate.py --status   # list applied / pending
+    python peekorobo-api/migrate.py --dry-run  # show what would run
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+_FILE_RE = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+_NO_TRANSACTION = "-- migrate: no-transaction"
+_CONCURRENT_INDEX_RE = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)",
+    re.IGNORECASE,
+)
+# pg_advisory_lock(key1, key2); distinct from the pipeline's run lock.
+_LOCK_KEY1 = 7_331_001
+_LOCK_KEY2 = 1
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    sql: str
+    checksum: str
+    transactional: bool
+
+
+def discover(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    migrations: List[Migration] = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILE_RE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+            sql = f.read()
+        migrations.append(
+            Migration(
+                version=int(match.group(1)),
+                name=match.group(2),
+                sql=sql,
+                checksum=hashlib.sha256(sql.encode("utf-8")).hexdigest(),
+                transactional=not sql.lstrip().startswith(_NO_TRANSACTION),
+            )
+        )
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration version in {directory}")
+    return migrations
+
+
+def _split_statements(sql: str) -> List[str]:
+    """Split on ``;`` at end of line. Migration files keep one statement per ``;``."""
+    body = "\n".join(line for line in sql.splitlines() if not line.strip().startswith("--"))
+    return [s.strip() for s in re.split(r";\s*(?:\n|$)", body) if s.strip()]
+
+
+def applied_versions(conn) -> Dict[int, str]:
+    """version -> checksum; empty when schema_migrations does not exist yet."""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT version, checksum FROM schema_migrations")
+        rows = cur.fetchall()
+    except Exception:
+        conn.rollback()
+        return {}
+    finally:
+        cur.close()
+    conn.rollback()
+    return {int(v): c for v, c in rows}
+
+
+def pending(conn, migrations: Optional[List[Migration]] = None) -> List[Migration]:
+    migrations = discover() if migrations is None else migrations
+    done = applied_versions(conn)
+    return [m for m in migrations if m.version not in done]
+
+
+def _invalid_indexes(cur, names: List[str]) -> List[str]:
+    """Which of ``names`` exist but are INVALID (an interrupted concurrent build)."""
+    cur.execute(
+        """
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE NOT i.indisvalid AND c.relname = ANY(%s) AND pg_table_is_visible(c.oid)
+        """,
+        (names,),
+    )
+    return [r[0] for r in cur.fetchall()]
+
+
+def _apply_one(conn, migration: Migration) -> None:
+    cur = conn.cursor()
+    try:
+        if migration.transactional:
+            cur.execute(migration.sql)
+        else:
+            statements = _split_statements(migration.sql)
+            indexes = [n for st in statements for n in _CONCURRENT_INDEX_RE.findall(st)]
+            conn.autocommit = True
+            try:
+                for name in _invalid_indexes(cur, indexes) if indexes else []:
+                    cur.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+                for statement in statements:
+                    cur.execute(statement)
+                invalid = _invalid_indexes(cur, indexes) if indexes else []
+                if invalid:
+                    raise RuntimeError(
+                        f"{migration.version:04d}_{migration.name}: index(es) left INVALID: "
+                        + ", ".join(invalid)
+                    )
+            finally:
+                conn.autocommit = False
+        cur.execute(
+            "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+            (migration.version, migration.name, migration.checksum),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def apply_pending(
+    conn,
+    *,
+    dry_run: bool = False,
+    online: bool = False,
+    log: Callable[[str], None] = print,
+) -> List[Migration]:
+    """Apply every pending migration in order; returns the ones applied (or pending on dry_run).
+
+    ``online`` (API boot): skip no-transaction files and return at once when
+    another process holds the migration lock.
+    """
+    migrations = discover()
+    todo = pending(conn, migrations)
+    if online:
+        for m in todo:
+            if not m.transactional:
+                log(f"[migrate] deferred {m.version:04d}_{m.name} (no-transaction; run migrate.py)")
+        migrations = [m for m in migrations if m.transactional]
+        todo = [m for m in todo if m.transactional]
+    if not todo or dry_run:
+        for m in todo:
+            log(f"[migrate] pending {m.version:04d}_{m.name}")
+        return todo
+
+    cur = conn.cursor()
+    if online:
+        cur.execute("SELECT pg_try_advisory_lock(%s, %s)", (_LOCK_KEY1, _LOCK_KEY2))
+        locked = bool(cur.fetchone()[0])
+        conn.commit()
+        if not locked:
+            log("[migrate] another process is migrating; skipping")
+            cur.close()
+            return []
+    else:
+        cur.execute("SELECT pg_advisory_lock(%s, %s)", (_LOCK_KEY1, _LOCK_KEY2))
+        conn.commit()
+    try:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                checksum TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """
+        )
+        conn.commit()
+        # Re-read under the lock: another process may have applied some meanwhile.
+        todo = pending(conn, migrations)
+        for m in todo:
+            log(f"[migrate] applying {m.version:04d}_{m.name}")
+            _apply_one(conn, m)
+        return todo
+    finally:
+        cur.execute("SELECT pg_advisory_unlock(%s, %s)", (_LOCK_KEY1, _LOCK_KEY2))
+        conn.commit()
+        cur.close()
+
+
+def status(conn) -> List[str]:
+    done = applied_versions(conn)
+    lines = []
+    for m in discover():
+        if m.version not in done:
+            state = "pending"
+        elif done[m.version] != m.checksum:
+            state = "applied (file changed since)"
+        else:
+            state = "applied"
+        lines.append(f"{m.version:04d}_{m.name}: {state}")
+    return lines
+
+
+def connect_from_env():
+    import psycopg2
+    from urllib.parse import urlparse
+
+    url = os.environ.get("DB_URL") or os.environ.get("DATABASE_URL")
+    if not url:
+        raise RuntimeError("DB_URL or DATABASE_URL must be set in the environment.")
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    kwargs = {}
+    if "neon.tech" in (urlparse(url).hostname or "") and "sslmode" not in url:
+        kwargs["sslmode"] = "require"
+    return psycopg2.connect(url, **kwargs)
+
+
+def main(argv: List[str]) -> int:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    conn = connect_from_env()
+    try:
+        if "--status" in argv:
+            for line in status(conn):
+                print(line)
+            return 0
+        applied = apply_pending(conn, dry_run="--dry-run" in argv)
+        if not applied:
+            print("[migrate] schema is up to date")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
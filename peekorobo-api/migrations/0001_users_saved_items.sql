@@ -0,0 +1,28 @@
+-- Account tables shared with the legacy Dash app. Production already has them
+-- (with data); this only matters for a fresh database. Never drops or mutates data.
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    username VARCHAR(50) NOT NULL,
+    password_hash BYTEA NOT NULL,
+    email VARCHAR(255),
+    role VARCHAR(100),
+    team VARCHAR(50),
+    bio TEXT,
+    avatar_key VARCHAR(100),
+    color VARCHAR(20),
+    followers JSONB DEFAULT '[]'::jsonb,
+    following JSONB DEFAULT '[]'::jsonb,
+    preferences JSONB,
+    higher_lower_highscore INTEGER DEFAULT 0,
+    api_key TEXT
+);
+
+CREATE TABLE IF NOT EXISTS saved_items (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    item_type TEXT NOT NULL,
+    item_key TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_saved_items_user ON saved_items (user_id, item_type);
+CREATE INDEX IF NOT EXISTS idx_saved_items_item ON saved_items (item_type, item_key);
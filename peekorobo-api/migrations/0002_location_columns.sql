@@ -0,0 +1,8 @@
+-- lat/lng written by the pipeline and data/geo/geocode.py; postal_code comes from TBA.
+ALTER TABLE teams ADD COLUMN IF NOT EXISTS lat DOUBLE PRECISION;
+ALTER TABLE teams ADD COLUMN IF NOT EXISTS lng DOUBLE PRECISION;
+ALTER TABLE teams ADD COLUMN IF NOT EXISTS postal_code TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS lat DOUBLE PRECISION;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS lng DOUBLE PRECISION;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS postal_code TEXT;
+ALTER TABLE event_teams DROP COLUMN IF EXISTS postal_code;
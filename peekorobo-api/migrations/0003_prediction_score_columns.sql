@@ -0,0 +1,5 @@
+-- Written by apply_match_predictions_to_db (data/prediction.py).
+ALTER TABLE event_matches
+    ADD COLUMN IF NOT EXISTS red_predicted_score DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS blue_predicted_score DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS pre_match_teams JSONB;
@@ -0,0 +1,13 @@
+-- Plain season column so year filters are sargable (see data/season_year.py).
+-- Schema only: this also runs on API boot, so it must not rewrite the tables.
+-- Adding a nullable column is metadata-only; the brief ACCESS EXCLUSIVE lock
+-- gives up after lock_timeout rather than queueing reads behind a long writer
+-- (the next boot / migrate.py run retries). Indexes are 0012 (CONCURRENTLY).
+-- Existing rows get their year from the batched backfill in
+-- data/season_year.py; new rows carry year from ingest.
+SET LOCAL lock_timeout = '5s';
+ALTER TABLE events ADD COLUMN IF NOT EXISTS year INTEGER;
+ALTER TABLE event_matches ADD COLUMN IF NOT EXISTS year INTEGER;
+ALTER TABLE event_teams ADD COLUMN IF NOT EXISTS year INTEGER;
+ALTER TABLE event_awards ADD COLUMN IF NOT EXISTS year INTEGER;
+ALTER TABLE event_rankings ADD COLUMN IF NOT EXISTS year INTEGER;
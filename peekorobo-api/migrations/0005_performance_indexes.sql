@@ -0,0 +1,20 @@
+-- migrate: no-transaction
+-- Built CONCURRENTLY so the API keeps serving reads/writes while they build.
+-- Per-event match lists, inserts' DELETE ... WHERE event_key, h2h joins.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_event_matches_event_key
+    ON event_matches (event_key);
+-- Team pages: a team's events / awards across seasons.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_event_teams_team_event
+    ON event_teams (team_number, event_key);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_event_awards_team_event
+    ON event_awards (team_number, event_key);
+-- Favorites: exact (user, type, key) lookups on add/remove.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_saved_items_user_item
+    ON saved_items (user_id, item_type, item_key);
+-- Login / availability checks compare LOWER(username) and LOWER(email).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_username_lower
+    ON users (LOWER(username));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email_lower
+    ON users (LOWER(email));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_api_key
+    ON users (api_key) WHERE api_key IS NOT NULL;
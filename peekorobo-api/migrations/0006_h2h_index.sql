@@ -0,0 +1,42 @@
+-- Head-to-head index for /games/h2h, rebuilt per season by data/h2h_index.py.
+-- Pairs are stored once with team_lo < team_hi; the API flips lo/hi to a/b.
+CREATE TABLE IF NOT EXISTS team_pair_years (
+    team_lo INTEGER NOT NULL,
+    team_hi INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    events_shared INTEGER NOT NULL DEFAULT 0,
+    together INTEGER NOT NULL DEFAULT 0,
+    together_wins INTEGER NOT NULL DEFAULT 0,
+    together_losses INTEGER NOT NULL DEFAULT 0,
+    together_ties INTEGER NOT NULL DEFAULT 0,
+    together_score_sum BIGINT NOT NULL DEFAULT 0,
+    together_opp_sum BIGINT NOT NULL DEFAULT 0,
+    against INTEGER NOT NULL DEFAULT 0,
+    lo_wins INTEGER NOT NULL DEFAULT 0,
+    hi_wins INTEGER NOT NULL DEFAULT 0,
+    against_ties INTEGER NOT NULL DEFAULT 0,
+    lo_score_sum BIGINT NOT NULL DEFAULT 0,
+    hi_score_sum BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (team_lo, team_hi, year)
+);
+CREATE INDEX IF NOT EXISTS idx_team_pair_years_year ON team_pair_years (year);
+
+-- One row per (team, match): intersecting two teams' lists replaces the
+-- LIKE scans over event_matches.red_teams / blue_teams.
+CREATE TABLE IF NOT EXISTS team_matches (
+    team_number INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    match_key TEXT NOT NULL,
+    alliance TEXT NOT NULL,
+    PRIMARY KEY (team_number, year, match_key)
+);
+CREATE INDEX IF NOT EXISTS idx_team_matches_year ON team_matches (year);
+
+-- Seasons the index has been built for; the API falls back to the scan path
+-- for anything not listed here.
+CREATE TABLE IF NOT EXISTS h2h_index_builds (
+    year INTEGER PRIMARY KEY,
+    matches INTEGER NOT NULL,
+    pairs INTEGER NOT NULL,
+    built_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,33 @@
+-- Match Predictor pools, rebuilt per season by data/predictor_pool.py after
+-- predictions are stored. One row per playable match (played, decided, with a
+-- stored win probability); ord / playoff_ord are dense per event so the API
+-- can sample (event_key, ord) pairs without reading the rest of the season.
+CREATE TABLE IF NOT EXISTS predictor_pool (
+    year INTEGER NOT NULL,
+    event_key TEXT NOT NULL,
+    ord INTEGER NOT NULL,
+    playoff_ord INTEGER,
+    match JSONB NOT NULL,
+    nicknames JSONB NOT NULL DEFAULT '{}'::jsonb,
+    PRIMARY KEY (year, event_key, ord)
+);
+CREATE INDEX IF NOT EXISTS idx_predictor_pool_playoff
+    ON predictor_pool (year, event_key, playoff_ord) WHERE playoff_ord IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS predictor_pool_events (
+    year INTEGER NOT NULL,
+    event_key TEXT NOT NULL,
+    event_name TEXT,
+    week INTEGER,
+    event_type TEXT,
+    matches INTEGER NOT NULL,
+    playoff_matches INTEGER NOT NULL,
+    PRIMARY KEY (year, event_key)
+);
+
+CREATE TABLE IF NOT EXISTS predictor_pool_builds (
+    year INTEGER PRIMARY KEY,
+    matches INTEGER NOT NULL,
+    events INTEGER NOT NULL,
+    built_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,28 @@
+-- Per-(team, season) walk-forward ACE series for the team-page chart, rebuilt
+-- by data/rating_series.py after predictions. Parallel arrays, one element
+-- per match in schedule order, so /team/{n}/match_ratings/{year} is a single
+-- primary-key read instead of a LIKE scan plus JSONB extraction per match.
+CREATE TABLE IF NOT EXISTS team_rating_series (
+    team_number INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    match_keys TEXT[] NOT NULL,
+    event_keys TEXT[] NOT NULL,
+    comp_levels TEXT[] NOT NULL,
+    match_numbers INTEGER[] NOT NULL,
+    set_numbers INTEGER[] NOT NULL,
+    played BOOLEAN[] NOT NULL,
+    a REAL[] NOT NULL,
+    t REAL[] NOT NULL,
+    e REAL[] NOT NULL,
+    r REAL[] NOT NULL,
+    c REAL[] NOT NULL,
+    ace REAL[] NOT NULL,
+    PRIMARY KEY (team_number, year)
+);
+CREATE INDEX IF NOT EXISTS idx_team_rating_series_year ON team_rating_series (year);
+
+CREATE TABLE IF NOT EXISTS team_rating_series_builds (
+    year INTEGER PRIMARY KEY,
+    teams INTEGER NOT NULL,
+    built_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,18 @@
+-- TBA webhook deliveries accepted by POST /webhooks/tba and drained by
+-- data/webhook_worker.py. The API only validates and enqueues (then NOTIFYs
+-- webhook_queue); the worker claims pending rows with FOR UPDATE SKIP LOCKED,
+-- applies them and stamps done_at (or error after a failed attempt).
+CREATE TABLE IF NOT EXISTS webhook_queue (
+    id BIGSERIAL PRIMARY KEY,
+    message_type TEXT NOT NULL,
+    event_key TEXT,
+    match_key TEXT,
+    payload JSONB NOT NULL,
+    received_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    claimed_at TIMESTAMPTZ,
+    done_at TIMESTAMPTZ,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_webhook_queue_pending
+    ON webhook_queue (id) WHERE done_at IS NULL;
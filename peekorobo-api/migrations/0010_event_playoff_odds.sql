@@ -0,0 +1,13 @@
+-- Per-event double-elimination playoff odds written by data/playoff_bracket.py
+-- (run.py after predictions, live_daemon.py / webhook_worker.py as playoff
+-- results land). state_key hashes the bracket state the odds were computed
+-- from, so writers skip events whose bracket has not moved.
+CREATE TABLE IF NOT EXISTS event_playoff_odds (
+    event_key TEXT PRIMARY KEY,
+    year INTEGER,
+    state_key TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    alliances JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_event_playoff_odds_year ON event_playoff_odds (year);
@@ -0,0 +1,13 @@
+-- Phase checkpoints for data/run.py full recomputes (see data/checkpoint.py).
+-- One row per (run_key, stage): fetched TBA payloads, the precompute caches,
+-- the set of teams already written, and bare completion markers for the
+-- later phases. config_key fingerprints the ACE / prediction settings, so
+-- `run.py --resume` never mixes state from a differently configured run.
+CREATE TABLE IF NOT EXISTS pipeline_checkpoints (
+    run_key TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    config_key TEXT NOT NULL,
+    payload BYTEA,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (run_key, stage)
+);
@@ -0,0 +1,13 @@
+-- migrate: no-transaction
+-- Year-leading composite indexes for 0004's season column, built CONCURRENTLY.
+-- No-transaction files are skipped on API boot; `python migrate.py` or the
+-- pipeline (data/run.py) applies them.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_events_year_event_key ON events (year, event_key);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_events_year_start_date ON events (year, start_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_event_matches_year_event_key ON event_matches (year, event_key);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_event_teams_year_event_key ON event_teams (year, event_key);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_event_teams_year_team_number ON event_teams (year, team_number);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_event_awards_year_event_key ON event_awards (year, event_key);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_event_awards_year_team_number ON event_awards (year, team_number);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_event_rankings_year_event_key ON event_rankings (year, event_key);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_event_rankings_year_team_number ON event_rankings (year, team_number);
@@ -54,3 +54,20 @@ class TeamMatchRatingsResponse(BaseModel):
     team_number: int
     year: int
     matches: List[TeamMatchRating]
+
+class TeamMatchRatingSeriesResponse(BaseModel):
+    """TeamMatchRatingsResponse as parallel arrays, one element per match (chart-friendly)."""
+    team_number: int
+    year: int
+    match_key: List[str] = []
+    event_key: List[str] = []
+    comp_level: List[str] = []
+    match_number: List[int] = []
+    set_number: List[int] = []
+    played: List[bool] = []
+    a: List[Optional[float]] = []
+    t: List[Optional[float]] = []
+    e: List[Optional[float]] = []
+    r: List[Optional[float]] = []
+    c: List[Optional[float]] = []
+    ace: List[Optional[float]] = []
@@ -0,0 +1,21 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class AlliancePlayoffOdds(BaseModel):
+    alliance: int
+    teams: List[int]
+    strength: float
+    p_champion: float
+    p_finals: float
+    # p_survive[r - 1]: still alive after double-elimination round r (1-5)
+    p_survive: List[float]
+
+
+class EventPlayoffOddsResponse(BaseModel):
+    event_key: str
+    engine: Optional[str] = None
+    state_key: Optional[str] = None
+    updated_at: Optional[str] = None
+    alliances: List[AlliancePlayoffOdds] = []
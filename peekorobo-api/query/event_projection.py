@@ -0,0 +1,32 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class EventProjectionQuery(BaseModel):
+    # Rounded up to 1000, 5000, 20000 or 50000 (event_projection.SIMULATION_TIERS).
+    simulations: int = Field(default=20000, ge=1000, le=50000)
+
+
+class TeamProjection(BaseModel):
+    team_number: int
+    current_rank: Optional[int] = None
+    wins: int
+    losses: int
+    ties: int
+    remaining: int
+    mean_wins: float
+    mean_rank: float
+    p_first: float
+    p_top8: float
+    # rank_probs[i] = probability of finishing quals ranked i + 1
+    rank_probs: List[float]
+
+
+class EventProjectionResponse(BaseModel):
+    event_key: str
+    simulations: int
+    engine: str
+    played_matches: int
+    remaining_matches: int
+    teams: List[TeamProjection]
@@ -40,3 +40,34 @@ class MapEventsResponse(BaseModel):
     year: int
     count: int
     events: List[MapEvent]
+
+
+class MapClusterArrays(BaseModel):
+    """Parallel arrays, one entry per cluster. ``id`` is set only for single points."""
+
+    x: List[int]
+    y: List[int]
+    count: List[int]
+    id: List[Optional[str]]
+
+
+class MapTileResponse(BaseModel):
+    year: int
+    layer: str
+    z: int
+    x: int
+    y: int
+    # Tile-local integer coordinates in [0, extent), like a vector tile.
+    extent: int
+    count: int
+    clusters: MapClusterArrays
+
+
+class MapClustersResponse(BaseModel):
+    year: int
+    layer: str
+    zoom: int
+    # x = round(lng * precision), y = round(lat * precision).
+    precision: int
+    count: int
+    clusters: MapClusterArrays
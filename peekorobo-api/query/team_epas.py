@@ -3,15 +3,15 @@ from typing import Optional, List, Dict, Any
 
 class TeamPerfInfo(BaseModel):
     year : int
-    raw : Optional[float]
-    ace : Optional[float]
-    confidence : Optional[float]
-    auto_raw : Optional[float]
-    teleop_raw : Optional[float]
-    endgame_raw : Optional[float]
-    wins : Optional[int]
-    losses : Optional[int]
-    ties : Optional[int]
+    raw : Optional[float] = None
+    ace : Optional[float] = None
+    confidence : Optional[float] = None
+    auto_raw : Optional[float] = None
+    teleop_raw : Optional[float] = None
+    endgame_raw : Optional[float] = None
+    wins : Optional[int] = None
+    losses : Optional[int] = None
+    ties : Optional[int] = None
     event_perf : Optional[List[Dict[str, Any]]] = None
     rank_global : Optional[int] = None
     rank_country : Optional[int] = None
@@ -37,10 +37,18 @@ class TeamPerfListRequest(BaseModel):
     state_prov : Optional[str] = None
     country : Optional[str] = None
     district_key : Optional[str] = None
-    # "rank" returns the top `limit` teams by global ACE rank (fast preview,
-    # no cursor). Any other value uses the default team-number cursor paging.
+    # "rank" orders by ACE descending and pages with `next_cursor`. Any other
+    # value uses the default team-number cursor paging (`next_team_number`).
     sort : Optional[str] = None
+    # Opaque keyset cursor for sort=rank, taken from the previous page's `next_cursor`.
+    next_cursor : Optional[str] = None
+    # Comma-separated projection, e.g. "ace,raw,rank_global". Omitted = every
+    # scalar column. Unselected columns are left out of the response entirely.
+    fields : Optional[str] = None
+    # Comma-separated opt-ins for heavy columns. Only "event_perf" today.
+    include : Optional[str] = None
 
 class TeamPerfListResponse(BaseModel):
     team_perfs : List[TeamPerfResponse]
     next : Optional[int] = None
+    next_cursor : Optional[str] = None
@@ -0,0 +1,9 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class WebhookAck(BaseModel):
+    message_type: str
+    queued: bool = False
+    queue_id: Optional[int] = None
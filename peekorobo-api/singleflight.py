@@ -0,0 +1,105 @@
+"""Single-flight request coalescing for identical concurrent reads.
+
+When the CDN copy of a hot URL expires (an Einstein match list, the insights
+overview) many identical requests arrive at once. Without coalescing each one
+takes a DB semaphore slot and runs the same query. Here the first request for a
+key becomes the *leader* and does the work; every identical request that
+arrives while it is in flight awaits the leader and reuses its serialized
+response instead of touching the database.
+
+Only successful (200) responses are shared. If the leader fails, is cancelled,
+or returns anything else (429, 503, 404 ...), waiting followers fall back to
+running their own request so errors are never fanned out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+
+@dataclass
+class SharedResponse:
+    """A fully-read response body plus what is needed to rebuild it per follower."""
+
+    status_code: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    media_type: Optional[str] = None
+
+
+@dataclass
+class SingleFlightStats:
+    leaders: int = 0
+    coalesced: int = 0
+    fallbacks: int = 0
+    per_path: Dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "fallbacks": self.fallbacks,
+            "per_path": dict(self.per_path),
+        }
+
+
+def request_key(path: str, query_items: List[Tuple[str, str]], scope_token: str = "") -> str:
+    """Normalized key: path + query params sorted so ``?a=1&b=2`` == ``?b=2&a=1``."""
+    query = urlencode(sorted(query_items))
+    key = f"{path.rstrip('/') or '/'}?{query}"
+    if scope_token:
+        key = f"{key}#{scope_token}"
+    return key
+
+
+class SingleFlight:
+    """Deduplicates concurrent async computations that share a key (per process)."""
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = SingleFlightStats()
+
+    def inflight_count(self) -> int:
+        return len(self._inflight)
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Tuple[object, Optional[SharedResponse]]]],
+        *,
+        label: str = "",
+    ) -> Tuple[object, bool]:
+        """Run ``fn`` once per in-flight ``key``.
+
+        ``fn`` returns ``(result, shareable)`` where ``shareable`` is what
+        followers receive (``None`` means "do not share; compute your own").
+        Returns ``(result, coalesced)``: the leader gets its own ``result``,
+        followers get the leader's ``SharedResponse``.
+        """
+        existing = self._inflight.get(key)
+        if existing is not None:
+            # shield: a follower disconnecting must not cancel the leader's future.
+            shared = await asyncio.shield(existing)
+            if shared is not None:
+                self.stats.coalesced += 1
+                if label:
+                    self.stats.per_path[label] = self.stats.per_path.get(label, 0) + 1
+                return shared, True
+            self.stats.fallbacks += 1
+            result, _ = await fn()
+            return result, False
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.stats.leaders += 1
+        shared: Optional[SharedResponse] = None
+        try:
+            result, shared = await fn()
+            return result, False
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.set_result(shared)